@@ -0,0 +1,133 @@
+# SPDX-License-Identifier: Apache-2.0
+"""
+Resize Backend Benchmark
+
+Compares throughput and peak memory of the installed image resize backends for
+each resolution preset. Every (image, backend, preset) combination runs in a
+fresh process so the peak resident set size of one run does not hide another.
+
+Usage (from apps/servers/inference_bridge/server):
+    PYTHONPATH=. python _scripts/benchmark_resize.py [IMAGE ...] [--iterations N]
+
+Without image arguments, synthetic 4K and 8K JPEG and PNG images are generated.
+"""
+
+import argparse
+import multiprocessing
+import resource
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+from loguru import logger
+
+
+def _reset_peak_rss() -> None:
+    """Reset the peak resident set size on Linux, which otherwise carries over from the parent process."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _peak_rss_mb() -> float:
+    """Peak resident set size of this process in MiB."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _run(image_path: str, backend: str, preset: str, iterations: int, results) -> None:
+    """Resize one image repeatedly with one backend and report throughput and peak memory."""
+    from server.utils.resizing import ResolutionPreset, resize_image
+
+    logger.remove()
+    _reset_peak_rss()
+    baseline = _peak_rss_mb()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        resized = resize_image(Path(image_path), ResolutionPreset[preset], backend=backend)
+        resized.load()
+    elapsed = time.perf_counter() - start
+    results.put((iterations / elapsed, _peak_rss_mb() - baseline, resized.size))
+
+
+def _generate_images(directory: Path) -> List[Path]:
+    """Create synthetic photo-like test images."""
+    from PIL import Image
+
+    images = []
+    for label, size in (("4k", (3840, 2160)), ("8k", (7680, 4320))):
+        gradient = Image.linear_gradient("L").resize(size)
+        noise = Image.effect_noise(size, 64)
+        image = Image.merge("RGB", (gradient, noise, gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT)))
+        for image_format, suffix in (("JPEG", ".jpg"), ("PNG", ".png")):
+            path = directory / f"synthetic_{label}{suffix}"
+            image.save(path, format=image_format)
+            images.append(path)
+    return images
+
+
+def benchmark(images: List[Path], iterations: int) -> List[Tuple[str, str, str, float, float, Tuple[int, int]]]:
+    """
+    Benchmark every installed backend on every preset smaller than each image.
+
+    Args:
+        images: Images to resize
+        iterations: Number of resizes per measurement
+
+    Returns:
+        Rows of (image name, backend, preset, images per second, peak MiB, output size)
+    """
+    from PIL import Image
+    from server.utils.resize_backends import available_resize_backends
+    from server.utils.resizing import ResolutionPreset, target_size
+
+    context = multiprocessing.get_context("spawn")
+    rows = []
+    for image_path in images:
+        with Image.open(image_path) as image:
+            size = image.size
+        for preset in ResolutionPreset:
+            if target_size(size, preset) is None:
+                continue
+            for backend in available_resize_backends():
+                results = context.Queue()
+                process = context.Process(
+                    target=_run, args=(str(image_path), backend, preset.name, iterations, results)
+                )
+                process.start()
+                throughput, peak_mb, output_size = results.get()
+                process.join()
+                rows.append((image_path.name, backend, preset.name, throughput, peak_mb, output_size))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("images", nargs="*", type=Path, help="Images to resize (default: synthetic 4K and 8K images)")
+    parser.add_argument("--iterations", type=int, default=5, help="Resizes per measurement")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        images = args.images or _generate_images(Path(directory))
+        rows = benchmark(images, args.iterations)
+
+    print(f"{'image':<22} {'backend':<8} {'preset':<10} {'images/s':>9} {'peak MiB':>9} {'output':>11}")
+    for name, backend, preset, throughput, peak_mb, output_size in rows:
+        output = f"{output_size[0]}x{output_size[1]}"
+        print(f"{name:<22} {backend:<8} {preset:<10} {throughput:>9.2f} {peak_mb:>9.1f} {output:>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ Manages server configuration settings using Pydantic.
 """
 
 import os
+import tempfile
 from pathlib import Path
 from typing import Optional
 
@@ -28,6 +29,32 @@ class Settings(BaseSettings):
     # Job settings
     MAX_CONCURRENT_JOBS: int = 5
     JOB_TIMEOUT_SECONDS: int = 3600  # 1 hour default timeout
+    MAX_QUEUED_JOBS: int = 100  # Jobs waiting beyond this are rejected with 503
+    JOB_RETRY_AFTER_SECONDS: int = 30  # Retry-After hint when no job durations are known yet
+
+    # Upload settings
+    MAX_UPLOAD_BYTES: int = 20 * 1024 * 1024  # Largest accepted image upload
+
+    # Caption result settings
+    CAPTION_RESULTS_STORE: bool = True  # Store caption results and reuse them instead of calling the provider again
+    CAPTION_RESULTS_FLUSH_SIZE: int = 100  # Batch results written to the store at once
+
+    # Image download settings
+    MAX_DOWNLOAD_BYTES: int = 20 * 1024 * 1024  # Largest accepted image download
+    DOWNLOAD_TIMEOUT_SECONDS: float = 30.0  # Timeout of a whole download
+    DOWNLOAD_MAX_CONNECTIONS: int = 100  # Pooled connections across all hosts
+    DOWNLOAD_MAX_CONNECTIONS_PER_HOST: int = 8  # Concurrent downloads from one host
+    DOWNLOAD_CACHE_PATH: Optional[Path] = None  # Defaults to a graphcap directory in the system temp dir
+    DOWNLOAD_CACHE_MAX_BYTES: int = 512 * 1024 * 1024  # Downloaded images kept for conditional requests, 0 disables
+
+    # Image resize settings
+    IMAGE_PREPROCESSING: bool = True  # Resize and re-encode images for the provider's token model
+    IMAGE_QUALITY: int = 85  # Encoding quality of preprocessed JPEG and WebP images
+    IMAGE_MAX_TOKENS: Optional[int] = None  # Optional image token budget per image
+    RESIZE_BACKEND: str = "auto"  # pillow, vips, opencv, or auto for the fastest installed backend
+    RESIZE_QUALITY: int = 90  # Encoding quality of resized JPEG and WebP images
+    DERIVED_IMAGE_CACHE_PATH: Optional[Path] = None  # Defaults to a graphcap directory in the system temp dir
+    DERIVED_IMAGE_CACHE_MAX_BYTES: int = 1024 * 1024 * 1024  # Resized images kept on disk
 
     # Debug settings
     SQL_DEBUG: bool = False
@@ -43,6 +70,12 @@ class Settings(BaseSettings):
         if not self.PROVIDER_CONFIG_PATH:
             self.PROVIDER_CONFIG_PATH = self.CONFIG_PATH / "provider.config.toml"
 
+        if not self.DERIVED_IMAGE_CACHE_PATH:
+            self.DERIVED_IMAGE_CACHE_PATH = Path(tempfile.gettempdir()) / "graphcap" / "derived_images"
+
+        if not self.DOWNLOAD_CACHE_PATH:
+            self.DOWNLOAD_CACHE_PATH = Path(tempfile.gettempdir()) / "graphcap" / "downloads"
+
         # Construct DATABASE_URL if not provided
         if not self.DATABASE_URL:
             self.DATABASE_URL = f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
@@ -0,0 +1,10 @@
+"""
+# SPDX-License-Identifier: Apache-2.0
+Captions Feature
+
+Provides the persisted store of caption results and endpoints to query it.
+"""
+
+from .router import router
+
+__all__ = ["router"]
@@ -0,0 +1,48 @@
+"""
+# SPDX-License-Identifier: Apache-2.0
+Captions Database Models
+
+SQLAlchemy mapping for the caption results table defined in the datamodel package.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import JSON, BigInteger, DateTime, Index, Integer, Text, func
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ...db import Base
+
+
+class CaptionResult(Base):
+    """A structured caption of one image by one perspective and model."""
+
+    __tablename__ = "caption_results"
+    __table_args__ = (
+        Index(
+            "caption_results_key_idx",
+            "image_hash",
+            "perspective",
+            "version",
+            "model",
+            "fields",
+            "provider",
+            "params",
+            unique=True,
+        ),
+        Index("caption_results_perspective_id_idx", "perspective", "id"),
+    )
+
+    # SQLite only auto-increments INTEGER primary keys
+    id: Mapped[int] = mapped_column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    image_hash: Mapped[str] = mapped_column(Text, nullable=False)
+    perspective: Mapped[str] = mapped_column(Text, nullable=False)
+    version: Mapped[str] = mapped_column(Text, nullable=False)
+    model: Mapped[str] = mapped_column(Text, nullable=False)
+    fields: Mapped[str] = mapped_column(Text, nullable=False, default="", server_default="")
+    provider: Mapped[str] = mapped_column(Text, nullable=False)
+    params: Mapped[str] = mapped_column(Text, nullable=False, default="", server_default="")
+    image_path: Mapped[Optional[str]] = mapped_column(Text)
+    result: Mapped[Dict[str, Any]] = mapped_column(JSON().with_variant(JSONB, "postgresql"), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, server_default=func.now())
@@ -0,0 +1,36 @@
+"""
+# SPDX-License-Identifier: Apache-2.0
+Captions API Models
+
+Defines data models for the captions API endpoints.
+"""
+
+from datetime import datetime
+from typing import List, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class CaptionResultInfo(BaseModel):
+    """A stored caption result."""
+
+    model_config = ConfigDict(from_attributes=True, protected_namespaces=())
+
+    id: int = Field(..., description="Identifier of the result")
+    image_hash: str = Field(..., description="SHA-256 of the image named by the caption request")
+    perspective: str = Field(..., description="Name of the perspective used")
+    version: str = Field(..., description="Version of the perspective")
+    model: str = Field(..., description="Model the caption was generated with")
+    fields: str = Field("", description="Comma-separated field selection, empty for every field")
+    provider: str = Field(..., description="Name of the provider used")
+    params: str = Field("", description="Canonical JSON of the global context and generation options")
+    image_path: Optional[str] = Field(None, description="Path or name of the image when it was captioned")
+    result: dict = Field(..., description="Structured caption result")
+    created_at: datetime = Field(..., description="When the result was stored")
+
+
+class CaptionResultsResponse(BaseModel):
+    """Response model for a page of caption results."""
+
+    results: List[CaptionResultInfo] = Field(..., description="Caption results ordered by id")
+    next_cursor: Optional[int] = Field(None, description="Cursor for the next page of results, if any")
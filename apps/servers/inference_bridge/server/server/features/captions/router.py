@@ -0,0 +1,59 @@
+"""
+# SPDX-License-Identifier: Apache-2.0
+Captions Router
+
+Defines API routes for querying stored caption results.
+
+This module provides the following endpoints:
+- GET /captions - Page through stored caption results, optionally filtered by image, perspective and model
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+
+from .models import CaptionResultInfo, CaptionResultsResponse
+from .service import get_caption_store
+
+router = APIRouter(prefix="/captions", tags=["captions"])
+
+
+@router.get("", response_model=CaptionResultsResponse)
+async def list_caption_results(
+    image_hash: Optional[str] = Query(None, description="Only return results for this image hash"),
+    perspective: Optional[str] = Query(None, description="Only return results of this perspective"),
+    version: Optional[str] = Query(None, description="Only return results of this perspective version"),
+    model: Optional[str] = Query(None, description="Only return results of this model"),
+    after: int = Query(0, ge=0, description="Return results after this cursor"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of results to return"),
+) -> CaptionResultsResponse:
+    """
+    Get a page of stored caption results.
+
+    Results are ordered by id; pass ``next_cursor`` as ``after`` to page.
+
+    Args:
+        image_hash: Only return results for this image hash
+        perspective: Only return results of this perspective
+        version: Only return results of this perspective version
+        model: Only return results of this model
+        after: Return results after this cursor
+        limit: Maximum number of results to return
+
+    Returns:
+        A page of caption results
+
+    Raises:
+        HTTPException: If the caption result store is not available
+    """
+    store = get_caption_store()
+    if store is None:
+        raise HTTPException(status_code=503, detail="Caption result store is not available")
+
+    results = await store.query(
+        image_hash=image_hash, perspective=perspective, version=version, model=model, after_id=after, limit=limit
+    )
+    return CaptionResultsResponse(
+        results=[CaptionResultInfo.model_validate(result) for result in results],
+        next_cursor=results[-1].id if len(results) == limit else None,
+    )
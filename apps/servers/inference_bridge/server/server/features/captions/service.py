@@ -0,0 +1,290 @@
+"""
+# SPDX-License-Identifier: Apache-2.0
+Captions Service
+
+Stores caption results and looks them up by image and perspective.
+
+Results are keyed by the SHA-256 of the image file or upload named by the
+request (its resized copy when a resize was requested), the perspective name
+and version, the model, the field selection, the provider and the generation
+parameters. Provider-side preprocessing only depends on the provider and model,
+so the same key always means the same request. Writing a result for an existing
+key replaces it. Large batches are loaded with COPY into
+a staging table on PostgreSQL; smaller batches and other databases (such as the
+SQLite stand-in used for local testing) use multi-row INSERT statements.
+"""
+
+import json
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from loguru import logger
+from sqlalchemy import func, insert, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from ... import db
+from ...config import settings
+from .db_models import CaptionResult
+
+KEY_COLUMNS = ("image_hash", "perspective", "version", "model", "fields", "provider", "params")
+VALUE_COLUMNS = ("image_path", "result")
+
+# Batches of at least this many rows are loaded with COPY on PostgreSQL
+COPY_THRESHOLD = 200
+
+# Rows per multi-row INSERT statement
+INSERT_BATCH_SIZE = 500
+
+# Image hashes per lookup statement
+LOOKUP_BATCH_SIZE = 500
+
+
+def fields_key(fields: Optional[Sequence[str]]) -> str:
+    """Normalize a field selection for use in a result key; an empty string selects every field."""
+    return ",".join(sorted(set(fields))) if fields else ""
+
+
+def params_key(global_context: Optional[str] = None, **options: Any) -> str:
+    """
+    Normalize the request parameters that shape a caption for use in a result key.
+
+    Args:
+        global_context: Global context sent with every prompt
+        **options: Generation options, such as max_tokens, temperature, top_p and repetition_penalty
+
+    Returns:
+        Canonical JSON of the parameters
+    """
+    return json.dumps({"global_context": global_context, **options}, sort_keys=True, separators=(",", ":"))
+
+
+@dataclass(frozen=True)
+class CaptionResultRow:
+    """A caption result to store."""
+
+    image_hash: str
+    perspective: str
+    version: str
+    model: str
+    provider: str
+    result: Dict[str, Any]
+    fields: str = ""
+    params: str = ""
+    image_path: Optional[str] = None
+
+
+def _dedupe(rows: Iterable[CaptionResultRow]) -> List[CaptionResultRow]:
+    """Keep the last row for each key, since one statement cannot update a row twice."""
+    latest = {}
+    for row in rows:
+        latest[tuple(getattr(row, column) for column in KEY_COLUMNS)] = row
+    return list(latest.values())
+
+
+class CaptionResultStore:
+    """
+    Caption results in the caption_results table.
+
+    Attributes:
+        session_factory (async_sessionmaker): Factory of sessions on the results database
+    """
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession]):
+        self.session_factory = session_factory
+
+    async def get(
+        self,
+        image_hash: str,
+        perspective: str,
+        version: str,
+        model: str,
+        provider: str,
+        fields: str = "",
+        params: str = "",
+    ) -> Optional[CaptionResult]:
+        """
+        Look up the result for a key.
+
+        Args:
+            image_hash: SHA-256 of the image
+            perspective: Name of the perspective
+            version: Version of the perspective
+            model: Model the caption was generated with
+            provider: Name of the provider the caption was generated with
+            fields: Normalized field selection from fields_key
+            params: Normalized request parameters from params_key
+
+        Returns:
+            The stored result, or None
+        """
+        async with self.session_factory() as session:
+            result = await session.execute(
+                select(CaptionResult).where(
+                    CaptionResult.image_hash == image_hash,
+                    CaptionResult.perspective == perspective,
+                    CaptionResult.version == version,
+                    CaptionResult.model == model,
+                    CaptionResult.fields == fields,
+                    CaptionResult.provider == provider,
+                    CaptionResult.params == params,
+                )
+            )
+            return result.scalar_one_or_none()
+
+    async def get_many(
+        self, image_hashes: Iterable[str], perspectives: Iterable[str], model: str, provider: str, params: str = ""
+    ) -> List[CaptionResult]:
+        """
+        Look up the results of many images and perspectives at once.
+
+        Callers match the returned rows on version and fields themselves.
+
+        Args:
+            image_hashes: SHA-256 of the images
+            perspectives: Names of the perspectives
+            model: Model the captions were generated with
+            provider: Name of the provider the captions were generated with
+            params: Normalized request parameters from params_key
+
+        Returns:
+            Stored results of any of the images and perspectives
+        """
+        image_hashes = sorted(set(image_hashes))
+        perspectives = sorted(set(perspectives))
+        if not image_hashes or not perspectives:
+            return []
+
+        results: List[CaptionResult] = []
+        async with self.session_factory() as session:
+            for start in range(0, len(image_hashes), LOOKUP_BATCH_SIZE):
+                result = await session.execute(
+                    select(CaptionResult).where(
+                        CaptionResult.image_hash.in_(image_hashes[start : start + LOOKUP_BATCH_SIZE]),
+                        CaptionResult.perspective.in_(perspectives),
+                        CaptionResult.model == model,
+                        CaptionResult.provider == provider,
+                        CaptionResult.params == params,
+                    )
+                )
+                results.extend(result.scalars().all())
+        return results
+
+    async def query(
+        self,
+        image_hash: Optional[str] = None,
+        perspective: Optional[str] = None,
+        version: Optional[str] = None,
+        model: Optional[str] = None,
+        after_id: int = 0,
+        limit: int = 100,
+    ) -> List[CaptionResult]:
+        """
+        Load a page of results ordered by id, starting after ``after_id``.
+
+        Args:
+            image_hash: Only return results for this image
+            perspective: Only return results of this perspective
+            version: Only return results of this perspective version
+            model: Only return results of this model
+            after_id: Return results with a larger id
+            limit: Maximum number of results
+
+        Returns:
+            Matching results
+        """
+        statement = select(CaptionResult).where(CaptionResult.id > after_id)
+        for column, value in (
+            (CaptionResult.image_hash, image_hash),
+            (CaptionResult.perspective, perspective),
+            (CaptionResult.version, version),
+            (CaptionResult.model, model),
+        ):
+            if value is not None:
+                statement = statement.where(column == value)
+
+        async with self.session_factory() as session:
+            result = await session.execute(statement.order_by(CaptionResult.id).limit(limit))
+            return list(result.scalars().all())
+
+    async def add_many(self, rows: Iterable[CaptionResultRow]) -> int:
+        """
+        Store results, replacing existing results with the same key.
+
+        Args:
+            rows: Results to store
+
+        Returns:
+            Number of results written
+        """
+        rows = _dedupe(rows)
+        if not rows:
+            return 0
+
+        async with self.session_factory() as session:
+            async with session.begin():
+                dialect = session.bind.dialect
+                if dialect.name == "postgresql" and dialect.driver == "asyncpg" and len(rows) >= COPY_THRESHOLD:
+                    await self._copy(session, rows)
+                else:
+                    for start in range(0, len(rows), INSERT_BATCH_SIZE):
+                        await self._insert(session, rows[start : start + INSERT_BATCH_SIZE])
+        logger.debug("Stored {} caption results", len(rows))
+        return len(rows)
+
+    async def _insert(self, session: AsyncSession, rows: List[CaptionResultRow]) -> None:
+        """Upsert rows with one multi-row INSERT statement."""
+        dialect = session.bind.dialect.name
+        values = [asdict(row) for row in rows]
+        if dialect in ("postgresql", "sqlite"):
+            dialect_insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+            statement = dialect_insert(CaptionResult).values(values)
+            statement = statement.on_conflict_do_update(
+                index_elements=list(KEY_COLUMNS),
+                set_={
+                    **{column: statement.excluded[column] for column in VALUE_COLUMNS},
+                    "created_at": func.now(),
+                },
+            )
+        else:
+            statement = insert(CaptionResult).values(values)
+        await session.execute(statement)
+
+    async def _copy(self, session: AsyncSession, rows: List[CaptionResultRow]) -> None:
+        """Load rows into a staging table with COPY, then upsert them in one statement."""
+        columns = KEY_COLUMNS + VALUE_COLUMNS
+        column_list = ", ".join(columns)
+        connection = await session.connection()
+        raw_connection = await connection.get_raw_connection()
+
+        await connection.execute(
+            text("CREATE TEMP TABLE caption_results_staging (LIKE caption_results INCLUDING DEFAULTS) ON COMMIT DROP")
+        )
+        await raw_connection.driver_connection.copy_records_to_table(
+            "caption_results_staging",
+            records=[
+                tuple(json.dumps(row.result) if column == "result" else getattr(row, column) for column in columns)
+                for row in rows
+            ],
+            columns=list(columns),
+        )
+        updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in VALUE_COLUMNS)
+        await connection.execute(
+            text(
+                f"INSERT INTO caption_results ({column_list}) SELECT {column_list} FROM caption_results_staging "
+                f"ON CONFLICT ({', '.join(KEY_COLUMNS)}) DO UPDATE SET {updates}, created_at = now()"
+            )
+        )
+
+
+_caption_store: Optional[CaptionResultStore] = None
+
+
+def get_caption_store() -> Optional[CaptionResultStore]:
+    """Get the caption result store on the application database, or None if it is disabled or not connected."""
+    global _caption_store
+    if not settings.CAPTION_RESULTS_STORE or db.SessionLocal is None:
+        return None
+    if _caption_store is None or _caption_store.session_factory is not db.SessionLocal:
+        _caption_store = CaptionResultStore(db.SessionLocal)
+    return _caption_store
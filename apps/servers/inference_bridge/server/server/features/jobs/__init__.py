@@ -0,0 +1,10 @@
+"""
+# SPDX-License-Identifier: Apache-2.0
+Jobs Feature
+
+Provides asynchronous caption jobs that run in a bounded server-side worker pool.
+"""
+
+from .router import router
+
+__all__ = ["router"]
@@ -0,0 +1,58 @@
+"""
+# SPDX-License-Identifier: Apache-2.0
+Jobs Database Models
+
+SQLAlchemy mappings for the batch job tables defined in the datamodel package.
+"""
+
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy import Boolean, DateTime, ForeignKey, Integer, Text, Uuid, func
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from ...db import Base
+
+
+class BatchJob(Base):
+    """A batch captioning job."""
+
+    __tablename__ = "batch_jobs"
+
+    job_id: Mapped[uuid.UUID] = mapped_column(Uuid, primary_key=True, default=uuid.uuid4)
+    type: Mapped[str] = mapped_column(Text, nullable=False)
+    status: Mapped[str] = mapped_column(Text, nullable=False, default="pending")
+    priority: Mapped[int] = mapped_column(Integer, nullable=False, default=100)
+    config: Mapped[Dict[str, Any]] = mapped_column(JSONB, nullable=False)
+    total_images: Mapped[int] = mapped_column(Integer, nullable=False)
+    processed_images: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    failed_images: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    progress: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    error: Mapped[Optional[str]] = mapped_column(Text)
+    owner: Mapped[Optional[str]] = mapped_column(Text)
+    heartbeat_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, server_default=func.now())
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    archived: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+
+
+class BatchJobItem(Base):
+    """A single image and perspective pair of a batch job."""
+
+    __tablename__ = "batch_job_items"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
+    job_id: Mapped[uuid.UUID] = mapped_column(
+        Uuid, ForeignKey("batch_jobs.job_id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    image_path: Mapped[str] = mapped_column(Text, nullable=False)
+    perspective: Mapped[str] = mapped_column(Text, nullable=False)
+    status: Mapped[str] = mapped_column(Text, nullable=False, default="pending")
+    error: Mapped[Optional[str]] = mapped_column(Text)
+    result: Mapped[Optional[Dict[str, Any]]] = mapped_column(JSONB)
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    processing_time: Mapped[Optional[int]] = mapped_column(Integer)
@@ -0,0 +1,76 @@
+"""
+# SPDX-License-Identifier: Apache-2.0
+Jobs API Models
+
+Defines data models for the jobs API endpoints.
+"""
+
+from datetime import datetime
+from enum import Enum
+from typing import List, Optional
+from uuid import UUID
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class JobStatus(str, Enum):
+    """Status values shared with the datamodel batch job tables."""
+
+    PENDING = "pending"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+    PARTIAL = "partial"
+
+    @property
+    def is_terminal(self) -> bool:
+        """Whether the job has finished and will not change again."""
+        return self not in (JobStatus.PENDING, JobStatus.RUNNING)
+
+
+class JobSubmitResponse(BaseModel):
+    """Response model for a submitted job."""
+
+    job_id: UUID = Field(..., description="Identifier of the job")
+    status: JobStatus = Field(..., description="Status of the job")
+    queue_depth: int = Field(..., description="Number of jobs waiting ahead of this one")
+
+
+class JobStatusResponse(BaseModel):
+    """Response model for the status of a job."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    job_id: UUID = Field(..., description="Identifier of the job")
+    type: str = Field(..., description="Type of the job")
+    status: JobStatus = Field(..., description="Status of the job")
+    total_images: int = Field(..., description="Number of images in the job")
+    processed_images: int = Field(..., description="Number of images with every perspective processed")
+    failed_images: int = Field(..., description="Number of processed images with at least one failed perspective")
+    progress: int = Field(..., description="Progress percentage (0-100)")
+    error: Optional[str] = Field(None, description="Error message if the job failed")
+    created_at: datetime = Field(..., description="When the job was submitted")
+    started_at: Optional[datetime] = Field(None, description="When the job started running")
+    completed_at: Optional[datetime] = Field(None, description="When the job finished")
+
+
+class JobItemResult(BaseModel):
+    """Result of one image and perspective pair of a job."""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int = Field(..., description="Identifier of the item")
+    image_path: str = Field(..., description="Path to the image file")
+    perspective: str = Field(..., description="Name of the perspective used")
+    status: str = Field(..., description="Status of the item")
+    result: Optional[dict] = Field(None, description="Structured caption result")
+    error: Optional[str] = Field(None, description="Error message if captioning failed")
+
+
+class JobResultsResponse(BaseModel):
+    """Response model for the results of a job."""
+
+    job: JobStatusResponse = Field(..., description="Status of the job")
+    items: List[JobItemResult] = Field(..., description="Results of the job items")
+    next_cursor: Optional[int] = Field(None, description="Cursor for the next page of items, if any")
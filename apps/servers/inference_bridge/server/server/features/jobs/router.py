@@ -0,0 +1,154 @@
+"""
+# SPDX-License-Identifier: Apache-2.0
+Jobs Router
+
+Defines API routes for asynchronous caption jobs.
+
+This module provides the following endpoints:
+- POST /jobs/caption-batch - Submit a caption batch as a background job
+- GET /jobs/{job_id} - Get the status of a job, optionally long-polling until it finishes
+- GET /jobs/{job_id}/results - Get a page of job results
+- POST /jobs/{job_id}/cancel - Cancel a pending or running job
+"""
+
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import JSONResponse
+
+from ..perspectives.models import CaptionBatchRequest
+from ..perspectives.service import resolve_batch_perspectives
+from .models import JobItemResult, JobResultsResponse, JobStatus, JobStatusResponse, JobSubmitResponse
+from .service import JobQueue, QueueFullError, get_job, get_job_items
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+# Longest accepted long-poll wait
+MAX_WAIT_SECONDS = 60.0
+
+
+def get_job_queue(request: Request) -> JobQueue:
+    """Get the job queue started by the application lifespan."""
+    job_queue = getattr(request.app.state, "job_queue", None)
+    if job_queue is None:
+        raise HTTPException(status_code=503, detail="Job queue is not running")
+    return job_queue
+
+
+@router.post(
+    "/caption-batch",
+    response_model=JobSubmitResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    responses={503: {"description": "Job queue is saturated; retry after the Retry-After header"}},
+)
+async def submit_caption_batch_job(
+    request: CaptionBatchRequest,
+    job_queue: JobQueue = Depends(get_job_queue),
+):
+    """
+    Submit a caption batch to run in the background.
+
+    Args:
+        request: Batch caption request with image paths, perspectives and provider settings
+
+    Returns:
+        Identifier and status of the queued job, or 503 with Retry-After when the queue is full
+
+    Raises:
+        HTTPException: If a perspective or field selection is invalid
+    """
+    nodes = resolve_batch_perspectives(request)
+    try:
+        job_id = await job_queue.submit(request, nodes)
+    except QueueFullError as e:
+        return JSONResponse(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            content={"detail": str(e)},
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    return JobSubmitResponse(job_id=job_id, status=JobStatus.PENDING, queue_depth=job_queue.queue_depth - 1)
+
+
+@router.get("/{job_id}", response_model=JobStatusResponse)
+async def get_job_status(
+    job_id: UUID,
+    wait: float = Query(0, ge=0, le=MAX_WAIT_SECONDS, description="Seconds to wait for the job to finish"),
+    job_queue: JobQueue = Depends(get_job_queue),
+) -> JobStatusResponse:
+    """
+    Get the status of a job.
+
+    With ``wait`` set, the request is held until the job finishes or the wait expires.
+
+    Args:
+        job_id: Identifier of the job
+        wait: Seconds to wait for the job to reach a terminal status
+
+    Returns:
+        Status of the job
+
+    Raises:
+        HTTPException: If the job does not exist
+    """
+    job = await job_queue.wait(job_id, wait) if wait else await get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return JobStatusResponse.model_validate(job)
+
+
+@router.get("/{job_id}/results", response_model=JobResultsResponse)
+async def get_job_results(
+    job_id: UUID,
+    after: int = Query(0, ge=0, description="Return items after this cursor"),
+    limit: int = Query(100, ge=1, le=1000, description="Maximum number of items to return"),
+) -> JobResultsResponse:
+    """
+    Get a page of results of a job.
+
+    Results are available while the job runs; pass ``next_cursor`` as ``after`` to page.
+
+    Args:
+        job_id: Identifier of the job
+        after: Return items after this cursor
+        limit: Maximum number of items to return
+
+    Returns:
+        Status of the job and a page of item results
+
+    Raises:
+        HTTPException: If the job does not exist
+    """
+    job = await get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+
+    items = await get_job_items(job_id, after_id=after, limit=limit)
+    return JobResultsResponse(
+        job=JobStatusResponse.model_validate(job),
+        items=[JobItemResult.model_validate(item) for item in items],
+        next_cursor=items[-1].id if len(items) == limit else None,
+    )
+
+
+@router.post("/{job_id}/cancel", response_model=JobStatusResponse)
+async def cancel_job(job_id: UUID, job_queue: JobQueue = Depends(get_job_queue)) -> JobStatusResponse:
+    """
+    Cancel a pending or running job.
+
+    Args:
+        job_id: Identifier of the job
+
+    Returns:
+        Status of the job after cancellation
+
+    Raises:
+        HTTPException: If the job does not exist or cannot be cancelled by this server
+    """
+    if not await job_queue.cancel(job_id):
+        job = await get_job(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+        raise HTTPException(status_code=409, detail=f"Job '{job_id}' is {job.status} and cannot be cancelled")
+
+    job = await job_queue.wait(job_id, MAX_WAIT_SECONDS)
+    return JobStatusResponse.model_validate(job)
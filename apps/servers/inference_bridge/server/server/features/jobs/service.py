@@ -0,0 +1,404 @@
+"""
+# SPDX-License-Identifier: Apache-2.0
+Jobs Service
+
+Runs caption batches as background jobs with persisted status and results.
+
+Submitted jobs wait in an in-memory queue and are executed by a fixed pool of
+MAX_CONCURRENT_JOBS workers, each job bounded by JOB_TIMEOUT_SECONDS. Status,
+progress and per-item results are written to the batch job tables so clients can
+poll for them from any server process.
+
+Every job records the server process that owns it, which refreshes a heartbeat
+while the job is pending or running. Active jobs whose heartbeat goes stale were
+orphaned by a crashed process and are marked as failed; jobs of live processes
+sharing the database are left alone.
+"""
+
+import asyncio
+import math
+import os
+import socket
+import time
+from collections import Counter, deque
+from datetime import timedelta
+from typing import Deque, Dict, List, Optional, Tuple
+from uuid import UUID, uuid4
+
+from loguru import logger
+from sqlalchemy import func, or_, select, update
+
+from ...db import managed_transaction
+from ..perspectives.models import CaptionBatchItem, CaptionBatchRequest
+from ..perspectives.service import create_provider, stream_caption_batch
+from .db_models import BatchJob, BatchJobItem
+from .models import JobStatus
+
+JOB_TYPE_MULTI_PERSPECTIVE = "MULTI_PERSPECTIVE"
+
+# Number of item results written to the database at once
+ITEM_FLUSH_SIZE = 50
+
+# Interval for polling the database when waiting on a job run by another process
+POLL_INTERVAL_SECONDS = 1.0
+
+# Interval at which a server process refreshes the heartbeat of its active jobs
+HEARTBEAT_INTERVAL_SECONDS = 15.0
+
+# Active jobs whose heartbeat is older than this are considered orphaned
+HEARTBEAT_STALE_SECONDS = 4 * HEARTBEAT_INTERVAL_SECONDS
+
+ACTIVE_STATUSES = [JobStatus.PENDING.value, JobStatus.RUNNING.value]
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue cannot accept more jobs."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Job queue is full, retry after {retry_after} seconds")
+        self.retry_after = retry_after
+
+
+def _job_config(request: CaptionBatchRequest) -> dict:
+    """Build the persisted job configuration, leaving out provider credentials."""
+    config = request.model_dump(exclude={"provider_config", "stream_format"})
+    config["provider_config"] = {
+        key: value for key, value in request.provider_config.items() if key not in ("api_key", "apiKey")
+    }
+    return config
+
+
+async def create_job(request: CaptionBatchRequest, owner: Optional[str] = None) -> UUID:
+    """Persist a new pending job for a caption batch request, owned by the given server process."""
+    async with managed_transaction() as session:
+        job = BatchJob(
+            type=JOB_TYPE_MULTI_PERSPECTIVE,
+            status=JobStatus.PENDING.value,
+            config=_job_config(request),
+            total_images=len(request.image_paths),
+            owner=owner,
+            heartbeat_at=func.now(),
+        )
+        session.add(job)
+        await session.flush()
+        return job.job_id
+
+
+async def get_job(job_id: UUID) -> Optional[BatchJob]:
+    """Load a job by id."""
+    async with managed_transaction() as session:
+        return await session.get(BatchJob, job_id)
+
+
+async def get_job_items(job_id: UUID, after_id: int = 0, limit: int = 100) -> List[BatchJobItem]:
+    """Load a page of job item results ordered by id, starting after ``after_id``."""
+    async with managed_transaction() as session:
+        result = await session.execute(
+            select(BatchJobItem)
+            .where(BatchJobItem.job_id == job_id, BatchJobItem.id > after_id)
+            .order_by(BatchJobItem.id)
+            .limit(limit)
+        )
+        return list(result.scalars().all())
+
+
+async def _update_job(job_id: UUID, **values) -> None:
+    """Update columns of a job."""
+    async with managed_transaction() as session:
+        await session.execute(update(BatchJob).where(BatchJob.job_id == job_id).values(**values))
+
+
+async def _write_items(job_id: UUID, items: List[CaptionBatchItem], processed: int, failed: int, total: int) -> None:
+    """Insert item results and update job counters in one transaction."""
+    async with managed_transaction() as session:
+        session.add_all(
+            BatchJobItem(
+                job_id=job_id,
+                image_path=item.image_path,
+                perspective=item.perspective,
+                status=JobStatus.FAILED.value if item.error else JobStatus.COMPLETED.value,
+                error=item.error,
+                result=item.result,
+                completed_at=func.now(),
+            )
+            for item in items
+        )
+        await session.execute(
+            update(BatchJob)
+            .where(BatchJob.job_id == job_id)
+            .values(
+                processed_images=processed,
+                failed_images=failed,
+                progress=min(100, int(processed * 100 / total)) if total else 100,
+            )
+        )
+
+
+async def heartbeat_jobs(owner: str) -> None:
+    """Refresh the heartbeat of the active jobs owned by a server process."""
+    async with managed_transaction() as session:
+        await session.execute(
+            update(BatchJob)
+            .where(BatchJob.owner == owner, BatchJob.status.in_(ACTIVE_STATUSES))
+            .values(heartbeat_at=func.now())
+        )
+
+
+async def fail_interrupted_jobs(owner: str, stale_after: float = HEARTBEAT_STALE_SECONDS) -> None:
+    """
+    Mark active jobs orphaned by a crashed server process as failed.
+
+    Jobs of other processes are only failed once their heartbeat, or their
+    creation time for jobs without one, is older than ``stale_after`` seconds.
+
+    Args:
+        owner: Identifier of the calling process, whose jobs are never failed here
+        stale_after: Age in seconds after which a heartbeat is considered stale
+    """
+    last_seen = func.coalesce(BatchJob.heartbeat_at, BatchJob.created_at)
+    async with managed_transaction() as session:
+        result = await session.execute(
+            update(BatchJob)
+            .where(
+                BatchJob.type == JOB_TYPE_MULTI_PERSPECTIVE,
+                BatchJob.status.in_(ACTIVE_STATUSES),
+                or_(BatchJob.owner.is_(None), BatchJob.owner != owner),
+                last_seen < func.now() - timedelta(seconds=stale_after),
+            )
+            .values(status=JobStatus.FAILED.value, error="Interrupted by server restart", completed_at=func.now())
+        )
+        if result.rowcount:
+            logger.warning(f"Marked {result.rowcount} interrupted jobs as failed")
+
+
+class JobQueue:
+    """
+    Bounded queue of caption jobs executed by a fixed pool of workers.
+
+    Attributes:
+        max_concurrent_jobs (int): Number of jobs that run at the same time
+        max_queued_jobs (int): Number of waiting jobs accepted before submissions are rejected
+        job_timeout_seconds (int): Maximum run time of a single job
+        owner (str): Identifier of this server process recorded on its jobs
+    """
+
+    def __init__(
+        self,
+        max_concurrent_jobs: int,
+        max_queued_jobs: int,
+        job_timeout_seconds: int,
+        default_retry_after: int = 30,
+    ):
+        self.max_concurrent_jobs = max_concurrent_jobs
+        self.max_queued_jobs = max_queued_jobs
+        self.job_timeout_seconds = job_timeout_seconds
+        self.default_retry_after = default_retry_after
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+        self._queue: asyncio.Queue[Tuple[UUID, CaptionBatchRequest, list]] = asyncio.Queue()
+        self._done_events: Dict[UUID, asyncio.Event] = {}
+        self._running: Dict[UUID, asyncio.Task] = {}
+        self._cancelled: set[UUID] = set()
+        self._durations: Deque[float] = deque(maxlen=20)
+        self._workers: List[asyncio.Task] = []
+        self._heartbeat: Optional[asyncio.Task] = None
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of jobs waiting for a worker."""
+        return self._queue.qsize()
+
+    def retry_after(self) -> int:
+        """Estimate how many seconds until a queue slot frees up."""
+        if not self._durations:
+            return self.default_retry_after
+        average = sum(self._durations) / len(self._durations)
+        return max(1, math.ceil(average / self.max_concurrent_jobs))
+
+    async def start(self) -> None:
+        """Start the worker pool and the heartbeat of this process's jobs."""
+        await fail_interrupted_jobs(self.owner)
+        self._workers = [asyncio.create_task(self._worker(i)) for i in range(self.max_concurrent_jobs)]
+        self._heartbeat = asyncio.create_task(self._heartbeat_loop())
+        logger.info(
+            f"Started {self.max_concurrent_jobs} job workers as {self.owner} (queue limit {self.max_queued_jobs})"
+        )
+
+    async def stop(self) -> None:
+        """Cancel running jobs and stop the worker pool."""
+        tasks = self._workers + ([self._heartbeat] if self._heartbeat is not None else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._heartbeat = None
+
+    async def _heartbeat_loop(self) -> None:
+        """Keep this process's jobs alive and fail jobs orphaned by other processes."""
+        while True:
+            await asyncio.sleep(HEARTBEAT_INTERVAL_SECONDS)
+            try:
+                await heartbeat_jobs(self.owner)
+                await fail_interrupted_jobs(self.owner)
+            except Exception as e:
+                logger.warning(f"Failed to refresh job heartbeats: {e}")
+
+    async def submit(self, request: CaptionBatchRequest, nodes: list) -> UUID:
+        """
+        Persist and enqueue a caption batch job.
+
+        Args:
+            request: Batch caption request
+            nodes: Validated perspective graph nodes for the request
+
+        Returns:
+            Identifier of the job
+
+        Raises:
+            QueueFullError: If the queue already holds max_queued_jobs waiting jobs
+        """
+        if self.queue_depth >= self.max_queued_jobs:
+            raise QueueFullError(self.retry_after())
+
+        job_id = await create_job(request, self.owner)
+        self._done_events[job_id] = asyncio.Event()
+        self._queue.put_nowait((job_id, request, nodes))
+        logger.info(f"Queued job {job_id} ({self.queue_depth} waiting)")
+        return job_id
+
+    async def cancel(self, job_id: UUID) -> bool:
+        """
+        Cancel a job run by this process.
+
+        Returns:
+            True if the job was pending or running here and is now cancelled
+        """
+        if job_id not in self._done_events or self._done_events[job_id].is_set():
+            return False
+
+        self._cancelled.add(job_id)
+        task = self._running.get(job_id)
+        if task is not None:
+            task.cancel()
+        else:
+            await _update_job(job_id, status=JobStatus.CANCELLED.value, completed_at=func.now())
+            self._done_events.pop(job_id).set()
+        return True
+
+    async def wait(self, job_id: UUID, timeout: float) -> Optional[BatchJob]:
+        """
+        Wait until a job reaches a terminal status or the timeout expires.
+
+        Jobs run by this process are awaited directly; jobs run elsewhere are polled.
+
+        Returns:
+            The job as stored after waiting, or None if it does not exist
+        """
+        deadline = time.monotonic() + timeout
+        event = self._done_events.get(job_id)
+        if event is not None:
+            try:
+                await asyncio.wait_for(event.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            return await get_job(job_id)
+
+        while True:
+            job = await get_job(job_id)
+            remaining = deadline - time.monotonic()
+            if job is None or JobStatus(job.status).is_terminal or remaining <= 0:
+                return job
+            await asyncio.sleep(min(POLL_INTERVAL_SECONDS, remaining))
+
+    async def _worker(self, index: int) -> None:
+        """Take jobs from the queue and run them one at a time."""
+        while True:
+            job_id, request, nodes = await self._queue.get()
+            try:
+                if job_id in self._cancelled:
+                    continue
+                task = asyncio.create_task(self._run_job(job_id, request, nodes))
+                self._running[job_id] = task
+                await self._finish(job_id, task)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job worker {index} failed to run job {job_id}: {e}")
+            finally:
+                self._running.pop(job_id, None)
+                self._cancelled.discard(job_id)
+                event = self._done_events.pop(job_id, None)
+                if event is not None:
+                    event.set()
+                self._queue.task_done()
+
+    async def _finish(self, job_id: UUID, task: asyncio.Task) -> None:
+        """Await a job under the timeout and record how it ended."""
+        start_time = time.monotonic()
+        try:
+            status = await asyncio.wait_for(task, self.job_timeout_seconds)
+            await _update_job(job_id, status=status.value, completed_at=func.now())
+            logger.info(f"Job {job_id} finished with status {status.value}")
+        except asyncio.TimeoutError:
+            logger.error(f"Job {job_id} timed out after {self.job_timeout_seconds} seconds")
+            await _update_job(
+                job_id,
+                status=JobStatus.FAILED.value,
+                error=f"Timed out after {self.job_timeout_seconds} seconds",
+                completed_at=func.now(),
+            )
+        except asyncio.CancelledError:
+            if job_id not in self._cancelled:
+                # The worker itself is shutting down
+                await asyncio.shield(
+                    _update_job(job_id, status=JobStatus.FAILED.value, error="Server shutdown", completed_at=func.now())
+                )
+                raise
+            await _update_job(job_id, status=JobStatus.CANCELLED.value, completed_at=func.now())
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {e}")
+            await _update_job(job_id, status=JobStatus.FAILED.value, error=str(e), completed_at=func.now())
+        finally:
+            self._durations.append(time.monotonic() - start_time)
+
+    async def _run_job(self, job_id: UUID, request: CaptionBatchRequest, nodes: list) -> JobStatus:
+        """
+        Run a caption batch, persisting results in chunks as they stream in.
+
+        Progress is counted in images like total_images: an image is processed
+        once all of its perspectives are, and failed if any of them failed.
+        """
+        await _update_job(job_id, status=JobStatus.RUNNING.value, started_at=func.now())
+        provider = create_provider(request.provider, request.provider_config)
+
+        total = len(request.image_paths)
+        processed = failed = 0
+        items_done = items_failed = 0
+        # Perspectives finished so far for each image index, and images with a failed perspective
+        done_per_image: Counter[int] = Counter()
+        failed_images: set[int] = set()
+        pending: List[CaptionBatchItem] = []
+        async for record in stream_caption_batch(request, nodes, provider):
+            if not isinstance(record, CaptionBatchItem):
+                continue
+            pending.append(record)
+            items_done += 1
+            done_per_image[record.index] += 1
+            if record.error is not None:
+                items_failed += 1
+                failed_images.add(record.index)
+            if done_per_image[record.index] == len(nodes):
+                del done_per_image[record.index]
+                processed += 1
+                if record.index in failed_images:
+                    failed_images.discard(record.index)
+                    failed += 1
+            if len(pending) >= ITEM_FLUSH_SIZE:
+                await _write_items(job_id, pending, processed, failed, total)
+                pending = []
+        await _write_items(job_id, pending, processed, failed, total)
+
+        if items_failed == 0:
+            return JobStatus.COMPLETED
+        if items_failed == items_done:
+            return JobStatus.FAILED
+        return JobStatus.PARTIAL
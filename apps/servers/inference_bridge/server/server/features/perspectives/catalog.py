@@ -0,0 +1,114 @@
+"""
+# SPDX-License-Identifier: Apache-2.0
+Perspective Catalog
+
+Precomputed perspective and module listings for the catalog endpoints.
+
+The catalog is built once per perspective registry generation. It indexes
+perspectives and modules by name and holds the serialized response bodies with
+their entity tags, so serving a listing is a dictionary lookup.
+"""
+
+import hashlib
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+from .models import ModuleInfo, ModuleListResponse, ModulePerspectivesResponse, PerspectiveInfo, PerspectiveListResponse
+
+
+@dataclass(frozen=True)
+class CatalogResponse:
+    """A serialized JSON response body and its entity tag."""
+
+    body: bytes
+    etag: str
+
+    @classmethod
+    def from_model(cls, model) -> "CatalogResponse":
+        """Serialize a response model and derive a strong entity tag from the body."""
+        body = model.model_dump_json().encode()
+        return cls(body=body, etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """
+        Check whether an If-None-Match header matches this response.
+
+        Args:
+            if_none_match: Value of the If-None-Match request header, if any
+
+        Returns:
+            True if the client already has this response
+        """
+        if not if_none_match:
+            return False
+        for tag in if_none_match.split(","):
+            tag = tag.strip()
+            # If-None-Match uses weak comparison
+            if tag == "*" or tag.removeprefix("W/") == self.etag:
+                return True
+        return False
+
+
+@dataclass(frozen=True)
+class PerspectiveCatalog:
+    """Perspective and module listings for one registry generation."""
+
+    generation: int
+    perspectives: List[PerspectiveInfo]
+    modules: List[ModuleInfo]
+    perspective_index: Dict[str, PerspectiveInfo]
+    module_index: Dict[str, ModuleInfo]
+    module_perspectives: Dict[str, List[PerspectiveInfo]]
+    perspective_list_response: CatalogResponse
+    module_list_response: CatalogResponse
+    module_responses: Dict[str, CatalogResponse]
+
+
+def build_catalog(generation: int, perspectives: List[PerspectiveInfo]) -> PerspectiveCatalog:
+    """
+    Build the catalog for a list of perspectives.
+
+    Args:
+        generation: Registry generation the perspectives were read from
+        perspectives: Information about every available perspective
+
+    Returns:
+        The catalog with indexes and serialized responses
+    """
+    # Group perspectives by module
+    module_map: Dict[str, List[PerspectiveInfo]] = defaultdict(list)
+    for perspective in perspectives:
+        module_map[perspective.module].append(perspective)
+
+    modules = []
+    for module_name, module_perspectives in module_map.items():
+        # Sort perspectives by priority, then name
+        module_perspectives.sort(key=lambda p: (p.priority, p.name))
+        modules.append(
+            ModuleInfo(
+                name=module_name,
+                display_name=module_name.replace("_", " ").title(),
+                description=f"Contains {len(module_perspectives)} perspectives",
+                enabled=True,
+                perspective_count=len(module_perspectives),
+            )
+        )
+    modules.sort(key=lambda m: m.name)
+
+    return PerspectiveCatalog(
+        generation=generation,
+        perspectives=perspectives,
+        modules=modules,
+        perspective_index={p.name: p for p in perspectives},
+        module_index={m.name: m for m in modules},
+        module_perspectives=dict(module_map),
+        perspective_list_response=CatalogResponse.from_model(PerspectiveListResponse(perspectives=perspectives)),
+        module_list_response=CatalogResponse.from_model(ModuleListResponse(modules=modules)),
+        module_responses={
+            m.name: CatalogResponse.from_model(
+                ModulePerspectivesResponse(module=m, perspectives=module_map[m.name])
+            )
+            for m in modules
+        },
+    )
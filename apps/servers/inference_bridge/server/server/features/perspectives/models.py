@@ -5,7 +5,7 @@ Perspectives API Models
 Defines data models for the perspectives API endpoints.
 """
 
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Literal, Optional, Union
 
 from pydantic import BaseModel, Field
 
@@ -17,6 +17,7 @@ DESC_TOP_P = "Top-p sampling parameter"
 DESC_REPETITION_PENALTY = "Repetition penalty"
 DESC_GLOBAL_CONTEXT = "Global context for the caption"
 DESC_ADDITIONAL_CONTEXT = "Additional context for the caption"
+DESC_FIELDS = "Output fields to generate (None for the full perspective schema)"
 DESC_RESIZE_RESOLUTION = (
     "Resolution to resize to (None to disable, or SD_VGA, HD_720P, FHD_1080P, QHD_1440P, UHD_4K, UHD_8K)"
 )
@@ -113,12 +114,16 @@ class CaptionRequest(BaseModel):
 
     perspective: str = Field(..., description=DESC_PERSPECTIVE_NAME)
     image: ImageSource = Field(..., description="Image to caption")
+    provider: str = Field(..., description="Name of the provider to use")
+    provider_config: dict = Field(..., description="Provider configuration")
+    model: str = Field(..., description="Model name to use for processing")
     max_tokens: Optional[int] = Field(4096, description=DESC_MAX_TOKENS)
     temperature: Optional[float] = Field(0.8, description=DESC_TEMPERATURE)
     top_p: Optional[float] = Field(0.9, description=DESC_TOP_P)
     repetition_penalty: Optional[float] = Field(1.15, description=DESC_REPETITION_PENALTY)
     context: Optional[List[str]] = Field(None, description=DESC_ADDITIONAL_CONTEXT)
     global_context: Optional[str] = Field(None, description=DESC_GLOBAL_CONTEXT)
+    fields: Optional[List[str]] = Field(None, description=DESC_FIELDS)
     resize_resolution: Optional[str] = Field(None, description=DESC_RESIZE_RESOLUTION)
 
     class Config:
@@ -126,6 +131,8 @@ class CaptionRequest(BaseModel):
             "example": {
                 "perspective": "custom_caption",
                 "image": {"url": "https://example.com/image.jpg"},
+                "provider": "gemini",
+                "model": "gemini-pro-vision",
                 "max_tokens": 4096,
                 "temperature": 0.8,
                 "resize_resolution": "HD_720P",
@@ -158,6 +165,7 @@ class CaptionPathRequest(BaseModel):
     repetition_penalty: Optional[float] = Field(1.15, description=DESC_REPETITION_PENALTY)
     context: Optional[Union[List[str], str]] = Field(None, description=DESC_ADDITIONAL_CONTEXT)
     global_context: Optional[str] = Field(None, description=DESC_GLOBAL_CONTEXT)
+    fields: Optional[List[str]] = Field(None, description=DESC_FIELDS)
     resize_resolution: Optional[str] = Field(None, description=DESC_RESIZE_RESOLUTION)
 
     class Config:
@@ -180,3 +188,65 @@ class CaptionPathRequest(BaseModel):
                 "resize_resolution": "HD_720P",
             }
         }
+
+
+class CaptionBatchRequest(BaseModel):
+    """Request model for captioning many images with one or more perspectives."""
+
+    perspectives: List[str] = Field(..., min_length=1, description="Names of the perspectives to use")
+    image_paths: List[str] = Field(..., min_length=1, description="Paths to the image files in the workspace")
+    provider: str = Field(..., description="Name of the provider to use")
+    provider_config: dict = Field(..., description="Provider configuration")
+    model: str = Field(..., description="Model name to use for processing")
+    max_tokens: Optional[int] = Field(4096, description=DESC_MAX_TOKENS)
+    temperature: Optional[float] = Field(0.8, description=DESC_TEMPERATURE)
+    top_p: Optional[float] = Field(0.9, description=DESC_TOP_P)
+    repetition_penalty: Optional[float] = Field(1.15, description=DESC_REPETITION_PENALTY)
+    global_context: Optional[str] = Field(None, description=DESC_GLOBAL_CONTEXT)
+    fields: Optional[Dict[str, List[str]]] = Field(
+        None, description="Output fields to generate, keyed by perspective (omitted perspectives use the full schema)"
+    )
+    max_concurrent: int = Field(8, ge=1, le=64, description="Maximum number of concurrent provider requests")
+    stream_format: Literal["ndjson", "sse"] = Field("ndjson", description="Format of the streamed response")
+
+    class Config:
+        schema_extra = {
+            "example": {
+                "perspectives": ["graph_caption", "art_critic"],
+                "image_paths": ["/workspace/datasets/example1.jpg", "/workspace/datasets/example2.jpg"],
+                "provider": "gemini",
+                "model": "gemini-2.0-flash-exp",
+                "provider_config": {
+                    "name": "gemini",
+                    "kind": "gemini",
+                    "environment": "cloud",
+                    "api_key": "your_api_key_here",
+                    "base_url": "https://generativelanguage.googleapis.com/v1beta",
+                    "models": ["gemini-2.0-flash-exp"]
+                },
+                "fields": {"graph_caption": ["short_caption"]},
+                "max_concurrent": 8,
+                "stream_format": "ndjson",
+            }
+        }
+
+
+class CaptionBatchItem(BaseModel):
+    """Streamed record for one image and perspective of a batch."""
+
+    type: Literal["result"] = "result"
+    index: int = Field(..., description="Position of the image in the request")
+    image_path: str = Field(..., description="Path to the image file")
+    perspective: str = Field(..., description="Name of the perspective used")
+    result: Optional[dict] = Field(None, description="Structured caption result")
+    error: Optional[str] = Field(None, description="Error message if captioning failed")
+
+
+class CaptionBatchSummary(BaseModel):
+    """Final streamed record of a batch."""
+
+    type: Literal["summary"] = "summary"
+    total: int = Field(..., description="Number of image and perspective pairs")
+    succeeded: int = Field(..., description="Number of successful captions")
+    failed: int = Field(..., description="Number of failed captions")
+    duration_seconds: float = Field(..., description="Time taken to process the batch")
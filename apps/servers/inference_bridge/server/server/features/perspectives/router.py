@@ -6,43 +6,142 @@ Defines API routes for working with perspective captions.
 
 This module provides the following endpoints:
 - GET /perspectives/list - List all available perspectives
-- POST /perspectives/caption - Generate a caption for an image using file upload
+- POST /perspectives/caption - Generate a caption for an image using a multipart file upload
 - GET /perspectives/debug/{perspective_name} - Get debug information about a perspective
 - POST /perspectives/caption-from-path - Generate a caption for an image using a file path
+- POST /perspectives/caption-from-url - Generate a caption for an image given by URL or base64 data
+- POST /perspectives/caption-batch - Caption many images with many perspectives, streaming results
 - GET /perspectives/modules - List all available perspective modules
 - GET /perspectives/modules/{module_name} - Get perspectives for a specific module
 """
 
 import json
-import os
-import tempfile
 from pathlib import Path
 from typing import List, Optional
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Depends, File, Form, Header, HTTPException, Request, Response, UploadFile, status
+from fastapi.responses import StreamingResponse
 from loguru import logger
 
-from ...utils.resizing import (ResolutionPreset, log_resize_options,
-                               resize_image)
-from .models import (CaptionPathRequest, CaptionResponse, ModuleListResponse,
-                     ModulePerspectivesResponse, PerspectiveListResponse)
-from .service import (generate_caption, get_available_modules,
-                      get_available_perspectives, get_perspectives_by_module)
+from ...config import settings
+from ...utils.downloads import ImageDownloader
+from .catalog import CatalogResponse
+from .models import (
+    DESC_ADDITIONAL_CONTEXT,
+    DESC_GLOBAL_CONTEXT,
+    DESC_MAX_TOKENS,
+    DESC_PERSPECTIVE_NAME,
+    DESC_REPETITION_PENALTY,
+    DESC_RESIZE_RESOLUTION,
+    DESC_TEMPERATURE,
+    DESC_TOP_P,
+    CaptionBatchRequest,
+    CaptionPathRequest,
+    CaptionRequest,
+    CaptionResponse,
+    ModuleListResponse,
+    ModulePerspectivesResponse,
+    PerspectiveListResponse,
+)
+from .service import (
+    create_provider,
+    decode_base64_image,
+    download_image_bytes,
+    generate_caption,
+    get_perspective_catalog,
+    prepare_image_bytes,
+    prepare_image_path,
+    read_upload_bytes,
+    resolve_batch_perspectives,
+    stream_caption_batch,
+)
 
 router = APIRouter(prefix="/perspectives", tags=["perspectives"])
 
 
+def get_image_downloader(request: Request) -> ImageDownloader:
+    """Get the image download client started by the application lifespan."""
+    downloader = getattr(request.app.state, "image_downloader", None)
+    if downloader is None:
+        raise HTTPException(status_code=503, detail="Image downloader is not running")
+    return downloader
+
+
 @router.get("/list", response_model=PerspectiveListResponse)
-async def list_perspectives() -> PerspectiveListResponse:
+async def list_perspectives(if_none_match: Optional[str] = Header(None)) -> Response:
     """
     List all available perspectives.
 
+    The listing is precomputed per perspective registry generation and carries an
+    ETag; a matching If-None-Match header returns 304 Not Modified.
+
     Returns:
         List of available perspectives
     """
-    perspectives = get_available_perspectives()
-    return PerspectiveListResponse(perspectives=perspectives)
+    return _catalog_response(get_perspective_catalog().perspective_list_response, if_none_match)
+
+
+def _catalog_response(catalog_response: CatalogResponse, if_none_match: Optional[str]) -> Response:
+    """Serve a precomputed catalog response, or 304 Not Modified if the client already has it."""
+    headers = {"ETag": catalog_response.etag, "Cache-Control": "no-cache"}
+    if catalog_response.matches(if_none_match):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=catalog_response.body, media_type="application/json", headers=headers)
+
+
+@router.post("/caption", response_model=CaptionResponse, status_code=status.HTTP_200_OK)
+async def create_caption_from_upload(
+    file: UploadFile = File(..., description="Image file to caption"),
+    perspective: str = Form(..., description=DESC_PERSPECTIVE_NAME),
+    provider: str = Form(..., description="Name of the provider to use"),
+    provider_config: str = Form(..., description="Provider configuration as a JSON object"),
+    model: str = Form(..., description="Model name to use for processing"),
+    max_tokens: Optional[int] = Form(4096, description=DESC_MAX_TOKENS),
+    temperature: Optional[float] = Form(0.8, description=DESC_TEMPERATURE),
+    top_p: Optional[float] = Form(0.9, description=DESC_TOP_P),
+    repetition_penalty: Optional[float] = Form(1.15, description=DESC_REPETITION_PENALTY),
+    context: Optional[str] = Form(None, description=DESC_ADDITIONAL_CONTEXT),
+    global_context: Optional[str] = Form(None, description=DESC_GLOBAL_CONTEXT),
+    fields: Optional[str] = Form(None, description="Comma-separated or JSON list of output fields to generate"),
+    resize_resolution: Optional[str] = Form(None, description=DESC_RESIZE_RESOLUTION),
+) -> CaptionResponse:
+    """
+    Generate a caption for an uploaded image using a perspective.
+
+    The image bytes stay in memory: they are validated once, optionally resized in
+    memory and handed straight to the provider client without temporary files.
+
+    Returns:
+        Generated caption with structured result and optional raw text
+
+    Raises:
+        HTTPException: If the request is invalid or processing fails
+    """
+    try:
+        parsed_provider_config = json.loads(provider_config)
+    except json.JSONDecodeError as e:
+        raise HTTPException(status_code=400, detail=f"provider_config must be a JSON object: {str(e)}")
 
+    image_bytes = await prepare_image_bytes(
+        await read_upload_bytes(file, settings.MAX_UPLOAD_BYTES), resize_resolution
+    )
+
+    caption_data = await generate_caption(
+        perspective_name=perspective,
+        image_path=image_bytes,
+        model=model,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        top_p=top_p,
+        repetition_penalty=repetition_penalty,
+        context=_process_context(context),
+        global_context=global_context,
+        provider_name=provider,
+        provider_config=parsed_provider_config,
+        fields=_process_fields(fields),
+        filename=Path(file.filename).name if file.filename else None,
+    )
+    return _prepare_caption_response(caption_data, perspective, provider)
 
 
 @router.post("/caption-from-path", response_model=CaptionResponse, status_code=status.HTTP_200_OK)
@@ -66,10 +165,9 @@ async def create_caption_from_path(
     try:
         # Create Path object from image path and validate
         image_path = _validate_image_path(request.image_path)
-        temp_path = None
 
         # Handle image resizing if requested
-        image_path, temp_path = await _resize_image_if_needed(image_path, request.resize_resolution)
+        image_path = await prepare_image_path(image_path, request.resize_resolution)
 
         # Process context
         context = _process_context(request.context)
@@ -103,11 +201,9 @@ async def create_caption_from_path(
             global_context=request.global_context,
             provider_name=request.provider,
             provider_config=request.provider_config,
+            fields=request.fields,
         )
 
-        # Clean up temporary file if we created one
-        _cleanup_temp_file(temp_path)
-
         # Prepare the response
         return _prepare_caption_response(caption_data, request.perspective, request.provider)
     except Exception as e:
@@ -117,52 +213,101 @@ async def create_caption_from_path(
         raise HTTPException(status_code=500, detail=f"Error creating caption from path: {str(e)}")
 
 
-def _validate_image_path(image_path_str: str) -> Path:
-    """Validate that the image path exists."""
-    image_path = Path(image_path_str)
-    if not image_path.exists():
-        raise HTTPException(status_code=404, detail=f"Image file not found: {image_path}")
-    return image_path
+@router.post("/caption-from-url", response_model=CaptionResponse, status_code=status.HTTP_200_OK)
+async def create_caption_from_url(
+    request: CaptionRequest,
+    downloader: ImageDownloader = Depends(get_image_downloader),
+) -> CaptionResponse:
+    """
+    Generate a caption for an image given by URL or base64 data.
 
+    URLs are fetched with the shared download client, which pools connections,
+    limits concurrent downloads per host, enforces the download size limit and
+    revalidates previously downloaded images instead of fetching them again.
 
-async def _resize_image_if_needed(image_path: Path, resize_resolution: Optional[str]) -> tuple[Path, Optional[Path]]:
-    """Resize the image if a resize resolution is provided."""
-    temp_path = None
+    Args:
+        request: Caption request with the image source and perspective settings
 
-    # Log resize options
-    options = {"resize_resolution": resize_resolution}
-    log_resize_options(options)
+    Returns:
+        Generated caption with structured result and optional raw text
+
+    Raises:
+        HTTPException: If the request is invalid or processing fails
+    """
+    if request.image.url:
+        image_bytes = await download_image_bytes(downloader, request.image.url)
+        filename = Path(request.image.url.split("?", 1)[0]).name or None
+    elif request.image.base64:
+        image_bytes = decode_base64_image(request.image.base64)
+        filename = None
+    else:
+        raise HTTPException(status_code=400, detail="Image must have a url or base64 data")
+
+    caption_data = await generate_caption(
+        perspective_name=request.perspective,
+        image_path=await prepare_image_bytes(image_bytes, request.resize_resolution),
+        model=request.model,
+        max_tokens=request.max_tokens,
+        temperature=request.temperature,
+        top_p=request.top_p,
+        repetition_penalty=request.repetition_penalty,
+        context=request.context,
+        global_context=request.global_context,
+        provider_name=request.provider,
+        provider_config=request.provider_config,
+        fields=request.fields,
+        filename=filename,
+    )
+    return _prepare_caption_response(caption_data, request.perspective, request.provider)
 
-    if not resize_resolution:
-        return image_path, temp_path
 
+@router.post("/caption-batch", status_code=status.HTTP_200_OK)
+async def create_caption_batch(request: CaptionBatchRequest) -> StreamingResponse:
+    """
+    Caption many images with one or more perspectives in a single request.
+
+    Requests run with bounded concurrency on one provider client. Each image and
+    perspective pair is streamed back as soon as its image completes, followed by
+    a summary record. Per-item failures are reported in the stream; only invalid
+    requests fail the whole call.
+
+    Args:
+        request: Batch caption request with image paths, perspectives and provider settings
+
+    Returns:
+        NDJSON (application/x-ndjson) or server-sent events (text/event-stream) stream
+
+    Raises:
+        HTTPException: If a perspective, field selection or provider configuration is invalid
+    """
+    nodes = resolve_batch_perspectives(request)
     try:
-        # Get the resolution enum value
-        try:
-            resolution = ResolutionPreset[resize_resolution]
-        except (KeyError, ValueError):
-            logger.warning(f"Invalid resolution: {resize_resolution}. Skipping resize.")
-            return image_path, temp_path
-        
-        # Create temporary file for resized image
-        suffix = os.path.splitext(str(image_path))[1]
-        fd, resized_path = tempfile.mkstemp(suffix=suffix)
-        os.close(fd)
-        temp_path = Path(resized_path)
-
-        # Resize the image
-        logger.info(f"Resizing image to {resolution.name} ({resolution.value})")
-        resized_img = resize_image(image_path, resolution)
-        resized_img.save(resized_path)
-
-        # Use the resized image
-        logger.info(f"Image resized successfully to {resolution.name}")
-        return temp_path, temp_path
+        provider = create_provider(request.provider, request.provider_config)
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error resizing image: {str(e)}")
-        logger.warning("Using original image instead")
-        # Continue with original image if resizing fails
-        return image_path, temp_path
+        logger.error(f"Error creating provider for caption batch: {str(e)}")
+        raise HTTPException(status_code=400, detail=f"Invalid provider configuration: {str(e)}")
+
+    async def ndjson_stream():
+        async for record in stream_caption_batch(request, nodes, provider):
+            yield record.model_dump_json() + "\n"
+
+    async def sse_stream():
+        async for record in stream_caption_batch(request, nodes, provider):
+            yield f"event: {record.type}\ndata: {record.model_dump_json()}\n\n"
+
+    if request.stream_format == "sse":
+        return StreamingResponse(sse_stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+    return StreamingResponse(ndjson_stream(), media_type="application/x-ndjson")
+
+
+def _validate_image_path(image_path_str: str) -> Path:
+    """Validate that the image path exists."""
+    image_path = Path(image_path_str)
+    if not image_path.exists():
+        raise HTTPException(status_code=404, detail=f"Image file not found: {image_path}")
+    return image_path
 
 
 def _process_context(context_input) -> Optional[List[str]]:
@@ -186,19 +331,24 @@ def _process_context(context_input) -> Optional[List[str]]:
         return [context_input]
 
 
-def _cleanup_temp_file(temp_path: Optional[Path]) -> None:
-    """Clean up temporary file if it exists."""
-    if temp_path and temp_path.exists():
-        try:
-            os.unlink(temp_path)
-        except Exception as e:
-            logger.error(f"Error removing temporary file: {str(e)}")
+def _process_fields(fields_input: Optional[str]) -> Optional[List[str]]:
+    """Parse a field selection given as a JSON list or comma-separated string."""
+    if not fields_input:
+        return None
+
+    try:
+        parsed_fields = json.loads(fields_input)
+        if isinstance(parsed_fields, list):
+            return [str(field) for field in parsed_fields]
+    except json.JSONDecodeError:
+        pass
+    return [field.strip() for field in fields_input.split(",") if field.strip()]
 
 
 def _prepare_caption_response(caption_data: dict, perspective: str, provider: str) -> CaptionResponse:
     """Prepare the caption response from the caption data."""
     # Log the caption data for debugging
-    logger.debug(f"Caption data: {caption_data}")
+    logger.debug("Caption data: {}", caption_data)
 
     # Extract the parsed result and raw text
     parsed_result = caption_data.get("parsed", {})
@@ -218,22 +368,19 @@ def _prepare_caption_response(caption_data: dict, perspective: str, provider: st
     )
 
 
-
-
 @router.get("/modules", response_model=ModuleListResponse)
-async def list_modules() -> ModuleListResponse:
+async def list_modules(if_none_match: Optional[str] = Header(None)) -> Response:
     """
     List all available perspective modules.
 
     Returns:
         List of available modules with metadata
     """
-    modules = get_available_modules()
-    return ModuleListResponse(modules=modules)
+    return _catalog_response(get_perspective_catalog().module_list_response, if_none_match)
 
 
 @router.get("/modules/{module_name}", response_model=ModulePerspectivesResponse)
-async def get_module_perspectives(module_name: str) -> ModulePerspectivesResponse:
+async def get_module_perspectives(module_name: str, if_none_match: Optional[str] = Header(None)) -> Response:
     """
     Get all perspectives that belong to a specific module.
 
@@ -242,31 +389,11 @@ async def get_module_perspectives(module_name: str) -> ModulePerspectivesRespons
 
     Returns:
         Module information and list of perspectives in the module
-    
+
     Raises:
         HTTPException: If the module is not found
     """
-    try:
-        # Get perspectives for the module
-        perspectives = get_perspectives_by_module(module_name)
-        
-        # Get module info
-        modules = get_available_modules()
-        module = next((m for m in modules if m.name == module_name), None)
-        
-        if not module:
-            raise HTTPException(status_code=404, detail=f"Module '{module_name}' not found")
-        
-        return ModulePerspectivesResponse(
-            module=module,
-            perspectives=perspectives
-        )
-    except HTTPException:
-        # Re-raise HTTP exceptions
-        raise
-    except Exception as e:
-        logger.error(f"Error getting perspectives for module '{module_name}': {str(e)}")
-        raise HTTPException(
-            status_code=500,
-            detail=f"Error getting perspectives for module '{module_name}': {str(e)}"
-        )
+    catalog_response = get_perspective_catalog().module_responses.get(module_name)
+    if catalog_response is None:
+        raise HTTPException(status_code=404, detail=f"Module '{module_name}' not found")
+    return _catalog_response(catalog_response, if_none_match)
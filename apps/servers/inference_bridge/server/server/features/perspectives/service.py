@@ -5,90 +5,245 @@ Perspectives Service
 Provides services for working with perspective captions.
 """
 
+import asyncio
 import base64
-import os
-import tempfile
+import binascii
+import time
 from collections import defaultdict
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import AsyncIterator, Dict, List, Optional, Union
 
-import aiohttp
-from fastapi import HTTPException
+from fastapi import HTTPException, UploadFile
 from loguru import logger
 
-from graphcap.perspectives import get_perspective, get_perspective_list
-
-from .models import (ModuleInfo, PerspectiveInfo, PerspectiveSchema,
-                     SchemaField, TableColumn)
-
-
-async def download_image(url: str) -> Path:
+from graphcap.perspectives import (
+    PerspectiveNode,
+    PerspectiveScheduler,
+    get_perspective,
+    get_perspective_list,
+    get_registry_generation,
+)
+from graphcap.perspectives.types import PerspectiveCaptionResult
+from graphcap.providers import ImagePreprocessor
+from graphcap.providers.clients.base_client import BaseClient
+
+from ...config import settings
+from ...utils.downloads import DownloadError, ImageDownloader
+from ...utils.image_cache import DerivedImageCache, derived_image_key, file_fingerprint, hash_bytes, hash_file
+from ...utils.images import resize_image_bytes, resize_image_file, validate_image_bytes
+from ...utils.resizing import ResolutionPreset
+from ..captions.db_models import CaptionResult
+from ..captions.service import CaptionResultRow, fields_key, get_caption_store, params_key
+from ..providers.models import ProviderConfig
+from ..providers.service import create_provider_client_from_config
+from .catalog import PerspectiveCatalog, build_catalog
+from .models import (
+    CaptionBatchItem,
+    CaptionBatchRequest,
+    CaptionBatchSummary,
+    ModuleInfo,
+    PerspectiveInfo,
+    PerspectiveSchema,
+    SchemaField,
+    TableColumn,
+)
+
+
+async def download_image_bytes(downloader: ImageDownloader, url: str) -> bytes:
     """
-    Download an image from a URL to a temporary file.
+    Download an image from a URL into memory.
+
     Args:
+        downloader: Shared download client from the application lifespan
         url: URL of the image to download
+
     Returns:
-        Path to the downloaded image
+        Encoded image bytes
+
     Raises:
         HTTPException: If the image cannot be downloaded
     """
     try:
-        # Create a temporary file
-        fd, temp_path = tempfile.mkstemp(suffix=".jpg")
-        os.close(fd)
-        temp_file = Path(temp_path)
-
-        # Download the image
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status != 200:
-                    raise HTTPException(status_code=400, detail=f"Failed to download image from URL: {response.status}")
-
-                content = await response.read()
-                with open(temp_file, "wb") as f:
-                    f.write(content)
-
-        return temp_file
-    except Exception as e:
+        return await downloader.fetch(url)
+    except DownloadError as e:
         logger.error(f"Error downloading image: {str(e)}")
-        raise HTTPException(status_code=400, detail=f"Error downloading image: {str(e)}")
+        raise HTTPException(status_code=e.status_code, detail=str(e))
 
 
-async def save_base64_image(base64_data: str) -> Path:
+def decode_base64_image(base64_data: str) -> bytes:
     """
-    Save a base64-encoded image to a temporary file.
+    Decode a base64-encoded image or data URL into bytes.
 
     Args:
         base64_data: Base64-encoded image data
 
     Returns:
-        Path to the saved image
+        Encoded image bytes
 
     Raises:
-        HTTPException: If the image cannot be saved
+        HTTPException: If the data is not valid base64
     """
+    # Handle data URLs (e.g., "data:image/jpeg;base64,...")
+    if "base64," in base64_data:
+        base64_data = base64_data.split("base64,")[1]
+
     try:
-        # Create a temporary file
-        fd, temp_path = tempfile.mkstemp(suffix=".jpg")
-        os.close(fd)
-        temp_file = Path(temp_path)
+        return base64.b64decode(base64_data, validate=True)
+    except (binascii.Error, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid base64 image data: {str(e)}")
 
-        # Decode and save the image
-        try:
-            # Handle data URLs (e.g., "data:image/jpeg;base64,...")
-            if "base64," in base64_data:
-                base64_data = base64_data.split("base64,")[1]
 
-            image_data = base64.b64decode(base64_data)
-            with open(temp_file, "wb") as f:
-                f.write(image_data)
+async def read_upload_bytes(upload: UploadFile, max_bytes: int) -> bytes:
+    """
+    Read an uploaded image into memory, enforcing a size limit.
 
-            return temp_file
-        except Exception as e:
-            raise HTTPException(status_code=400, detail=f"Invalid base64 image data: {str(e)}")
+    The upload is already held in a spooled buffer that only spills to disk for
+    large files, so small images never touch the filesystem.
+
+    Args:
+        upload: Uploaded file
+        max_bytes: Maximum accepted size in bytes
+
+    Returns:
+        Encoded image bytes
+
+    Raises:
+        HTTPException: If the upload exceeds the size limit
+    """
+    if upload.size is not None and upload.size > max_bytes:
+        raise HTTPException(status_code=413, detail=f"Image upload exceeds the {max_bytes} byte limit")
+
+    data = await upload.read(max_bytes + 1)
+    if len(data) > max_bytes:
+        raise HTTPException(status_code=413, detail=f"Image upload exceeds the {max_bytes} byte limit")
+    return data
+
+
+_derived_image_cache: Optional[DerivedImageCache] = None
+_image_preprocessor: Optional[ImagePreprocessor] = None
+
+
+def get_image_preprocessor() -> Optional[ImagePreprocessor]:
+    """Get the shared provider-aware image preprocessor, or None if preprocessing is disabled."""
+    global _image_preprocessor
+    if _image_preprocessor is None and settings.IMAGE_PREPROCESSING:
+        _image_preprocessor = ImagePreprocessor(
+            quality=settings.IMAGE_QUALITY, max_image_tokens=settings.IMAGE_MAX_TOKENS
+        )
+    return _image_preprocessor
+
+
+def get_derived_image_cache() -> DerivedImageCache:
+    """Get the shared cache of resized images."""
+    global _derived_image_cache
+    if _derived_image_cache is None:
+        _derived_image_cache = DerivedImageCache(
+            settings.DERIVED_IMAGE_CACHE_PATH, settings.DERIVED_IMAGE_CACHE_MAX_BYTES
+        )
+    return _derived_image_cache
+
+
+def _parse_resolution(resize_resolution: Optional[str]) -> Optional[ResolutionPreset]:
+    """Look up a resolution preset by name, ignoring unknown names."""
+    if not resize_resolution:
+        return None
+    try:
+        return ResolutionPreset[resize_resolution]
+    except KeyError:
+        logger.warning(f"Invalid resolution: {resize_resolution}. Skipping resize.")
+        return None
+
+
+def _derive_resized_bytes(data: bytes, image_format: str, resolution: ResolutionPreset) -> bytes:
+    """Resize image bytes, reusing a cached result for the same content and preset."""
+    cache = get_derived_image_cache()
+    suffix = f".{image_format.lower()}"
+    key = derived_image_key(hash_bytes(data), resolution.name, image_format, settings.RESIZE_QUALITY)
+    cached = cache.get(key, suffix)
+    if cached is not None:
+        logger.debug("Using cached {} image {}", resolution.name, cached.name)
+        return cached.read_bytes()
+
+    resized = resize_image_bytes(data, image_format, resolution, settings.RESIZE_QUALITY)
+    if resized is not data:
+        cache.put(key, suffix, resized)
+    return resized
+
+
+def _derive_resized_file(image_path: Path, resolution: ResolutionPreset) -> Path:
+    """Resize an image file, reusing a cached result while the file is unchanged."""
+    cache = get_derived_image_cache()
+    suffix = image_path.suffix.lower()
+    key = derived_image_key(file_fingerprint(image_path), resolution.name, suffix, settings.RESIZE_QUALITY)
+    cached = cache.get(key, suffix)
+    if cached is not None:
+        logger.debug("Using cached {} image for {}", resolution.name, image_path.name)
+        return cached
+
+    resized = resize_image_file(image_path, resolution, settings.RESIZE_QUALITY)
+    if resized is None:
+        return image_path
+    return cache.put(key, suffix, resized)
+
+
+async def prepare_image_bytes(data: bytes, resize_resolution: Optional[str] = None) -> bytes:
+    """
+    Validate image bytes once and optionally resize them in memory.
+
+    Decoding and resizing run in a worker thread; resized images are cached by
+    content so repeated requests for the same image skip the work.
+
+    Args:
+        data: Encoded image bytes
+        resize_resolution: Name of a ResolutionPreset to resize to, or None
+
+    Returns:
+        Image bytes ready to send to the provider
+
+    Raises:
+        HTTPException: If the data is not a supported image
+    """
+    try:
+        image_format = validate_image_bytes(data)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    resolution = _parse_resolution(resize_resolution)
+    if resolution is None:
+        return data
+
+    try:
+        return await asyncio.to_thread(_derive_resized_bytes, data, image_format, resolution)
     except Exception as e:
-        logger.error(f"Error saving base64 image: {str(e)}")
-        raise HTTPException(status_code=400, detail=f"Error saving base64 image: {str(e)}")
+        logger.error(f"Error resizing image: {str(e)}")
+        logger.warning("Using original image instead")
+        return data
+
+
+async def prepare_image_path(image_path: Path, resize_resolution: Optional[str] = None) -> Path:
+    """
+    Optionally resize an image file.
+
+    Decoding and resizing run in a worker thread; resized images are cached by
+    path, modification time and size so repeated requests skip the work.
+
+    Args:
+        image_path: Path to the image file
+        resize_resolution: Name of a ResolutionPreset to resize to, or None
+
+    Returns:
+        Path to the image to send to the provider: a cached resized copy, or the original
+    """
+    resolution = _parse_resolution(resize_resolution)
+    if resolution is None:
+        return image_path
+
+    try:
+        return await asyncio.to_thread(_derive_resized_file, image_path, resolution)
+    except Exception as e:
+        logger.error(f"Error resizing image: {str(e)}")
+        logger.warning("Using original image instead")
+        return image_path
 
 
 def load_perspective_schema(perspective_name: str) -> Optional[PerspectiveSchema]:
@@ -154,17 +309,10 @@ def load_perspective_schema(perspective_name: str) -> Optional[PerspectiveSchema
         return None
 
 
-def get_available_perspectives() -> List[PerspectiveInfo]:
-    """
-    Get a list of available perspectives with their schemas.
-
-    Returns:
-        List of perspective information including schemas
-    """
-    perspective_names = get_perspective_list()
+def _collect_perspectives() -> List[PerspectiveInfo]:
+    """Read information and schemas for every loaded perspective."""
     perspectives = []
-
-    for name in perspective_names:
+    for name in get_perspective_list():
         try:
             perspective = get_perspective(name)
             schema = load_perspective_schema(perspective.config_name)
@@ -189,6 +337,37 @@ def get_available_perspectives() -> List[PerspectiveInfo]:
     return perspectives
 
 
+_perspective_catalog: Optional[PerspectiveCatalog] = None
+
+
+def get_perspective_catalog() -> PerspectiveCatalog:
+    """
+    Get the perspective catalog, rebuilding it when the perspective registry changes.
+
+    Returns:
+        The catalog for the current registry generation
+    """
+    global _perspective_catalog
+    generation = get_registry_generation()
+    if _perspective_catalog is None or _perspective_catalog.generation != generation:
+        _perspective_catalog = build_catalog(generation, _collect_perspectives())
+        logger.info(
+            f"Built perspective catalog for registry generation {generation}: "
+            f"{len(_perspective_catalog.perspectives)} perspectives in {len(_perspective_catalog.modules)} modules"
+        )
+    return _perspective_catalog
+
+
+def get_available_perspectives() -> List[PerspectiveInfo]:
+    """
+    Get a list of available perspectives with their schemas.
+
+    Returns:
+        List of perspective information including schemas
+    """
+    return get_perspective_catalog().perspectives
+
+
 def get_available_modules() -> List[ModuleInfo]:
     """
     Get a list of available modules and their metadata.
@@ -196,33 +375,7 @@ def get_available_modules() -> List[ModuleInfo]:
     Returns:
         List of module information
     """
-    perspectives = get_available_perspectives()
-    
-    # Group perspectives by module
-    module_map = defaultdict(list)
-    for perspective in perspectives:
-        module_map[perspective.module].append(perspective)
-    
-    # Create module info objects
-    modules = []
-    for module_name, module_perspectives in module_map.items():
-        # Try to find a display name, falling back to the module name
-        display_name = module_name.replace("_", " ").title()
-        
-        modules.append(
-            ModuleInfo(
-                name=module_name,
-                display_name=display_name,
-                description=f"Contains {len(module_perspectives)} perspectives",
-                enabled=True,  # Default to enabled
-                perspective_count=len(module_perspectives)
-            )
-        )
-    
-    # Sort modules by name
-    modules.sort(key=lambda m: m.name)
-    
-    return modules
+    return get_perspective_catalog().modules
 
 
 def get_perspectives_by_module(module_name: str) -> List[PerspectiveInfo]:
@@ -233,32 +386,137 @@ def get_perspectives_by_module(module_name: str) -> List[PerspectiveInfo]:
         module_name: Name of the module to filter by
 
     Returns:
-        List of perspective information in the specified module
-        
+        List of perspective information in the specified module, sorted by priority then name
+
     Raises:
         HTTPException: If the module is not found
     """
-    perspectives = get_available_perspectives()
-    
-    # Filter perspectives by module name
-    module_perspectives = [p for p in perspectives if p.module == module_name]
-    
-    # If no perspectives were found for this module, the module might not exist
-    if not module_perspectives:
-        # Check if the module exists
-        all_modules = get_available_modules()
-        if not any(m.name == module_name for m in all_modules):
-            raise HTTPException(status_code=404, detail=f"Module '{module_name}' not found")
-    
-    # Sort perspectives by priority, then name
-    module_perspectives.sort(key=lambda p: (p.priority, p.name))
-    
+    module_perspectives = get_perspective_catalog().module_perspectives.get(module_name)
+    if module_perspectives is None:
+        raise HTTPException(status_code=404, detail=f"Module '{module_name}' not found")
     return module_perspectives
 
 
+async def hash_image(image: Union[Path, bytes]) -> str:
+    """Hash image bytes or an image file in a worker thread, giving the key of its stored captions."""
+    if isinstance(image, bytes):
+        return await asyncio.to_thread(hash_bytes, image)
+    return await asyncio.to_thread(hash_file, image)
+
+
+async def lookup_caption_result(
+    image_hash: str,
+    perspective: str,
+    version: str,
+    model: str,
+    provider_name: str,
+    fields: Optional[List[str]],
+    params: str,
+) -> Optional[CaptionResult]:
+    """Look up a stored caption result, treating an unavailable store as a miss."""
+    store = get_caption_store()
+    if store is None:
+        return None
+    try:
+        return await store.get(image_hash, perspective, version, model, provider_name, fields_key(fields), params)
+    except Exception as e:
+        logger.warning(f"Caption result lookup failed: {str(e)}")
+        return None
+
+
+async def lookup_batch_results(
+    image_hashes: Dict[str, str],
+    nodes: List[PerspectiveNode],
+    model: str,
+    provider: BaseClient,
+    provider_name: str,
+    params: str,
+) -> Dict[str, Dict[str, PerspectiveCaptionResult]]:
+    """
+    Look up the stored results of a batch, treating an unavailable store as a miss.
+
+    Nodes fed by other perspectives depend on more than the image and are never looked up.
+
+    Args:
+        image_hashes: Image hash by image path
+        nodes: Perspective graph nodes of the batch
+        model: Model name of the batch
+        provider: Provider client recorded on the reused results
+        provider_name: Name of the provider the results are keyed by
+        params: Normalized request parameters from params_key
+
+    Returns:
+        Reusable results by image path and node name, as PerspectiveScheduler.run takes them
+    """
+    store = get_caption_store()
+    lookup_nodes = [node for node in nodes if not node.depends_on]
+    if store is None or not image_hashes or not lookup_nodes:
+        return {}
+    try:
+        rows = await store.get_many(
+            image_hashes.values(), [node.name for node in lookup_nodes], model, provider_name, params
+        )
+    except Exception as e:
+        logger.warning(f"Caption result lookup failed: {str(e)}")
+        return {}
+
+    stored = {(row.image_hash, row.perspective, row.version, row.fields): row.result for row in rows}
+    prior_results: Dict[str, Dict[str, PerspectiveCaptionResult]] = {}
+    for image_path, image_hash in image_hashes.items():
+        for node in lookup_nodes:
+            result = stored.get((image_hash, node.name, node.processor.version, fields_key(node.fields)))
+            if result is not None:
+                prior_results.setdefault(image_path, {})[node.name] = node.processor.build_caption_result(
+                    provider, Path(image_path), model, result
+                )
+    return prior_results
+
+
+async def store_caption_results(rows: List[CaptionResultRow]) -> None:
+    """Store caption results, logging instead of failing if the store is unavailable."""
+    store = get_caption_store()
+    if store is None or not rows:
+        return
+    try:
+        await store.add_many(rows)
+    except Exception as e:
+        logger.warning(f"Could not store {len(rows)} caption results: {str(e)}")
+
+
+def create_provider(provider_name: str, provider_config: Optional[dict]) -> BaseClient:
+    """
+    Create a provider client from the configuration sent with a request.
+
+    Args:
+        provider_name: Name of the provider to use
+        provider_config: Full provider configuration
+
+    Returns:
+        Provider client
+
+    Raises:
+        HTTPException: If no provider configuration was provided
+    """
+    if not provider_config:
+        logger.error(f"No provider configuration provided for {provider_name}. Caption generation will likely fail.")
+        logger.error("Provider configuration must be provided in the request.")
+        raise HTTPException(
+            status_code=400,
+            detail=f"""Provider configuration not provided for '{provider_name}'.
+            Provider configuration must be included in the request.""",
+        )
+
+    # Convert dict to ProviderConfig
+    config = ProviderConfig(**provider_config)
+    provider = create_provider_client_from_config(config)
+    provider.image_preprocessor = get_image_preprocessor()
+    logger.debug("Created provider client from provided config for {}", provider_name)
+    return provider
+
+
 async def generate_caption(
     perspective_name: str,
-    image_path: Path,
+    image_path: Union[Path, bytes],
     model: str,
     max_tokens: Optional[int] = 4096,
     temperature: Optional[float] = 0.8,
@@ -268,13 +526,15 @@ async def generate_caption(
     global_context: Optional[str] = None,
     provider_name: str = "gemini",
     provider_config: Optional[dict] = None,
+    fields: Optional[List[str]] = None,
+    filename: Optional[str] = None,
 ) -> Dict:
     """
     Generate a caption for an image using a perspective.
 
     Args:
         perspective_name: Name of the perspective to use
-        image_path: Path to the image file
+        image_path: Path to the image file, or the encoded image bytes
         model: Model name to use for processing
         max_tokens: Maximum number of tokens in the response
         temperature: Temperature for generation
@@ -284,6 +544,8 @@ async def generate_caption(
         global_context: Global context for the caption
         provider_name: Name of the provider to use (default: "gemini")
         provider_config: Full provider configuration if available
+        fields: Output fields to generate, defaults to the full perspective schema
+        filename: Name recorded for the image, defaults to the file name of image_path
 
     Returns:
         Caption data
@@ -295,61 +557,91 @@ async def generate_caption(
         # Get the perspective
         perspective = get_perspective(perspective_name)
 
-        # Create a provider client using the config if provided
-        if provider_config:
-            from ..providers.models import ProviderConfig
-            from ..providers.service import create_provider_client_from_config
-
-            # Convert dict to ProviderConfig
-            config = ProviderConfig(**provider_config)
-            provider = create_provider_client_from_config(config)
-            logger.info(f"Created provider client from provided config for {provider_name}")
-        else:
-            # Legacy path - will likely fail as no provider manager exists
-            logger.error(f"No provider configuration provided for {provider_name}. Caption generation will likely fail.")
-            logger.error("Provider configuration must be provided in the request.")
-            raise HTTPException(
-                status_code=400,
-                detail=f"""Provider configuration not provided for '{provider_name}'. 
-                Provider configuration must be included in the request.""",
-            )
-
-        # Create a temporary output directory
-        with tempfile.TemporaryDirectory() as temp_dir:
-            output_dir = Path(temp_dir)
-
-            # Generate the caption
-            logger.info(
-                f"Generating caption for {image_path} using {perspective_name} perspective and {provider_name} provider"
-            )
+        # Restrict the schema and prompt to the requested fields
+        try:
+            perspective = perspective.project(fields)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        image_name = filename or (image_path.name if isinstance(image_path, Path) else "upload")
+        config_name = getattr(perspective, "config_name", perspective_name)
+        version = getattr(perspective, "version", "1.0")
+
+        # Reuse a stored result; captions that depend on request context are never stored
+        image_hash = None
+        params = params_key(
+            global_context,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            top_p=top_p,
+            repetition_penalty=repetition_penalty,
+        )
+        if not context and get_caption_store() is not None:
+            image_hash = await hash_image(image_path)
+            stored = await lookup_caption_result(image_hash, config_name, version, model, provider_name, fields, params)
+            if stored is not None:
+                logger.info("Using stored {} caption for {}", perspective_name, image_name)
+                return {
+                    "filename": f"./{image_name}",
+                    "config_name": config_name,
+                    "version": version,
+                    "model": model,
+                    "provider": stored.provider,
+                    "parsed": stored.result,
+                }
+
+        provider = create_provider(provider_name, provider_config)
+
+        # Generate the caption
+        logger.info(
+            "Generating caption for {} using {} perspective and {} provider",
+            image_name,
+            perspective_name,
+            provider_name,
+        )
+        parsed = await perspective.process_single(
+            provider=provider,
+            image_path=image_path,
+            model=model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            top_p=top_p,
+            repetition_penalty=repetition_penalty,
+            context=context,
+            global_context=global_context,
+        )
 
-            # Use process_single directly as process_batch has been deprecated
-            logger.info(f"Using process_single for {perspective_name}")
-            caption_data = await perspective.process_single(
-                provider=provider,
-                image_path=image_path,
-                model=model,
-                max_tokens=max_tokens,
-                temperature=temperature,
-                top_p=top_p,
-                repetition_penalty=repetition_penalty,
-                context=context,
-                global_context=global_context,
+        caption_data = {
+            "filename": f"./{image_name}",
+            "config_name": config_name,
+            "version": version,
+            "model": model,
+            "provider": provider.name,
+            "parsed": parsed,
+        }
+        if image_hash is not None:
+            await store_caption_results(
+                [
+                    CaptionResultRow(
+                        image_hash=image_hash,
+                        perspective=config_name,
+                        version=version,
+                        model=model,
+                        fields=fields_key(fields),
+                        provider=provider_name,
+                        params=params,
+                        image_path=image_name,
+                        result=parsed,
+                    )
+                ]
             )
 
-            caption_data = {
-                "filename": f"./{image_path.name}",
-                "config_name": getattr(perspective, 'config_name', perspective_name),
-                "version": getattr(perspective, 'version', '1.0'),
-                "model": model,
-                "provider": provider.name,
-                "parsed": caption_data,
-            }
+        # Log the result
+        logger.debug("Caption generated successfully for {}", image_name)
 
-            # Log the result
-            logger.info(f"Caption generated successfully: {caption_data.keys() if caption_data else 'None'}")
-
-            return caption_data
+        return caption_data
+    except HTTPException:
+        raise
     except ValueError as e:
         logger.error(f"Error getting perspective: {str(e)}")
         raise HTTPException(status_code=404, detail=str(e))
@@ -358,3 +650,157 @@ async def generate_caption(
         raise HTTPException(status_code=500, detail=f"Error generating caption: {str(e)}")
 
 
+def resolve_batch_perspectives(request: CaptionBatchRequest) -> List[PerspectiveNode]:
+    """
+    Resolve and validate the perspectives and field selections of a batch request.
+
+    Args:
+        request: Batch caption request
+
+    Returns:
+        Perspective graph nodes for the batch
+
+    Raises:
+        HTTPException: If a perspective is unknown or a field selection is invalid
+    """
+    fields = request.fields or {}
+    unknown = sorted(set(fields).difference(request.perspectives))
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Field selection for perspectives not in the batch: {unknown}")
+
+    nodes = []
+    for name in dict.fromkeys(request.perspectives):
+        try:
+            perspective = get_perspective(name)
+        except ValueError as e:
+            raise HTTPException(status_code=404, detail=str(e))
+
+        selected = tuple(fields[name]) if name in fields else None
+        try:
+            perspective.project(selected)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        nodes.append(PerspectiveNode(name=name, processor=perspective, fields=selected))
+    return nodes
+
+
+async def stream_caption_batch(
+    request: CaptionBatchRequest,
+    nodes: List[PerspectiveNode],
+    provider: BaseClient,
+) -> AsyncIterator[Union[CaptionBatchItem, CaptionBatchSummary]]:
+    """
+    Caption every image with every perspective, yielding records as images complete.
+
+    All requests share one provider client and one concurrency budget. Errors are
+    reported per item and the stream always ends with a summary record.
+
+    Args:
+        request: Batch caption request
+        nodes: Perspective graph nodes from resolve_batch_perspectives
+        provider: Provider client used for every request
+
+    Yields:
+        A CaptionBatchItem per image and perspective, then a CaptionBatchSummary
+    """
+    start_time = time.perf_counter()
+    succeeded = failed = 0
+    indices: Dict[str, List[int]] = defaultdict(list)
+    image_paths: List[Path] = []
+
+    for index, image_path_str in enumerate(request.image_paths):
+        image_path = Path(image_path_str)
+        if not image_path.is_file():
+            for node in nodes:
+                failed += 1
+                yield CaptionBatchItem(
+                    index=index,
+                    image_path=image_path_str,
+                    perspective=node.name,
+                    error=f"Image file not found: {image_path}",
+                )
+            continue
+        indices[str(image_path)].append(index)
+        image_paths.append(image_path)
+
+    # Reuse stored results instead of calling the provider for them
+    params = params_key(
+        request.global_context,
+        max_tokens=request.max_tokens,
+        temperature=request.temperature,
+        top_p=request.top_p,
+        repetition_penalty=request.repetition_penalty,
+    )
+    image_hashes: Dict[str, str] = {}
+    prior_results: Dict[str, Dict[str, PerspectiveCaptionResult]] = {}
+    if get_caption_store() is not None:
+        unique_paths = list(dict.fromkeys(str(image_path) for image_path in image_paths))
+        hashes = await asyncio.gather(*(hash_image(Path(image_path)) for image_path in unique_paths))
+        image_hashes = dict(zip(unique_paths, hashes))
+        prior_results = await lookup_batch_results(
+            image_hashes, nodes, request.model, provider, request.provider, params
+        )
+
+    reused = sum(len(prior) for prior in prior_results.values())
+    logger.info(
+        f"Captioning {len(image_paths)} images with {len(nodes)} perspectives, reusing {reused} stored results "
+        f"(max {request.max_concurrent} concurrent requests)"
+    )
+    scheduler = PerspectiveScheduler(
+        provider,
+        request.model,
+        nodes,
+        max_concurrent=request.max_concurrent,
+        global_context=request.global_context,
+        max_tokens=request.max_tokens,
+        temperature=request.temperature,
+        top_p=request.top_p,
+        repetition_penalty=request.repetition_penalty,
+    )
+    # New successful results are written to the caption result store in batches
+    store_results = bool(image_hashes)
+    pending_rows: List[CaptionResultRow] = []
+    nodes_by_name = {node.name: node for node in nodes}
+
+    async for image_result in scheduler.run(image_paths, prior_results=prior_results):
+        index = indices[image_result["image_path"]].pop(0)
+        prior = prior_results.get(image_result["image_path"], {})
+        for name, caption_data in image_result["perspectives"].items():
+            parsed = caption_data["parsed"]
+            if "error" in parsed:
+                failed += 1
+                yield CaptionBatchItem(
+                    index=index, image_path=image_result["image_path"], perspective=name, error=parsed["error"]
+                )
+                continue
+
+            succeeded += 1
+            node = nodes_by_name[name]
+            # Perspectives fed by other perspectives' output depend on more than the image
+            if store_results and not node.depends_on and name not in prior:
+                pending_rows.append(
+                    CaptionResultRow(
+                        image_hash=image_hashes[image_result["image_path"]],
+                        perspective=name,
+                        version=node.processor.version,
+                        model=request.model,
+                        fields=fields_key(node.fields),
+                        provider=request.provider,
+                        params=params,
+                        image_path=image_result["image_path"],
+                        result=parsed,
+                    )
+                )
+            yield CaptionBatchItem(index=index, image_path=image_result["image_path"], perspective=name, result=parsed)
+
+        if len(pending_rows) >= settings.CAPTION_RESULTS_FLUSH_SIZE:
+            await store_caption_results(pending_rows)
+            pending_rows = []
+    await store_caption_results(pending_rows)
+
+    yield CaptionBatchSummary(
+        total=succeeded + failed,
+        succeeded=succeeded,
+        failed=failed,
+        duration_seconds=round(time.perf_counter() - start_time, 3),
+    )
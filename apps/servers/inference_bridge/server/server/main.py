@@ -13,10 +13,14 @@ from typing import Any
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from .config import settings
 from .db import init_app_db
+from .features.jobs.service import JobQueue
 from .routers import main_router
+from .utils.downloads import ImageDownloader
 from .utils.logger import logger
 from .utils.middleware import setup_middlewares
+from .utils.resize_backends import set_default_resize_backend
 
 
 class GracefulExit(Exception):
@@ -71,10 +75,36 @@ async def lifespan(app: FastAPI):
         logger.info("Shutting down during startup")
         raise
 
+    set_default_resize_backend(settings.RESIZE_BACKEND)
+
+    # Start the background job workers
+    app.state.job_queue = JobQueue(
+        max_concurrent_jobs=settings.MAX_CONCURRENT_JOBS,
+        max_queued_jobs=settings.MAX_QUEUED_JOBS,
+        job_timeout_seconds=settings.JOB_TIMEOUT_SECONDS,
+        default_retry_after=settings.JOB_RETRY_AFTER_SECONDS,
+    )
+    await app.state.job_queue.start()
+
+    # Share one pooled HTTP client for image downloads
+    app.state.image_downloader = ImageDownloader(
+        max_bytes=settings.MAX_DOWNLOAD_BYTES,
+        timeout_seconds=settings.DOWNLOAD_TIMEOUT_SECONDS,
+        max_connections=settings.DOWNLOAD_MAX_CONNECTIONS,
+        max_connections_per_host=settings.DOWNLOAD_MAX_CONNECTIONS_PER_HOST,
+        cache_dir=settings.DOWNLOAD_CACHE_PATH,
+        cache_max_bytes=settings.DOWNLOAD_CACHE_MAX_BYTES,
+    )
+    await app.state.image_downloader.start()
+
     yield
 
     # Shutdown
     logger.info("Shutting down application")
+    await app.state.job_queue.stop()
+    await app.state.image_downloader.close()
+    # Flush the background log sink
+    await logger.complete()
 
 
 # Create FastAPI application
@@ -1,9 +1,11 @@
 from fastapi import APIRouter
 
+from .features.captions.router import router as captions_router
+from .features.jobs.router import router as jobs_router
 from .features.perspectives.router import router as perspectives_router
 from .features.providers.router import router as providers_router
 
-routers = [perspectives_router, providers_router]
+routers = [perspectives_router, providers_router, jobs_router, captions_router]
 
 main_router = APIRouter()
 
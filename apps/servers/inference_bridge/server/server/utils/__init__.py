@@ -7,11 +7,13 @@ Provides utility functions and classes for the FastAPI application.
 Key components:
 - logger: Configured loguru logger
 - resizing: Image resizing utilities
+- resize_backends: Pluggable implementations of image resizing
 - middleware: FastAPI middleware components
 """
 
 from . import logger
 from . import resizing
+from . import resize_backends
 from . import middleware
 
-__all__ = ["logger", "resizing", "middleware"]
+__all__ = ["logger", "resizing", "resize_backends", "middleware"]
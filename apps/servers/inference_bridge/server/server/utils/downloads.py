@@ -0,0 +1,199 @@
+# SPDX-License-Identifier: Apache-2.0
+"""
+Image Download Client
+
+This module provides the client used to fetch images by URL. One client lives
+for the lifetime of the application, so requests share pooled keep-alive
+connections instead of paying a TCP and TLS handshake each time.
+
+Downloads are streamed into memory and abandoned as soon as they exceed the size
+limit. Responses that carry an ETag or Last-Modified validator are kept in a
+size-bounded disk cache keyed by URL and validator; later downloads of the same
+URL send a conditional request and reuse the cached body on 304 Not Modified.
+"""
+
+import asyncio
+import hashlib
+import json
+from pathlib import Path
+from typing import Optional, Union
+
+import aiohttp
+from loguru import logger
+
+from .image_cache import DerivedImageCache
+
+CHUNK_SIZE = 64 * 1024
+
+
+class DownloadError(Exception):
+    """
+    Raised when an image cannot be downloaded.
+
+    Attributes:
+        status_code (int): HTTP status code to report to the caller
+    """
+
+    def __init__(self, message: str, status_code: int = 400):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+def _url_key(url: str, validator: str = "") -> str:
+    """Build the cache key of a URL, optionally for one version of its content."""
+    return hashlib.sha256(f"{url}|{validator}".encode()).hexdigest()
+
+
+class ImageDownloader:
+    """
+    Pooled, size-limited and cached HTTP image downloads.
+
+    Attributes:
+        max_bytes (int): Largest accepted response body
+        cache (DerivedImageCache): Cache of downloaded bodies and their validators, or None
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        timeout_seconds: float = 30.0,
+        max_connections: int = 100,
+        max_connections_per_host: int = 8,
+        cache_dir: Optional[Union[str, Path]] = None,
+        cache_max_bytes: int = 0,
+    ):
+        """
+        Args:
+            max_bytes: Largest accepted response body
+            timeout_seconds: Timeout of a whole download, including connecting
+            max_connections: Maximum concurrent connections across all hosts
+            max_connections_per_host: Maximum concurrent connections to one host
+            cache_dir: Directory of the download cache, or None to disable caching
+            cache_max_bytes: Size limit of the download cache
+        """
+        self.max_bytes = max_bytes
+        self.timeout = aiohttp.ClientTimeout(total=timeout_seconds, sock_connect=min(timeout_seconds, 10.0))
+        self.max_connections = max_connections
+        self.max_connections_per_host = max_connections_per_host
+        self.cache = DerivedImageCache(cache_dir, cache_max_bytes) if cache_dir and cache_max_bytes > 0 else None
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def start(self) -> None:
+        """Open the shared connection pool."""
+        if self._session is None:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                limit_per_host=self.max_connections_per_host,
+                ttl_dns_cache=300,
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout, auto_decompress=False)
+            logger.info(
+                f"Started image downloader ({self.max_connections} connections, "
+                f"{self.max_connections_per_host} per host)"
+            )
+
+    async def close(self) -> None:
+        """Close the shared connection pool."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _cached_validators(self, url: str) -> Optional[dict]:
+        """Read the validators of a cached URL, if its body is still cached."""
+        meta_path = self.cache.get(_url_key(url), ".json")
+        if meta_path is None:
+            return None
+        try:
+            meta = json.loads(meta_path.read_bytes())
+        except (OSError, ValueError):
+            return None
+        if self.cache.get(meta["key"], ".body") is None:
+            return None
+        return meta
+
+    def _read_cached(self, meta: dict) -> Optional[bytes]:
+        """Read a cached body, or None if it has been evicted."""
+        body_path = self.cache.get(meta["key"], ".body")
+        if body_path is None:
+            return None
+        try:
+            return body_path.read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def _store(self, url: str, etag: Optional[str], last_modified: Optional[str], data: bytes) -> None:
+        """Cache a body with the validators needed to revalidate it."""
+        key = _url_key(url, f"{etag or ''}|{last_modified or ''}")
+        self.cache.put(key, ".body", data)
+        meta = {"key": key, "etag": etag, "last_modified": last_modified}
+        self.cache.put(_url_key(url), ".json", json.dumps(meta).encode())
+
+    async def _read_body(self, response: aiohttp.ClientResponse) -> bytes:
+        """Stream a response body into memory, enforcing the size limit."""
+        if response.content_length is not None and response.content_length > self.max_bytes:
+            raise DownloadError(f"Image exceeds the {self.max_bytes} byte limit", status_code=413)
+
+        body = bytearray()
+        async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+            body += chunk
+            if len(body) > self.max_bytes:
+                raise DownloadError(f"Image exceeds the {self.max_bytes} byte limit", status_code=413)
+        return bytes(body)
+
+    async def _download(self, url: str, meta: Optional[dict]) -> Optional[bytes]:
+        """Send one, possibly conditional, request; None means 304 for a body evicted meanwhile."""
+        headers = {"Accept-Encoding": "identity"}
+        if meta:
+            if meta.get("etag"):
+                headers["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                headers["If-Modified-Since"] = meta["last_modified"]
+
+        try:
+            async with self._session.get(url, headers=headers) as response:
+                if response.status == 304 and meta:
+                    logger.debug("Image at {} not modified, using cached copy", url)
+                    return await asyncio.to_thread(self._read_cached, meta)
+                if response.status != 200:
+                    raise DownloadError(f"Failed to download image from URL: {response.status}")
+                data = await self._read_body(response)
+                etag = response.headers.get("ETag")
+                last_modified = response.headers.get("Last-Modified")
+        except DownloadError:
+            raise
+        except asyncio.TimeoutError:
+            raise DownloadError("Timed out downloading image", status_code=504)
+        except aiohttp.ClientError as e:
+            raise DownloadError(f"Error downloading image: {str(e)}")
+
+        if self.cache and (etag or last_modified):
+            try:
+                await asyncio.to_thread(self._store, url, etag, last_modified, data)
+            except OSError as e:
+                logger.warning(f"Could not cache downloaded image: {str(e)}")
+        return data
+
+    async def fetch(self, url: str) -> bytes:
+        """
+        Download an image.
+
+        Args:
+            url: HTTP or HTTPS URL of the image
+
+        Returns:
+            Response body
+
+        Raises:
+            DownloadError: If the URL is invalid, the server fails, the body is too
+                large or the download times out
+        """
+        if self._session is None:
+            raise DownloadError("Image downloader is not running", status_code=503)
+        if not url.startswith(("http://", "https://")):
+            raise DownloadError("Image URL must use http or https")
+
+        meta = await asyncio.to_thread(self._cached_validators, url) if self.cache else None
+        data = await self._download(url, meta)
+        if data is None:
+            data = await self._download(url, None)
+        return data
@@ -0,0 +1,172 @@
+# SPDX-License-Identifier: Apache-2.0
+"""
+Derived Image Cache
+
+This module provides a bounded on-disk cache of derived (resized) images, so
+repeated captions of the same source at the same preset reuse the encoded result
+instead of decoding and resizing again.
+
+Entries are keyed by the source identity (content hash, or path, mtime and size),
+the resolution preset, the output format and the encoding quality. When the cache
+grows past its size limit, the least recently used entries are evicted.
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Optional, Union
+
+from loguru import logger
+
+# Fraction of the size limit the cache is trimmed down to on eviction
+EVICTION_TARGET = 0.9
+
+
+def hash_bytes(data: bytes) -> str:
+    """Identify in-memory image data by its content hash."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path: Union[str, Path]) -> str:
+    """Identify an image file by its content hash, matching hash_bytes of the same content."""
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
+
+
+def file_fingerprint(path: Union[str, Path]) -> str:
+    """Identify an image file by its resolved path, modification time and size."""
+    path = Path(path).resolve()
+    stat = path.stat()
+    return f"{path}:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def derived_image_key(source_id: str, preset: str, image_format: str, quality: int) -> str:
+    """
+    Build the cache key of a derived image.
+
+    Args:
+        source_id: Identity of the source image, from hash_bytes or file_fingerprint
+        preset: Name of the resolution preset
+        image_format: Output format of the derived image
+        quality: Encoding quality of the derived image
+
+    Returns:
+        Hex digest identifying the derived image
+    """
+    return hashlib.sha256(f"{source_id}|{preset}|{image_format.upper()}|{quality}".encode()).hexdigest()
+
+
+class DerivedImageCache:
+    """
+    Size-bounded directory of derived images with least recently used eviction.
+
+    Safe to use from several threads of one process. Files are written atomically,
+    so several processes may share a directory; each then enforces the limit on its
+    own view of the cache.
+
+    Attributes:
+        directory (Path): Directory holding the cached images
+        max_bytes (int): Size limit of the cache
+    """
+
+    def __init__(self, directory: Union[str, Path], max_bytes: int):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total_bytes: Optional[int] = None
+
+    def _path(self, key: str, suffix: str) -> Path:
+        return self.directory / key[:2] / f"{key}{suffix}"
+
+    def _entries(self) -> list[os.DirEntry]:
+        entries = []
+        if not self.directory.is_dir():
+            return entries
+        for shard in os.scandir(self.directory):
+            if shard.is_dir():
+                entries.extend(
+                    entry for entry in os.scandir(shard.path) if entry.is_file() and not entry.name.startswith(".")
+                )
+        return entries
+
+    def _ensure_total(self) -> int:
+        if self._total_bytes is None:
+            self._total_bytes = sum(entry.stat().st_size for entry in self._entries())
+        return self._total_bytes
+
+    def get(self, key: str, suffix: str = "") -> Optional[Path]:
+        """
+        Look up a derived image.
+
+        Args:
+            key: Cache key from derived_image_key
+            suffix: File suffix of the derived image (e.g. '.jpg')
+
+        Returns:
+            Path to the cached image, or None on a miss
+        """
+        path = self._path(key, suffix)
+        try:
+            # Mark the entry as recently used
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key: str, suffix: str, data: bytes) -> Path:
+        """
+        Store a derived image, evicting old entries if the cache is over its limit.
+
+        Args:
+            key: Cache key from derived_image_key
+            suffix: File suffix of the derived image (e.g. '.jpg')
+            data: Encoded image bytes
+
+        Returns:
+            Path to the cached image
+        """
+        path = self._path(key, suffix)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        except BaseException:
+            Path(temp_path).unlink(missing_ok=True)
+            raise
+
+        with self._lock:
+            self._total_bytes = self._ensure_total() + len(data)
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+        return path
+
+    def _evict(self) -> None:
+        """Remove least recently used entries until the cache is below the eviction target."""
+        entries = sorted(self._entries(), key=lambda entry: entry.stat().st_mtime)
+        total = sum(entry.stat().st_size for entry in entries)
+        target = self.max_bytes * EVICTION_TARGET
+        removed = 0
+        for entry in entries:
+            if total <= target:
+                break
+            try:
+                size = entry.stat().st_size
+                os.unlink(entry.path)
+            except FileNotFoundError:
+                continue
+            total -= size
+            removed += 1
+        self._total_bytes = total
+        logger.debug(f"Evicted {removed} derived images, cache now {total} bytes")
+
+    def clear(self) -> None:
+        """Remove every cached image."""
+        with self._lock:
+            for entry in self._entries():
+                Path(entry.path).unlink(missing_ok=True)
+            self._total_bytes = 0
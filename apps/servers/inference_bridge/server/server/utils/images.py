@@ -0,0 +1,139 @@
+# SPDX-License-Identifier: Apache-2.0
+"""
+In-Memory Image Utilities
+
+This module provides helpers for handling uploaded image bytes without writing
+temporary files: format sniffing, validation and in-memory resizing.
+"""
+
+import io
+from pathlib import Path
+from typing import Optional, Tuple, Union
+
+from loguru import logger
+from PIL import Image
+
+from .resize_backends import get_resize_backend
+from .resizing import ResolutionPreset, target_size
+
+# Leading byte signatures of the image formats accepted by the vision providers
+IMAGE_SIGNATURES: Tuple[Tuple[bytes, str], ...] = (
+    (b"\xff\xd8\xff", "JPEG"),
+    (b"\x89PNG\r\n\x1a\n", "PNG"),
+    (b"GIF87a", "GIF"),
+    (b"GIF89a", "GIF"),
+    (b"BM", "BMP"),
+    (b"II*\x00", "TIFF"),
+    (b"MM\x00*", "TIFF"),
+)
+
+MIME_TYPES = {
+    "JPEG": "image/jpeg",
+    "PNG": "image/png",
+    "GIF": "image/gif",
+    "WEBP": "image/webp",
+    "BMP": "image/bmp",
+    "TIFF": "image/tiff",
+}
+
+# Formats whose encoder takes a quality setting
+LOSSY_FORMATS = frozenset({"JPEG", "WEBP"})
+
+
+def sniff_image_format(data: bytes) -> Optional[str]:
+    """
+    Detect the image format from the leading bytes of the data.
+
+    Args:
+        data: Encoded image bytes
+
+    Returns:
+        Pillow format name (e.g. 'JPEG', 'PNG'), or None if the format is not recognized
+    """
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "WEBP"
+    for signature, image_format in IMAGE_SIGNATURES:
+        if data.startswith(signature):
+            return image_format
+    return None
+
+
+def validate_image_bytes(data: bytes, max_bytes: Optional[int] = None) -> str:
+    """
+    Validate encoded image bytes and return their format.
+
+    Args:
+        data: Encoded image bytes
+        max_bytes: Maximum accepted size in bytes
+
+    Returns:
+        Pillow format name of the image
+
+    Raises:
+        ValueError: If the data is empty, too large or not a supported image format
+    """
+    if not data:
+        raise ValueError("Image data is empty")
+    if max_bytes is not None and len(data) > max_bytes:
+        raise ValueError(f"Image is {len(data)} bytes, larger than the {max_bytes} byte limit")
+
+    image_format = sniff_image_format(data)
+    if image_format is None:
+        raise ValueError("Unsupported or unrecognized image format")
+    return image_format
+
+
+def _encode_resized(
+    source: Union[bytes, Path], original: Image.Image, image_format: str, resolution: ResolutionPreset, quality: int
+) -> Optional[bytes]:
+    """Resize an image and encode it in the given format, or return None if no resize was needed."""
+    size = target_size(original.size, resolution)
+    if size is None:
+        return None
+    # Hand the backend the undecoded source so it can shrink on load
+    resized = get_resize_backend().resize(source, original, size)
+
+    if image_format == "JPEG" and resized.mode not in ("RGB", "L"):
+        resized = resized.convert("RGB")
+    save_params = {"quality": quality} if image_format in LOSSY_FORMATS else {}
+    output = io.BytesIO()
+    resized.save(output, format=image_format, **save_params)
+    return output.getvalue()
+
+
+def resize_image_bytes(data: bytes, image_format: str, resolution: ResolutionPreset, quality: int = 90) -> bytes:
+    """
+    Resize encoded image bytes in memory, keeping the original format.
+
+    Args:
+        data: Encoded image bytes
+        image_format: Pillow format name of the image
+        resolution: Target resolution preset
+        quality: Encoding quality for lossy formats
+
+    Returns:
+        Encoded bytes of the resized image, or the original bytes if no resize was needed
+    """
+    with Image.open(io.BytesIO(data)) as original:
+        resized = _encode_resized(data, original, image_format, resolution, quality)
+    if resized is None:
+        return data
+
+    logger.debug("Resized in-memory image from {} to {} bytes", len(data), len(resized))
+    return resized
+
+
+def resize_image_file(path: Path, resolution: ResolutionPreset, quality: int = 90) -> Optional[bytes]:
+    """
+    Resize an image file in memory, keeping the original format.
+
+    Args:
+        path: Path to the image file
+        resolution: Target resolution preset
+        quality: Encoding quality for lossy formats
+
+    Returns:
+        Encoded bytes of the resized image, or None if the image is already small enough
+    """
+    with Image.open(path) as original:
+        return _encode_resized(path, original, original.format, resolution, quality)
@@ -0,0 +1,220 @@
+# SPDX-License-Identifier: Apache-2.0
+"""
+Image Resize Backends
+
+This module provides interchangeable implementations of the pixel work behind
+the resizing utilities. Every backend takes an image source and an exact target
+size and returns a Pillow image with the same dimensions and mode, so callers
+see the same results whichever backend runs.
+
+Available backends:
+- pillow: Pillow LANCZOS resampling with JPEG draft decoding (always available)
+- vips: libvips thumbnailing with shrink-on-load, streaming the decode (requires pyvips)
+- opencv: OpenCV with reduced-scale JPEG decoding and area resampling (requires opencv-python-headless)
+
+Backends that cannot load a source themselves (an already decoded image, or a
+mode such as palette or CMYK) fall back to Pillow for that call.
+"""
+
+import io
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Type, Union
+
+from loguru import logger
+from PIL import Image
+
+try:
+    import pyvips
+except (ImportError, OSError):
+    pyvips = None
+
+try:
+    import cv2
+    import numpy as np
+except ImportError:
+    cv2 = None
+
+ImageSource = Union[str, Path, bytes, Image.Image]
+
+
+class ResizeBackend(ABC):
+    """Base class for resize implementations."""
+
+    name: str
+
+    @classmethod
+    def is_available(cls) -> bool:
+        """Whether the libraries this backend needs are installed."""
+        return True
+
+    @abstractmethod
+    def resize(self, source: ImageSource, image: Image.Image, size: Tuple[int, int]) -> Image.Image:
+        """
+        Resize an image to an exact size.
+
+        Args:
+            source: Path, encoded bytes or decoded image the image was opened from
+            image: The source opened with Pillow, possibly not yet decoded
+            size: Target (width, height)
+
+        Returns:
+            Resized image in the mode of the source
+        """
+
+
+class PillowResizeBackend(ResizeBackend):
+    """Resize with Pillow, decoding JPEG at a reduced scale when downscaling."""
+
+    name = "pillow"
+
+    def resize(self, source: ImageSource, image: Image.Image, size: Tuple[int, int]) -> Image.Image:
+        width, height = size
+        # Let JPEG decoding skip detail that the downscale would discard anyway
+        if image.format == "JPEG" and width < image.width and height < image.height:
+            image.draft(image.mode, size)
+        return image.resize(size, Image.LANCZOS)
+
+
+class VipsResizeBackend(ResizeBackend):
+    """Resize with libvips thumbnailing, which shrinks on load and streams the decode."""
+
+    name = "vips"
+
+    # Modes libvips produces without conversion; libvips premultiplies alpha while resampling, like Pillow
+    modes = ("L", "RGB", "RGBA")
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return pyvips is not None
+
+    def resize(self, source: ImageSource, image: Image.Image, size: Tuple[int, int]) -> Image.Image:
+        if isinstance(source, Image.Image) or image.mode not in self.modes:
+            return _pillow.resize(source, image, size)
+
+        width, height = size
+        # Pillow does not apply EXIF orientation, so neither do we
+        options = {"height": height, "size": "force", "no_rotate": True}
+        if isinstance(source, bytes):
+            thumbnail = pyvips.Image.thumbnail_buffer(source, width, **options)
+        else:
+            thumbnail = pyvips.Image.thumbnail(str(source), width, **options)
+
+        if thumbnail.bands != len(image.mode):
+            return _pillow.resize(source, image, size)
+        if thumbnail.format != "uchar":
+            thumbnail = thumbnail.cast("uchar")
+        return Image.frombytes(image.mode, (thumbnail.width, thumbnail.height), thumbnail.write_to_memory())
+
+
+class OpenCVResizeBackend(ResizeBackend):
+    """Resize with OpenCV, decoding JPEG at a reduced scale and using area resampling to downscale."""
+
+    name = "opencv"
+
+    # OpenCV resamples alpha unpremultiplied, unlike Pillow, so transparent images go to Pillow
+    modes = ("L", "RGB")
+
+    @classmethod
+    def is_available(cls) -> bool:
+        return cv2 is not None
+
+    def _read_flags(self, image: Image.Image, size: Tuple[int, int]) -> int:
+        """Choose decode flags, shrinking JPEG on load by the largest factor that still covers the size."""
+        gray = image.mode == "L"
+        if image.format == "JPEG":
+            for factor in (8, 4, 2):
+                if image.width // factor >= size[0] and image.height // factor >= size[1]:
+                    prefix = "IMREAD_REDUCED_GRAYSCALE_" if gray else "IMREAD_REDUCED_COLOR_"
+                    return getattr(cv2, f"{prefix}{factor}") | cv2.IMREAD_IGNORE_ORIENTATION
+        return (cv2.IMREAD_GRAYSCALE if gray else cv2.IMREAD_COLOR) | cv2.IMREAD_IGNORE_ORIENTATION
+
+    def resize(self, source: ImageSource, image: Image.Image, size: Tuple[int, int]) -> Image.Image:
+        if isinstance(source, Image.Image) or image.mode not in self.modes:
+            return _pillow.resize(source, image, size)
+
+        flags = self._read_flags(image, size)
+        if isinstance(source, bytes):
+            array = cv2.imdecode(np.frombuffer(source, np.uint8), flags)
+        else:
+            array = cv2.imread(str(source), flags)
+        channels = array.shape[2] if array is not None and array.ndim == 3 else 1
+        if array is None or array.dtype != np.uint8 or channels != len(image.mode):
+            return _pillow.resize(source, image, size)
+
+        width, height = size
+        downscale = width <= array.shape[1] and height <= array.shape[0]
+        array = cv2.resize(array, size, interpolation=cv2.INTER_AREA if downscale else cv2.INTER_LANCZOS4)
+        if image.mode == "RGB":
+            array = cv2.cvtColor(array, cv2.COLOR_BGR2RGB)
+        return Image.fromarray(array, image.mode)
+
+
+RESIZE_BACKENDS: Dict[str, Type[ResizeBackend]] = {
+    backend.name: backend for backend in (VipsResizeBackend, OpenCVResizeBackend, PillowResizeBackend)
+}
+
+_pillow = PillowResizeBackend()
+_default_backend: Optional[ResizeBackend] = None
+
+
+def available_resize_backends() -> list[str]:
+    """Names of the backends whose libraries are installed, fastest first."""
+    return [name for name, backend in RESIZE_BACKENDS.items() if backend.is_available()]
+
+
+def get_resize_backend(name: Optional[str] = None) -> ResizeBackend:
+    """
+    Get a resize backend.
+
+    Args:
+        name: Backend name, 'auto' for the fastest installed backend, or None for the default backend
+
+    Returns:
+        The resize backend
+
+    Raises:
+        ValueError: If the backend is unknown or its libraries are not installed
+    """
+    if name is None:
+        global _default_backend
+        if _default_backend is None:
+            _default_backend = get_resize_backend("auto")
+        return _default_backend
+
+    if name == "auto":
+        name = available_resize_backends()[0]
+    backend = RESIZE_BACKENDS.get(name)
+    if backend is None:
+        raise ValueError(f"Unknown resize backend '{name}'. Available backends: {list(RESIZE_BACKENDS)}")
+    if not backend.is_available():
+        raise ValueError(f"Resize backend '{name}' is not installed")
+    return _pillow if backend is PillowResizeBackend else backend()
+
+
+def set_default_resize_backend(name: str) -> ResizeBackend:
+    """
+    Set the backend used when resizing without an explicit backend.
+
+    Args:
+        name: Backend name, or 'auto' for the fastest installed backend
+
+    Returns:
+        The selected backend
+
+    Raises:
+        ValueError: If the backend is unknown or its libraries are not installed
+    """
+    global _default_backend
+    _default_backend = get_resize_backend(name)
+    logger.info(f"Using the {_default_backend.name} image resize backend")
+    return _default_backend
+
+
+def open_image(source: ImageSource) -> Image.Image:
+    """Open an image source with Pillow without decoding the pixels."""
+    if isinstance(source, Image.Image):
+        return source
+    if isinstance(source, bytes):
+        return Image.open(io.BytesIO(source))
+    return Image.open(str(source))
@@ -3,7 +3,8 @@
 Image Resizing Utilities
 
 This module provides utility functions for resizing images to standard display
-and video resolutions while maintaining aspect ratio.
+and video resolutions while maintaining aspect ratio. The pixel work is done by a
+pluggable backend (see resize_backends).
 """
 
 from enum import Enum
@@ -19,6 +20,8 @@ try:
 except ImportError:
     raise ImportError("This module requires Pillow. Install it with 'pip install Pillow'.")
 
+from .resize_backends import ImageSource, get_resize_backend, open_image
+
 
 def log_resize_options(options: Dict[str, Any]) -> None:
     """
@@ -46,37 +49,27 @@ class ResolutionPreset(Enum):
     UHD_8K = (7680, 4320)  # 8K UHD
 
 
-def resize_image(
-    image: Union[str, Path, Image.Image],
+def target_size(
+    size: Tuple[int, int],
     resolution: Union[ResolutionPreset, Tuple[int, int]],
     maintain_aspect_ratio: bool = True,
     upscale: bool = False,
-) -> Image.Image:
+) -> Optional[Tuple[int, int]]:
     """
-    Resize an image to a target resolution while maintaining aspect ratio.
+    Compute the size an image is resized to for a target resolution.
 
     Args:
-        image: Path to the image file or PIL Image object
+        size: Original (width, height) of the image
         resolution: Target resolution as ResolutionPreset enum or (width, height) tuple
         maintain_aspect_ratio: If True, preserve aspect ratio; if False, force to exact dimensions
         upscale: If True, allow upscaling of images smaller than target resolution
 
     Returns:
-        Resized PIL Image object
+        New (width, height), or None if the image should not be resized
 
     Raises:
-        ValueError: If the image path is invalid or resolution is not recognized
-        IOError: If there's an error opening or processing the image
+        ValueError: If the resolution is not recognized
     """
-    # Load the image if path is provided
-    if not isinstance(image, Image.Image):
-        try:
-            img = Image.open(str(image))
-        except Exception as e:
-            raise IOError(f"Failed to open image: {e}")
-    else:
-        img = image
-
     # Get target dimensions from resolution
     if isinstance(resolution, ResolutionPreset):
         target_width, target_height = resolution.value
@@ -85,72 +78,101 @@ def resize_image(
     else:
         raise ValueError("Resolution must be a ResolutionPreset enum or a (width, height) tuple")
 
-    # Get original dimensions
-    orig_width, orig_height = img.size
-
-    logger.info(
-        f"Resizing image: original dimensions {orig_width}x{orig_height}, target {target_width}x{target_height}"
-    )
+    orig_width, orig_height = size
 
     # Skip resizing if the image is already smaller than target and upscale is False
     if not upscale and orig_width <= target_width and orig_height <= target_height:
-        logger.info(
-            f"Skipping resize: image {orig_width}x{orig_height} already smaller than target {target_width}x{target_height}"
-        )
-        return img
+        return None
 
-    if maintain_aspect_ratio:
-        # Calculate aspect ratios
-        target_ratio = target_width / target_height
-        image_ratio = orig_width / orig_height
-
-        if image_ratio > target_ratio:
-            # Image is wider than target: fit to width
-            new_width = target_width
-            new_height = int(new_width / image_ratio)
-        else:
-            # Image is taller than target: fit to height
-            new_height = target_height
-            new_width = int(new_height * image_ratio)
-    else:
+    if not maintain_aspect_ratio:
         # Force to exact dimensions without maintaining aspect ratio
-        new_width, new_height = target_width, target_height
+        return target_width, target_height
+
+    # Calculate aspect ratios
+    target_ratio = target_width / target_height
+    image_ratio = orig_width / orig_height
+
+    if image_ratio > target_ratio:
+        # Image is wider than target: fit to width
+        return target_width, int(target_width / image_ratio)
+    # Image is taller than target: fit to height
+    return int(target_height * image_ratio), target_height
+
+
+def resize_image(
+    image: ImageSource,
+    resolution: Union[ResolutionPreset, Tuple[int, int]],
+    maintain_aspect_ratio: bool = True,
+    upscale: bool = False,
+    backend: Optional[str] = None,
+) -> Image.Image:
+    """
+    Resize an image to a target resolution while maintaining aspect ratio.
+
+    Args:
+        image: Path to the image file, encoded image bytes or PIL Image object
+        resolution: Target resolution as ResolutionPreset enum or (width, height) tuple
+        maintain_aspect_ratio: If True, preserve aspect ratio; if False, force to exact dimensions
+        upscale: If True, allow upscaling of images smaller than target resolution
+        backend: Name of the resize backend to use, defaults to the configured backend
+
+    Returns:
+        Resized PIL Image object
+
+    Raises:
+        ValueError: If the image path is invalid or resolution is not recognized
+        IOError: If there's an error opening or processing the image
+    """
+    # Open the image without decoding it, so backends can shrink on load
+    try:
+        img = open_image(image)
+    except Exception as e:
+        raise IOError(f"Failed to open image: {e}")
+
+    orig_width, orig_height = img.size
+    new_size = target_size(img.size, resolution, maintain_aspect_ratio, upscale)
+    if new_size is None:
+        logger.debug("Skipping resize: image {}x{} already smaller than target {}", orig_width, orig_height, resolution)
+        return img
 
-    # Perform the resize operation
-    resized_img = img.resize((new_width, new_height), Image.LANCZOS)
-    logger.info(f"Image resized: original {orig_width}x{orig_height} → final {new_width}x{new_height}")
+    resize_backend = get_resize_backend(backend)
+    resized_img = resize_backend.resize(image, img, new_size)
+    logger.debug(
+        "Image resized with {}: original {}x{} → final {}x{}",
+        resize_backend.name,
+        orig_width,
+        orig_height,
+        *new_size,
+    )
 
     return resized_img
 
 
 def resize_to_fit_max_dimension(
-    image: Union[str, Path, Image.Image], max_dimension: int, upscale: bool = False
+    image: ImageSource, max_dimension: int, upscale: bool = False, backend: Optional[str] = None
 ) -> Image.Image:
     """
     Resize an image so its largest dimension does not exceed max_dimension.
 
     Args:
-        image: Path to the image file or PIL Image object
+        image: Path to the image file, encoded image bytes or PIL Image object
         max_dimension: Maximum size for the largest dimension
         upscale: If True, allow upscaling of images smaller than target size
+        backend: Name of the resize backend to use, defaults to the configured backend
 
     Returns:
         Resized PIL Image object
     """
-    # Load the image if path is provided
-    if not isinstance(image, Image.Image):
-        img = Image.open(str(image))
-    else:
-        img = image
+    img = open_image(image)
 
     # Get original dimensions
     width, height = img.size
 
-    logger.info(f"Resizing to max dimension: original dimensions {width}x{height}, max dimension {max_dimension}")
-
     # Skip if no resizing needed
     if not upscale and max(width, height) <= max_dimension:
-        logger.info(f"Skipping resize: largest dimension {max(width, height)} already smaller than max {max_dimension}")
+        logger.debug(
+            "Skipping resize: largest dimension {} already smaller than max {}", max(width, height), max_dimension
+        )
         return img
 
     # Calculate new dimensions
@@ -161,9 +183,11 @@ def resize_to_fit_max_dimension(
         new_height = max_dimension
         new_width = int(width * (max_dimension / height))
 
-    # Perform the resize
-    resized_img = img.resize((new_width, new_height), Image.LANCZOS)
-    logger.info(f"Image resized: original {width}x{height} → final {new_width}x{new_height}")
+    resize_backend = get_resize_backend(backend)
+    resized_img = resize_backend.resize(image, img, (new_width, new_height))
+    logger.debug(
+        "Image resized with {}: original {}x{} → final {}x{}", resize_backend.name, width, height, new_width, new_height
+    )
 
     return resized_img
 
@@ -0,0 +1,34 @@
+"""
+# SPDX-License-Identifier: Apache-2.0
+Shared fixtures for inference bridge tests.
+
+The settings are loaded when the server package is imported, so placeholder
+database settings are set before any test module imports it.
+"""
+
+import os
+
+import pytest
+
+for name, value in {
+    "POSTGRES_USER": "graphcap",
+    "POSTGRES_PASSWORD": "graphcap",
+    "POSTGRES_HOST": "localhost",
+    "POSTGRES_PORT": "5432",
+    "POSTGRES_DB": "graphcap",
+}.items():
+    os.environ.setdefault(name, value)
+
+from server.features.captions.db_models import CaptionResult  # noqa: E402
+from server.features.captions.service import CaptionResultStore  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+
+@pytest.fixture
+async def caption_store(tmp_path):
+    """Caption result store on a SQLite database in the test directory."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'captions.db'}")
+    async with engine.begin() as connection:
+        await connection.run_sync(CaptionResult.__table__.create)
+    yield CaptionResultStore(async_sessionmaker(engine, expire_on_commit=False))
+    await engine.dispose()
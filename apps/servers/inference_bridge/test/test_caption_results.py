@@ -0,0 +1,132 @@
+"""
+# SPDX-License-Identifier: Apache-2.0
+Tests for the caption result store and its use by caption batches.
+"""
+
+import json
+from types import SimpleNamespace
+
+from server.features.captions.service import CaptionResultRow, params_key
+from server.features.perspectives import service as perspectives_service
+from server.features.perspectives.models import CaptionBatchItem, CaptionBatchRequest
+
+from graphcap.perspectives import PerspectiveNode
+from graphcap.perspectives.perspective_loader import JsonPerspectiveProcessor, PerspectiveConfig
+
+PARAMS = params_key(None, max_tokens=4096, temperature=0.8, top_p=0.9, repetition_penalty=1.15)
+
+
+def make_row(image_hash: str, perspective: str = "art", caption: str = "An owl", **key) -> CaptionResultRow:
+    return CaptionResultRow(
+        image_hash=image_hash,
+        perspective=perspective,
+        version="1",
+        model="test-model",
+        provider="fake",
+        params=PARAMS,
+        result={"caption": caption},
+        **key,
+    )
+
+
+class FakeProvider:
+    """Provider stub that captions every image with its prompt and counts requests."""
+
+    name = "fake"
+
+    def __init__(self):
+        self.calls = 0
+
+    async def vision(self, prompt, image, **kwargs):
+        self.calls += 1
+        content = json.dumps({"caption": prompt})
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content, parsed=None))])
+
+
+def make_node(name: str) -> PerspectiveNode:
+    processor = JsonPerspectiveProcessor(
+        PerspectiveConfig(
+            name=name,
+            display_name=name.title(),
+            version="1",
+            prompt=f"{name} prompt",
+            schema_fields=[{"name": "caption", "type": "str", "description": "A caption"}],
+            table_columns=[{"name": "Caption", "style": "green"}],
+            context_template=f"<{name}>{{caption}}</{name}>",
+        )
+    )
+    return PerspectiveNode(name=name, processor=processor)
+
+
+async def test_add_and_get(caption_store):
+    """Results are found by their full key, and writing a key again replaces its result."""
+    assert await caption_store.add_many([make_row("a"), make_row("a", caption="A cat"), make_row("b")]) == 2
+    await caption_store.add_many([make_row("b", caption="A dog")])
+
+    stored = await caption_store.get("a", "art", "1", "test-model", "fake", params=PARAMS)
+    assert stored.result == {"caption": "A cat"}
+    assert (await caption_store.get("b", "art", "1", "test-model", "fake", params=PARAMS)).result == {
+        "caption": "A dog"
+    }
+
+    # Every part of the key must match
+    assert await caption_store.get("a", "art", "1", "test-model", "other", params=PARAMS) is None
+    assert await caption_store.get("a", "art", "1", "test-model", "fake", params=params_key("Be brief")) is None
+    assert await caption_store.get("a", "art", "1", "test-model", "fake", fields="caption", params=PARAMS) is None
+
+
+async def test_query_pages_by_id(caption_store):
+    """The keyset query pages through results in id order and applies its filters."""
+    await caption_store.add_many([make_row(f"image-{i}", perspective="art" if i % 2 else "graph") for i in range(7)])
+
+    pages, after_id = [], 0
+    while True:
+        page = await caption_store.query(perspective="art", after_id=after_id, limit=2)
+        if not page:
+            break
+        pages.append([result.image_hash for result in page])
+        after_id = page[-1].id
+
+    assert pages == [["image-1", "image-3"], ["image-5"]]
+    assert [result.image_hash for result in await caption_store.query(image_hash="image-4")] == ["image-4"]
+
+
+async def test_get_many(caption_store):
+    """Batch lookups return the results of any of the images and perspectives under the provider and params."""
+    await caption_store.add_many([make_row("a"), make_row("b", perspective="graph"), make_row("c")])
+    await caption_store.add_many([CaptionResultRow("a", "art", "1", "test-model", "other", {"caption": "x"})])
+
+    results = await caption_store.get_many(["a", "b", "missing"], ["art", "graph"], "test-model", "fake", PARAMS)
+
+    assert sorted((result.image_hash, result.perspective) for result in results) == [("a", "art"), ("b", "graph")]
+
+
+async def test_batch_reuses_stored_results(caption_store, monkeypatch, tmp_path):
+    """A repeated batch is answered from the store without calling the provider."""
+    monkeypatch.setattr(perspectives_service, "get_caption_store", lambda: caption_store)
+    image_paths = []
+    for name in ("one", "two"):
+        image_path = tmp_path / f"{name}.jpg"
+        image_path.write_bytes(name.encode())
+        image_paths.append(str(image_path))
+    request = CaptionBatchRequest(
+        perspectives=["art", "graph"], image_paths=image_paths, provider="fake", provider_config={}, model="test-model"
+    )
+    nodes = [make_node("art"), make_node("graph")]
+
+    async def run_batch(provider):
+        records = [record async for record in perspectives_service.stream_caption_batch(request, nodes, provider)]
+        return sorted(
+            (record.image_path, record.perspective, record.result["caption"])
+            for record in records
+            if isinstance(record, CaptionBatchItem)
+        )
+
+    first_provider, second_provider = FakeProvider(), FakeProvider()
+    first = await run_batch(first_provider)
+    second = await run_batch(second_provider)
+
+    assert first_provider.calls == 4
+    assert second_provider.calls == 0
+    assert second == first
+    assert len(await caption_store.query()) == 4
@@ -0,0 +1,91 @@
+# SPDX-License-Identifier: Apache-2.0
+"""
+Bulk loading of caption results into the caption_results table.
+
+Rows are streamed into a temporary staging table with COPY and merged into
+caption_results with one INSERT ... ON CONFLICT statement, so a run's results
+cost a single round trip instead of one INSERT per caption. Results are keyed
+like the inference bridge stores them: SHA-256 of the image file, perspective
+name and version, model, field selection, provider and generation parameters.
+"""
+
+import csv
+import io
+import json
+from pathlib import Path
+from typing import Any, Iterable, List, Optional
+
+from .hashing import hash_image_file
+from .resources import PostgresConfig
+
+KEY_COLUMNS = ("image_hash", "perspective", "version", "model", "fields", "provider", "params")
+VALUE_COLUMNS = ("image_path", "result")
+COLUMNS = KEY_COLUMNS + VALUE_COLUMNS
+
+
+def params_key(global_context: Optional[str] = None, **options: Any) -> str:
+    """Normalize the global context and generation options of a run, matching the inference bridge's result key."""
+    return json.dumps({"global_context": global_context, **options}, sort_keys=True, separators=(",", ":"))
+
+
+def caption_result_row(
+    image_path: Path,
+    perspective: str,
+    version: str,
+    model: str,
+    provider: str,
+    result: dict,
+    fields: Optional[Iterable[str]] = None,
+    image_hash: Optional[str] = None,
+    params: str = "",
+) -> tuple:
+    """Build a caption_results row, hashing the image unless its hash is given."""
+    return (
+        image_hash or hash_image_file(image_path),
+        perspective,
+        version,
+        model,
+        ",".join(sorted(set(fields))) if fields else "",
+        provider,
+        params,
+        str(image_path),
+        json.dumps(result),
+    )
+
+
+def copy_caption_results(postgres: PostgresConfig, rows: List[tuple]) -> int:
+    """
+    Upsert caption result rows with COPY.
+
+    Args:
+        postgres: Database connection settings
+        rows: Rows from caption_result_row
+
+    Returns:
+        Number of rows written
+    """
+    # One statement cannot update a row twice, so keep the last row for each key
+    rows = list({row[: len(KEY_COLUMNS)]: row for row in rows}.values())
+    if not rows:
+        return 0
+
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    buffer.seek(0)
+
+    column_list = ", ".join(COLUMNS)
+    updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in VALUE_COLUMNS)
+    connection = postgres.connect()
+    try:
+        with connection, connection.cursor() as cursor:
+            cursor.execute(
+                "CREATE TEMP TABLE caption_results_staging (LIKE caption_results INCLUDING DEFAULTS) ON COMMIT DROP"
+            )
+            cursor.copy_expert(f"COPY caption_results_staging ({column_list}) FROM STDIN WITH (FORMAT csv)", buffer)
+            cursor.execute(
+                f"INSERT INTO caption_results ({column_list}) SELECT {column_list} FROM caption_results_staging "
+                f"ON CONFLICT ({', '.join(KEY_COLUMNS)}) DO UPDATE SET {updates}, created_at = now()"
+            )
+    finally:
+        connection.close()
+    return len(rows)
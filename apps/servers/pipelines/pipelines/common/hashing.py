@@ -0,0 +1,12 @@
+# SPDX-License-Identifier: Apache-2.0
+"""Content hashes of image files, shared by the image store and caption results."""
+
+import hashlib
+from pathlib import Path
+from typing import Union
+
+
+def hash_image_file(path: Union[str, Path]) -> str:
+    """Hash an image file, matching the image hash the inference bridge stores results under."""
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, "sha256").hexdigest()
@@ -0,0 +1,60 @@
+# SPDX-License-Identifier: Apache-2.0
+"""
+job_info.json bookkeeping for caption jobs.
+
+The job description is kept in memory and the file is rewritten whenever it
+changes, through a temporary file and a rename, so readers never see a partial
+document and the counters stay current while the job runs.
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any
+
+JOB_INFO_FILENAME = "job_info.json"
+
+
+class JobInfo:
+    """
+    The job_info.json of a caption job directory.
+
+    Attributes:
+        job_dir (Path): Job directory holding job_info.json
+        data (dict): Current contents of job_info.json
+        count_offset (tuple): Successes and failures to add to sink counts, such as
+            results reused from an earlier run
+    """
+
+    def __init__(self, job_dir: Path, **fields: Any):
+        self.job_dir = Path(job_dir)
+        self.data = dict(fields)
+        self.count_offset = (0, 0)
+        self._lock = threading.Lock()
+        self.save()
+
+    @property
+    def path(self) -> Path:
+        """Path of job_info.json."""
+        return self.job_dir / JOB_INFO_FILENAME
+
+    def update(self, **fields: Any) -> None:
+        """Set fields and rewrite job_info.json; safe to call from worker threads."""
+        with self._lock:
+            self.data.update(fields)
+            self.save()
+
+    def record_counts(self, stats) -> None:
+        """Record the result counts of a caption sink checkpoint."""
+        self.update(
+            success_count=self.count_offset[0] + stats.succeeded,
+            failed_count=self.count_offset[1] + stats.failed,
+        )
+
+    def save(self) -> None:
+        """Atomically write job_info.json."""
+        temp_path = self.path.with_name(f".{JOB_INFO_FILENAME}.tmp")
+        with open(temp_path, "w") as f:
+            json.dump(self.data, f, indent=2)
+        os.replace(temp_path, self.path)
@@ -7,11 +7,22 @@ from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, List
 
+from graphcap.log import attach_queue_handlers, configure_logging, get_log_level
+
 
 def configure_loggers():
-    """Configures custom loggers for different levels."""
+    """
+    Configures custom loggers for different levels.
+
+    The Dagster logger level comes from GRAPHCAP_LOG_LEVEL (default INFO). File
+    handlers run on a background queue listener so steps never block on log I/O,
+    and loguru output from graphcap goes through its background sink.
+    """
+    configure_logging()
+    level = get_log_level()
+
     dagster_logger = logging.getLogger("dagster")
-    dagster_logger.setLevel(logging.DEBUG)  # Set default Dagster logger level
+    dagster_logger.setLevel(level)
 
     # Ensure the log directory exists
     log_dir = Path("/workspace/logs/gcap_pipelines")
@@ -19,7 +30,7 @@ def configure_loggers():
 
     # Create handlers for different log levels
     debug_handler = logging.FileHandler(log_dir / "debug.log")
-    debug_handler.setLevel(logging.DEBUG)
+    debug_handler.setLevel(level)
     error_handler = logging.FileHandler(log_dir / "error.log")
     error_handler.setLevel(logging.ERROR)
 
@@ -28,9 +39,8 @@ def configure_loggers():
     debug_handler.setFormatter(formatter)
     error_handler.setFormatter(formatter)
 
-    # Add handlers to the Dagster logger
-    dagster_logger.addHandler(debug_handler)
-    dagster_logger.addHandler(error_handler)
+    # Add handlers to the Dagster logger behind a queue
+    attach_queue_handlers(dagster_logger, [debug_handler, error_handler])
 
     return {"custom_logger": dagster_logger}
 
@@ -13,6 +13,14 @@ class PostgresConfig(dg.ConfigurableResource):
     user: str = "graphcap"
     password: str = "graphcap"
 
+    def connect(self):
+        """Open a psycopg2 connection to the database."""
+        import psycopg2
+
+        return psycopg2.connect(
+            host=self.host, port=self.port, dbname=self.database, user=self.user, password=self.password
+        )
+
 
 class FileSystemConfig(dg.ConfigurableResource):
     """Configuration for file system operations."""
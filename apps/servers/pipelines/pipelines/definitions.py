@@ -16,6 +16,7 @@ from .huggingface.types import HfUploadManifestConfig
 
 # Import jobs
 from .jobs import JOBS
+from .perspectives import SENSORS
 from .perspectives.jobs import PerspectivePipelineRunConfig
 
 # Configure custom loggers
@@ -36,4 +37,5 @@ defs = dg.Definitions(
         **loggers,  # Integrate custom loggers into resources
     },
     jobs=[*JOBS],
+    sensors=[*SENSORS],
 )
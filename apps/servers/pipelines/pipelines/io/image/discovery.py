@@ -0,0 +1,196 @@
+# SPDX-License-Identifier: Apache-2.0
+"""
+Image discovery with os.scandir.
+
+Directories are walked with os.scandir, optionally recursively, and each image
+is stat'ed once through its DirEntry. Sorting and sampling then work on the
+recorded size and modification time without further system calls. Files
+without a known image extension can be identified by their magic bytes.
+
+iter_image_entries streams entries as they are found. discover_images collects
+them into an ImageListing, which keeps paths in a list and sizes, modification
+times and inodes in typed arrays, so listing millions of files stays compact.
+"""
+
+import os
+from array import array
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Sequence, Union
+
+from loguru import logger
+
+from .types import SortingStrategy
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".gif", ".bmp", ".tiff", ".webp", ".ico")
+
+# Leading bytes of each image format; WebP is a RIFF container checked separately
+MAGIC_SIGNATURES = (
+    (b"\xff\xd8\xff", "jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+    (b"BM", "bmp"),
+    (b"II*\x00", "tiff"),
+    (b"MM\x00*", "tiff"),
+    (b"\x00\x00\x01\x00", "ico"),
+)
+SNIFF_BYTES = 16
+
+
+@dataclass(frozen=True, slots=True)
+class ImageEntry:
+    """A discovered image file."""
+
+    path: str
+    size: int
+    mtime_ns: int
+    inode: int
+
+
+def has_image_extension(filename: str) -> bool:
+    """Check if a file name has a known image extension."""
+    return filename.lower().endswith(IMAGE_EXTENSIONS)
+
+
+def sniff_image_format(path: Union[str, os.PathLike]) -> Optional[str]:
+    """
+    Identify an image format by the magic bytes at the start of a file.
+
+    Args:
+        path: Path of the file
+
+    Returns:
+        The format name, or None if the file is not a known image format or cannot be read
+    """
+    try:
+        with open(path, "rb") as f:
+            header = f.read(SNIFF_BYTES)
+    except OSError:
+        return None
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "webp"
+    for signature, image_format in MAGIC_SIGNATURES:
+        if header.startswith(signature):
+            return image_format
+    return None
+
+
+def iter_image_entries(
+    root: Union[str, os.PathLike], recursive: bool = False, sniff: bool = False
+) -> Iterator[ImageEntry]:
+    """
+    Stream the images under a directory.
+
+    Symbolic links to files are followed, links to directories are not, so a
+    recursive walk cannot loop. Directories that cannot be read and files that
+    vanish or cannot be stat'ed during the walk are logged and skipped, so one
+    bad entry never aborts a scan of a live directory.
+
+    Args:
+        root: Directory to search
+        recursive: Also search subdirectories
+        sniff: Identify files without an image extension by their magic bytes
+
+    Yields:
+        Each image in directory order, subdirectories after the files of their parent
+    """
+    pending = [os.fspath(root)]
+    while pending:
+        directory = pending.pop()
+        subdirectories = []
+        try:
+            entries = os.scandir(directory)
+        except OSError as e:
+            logger.warning(f"Skipping unreadable directory {directory}: {e}")
+            continue
+        with entries:
+            for entry in entries:
+                try:
+                    if recursive and entry.is_dir(follow_symlinks=False):
+                        subdirectories.append(entry.path)
+                        continue
+                    if not entry.is_file():
+                        continue
+                    if not has_image_extension(entry.name) and not (sniff and sniff_image_format(entry.path)):
+                        continue
+                    stat = entry.stat()
+                except OSError as e:
+                    logger.warning(f"Skipping {entry.path}: {e}")
+                    continue
+                yield ImageEntry(entry.path, stat.st_size, stat.st_mtime_ns, stat.st_ino)
+        # Reversed so the stack visits subdirectories in directory order
+        pending.extend(reversed(subdirectories))
+
+
+class ImageListing:
+    """
+    Columnar listing of discovered images.
+
+    Attributes:
+        paths (list): Image paths
+        sizes (array): File sizes in bytes
+        mtimes (array): Modification times in nanoseconds
+        inodes (array): Inode numbers
+    """
+
+    def __init__(self, entries: Iterable[ImageEntry] = ()):
+        self.paths: List[str] = []
+        self.sizes = array("q")
+        self.mtimes = array("q")
+        self.inodes = array("Q")
+        for entry in entries:
+            self.append(entry)
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def __getitem__(self, index: int) -> ImageEntry:
+        return ImageEntry(self.paths[index], self.sizes[index], self.mtimes[index], self.inodes[index])
+
+    def __iter__(self) -> Iterator[ImageEntry]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def append(self, entry: ImageEntry) -> None:
+        """Add an image to the listing."""
+        self.paths.append(entry.path)
+        self.sizes.append(entry.size)
+        self.mtimes.append(entry.mtime_ns)
+        self.inodes.append(entry.inode)
+
+    def select(self, indices: Sequence[int]) -> "ImageListing":
+        """Get a listing of the images at the given positions, in that order."""
+        return ImageListing(self[index] for index in indices)
+
+    def sorted(self, sorting_strategy: SortingStrategy) -> "ImageListing":
+        """
+        Sort the listing by path, size or modification time.
+
+        Args:
+            sorting_strategy: Column to sort by
+
+        Returns:
+            A sorted listing; images with equal keys keep their order
+        """
+        columns = {
+            SortingStrategy.NAME: self.paths,
+            SortingStrategy.SIZE: self.sizes,
+            SortingStrategy.MODIFIED: self.mtimes,
+        }
+        column = columns[SortingStrategy(sorting_strategy)]
+        return self.select(sorted(range(len(self)), key=column.__getitem__))
+
+
+def discover_images(root: Union[str, os.PathLike], recursive: bool = False, sniff: bool = False) -> ImageListing:
+    """
+    List the images under a directory.
+
+    Args:
+        root: Directory to search
+        recursive: Also search subdirectories
+        sniff: Identify files without an image extension by their magic bytes
+
+    Returns:
+        The images in directory order
+    """
+    return ImageListing(iter_image_entries(root, recursive=recursive, sniff=sniff))
@@ -9,10 +9,10 @@ object detection, etc.) from various image types.
 """
 
 from .common_formats import ASSETS as COMMON_FORMATS
-from .extract_exif import image_list_exif_data
+from .extract_exif import image_list_exif_data, image_standard_metadata
 
-ASSETS = [image_list_exif_data, *COMMON_FORMATS]
+ASSETS = [image_list_exif_data, image_standard_metadata, *COMMON_FORMATS]
 OPS = []
 
 
-__all__ = ["ASSETS", "image_list_exif_data"]
+__all__ = ["ASSETS", "image_list_exif_data", "image_standard_metadata"]
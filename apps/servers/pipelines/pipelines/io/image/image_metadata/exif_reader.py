@@ -0,0 +1,445 @@
+# SPDX-License-Identifier: Apache-2.0
+"""
+Batched Exif extraction into Arrow record batches.
+
+ExifTool is a Perl program, and starting it takes around 100 ms, longer than
+reading the metadata of a typical image. ExifToolProcess keeps ExifTool running
+with ``-stay_open True -@ -``: it reads arguments from stdin and runs them on
+every ``-execute``, so a whole batch of images costs one round trip.
+ExifToolPool runs several processes and sends each batch to one that is idle.
+
+The JSON of each batch is converted into an Arrow record batch as soon as it
+arrives. Tags differ between images, so the batches are combined into one table
+at the end. A column whose type differs between images is stored as strings.
+
+When ExifTool is not installed, read_pillow_exif reads the common Exif fields
+in-process with Pillow, using the tag names ExifTool reports.
+"""
+
+import json
+import os
+import queue
+import shutil
+import subprocess
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Sequence
+
+import pyarrow as pa
+from PIL import ExifTags, Image, TiffImagePlugin
+
+from ..types import ExifBackend
+
+EXIFTOOL = "exiftool"
+# JSON output with numeric values, as the one-process-per-image extraction produced
+EXIFTOOL_ARGS = ("-j", "-n")
+DEFAULT_WORKERS = os.cpu_count() or 1
+DEFAULT_BATCH_SIZE = 64
+NO_METADATA_ERROR = "ExifTool returned no metadata"
+
+# Pillow tag names that ExifTool reports under another name
+PILLOW_TAG_NAMES = {"ISOSpeedRatings": "ISO"}
+
+# Tags pointing to other IFDs rather than holding values
+IFD_POINTERS = {ifd.value for ifd in ExifTags.IFD}
+
+Record = Dict[str, Any]
+
+
+def exiftool_available(executable: str = EXIFTOOL) -> bool:
+    """Whether an ExifTool executable is on the PATH."""
+    return shutil.which(executable) is not None
+
+
+def resolve_exif_backend(backend: ExifBackend, executable: str = EXIFTOOL) -> ExifBackend:
+    """
+    Choose the Exif extractor.
+
+    Args:
+        backend: Requested backend; AUTO chooses ExifTool when it is installed
+        executable: ExifTool executable
+
+    Returns:
+        EXIFTOOL or PILLOW
+
+    Raises:
+        FileNotFoundError: If ExifTool was requested but is not installed
+    """
+    backend = ExifBackend(backend)
+    if backend == ExifBackend.AUTO:
+        return ExifBackend.EXIFTOOL if exiftool_available(executable) else ExifBackend.PILLOW
+    if backend == ExifBackend.EXIFTOOL and not exiftool_available(executable):
+        raise FileNotFoundError(f"ExifTool executable {executable!r} was not found on the PATH")
+    return backend
+
+
+def _batched(items: Sequence[str], batch_size: int) -> Iterator[List[str]]:
+    """Split items into lists of up to batch_size."""
+    for start in range(0, len(items), batch_size):
+        yield list(items[start : start + batch_size])
+
+
+def _error_record(image_path: str, error: str) -> Record:
+    """Record of an image whose metadata could not be read."""
+    return {"SourceFile": image_path, "Error": error}
+
+
+def _align(image_paths: Sequence[str], records: Iterable[Record]) -> List[Record]:
+    """Order records like image_paths, adding an error record for every image without one."""
+    by_path = {record.get("SourceFile"): record for record in records}
+    return [by_path.get(path) or _error_record(path, NO_METADATA_ERROR) for path in image_paths]
+
+
+class ExifToolProcess:
+    """
+    A long-running ExifTool process reading its arguments from stdin.
+
+    Attributes:
+        executable (str): ExifTool executable
+    """
+
+    def __init__(self, executable: str = EXIFTOOL):
+        self.executable = executable
+        self._process = subprocess.Popen(
+            [executable, "-stay_open", "True", "-@", "-"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        self._sequence = count(1)
+        # Drained continuously, so warnings never fill the pipe and block ExifTool
+        self._stderr: deque[str] = deque(maxlen=20)
+        threading.Thread(target=self._drain_stderr, daemon=True).start()
+
+    def _drain_stderr(self) -> None:
+        for line in self._process.stderr:
+            self._stderr.append(line.decode(errors="replace").rstrip())
+
+    @property
+    def alive(self) -> bool:
+        """Whether the process is still running."""
+        return self._process.poll() is None
+
+    def execute(self, image_paths: Sequence[str]) -> List[Record]:
+        """
+        Read the metadata of a batch of images.
+
+        Args:
+            image_paths: Paths to the images
+
+        Returns:
+            The metadata of each image ExifTool could read, with its path as SourceFile
+
+        Raises:
+            RuntimeError: If ExifTool exited or wrote output that is not JSON
+        """
+        sequence = next(self._sequence)
+        # A path starting with a dash would be read as an option
+        arguments = {f"./{path}" if path.startswith("-") else path: path for path in image_paths}
+        command = "\n".join([*EXIFTOOL_ARGS, *arguments, f"-execute{sequence}"]) + "\n"
+        ready = f"{{ready{sequence}}}".encode()
+
+        try:
+            self._process.stdin.write(command.encode())
+            self._process.stdin.flush()
+        except BrokenPipeError:
+            raise RuntimeError(f"ExifTool exited with code {self._process.poll()}: {' '.join(self._stderr)}")
+
+        lines = []
+        for line in iter(self._process.stdout.readline, b""):
+            if line.rstrip() == ready:
+                break
+            lines.append(line)
+        else:
+            raise RuntimeError(f"ExifTool exited with code {self._process.wait()}: {' '.join(self._stderr)}")
+
+        output = b"".join(lines).strip()
+        try:
+            records = json.loads(output) if output else []
+        except json.JSONDecodeError as e:
+            raise RuntimeError(f"Failed to parse ExifTool output: {e}")
+        for record in records:
+            record["SourceFile"] = arguments.get(record.get("SourceFile"), record.get("SourceFile"))
+        return records
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Ask ExifTool to exit, killing it if it does not within timeout seconds."""
+        if self.alive:
+            try:
+                self._process.stdin.write(b"-stay_open\nFalse\n")
+                self._process.stdin.flush()
+            except BrokenPipeError:
+                pass
+        try:
+            self._process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+            self._process.wait()
+        try:
+            self._process.stdin.close()
+        except BrokenPipeError:
+            # Arguments of a failed batch may still be buffered
+            pass
+        self._process.stdout.close()
+
+    def __enter__(self) -> "ExifToolProcess":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class ExifToolPool:
+    """
+    Long-running ExifTool processes reading batches of images in parallel.
+
+    Use as a context manager, which starts the processes and stops them on exit.
+
+    Attributes:
+        workers (int): Number of ExifTool processes
+        batch_size (int): Images sent to a process at once
+        executable (str): ExifTool executable
+    """
+
+    def __init__(
+        self, workers: int = DEFAULT_WORKERS, batch_size: int = DEFAULT_BATCH_SIZE, executable: str = EXIFTOOL
+    ):
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.executable = executable
+        self._idle: queue.Queue[ExifToolProcess] = queue.Queue()
+
+    def __enter__(self) -> "ExifToolPool":
+        for _ in range(self.workers):
+            self._idle.put(ExifToolProcess(self.executable))
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        while not self._idle.empty():
+            self._idle.get_nowait().close()
+
+    def read_batch(self, image_paths: Sequence[str]) -> List[Record]:
+        """
+        Read the metadata of a batch of images on an idle process.
+
+        A process that fails is replaced, and every image of its batch gets an error record.
+
+        Args:
+            image_paths: Paths to the images
+
+        Returns:
+            One record per image, in the order of image_paths
+        """
+        process = self._idle.get()
+        try:
+            records = process.execute(image_paths)
+        except RuntimeError as e:
+            process.close(timeout=0)
+            process = ExifToolProcess(self.executable)
+            records = [_error_record(path, str(e)) for path in image_paths]
+        finally:
+            self._idle.put(process)
+        return _align(image_paths, records)
+
+    def read_batches(self, image_paths: Sequence[str]) -> Iterator[pa.RecordBatch]:
+        """
+        Read the metadata of images as Arrow record batches.
+
+        Args:
+            image_paths: Paths to the images
+
+        Yields:
+            One record batch per batch of images, in the order of image_paths
+        """
+        yield from _read_in_batches(self.read_batch, image_paths, self.workers, self.batch_size)
+
+
+def _exif_value(value: Any) -> Any:
+    """Convert a Pillow Exif value to a JSON-like value; binary values are dropped."""
+    if isinstance(value, TiffImagePlugin.IFDRational):
+        return float(value) if value.denominator else None
+    if isinstance(value, bytes):
+        return None
+    if isinstance(value, tuple):
+        return [_exif_value(item) for item in value]
+    if isinstance(value, str):
+        return value.strip("\x00 ")
+    return value
+
+
+def _gps_degrees(value: Any, reference: Any) -> Any:
+    """Convert degrees, minutes and seconds to signed decimal degrees, as ExifTool reports them with -n."""
+    if not isinstance(value, list) or len(value) != 3 or None in value:
+        return value
+    degrees = value[0] + value[1] / 60 + value[2] / 3600
+    return -degrees if reference in ("S", "W") else degrees
+
+
+def read_pillow_exif(image_path: str) -> Record:
+    """
+    Read the common Exif fields of an image with Pillow.
+
+    Covers the file properties, the image IFD, the Exif IFD and the GPS IFD.
+    Tags are named like ExifTool names them, and binary tags are skipped.
+
+    Args:
+        image_path: Path to the image
+
+    Returns:
+        The metadata, with the path as SourceFile
+
+    Raises:
+        OSError: If the image cannot be opened
+    """
+    record: Record = {
+        "SourceFile": image_path,
+        "FileName": os.path.basename(image_path),
+        "FileSize": os.path.getsize(image_path),
+    }
+    with Image.open(image_path) as img:
+        record["FileType"] = img.format
+        record["MIMEType"] = img.get_format_mimetype()
+        record["ImageWidth"], record["ImageHeight"] = img.size
+        exif = img.getexif()
+        tags = {**dict(exif), **exif.get_ifd(ExifTags.IFD.Exif)}
+        gps_tags = exif.get_ifd(ExifTags.IFD.GPSInfo)
+
+    for tag_id, value in tags.items():
+        name = ExifTags.TAGS.get(tag_id)
+        value = _exif_value(value)
+        if name is None or tag_id in IFD_POINTERS or value is None:
+            continue
+        record[PILLOW_TAG_NAMES.get(name, name)] = value
+
+    gps = {ExifTags.GPSTAGS.get(tag_id): _exif_value(value) for tag_id, value in gps_tags.items()}
+    for axis in ("Latitude", "Longitude"):
+        if f"GPS{axis}" in gps:
+            gps[f"GPS{axis}"] = _gps_degrees(gps[f"GPS{axis}"], gps.get(f"GPS{axis}Ref"))
+    record.update({name: value for name, value in gps.items() if name is not None and value is not None})
+    return record
+
+
+def read_pillow_batch(image_paths: Sequence[str]) -> List[Record]:
+    """Read the Exif fields of a batch of images with Pillow, with an error record for each failure."""
+    records = []
+    for image_path in image_paths:
+        try:
+            records.append(read_pillow_exif(image_path))
+        except Exception as e:
+            records.append(_error_record(image_path, str(e)))
+    return records
+
+
+def _string_array(values: Sequence[Any]) -> pa.Array:
+    """Store values as strings, with lists and mappings as JSON."""
+    return pa.array(
+        [
+            None if value is None else value if isinstance(value, str) else json.dumps(value, default=str)
+            for value in values
+        ],
+        pa.string(),
+    )
+
+
+def records_to_batch(records: Sequence[Record]) -> pa.RecordBatch:
+    """
+    Convert metadata records into an Arrow record batch.
+
+    Every tag becomes a column, null where an image lacks it. Tags whose values
+    have no common Arrow type are stored as strings.
+
+    Args:
+        records: Metadata records
+
+    Returns:
+        The record batch
+    """
+    names = list(dict.fromkeys(name for record in records for name in record))
+    arrays = []
+    for name in names:
+        values = [record.get(name) for record in records]
+        try:
+            arrays.append(pa.array(values))
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            arrays.append(_string_array(values))
+    return pa.RecordBatch.from_arrays(arrays, names=names)
+
+
+def _read_in_batches(
+    read_batch: Callable[[Sequence[str]], List[Record]], image_paths: Sequence[str], workers: int, batch_size: int
+) -> Iterator[pa.RecordBatch]:
+    """Read batches of images on a thread pool, converting each into a record batch on its worker."""
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        yield from executor.map(
+            lambda batch: records_to_batch(read_batch(batch)), _batched(image_paths, max(1, batch_size))
+        )
+
+
+def read_exif_batches(
+    image_paths: Sequence[str],
+    backend: ExifBackend = ExifBackend.AUTO,
+    workers: int = DEFAULT_WORKERS,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[pa.RecordBatch]:
+    """
+    Read the Exif metadata of images as Arrow record batches.
+
+    Args:
+        image_paths: Paths to the images
+        backend: Exif extractor
+        workers: ExifTool processes, or Pillow threads
+        batch_size: Images per batch
+
+    Yields:
+        One record batch per batch of images, in the order of image_paths
+
+    Raises:
+        FileNotFoundError: If ExifTool was requested but is not installed
+    """
+    if resolve_exif_backend(backend) == ExifBackend.PILLOW:
+        yield from _read_in_batches(read_pillow_batch, image_paths, workers, batch_size)
+        return
+    with ExifToolPool(workers, batch_size) as pool:
+        yield from pool.read_batches(image_paths)
+
+
+def _conflicting_columns(tables: Sequence[pa.Table]) -> List[str]:
+    """Columns whose types differ between tables and cannot be promoted to a common type."""
+    types: Dict[str, set] = {}
+    for table in tables:
+        for field in table.schema:
+            types.setdefault(field.name, set()).add(field.type)
+    conflicting = []
+    for name, column_types in types.items():
+        try:
+            pa.unify_schemas(
+                [pa.schema([(name, column_type)]) for column_type in column_types], promote_options="permissive"
+            )
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+            conflicting.append(name)
+    return conflicting
+
+
+def exif_table(batches: Iterable[pa.RecordBatch]) -> pa.Table:
+    """
+    Combine record batches with different columns into one table.
+
+    Args:
+        batches: Record batches
+
+    Returns:
+        A table with every column of every batch, null where a batch lacks it
+    """
+    tables = [pa.Table.from_batches([batch]) for batch in batches]
+    if not tables:
+        return pa.table({})
+    conflicting = _conflicting_columns(tables)
+    for index, table in enumerate(tables):
+        for name in conflicting:
+            position = table.schema.get_field_index(name)
+            if position >= 0:
+                table = table.set_column(position, name, _string_array(table.column(name).to_pylist()))
+        tables[index] = table
+    return pa.concat_tables(tables, promote_options="permissive")
@@ -0,0 +1,233 @@
+# SPDX-License-Identifier: Apache-2.0
+"""
+Single-pass, parallel extraction of standard image file metadata.
+
+Each file is read once: small files with a single read into one buffer, large
+ones through a memory mapping. Pillow parses the image header from that buffer
+and every hasher consumes the same bytes, so a large file is never copied into
+Python memory. SHA-256 is always computed for provenance; a fast hash can be
+added for deduplication:
+
+- ``xxh3``: 128-bit XXH3, requires xxhash
+- ``blake3``: BLAKE3, requires blake3
+- ``blake2b``: BLAKE2b from the standard library
+
+Files are processed on a thread pool by default. hashlib, xxhash and blake3
+release the GIL while hashing large buffers, so threads keep several cores and
+outstanding reads busy. A process pool can be used instead when header parsing
+dominates, and a single worker reads in the calling thread.
+"""
+
+import hashlib
+import io
+import mmap
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from functools import partial
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple, TypedDict
+
+from PIL import Image
+
+FAST_HASHES = ("xxh3", "blake3", "blake2b")
+DEFAULT_MAX_WORKERS = min(32, (os.cpu_count() or 1) * 2)
+
+# Files of at least this size are memory-mapped; smaller ones are read with one system call
+MMAP_THRESHOLD = 8 * 2**20
+
+# Bits per pixel of common Pillow modes
+MODE_TO_BITS = {
+    "1": 1,  # binary
+    "L": 8,  # grayscale
+    "P": 8,  # palette
+    "RGB": 24,
+    "RGBA": 32,
+}
+
+
+class ImageMetadata(TypedDict):
+    """Standard metadata for an image file."""
+
+    file_path: str
+    file_name: str
+    file_size: int
+    file_format: str
+    width: int
+    height: int
+    aspect_ratio: float
+    color_mode: str
+    bit_depth: int
+    file_hash: str
+    created_time: str
+    modified_time: str
+    accessed_time: str
+
+
+def empty_metadata(image_path: str) -> ImageMetadata:
+    """Metadata recorded for a file that could not be read."""
+    return ImageMetadata(
+        file_path=image_path,
+        file_name=os.path.basename(image_path),
+        file_size=0,
+        file_format="Unknown",
+        width=0,
+        height=0,
+        aspect_ratio=0.0,
+        color_mode="Unknown",
+        bit_depth=0,
+        file_hash="",
+        created_time="",
+        modified_time="",
+        accessed_time="",
+    )
+
+
+def new_hasher(algorithm: str):
+    """
+    Create a hash object.
+
+    Args:
+        algorithm: "sha256" or one of FAST_HASHES
+
+    Returns:
+        An object with update and hexdigest methods
+
+    Raises:
+        ImportError: If the library providing the algorithm is not installed
+        ValueError: If the algorithm is unknown
+    """
+    if algorithm == "sha256":
+        return hashlib.sha256()
+    if algorithm == "blake2b":
+        return hashlib.blake2b()
+    if algorithm == "xxh3":
+        try:
+            import xxhash
+        except ImportError:
+            raise ImportError("The xxh3 hash requires xxhash. Install it with 'pip install xxhash'.")
+        return xxhash.xxh3_128()
+    if algorithm == "blake3":
+        try:
+            from blake3 import blake3
+        except ImportError:
+            raise ImportError("The blake3 hash requires blake3. Install it with 'pip install blake3'.")
+        return blake3()
+    raise ValueError(f"Unknown hash algorithm: {algorithm}")
+
+
+def fast_hash_column(fast_hash: str) -> str:
+    """Name of the metadata column holding a fast hash."""
+    return f"{fast_hash}_hash"
+
+
+def _read_header(fp) -> Tuple[int, int, str, str]:
+    """Parse the size, format and mode of an image; Pillow only reads the header, pixels are never decoded."""
+    with Image.open(fp) as img:
+        width, height = img.size
+        return width, height, img.format or "Unknown", img.mode
+
+
+def _update(hashers: Dict[str, Any], data) -> None:
+    """Feed the same buffer to every hasher."""
+    for hasher in hashers.values():
+        hasher.update(data)
+
+
+def read_file_metadata(image_path: str, fast_hash: Optional[str] = None) -> ImageMetadata:
+    """
+    Read the standard metadata of an image file in a single pass.
+
+    Args:
+        image_path: Path to the image file
+        fast_hash: Fast hash to add as the ``<fast_hash>_hash`` column, one of FAST_HASHES
+
+    Returns:
+        The metadata
+
+    Raises:
+        OSError: If the file cannot be read or is not an image Pillow can open
+    """
+    hashers = {"sha256": new_hasher("sha256")}
+    if fast_hash:
+        hashers[fast_hash] = new_hasher(fast_hash)
+
+    with open(image_path, "rb", buffering=0) as f:
+        stat = os.fstat(f.fileno())
+        if stat.st_size == 0:
+            raise OSError(f"Empty file: {image_path}")
+        if stat.st_size < MMAP_THRESHOLD:
+            data = f.readall()
+            width, height, format_name, mode = _read_header(io.BytesIO(data))
+            _update(hashers, data)
+        else:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                if hasattr(mmap, "MADV_SEQUENTIAL"):
+                    mapped.madvise(mmap.MADV_SEQUENTIAL)
+                width, height, format_name, mode = _read_header(mapped)
+                _update(hashers, mapped)
+
+    metadata: ImageMetadata = {
+        "file_path": image_path,
+        "file_name": os.path.basename(image_path),
+        "file_size": stat.st_size,
+        "file_format": format_name,
+        "width": width,
+        "height": height,
+        "aspect_ratio": round(width / height if height != 0 else 0, 4),
+        "color_mode": mode,
+        "bit_depth": MODE_TO_BITS.get(mode, 0),
+        "file_hash": hashers["sha256"].hexdigest(),
+        "created_time": datetime.fromtimestamp(stat.st_ctime).isoformat(),
+        "modified_time": datetime.fromtimestamp(stat.st_mtime).isoformat(),
+        "accessed_time": datetime.fromtimestamp(stat.st_atime).isoformat(),
+    }
+    if fast_hash:
+        metadata[fast_hash_column(fast_hash)] = hashers[fast_hash].hexdigest()
+    return metadata
+
+
+def _read_or_error(image_path: str, fast_hash: Optional[str]) -> Tuple[ImageMetadata, Optional[str]]:
+    """Read the metadata of a file, returning empty metadata and the error if it fails."""
+    try:
+        return read_file_metadata(image_path, fast_hash), None
+    except Exception as e:
+        return empty_metadata(image_path), str(e)
+
+
+def extract_file_metadata(
+    image_paths: Iterable[str],
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    fast_hash: Optional[str] = None,
+    use_processes: bool = False,
+) -> Iterator[Tuple[ImageMetadata, Optional[str]]]:
+    """
+    Read the standard metadata of many image files in parallel.
+
+    Args:
+        image_paths: Paths to the image files
+        max_workers: Files read at the same time
+        fast_hash: Fast hash to add, one of FAST_HASHES
+        use_processes: Use a process pool instead of a thread pool
+
+    Yields:
+        The metadata of each file and its error, or None, in the order of image_paths
+
+    Raises:
+        ImportError: If the fast hash needs a library that is not installed
+        ValueError: If the fast hash is unknown
+    """
+    if fast_hash:
+        if fast_hash not in FAST_HASHES:
+            raise ValueError(f"Unknown fast hash {fast_hash}, expected one of {FAST_HASHES}")
+        # Fail before starting workers if the library is missing
+        new_hasher(fast_hash)
+
+    read = partial(_read_or_error, fast_hash=fast_hash)
+    if max_workers <= 1:
+        yield from map(read, image_paths)
+        return
+
+    executor: Executor = (ProcessPoolExecutor if use_processes else ThreadPoolExecutor)(max_workers=max_workers)
+    with executor:
+        chunksize = 64 if use_processes else 1
+        yield from executor.map(read, image_paths, chunksize=chunksize)
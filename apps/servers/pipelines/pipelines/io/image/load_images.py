@@ -1,49 +1,21 @@
-import os
-import random
-import shutil
+from collections import defaultdict
+from pathlib import Path
+from typing import Iterable, Sequence
 
 import dagster as dg
 from dagster import asset
 from PIL import Image
 
-from .types import DatasetIOConfig, SamplingStrategy, SortingStrategy
 from ...perspectives.jobs.config import PerspectivePipelineConfig
+from .discovery import ImageEntry, ImageListing, has_image_extension, iter_image_entries
+from .sampling import sample_entries
+from .store import DEFAULT_LINK_MODES, ImageStore, default_store_dir, link_object
+from .types import DatasetIOConfig, SamplingStrategy, SortingStrategy, StratificationKey
 
 
 def is_image_file(filename: str) -> bool:
     """Check if a file is an image based on its extension."""
-    image_extensions = [".jpg", ".jpeg", ".png", ".gif", ".bmp", ".tiff", ".webp", ".ico"]
-    return any(filename.lower().endswith(ext) for ext in image_extensions)
-
-
-def sort_image_files(image_files: list[str], sorting_strategy: SortingStrategy) -> list[str]:
-    """Sort image files based on the specified strategy."""
-    if sorting_strategy == SortingStrategy.NAME:
-        image_files.sort()  # Sort by filename
-    elif sorting_strategy == SortingStrategy.SIZE:
-        image_files.sort(key=os.path.getsize)  # Sort by file size
-    elif sorting_strategy == SortingStrategy.MODIFIED:
-        image_files.sort(key=os.path.getmtime)  # Sort by modification time
-    return image_files
-
-
-def sample_image_files(
-    image_files: list[str], sampling_strategy: SamplingStrategy, num_samples: int | None
-) -> list[str]:
-    """Sample image files based on the specified strategy."""
-    if num_samples is None or num_samples >= len(image_files):
-        return image_files  # Return all files if num_samples is None or too large
-
-    if sampling_strategy == SamplingStrategy.INCREMENT:
-        sampled_files = image_files[:num_samples]  # Take the first num_samples files
-    elif sampling_strategy == SamplingStrategy.DECREMENT:
-        sampled_files = image_files[-num_samples:]  # Take the last num_samples files
-    elif sampling_strategy == SamplingStrategy.RANDOM:
-        sampled_files = random.sample(image_files, num_samples)  # Take a random sample
-    else:
-        raise ValueError(f"Invalid sampling strategy: {sampling_strategy}")
-
-    return sampled_files
+    return has_image_extension(filename)
 
 
 def get_image_list(
@@ -52,45 +24,106 @@ def get_image_list(
     sorting_strategy: SortingStrategy | None,
     sampling_strategy: SamplingStrategy,
     num_samples: int | None,
+    recursive: bool = False,
+    sniff: bool = False,
+    sampling_seed: int | None = None,
+    stratify_by: StratificationKey = StratificationKey.DIRECTORY,
 ) -> list[str]:
-    """Load raw images from directory."""
-    image_files = [
-        os.path.join(image_dir, f)
-        for f in os.listdir(image_dir)
-        if os.path.isfile(os.path.join(image_dir, f)) and is_image_file(f)
-    ]
-    context.log.info(f"Found {len(image_files)} images in {image_dir}")
-
-    # Sort images
+    """
+    Load raw images from directory.
+
+    Each file is stat'ed once during discovery, so sorting by size or modification
+    time needs no further system calls. ``recursive`` includes subdirectories and
+    ``sniff`` includes files without an image extension whose magic bytes match an
+    image format. Without sorting, images are sampled as they are discovered in a
+    single pass, keeping only the sample in memory.
+    """
+    entries: Iterable[ImageEntry] = iter_image_entries(image_dir, recursive=recursive, sniff=sniff)
+
+    # Sorting needs the full listing
     if sorting_strategy:
-        image_files = sort_image_files(image_files, sorting_strategy)
+        listing = ImageListing(entries).sorted(sorting_strategy)
+        context.log.info(f"Found {len(listing)} images in {image_dir}")
+        entries = listing
 
     # Sample images
-    image_files = sample_image_files(image_files, sampling_strategy, num_samples)
+    sample = sample_entries(
+        entries, sampling_strategy, num_samples, seed=sampling_seed, stratify_by=stratify_by, root=image_dir
+    )
+    context.log.info(f"Selected {len(sample)} images from {image_dir}")
+    return [entry.path for entry in sample]
 
-    return image_files
 
+def link_names(image_paths: Sequence[str], object_paths: Sequence[Path | None]) -> list[str | None]:
+    """
+    Name the links of stored images in a run's flat images directory.
 
-def copy_images(context: dg.AssetExecutionContext, image_paths: list[str], output_dir: str) -> list[str]:
-    """Copy images to the output directory."""
-    output_dir = output_dir + "/images"
-    try:
-        os.makedirs(output_dir, exist_ok=True)  # Ensure the output directory exists
-    except FileExistsError:
-        context.log.warning(f"Directory already exists: {output_dir}")
-    new_image_paths = []
+    Images keep their file name unless different images of the selection share it,
+    as images in different subdirectories may; those are all named
+    <stem>_<first 12 hex digits of their hash><suffix> instead.
 
-    for image_path in image_paths:
-        try:
-            new_image_path = os.path.join(output_dir, os.path.basename(image_path))
-            shutil.copy(image_path, new_image_path)
-            context.log.info(f"Image copied successfully: {image_path} to {new_image_path}")
-            new_image_paths.append(new_image_path)
-        except FileNotFoundError:
-            context.log.error(f"File not found: {image_path}")
-        except Exception as e:
-            context.log.error(f"Error copying image {image_path}: {e}")
+    Args:
+        image_paths: Source images
+        object_paths: Their stored objects, None for images that could not be stored
 
+    Returns:
+        Link names in the order of image_paths, None for images that could not be stored
+    """
+    hashes_by_name: dict[str, set[str]] = defaultdict(set)
+    for image_path, object_path in zip(image_paths, object_paths):
+        if object_path is not None:
+            hashes_by_name[Path(image_path).name].add(object_path.stem)
+
+    names: list[str | None] = []
+    for image_path, object_path in zip(image_paths, object_paths):
+        if object_path is None:
+            names.append(None)
+            continue
+        path = Path(image_path)
+        if len(hashes_by_name[path.name]) > 1:
+            names.append(f"{path.stem}_{object_path.stem[:12]}{path.suffix}")
+        else:
+            names.append(path.name)
+    return names
+
+
+def copy_images(
+    context: dg.AssetExecutionContext,
+    image_paths: list[str],
+    output_dir: str,
+    store_dir: str | None = None,
+    link_modes: Sequence[str] = DEFAULT_LINK_MODES,
+) -> list[str]:
+    """
+    Add images to the content-addressed image store and link them into the output directory.
+
+    Each image is stored once under its content hash, shared by all runs and
+    datasets using the store, which defaults to image_store next to the output
+    directory. ``link_modes`` are the ways new images are added to the store; the
+    defaults never hard link the source. The output directory's images directory
+    holds hard links to the stored objects under the names from link_names, so an
+    unchanged dataset is neither read nor copied again.
+    """
+    store = ImageStore(store_dir or default_store_dir(output_dir), link_modes=link_modes)
+    image_dir = Path(output_dir) / "images"
+    object_paths = store.put_many(image_paths)
+
+    new_image_paths = []
+    for image_path, object_path, name in zip(image_paths, object_paths, link_names(image_paths, object_paths)):
+        if object_path is None:
+            continue
+        new_image_path = image_dir / name
+        try:
+            link_object(object_path, new_image_path)
+        except OSError as e:
+            context.log.error(f"Error linking image {image_path}: {e}")
+            continue
+        new_image_paths.append(str(new_image_path))
+
+    context.log.info(
+        f"Stored {len(new_image_paths)} of {len(image_paths)} images in {store.root} "
+        f"({store.stats.as_dict()}) and linked them into {image_dir}"
+    )
     return new_image_paths
 
 
@@ -113,8 +146,18 @@ def image_list(context: dg.AssetExecutionContext, image_dataset_config: DatasetI
         sorting_strategy=image_dataset_config.sorting_strategy,
         sampling_strategy=image_dataset_config.sampling_strategy,
         num_samples=image_dataset_config.num_samples,
+        recursive=image_dataset_config.recursive,
+        sniff=image_dataset_config.sniff_images,
+        sampling_seed=image_dataset_config.sampling_seed,
+        stratify_by=image_dataset_config.stratify_by,
+    )
+    copied_image_files: list[str] = copy_images(
+        context,
+        image_files,
+        image_dataset_config.output_dir,
+        store_dir=image_dataset_config.image_store_dir,
+        link_modes=image_dataset_config.image_store_link_modes,
     )
-    copied_image_files: list[str] = copy_images(context, image_files, image_dataset_config.output_dir)
     return copied_image_files
 
 
@@ -164,9 +207,19 @@ def perspective_image_list(
         sorting_strategy=SortingStrategy(io_config.sorting_strategy),
         sampling_strategy=SamplingStrategy(io_config.sampling_strategy),
         num_samples=io_config.num_samples,
+        recursive=io_config.recursive,
+        sniff=io_config.sniff_images,
+        sampling_seed=io_config.sampling_seed,
+        stratify_by=StratificationKey(io_config.stratify_by),
     )
 
-    copied_image_files: list[str] = copy_images(context, image_files, io_config.output_dir)
+    copied_image_files: list[str] = copy_images(
+        context,
+        image_files,
+        io_config.output_dir,
+        store_dir=io_config.image_store_dir,
+        link_modes=io_config.image_store_link_modes,
+    )
 
     context.add_output_metadata(
         {
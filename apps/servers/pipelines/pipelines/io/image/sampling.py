@@ -0,0 +1,264 @@
+# SPDX-License-Identifier: Apache-2.0
+"""
+Streaming image samplers.
+
+Every sampler takes a single pass over an iterable, such as the entries streamed
+by iter_image_entries, and keeps a bounded number of items: the requested number,
+or a fixed multiple of it for stratified sampling. Sampling a few thousand images
+from millions therefore needs neither the full listing in memory nor a sort.
+
+- reservoir_sample draws a uniform random sample, reproducible with a seed.
+- hash_sample keeps the items with the smallest hashes of their keys. The sample
+  is stable across runs, and adding files only replaces members when a new file
+  hashes lower.
+- stratified_sample draws from each stratum, such as a directory, format or size
+  bucket, in proportion to its size.
+
+Samples are returned in stream order.
+"""
+
+import hashlib
+import heapq
+import math
+import os
+import random
+from collections import deque
+from itertools import islice
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Tuple, TypeVar
+
+from .discovery import ImageEntry
+from .types import SamplingStrategy, StratificationKey
+
+T = TypeVar("T")
+
+# Items kept in memory by stratified sampling, per item of the sample
+STRATIFIED_OVERSAMPLING = 8
+
+
+def _uniform(rng: random.Random) -> float:
+    """Draw from the open interval (0, 1), so its logarithm is finite."""
+    value = rng.random()
+    while value == 0.0:
+        value = rng.random()
+    return value
+
+
+def reservoir_sample(items: Iterable[T], k: int, seed: Optional[int] = None) -> List[T]:
+    """
+    Draw a uniform random sample in one pass.
+
+    Uses Algorithm L, which skips ahead geometrically, so random numbers are only
+    drawn for items that enter the reservoir.
+
+    Args:
+        items: Items to sample
+        k: Sample size
+        seed: Seed for a reproducible sample
+
+    Returns:
+        Up to k items, in stream order
+    """
+    if k <= 0:
+        return []
+    rng = random.Random(seed)
+    iterator = enumerate(items)
+    reservoir = list(islice(iterator, k))
+    if len(reservoir) < k:
+        return [item for _, item in reservoir]
+
+    w = math.exp(math.log(_uniform(rng)) / k)
+    while True:
+        skip = math.floor(math.log(_uniform(rng)) / math.log1p(-w))
+        chosen = next(islice(iterator, skip, None), None)
+        if chosen is None:
+            break
+        reservoir[rng.randrange(k)] = chosen
+        w *= math.exp(math.log(_uniform(rng)) / k)
+    return [item for _, item in sorted(reservoir, key=lambda indexed: indexed[0])]
+
+
+def _hash_value(key: str, salt: str) -> int:
+    """Map a key to a 64-bit integer."""
+    return int.from_bytes(hashlib.blake2b(f"{salt}:{key}".encode(), digest_size=8).digest(), "big")
+
+
+def hash_sample(items: Iterable[T], k: int, key: Callable[[T], str], seed: Optional[int] = None) -> List[T]:
+    """
+    Draw a deterministic sample: the k items with the smallest hashes of their keys.
+
+    Args:
+        items: Items to sample
+        k: Sample size
+        key: Stable key of an item, such as its path relative to the dataset root
+        seed: Salt selecting a different deterministic sample
+
+    Returns:
+        Up to k items, in stream order
+    """
+    if k <= 0:
+        return []
+    salt = "" if seed is None else str(seed)
+    # Max-heap of the k smallest hashes, stored negated
+    heap: List[Tuple[int, int, T]] = []
+    for index, item in enumerate(items):
+        entry = (-_hash_value(key(item), salt), index, item)
+        if len(heap) < k:
+            heapq.heappush(heap, entry)
+        elif entry[0] > heap[0][0]:
+            heapq.heapreplace(heap, entry)
+    return [item for _, _, item in sorted(heap, key=lambda entry: entry[1])]
+
+
+def _allocate(k: int, weights: Dict[Hashable, int], capacity: Dict[Hashable, int]) -> Dict[Hashable, int]:
+    """
+    Split k draws across groups in proportion to their weights, by largest remainder.
+
+    Draws a group cannot take beyond its capacity are split again across the groups
+    with capacity left, until k draws are allocated or every group is full.
+    """
+    allocation = {group: 0 for group in weights}
+    remaining = k
+    while remaining > 0:
+        open_groups = [group for group in weights if allocation[group] < capacity[group]]
+        if not open_groups:
+            break
+        open_weight = sum(weights[group] for group in open_groups)
+        quotas = {group: remaining * weights[group] / open_weight for group in open_groups}
+        granted = {
+            group: min(math.floor(quota), capacity[group] - allocation[group]) for group, quota in quotas.items()
+        }
+        left = remaining - sum(granted.values())
+        for group in sorted(open_groups, key=lambda group: quotas[group] - math.floor(quotas[group]), reverse=True):
+            if left == 0:
+                break
+            if allocation[group] + granted[group] < capacity[group]:
+                granted[group] += 1
+                left -= 1
+        for group, draws in granted.items():
+            allocation[group] += draws
+        remaining -= sum(granted.values())
+    return allocation
+
+
+def stratified_sample(
+    items: Iterable[T],
+    k: int,
+    stratum: Callable[[T], Hashable],
+    seed: Optional[int] = None,
+    max_items: Optional[int] = None,
+) -> List[T]:
+    """
+    Draw a random sample that represents every stratum in proportion to its size.
+
+    Every item gets a random key, and the max_items items with the smallest keys
+    are kept, which is a uniform sample of the stream and of each stratum in it.
+    Only a count is kept for each stratum. At the end, the k draws are allocated by
+    largest remainder over the stratum sizes and each stratum contributes its
+    smallest keys. A stratum with fewer kept items than its allocation gives the
+    rest to the other strata in a second allocation round, so memory is bounded by
+    max_items items plus one counter per stratum. With the default of
+    STRATIFIED_OVERSAMPLING times k, allocations are exact unless a stratum is
+    unusually underrepresented among the kept items.
+
+    Args:
+        items: Items to sample
+        k: Sample size
+        stratum: Stratum of an item
+        seed: Seed for a reproducible sample
+        max_items: Items kept in memory, at least k
+
+    Returns:
+        Up to k items, in stream order
+
+    Raises:
+        ValueError: If max_items is smaller than k
+    """
+    if k <= 0:
+        return []
+    max_items = STRATIFIED_OVERSAMPLING * k if max_items is None else max_items
+    if max_items < k:
+        raise ValueError(f"Stratified sampling keeps at least the sample size in memory, got {max_items} < {k}")
+    rng = random.Random(seed)
+    # Max-heap of the max_items smallest keys, stored negated
+    heap: List[Tuple[float, int, Hashable, T]] = []
+    counts: Dict[Hashable, int] = {}
+    for index, item in enumerate(items):
+        group = stratum(item)
+        counts[group] = counts.get(group, 0) + 1
+        entry = (-rng.random(), index, group, item)
+        if len(heap) < max_items:
+            heapq.heappush(heap, entry)
+        elif entry[0] > heap[0][0]:
+            heapq.heapreplace(heap, entry)
+
+    kept: Dict[Hashable, List[Tuple[float, int, Hashable, T]]] = {group: [] for group in counts}
+    for entry in sorted(heap, reverse=True):
+        kept[entry[2]].append(entry)
+    allocation = _allocate(k, counts, {group: len(entries) for group, entries in kept.items()})
+
+    sample = [entry for group, entries in kept.items() for entry in entries[: allocation[group]]]
+    return [item for _, _, _, item in sorted(sample, key=lambda entry: entry[1])]
+
+
+def directory_stratum(entry: ImageEntry) -> str:
+    """Stratum of an image by its directory."""
+    return os.path.dirname(entry.path)
+
+
+def format_stratum(entry: ImageEntry) -> str:
+    """Stratum of an image by its file extension."""
+    return os.path.splitext(entry.path)[1].lower()
+
+
+def size_stratum(entry: ImageEntry) -> int:
+    """Stratum of an image by power-of-two size bucket."""
+    return entry.size.bit_length()
+
+
+STRATA = {
+    StratificationKey.DIRECTORY: directory_stratum,
+    StratificationKey.FORMAT: format_stratum,
+    StratificationKey.SIZE: size_stratum,
+}
+
+
+def sample_entries(
+    entries: Iterable[ImageEntry],
+    sampling_strategy: SamplingStrategy,
+    num_samples: Optional[int],
+    seed: Optional[int] = None,
+    stratify_by: StratificationKey = StratificationKey.DIRECTORY,
+    root: Optional[str] = None,
+) -> List[ImageEntry]:
+    """
+    Sample image entries in one pass.
+
+    Args:
+        entries: Image entries, in the order INCREMENT and DECREMENT refer to
+        sampling_strategy: Sampling strategy
+        num_samples: Sample size, or None for every entry
+        seed: Seed for RANDOM and STRATIFIED sampling, salt for HASH sampling
+        stratify_by: Strata of STRATIFIED sampling
+        root: Dataset root that HASH sampling keys paths relative to
+
+    Returns:
+        The sampled entries
+
+    Raises:
+        ValueError: If the sampling strategy is unknown
+    """
+    if num_samples is None:
+        return list(entries)
+
+    sampling_strategy = SamplingStrategy(sampling_strategy)
+    if sampling_strategy == SamplingStrategy.INCREMENT:
+        return list(islice(entries, num_samples))
+    if sampling_strategy == SamplingStrategy.DECREMENT:
+        return list(deque(entries, maxlen=num_samples)) if num_samples > 0 else []
+    if sampling_strategy == SamplingStrategy.RANDOM:
+        return reservoir_sample(entries, num_samples, seed)
+    if sampling_strategy == SamplingStrategy.HASH:
+        return hash_sample(entries, num_samples, lambda entry: os.path.relpath(entry.path, root or "/"), seed)
+    if sampling_strategy == SamplingStrategy.STRATIFIED:
+        return stratified_sample(entries, num_samples, STRATA[StratificationKey(stratify_by)], seed)
+    raise ValueError(f"Invalid sampling strategy: {sampling_strategy}")
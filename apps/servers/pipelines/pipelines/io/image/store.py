@@ -0,0 +1,262 @@
+# SPDX-License-Identifier: Apache-2.0
+"""
+Content-addressed image store.
+
+Images are stored once under the SHA-256 of their bytes, as
+objects/<first two hex digits>/<hash><extension>, so the same image selected by
+several runs or datasets occupies the store once. The hashes of source files are
+cached by path, size, modification time and inode, so an unchanged dataset is not
+read again.
+
+By default a new object is materialized as a reflink (a copy-on-write clone)
+where the filesystem supports it, and otherwise as a copy, so the store never
+shares an inode with the user's original. A hard link mode can be enabled for
+sources that are never edited in place, since an edited source would change the
+stored object as well. Runs reference stored objects through hard links in their
+own image directory, which take no extra space.
+"""
+
+import errno
+import fcntl
+import json
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from loguru import logger
+
+from ...common.hashing import hash_image_file
+
+OBJECTS_DIRNAME = "objects"
+HASH_CACHE_FILENAME = "hash_cache.json"
+DEFAULT_STORE_DIRNAME = "image_store"
+DEFAULT_MAX_WORKERS = 8
+
+# Ways to materialize a new object, with the StoreStats field counting them
+LINK_MODES = ("reflink", "hardlink", "copy")
+MODE_STATS = {"reflink": "reflinked", "hardlink": "hardlinked", "copy": "copied"}
+
+# Modes tried by default, in order; none shares the inode of the source
+DEFAULT_LINK_MODES = ("reflink", "copy")
+
+# ioctl cloning a whole file on Linux filesystems with copy-on-write support (btrfs, XFS)
+FICLONE = 0x40049409
+
+# Errors that mean a link mode is not supported between two paths
+UNSUPPORTED_ERRNOS = {errno.EXDEV, errno.EPERM, errno.EOPNOTSUPP, errno.ENOTTY, errno.EINVAL, errno.EMLINK}
+
+
+@dataclass
+class StoreStats:
+    """Counts of how images were materialized in the store."""
+
+    reused: int = 0
+    reflinked: int = 0
+    hardlinked: int = 0
+    copied: int = 0
+    failed: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        """Return the counts as a dictionary."""
+        return {
+            "reused": self.reused,
+            "reflinked": self.reflinked,
+            "hardlinked": self.hardlinked,
+            "copied": self.copied,
+            "failed": self.failed,
+        }
+
+
+def default_store_dir(output_dir: Union[str, Path]) -> Path:
+    """Store shared by the datasets next to an output directory."""
+    return Path(output_dir).parent / DEFAULT_STORE_DIRNAME
+
+
+def _reflink(source: Path, destination: Path) -> None:
+    """Clone a file with the FICLONE ioctl."""
+    with open(source, "rb") as src, open(destination, "wb") as dst:
+        fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+
+
+def _materialize(source: Path, destination: Path, link_modes: Sequence[str]) -> str:
+    """
+    Create destination with the contents of source, atomically.
+
+    Args:
+        source: File to materialize
+        destination: Path to create
+        link_modes: Modes to try, in order
+
+    Returns:
+        The mode that succeeded
+
+    Raises:
+        OSError: If no mode succeeded
+    """
+    temp_path = destination.with_name(f".{destination.name}.{threading.get_ident()}.tmp")
+    error: Optional[OSError] = None
+    for mode in link_modes:
+        try:
+            if mode == "reflink":
+                _reflink(source, temp_path)
+            elif mode == "hardlink":
+                os.link(source, temp_path)
+            else:
+                shutil.copyfile(source, temp_path)
+        except OSError as e:
+            temp_path.unlink(missing_ok=True)
+            if mode != "copy" and e.errno not in UNSUPPORTED_ERRNOS:
+                raise
+            error = e
+            continue
+        os.replace(temp_path, destination)
+        return mode
+    raise error or OSError(f"No link mode to materialize {source}")
+
+
+class ImageStore:
+    """
+    Content-addressed store of image files.
+
+    Attributes:
+        root (Path): Store directory
+        link_modes (tuple): Modes tried to materialize new objects, in order
+        max_workers (int): Images stored in parallel by put_many
+        stats (StoreStats): Counts of the images stored so far
+    """
+
+    def __init__(
+        self,
+        root: Union[str, Path],
+        link_modes: Sequence[str] = DEFAULT_LINK_MODES,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+    ):
+        unknown = set(link_modes) - set(LINK_MODES)
+        if unknown:
+            raise ValueError(f"Unknown link modes: {sorted(unknown)}")
+        self.root = Path(root)
+        self.link_modes = tuple(link_modes)
+        self.max_workers = max_workers
+        self.stats = StoreStats()
+        self._lock = threading.Lock()
+        self._hashes = self._load_hashes()
+
+    @property
+    def hash_cache_path(self) -> Path:
+        """Path of the cached source hashes."""
+        return self.root / HASH_CACHE_FILENAME
+
+    def _load_hashes(self) -> Dict[str, Dict[str, int | str]]:
+        """Load the cached source hashes."""
+        try:
+            with open(self.hash_cache_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def save(self) -> None:
+        """Atomically write the cached source hashes."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        temp_path = self.hash_cache_path.with_name(f".{HASH_CACHE_FILENAME}.{os.getpid()}.tmp")
+        with self._lock:
+            with open(temp_path, "w") as f:
+                json.dump(self._hashes, f)
+        os.replace(temp_path, self.hash_cache_path)
+
+    def object_path(self, image_hash: str, suffix: str = "") -> Path:
+        """Path of the object with a content hash."""
+        return self.root / OBJECTS_DIRNAME / image_hash[:2] / f"{image_hash}{suffix.lower()}"
+
+    def hash_of(self, path: Union[str, Path]) -> str:
+        """Get the content hash of a file, reading it only if it changed since it was last hashed."""
+        key = os.path.abspath(path)
+        stat = os.stat(key)
+        signature = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "inode": stat.st_ino}
+        with self._lock:
+            cached = self._hashes.get(key)
+        if cached and all(cached[field] == value for field, value in signature.items()):
+            return cached["hash"]
+        image_hash = hash_image_file(Path(key))
+        with self._lock:
+            self._hashes[key] = {**signature, "hash": image_hash}
+        return image_hash
+
+    def put(self, path: Union[str, Path]) -> Path:
+        """
+        Add a file to the store.
+
+        Args:
+            path: File to add
+
+        Returns:
+            Path of the stored object
+        """
+        source = Path(path)
+        object_path = self.object_path(self.hash_of(source), source.suffix)
+        if object_path.exists():
+            counter = "reused"
+        else:
+            object_path.parent.mkdir(parents=True, exist_ok=True)
+            counter = MODE_STATS[_materialize(source, object_path, self.link_modes)]
+        with self._lock:
+            setattr(self.stats, counter, getattr(self.stats, counter) + 1)
+        return object_path
+
+    def put_many(self, paths: Sequence[Union[str, Path]]) -> List[Optional[Path]]:
+        """
+        Add files to the store in parallel and save the hash cache.
+
+        Args:
+            paths: Files to add
+
+        Returns:
+            Object paths in the order of paths, None for files that could not be stored
+        """
+
+        def put(path: Union[str, Path]) -> Tuple[Optional[Path], Optional[Exception]]:
+            try:
+                return self.put(path), None
+            except Exception as e:
+                with self._lock:
+                    self.stats.failed += 1
+                return None, e
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = list(executor.map(put, paths))
+        self.save()
+
+        for path, (_, error) in zip(paths, results):
+            if error is not None:
+                logger.error(f"Could not store image {path}: {error}")
+        return [object_path for object_path, _ in results]
+
+
+def link_object(object_path: Path, destination: Path) -> None:
+    """
+    Reference a stored object from another directory.
+
+    A hard link is used, falling back to a symbolic link across filesystems.
+    Existing links to the same object are kept.
+
+    Args:
+        object_path: Stored object
+        destination: Path of the reference
+    """
+    try:
+        if os.path.samefile(object_path, destination):
+            return
+    except FileNotFoundError:
+        pass
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = destination.with_name(f".{destination.name}.{threading.get_ident()}.tmp")
+    try:
+        os.link(object_path, temp_path)
+    except OSError as e:
+        if e.errno not in UNSUPPORTED_ERRNOS:
+            raise
+        os.symlink(object_path.resolve(), temp_path)
+    os.replace(temp_path, destination)
@@ -10,6 +10,16 @@ class SamplingStrategy(str, enum.Enum):
     INCREMENT = "increment"
     DECREMENT = "decrement"
     RANDOM = "random"
+    HASH = "hash"
+    STRATIFIED = "stratified"
+
+
+class StratificationKey(str, enum.Enum):
+    """Enum for the strata of stratified sampling."""
+
+    DIRECTORY = "directory"
+    FORMAT = "format"
+    SIZE = "size"
 
 
 class SortingStrategy(str, enum.Enum):
@@ -20,6 +30,14 @@ class SortingStrategy(str, enum.Enum):
     MODIFIED = "modified"
 
 
+class ExifBackend(str, enum.Enum):
+    """Enum for the tools extracting Exif metadata."""
+
+    AUTO = "auto"
+    EXIFTOOL = "exiftool"
+    PILLOW = "pillow"
+
+
 class DatasetIOConfig(dg.Config):
     """Configuration for dataset operations."""
 
@@ -29,8 +47,41 @@ class DatasetIOConfig(dg.Config):
         default="/workspace/.local/output/os_img", description="The output directory for the dataset."
     )
     copy_images: bool = Field(default=True, description="Whether to copy images to the output directory.")
+    image_store_dir: str | None = Field(
+        default=None,
+        description="The content-addressed image store; defaults to image_store next to the output directory.",
+    )
+    image_store_link_modes: list[str] = Field(
+        default=["reflink", "copy"],
+        description="How new images are added to the image store, in order of preference.",
+    )
     sampling_strategy: SamplingStrategy = Field(
         default=SamplingStrategy.INCREMENT, description="The sampling strategy to use."
     )
     num_samples: int | None = Field(default=None, description="The number of samples to take.")
+    sampling_seed: int | None = Field(
+        default=None, description="Seed for random and stratified sampling, salt for hash sampling."
+    )
+    stratify_by: StratificationKey = Field(
+        default=StratificationKey.DIRECTORY, description="The strata of stratified sampling."
+    )
     sorting_strategy: SortingStrategy | None = Field(default=None, description="The sorting strategy to use.")
+    recursive: bool = Field(default=False, description="Whether to include images in subdirectories.")
+    sniff_images: bool = Field(
+        default=False, description="Whether to identify files without an image extension by their magic bytes."
+    )
+    metadata_workers: int | None = Field(
+        default=None,
+        description="The number of images metadata is extracted from at once, by default twice the number of CPUs.",
+    )
+    fast_hash: str | None = Field(
+        default=None,
+        description="A fast hash added to the standard metadata for deduplication: xxh3, blake3 or blake2b.",
+    )
+    exif_backend: ExifBackend = Field(
+        default=ExifBackend.AUTO, description="The Exif extractor; auto uses ExifTool when it is installed."
+    )
+    exiftool_workers: int | None = Field(
+        default=None, description="The number of ExifTool processes, by default the number of CPUs."
+    )
+    exiftool_batch_size: int = Field(default=64, description="The number of images sent to ExifTool at once.")
@@ -1,4 +1,5 @@
 from .assets import caption_contexts, caption_output_files, perspective_caption, synthesizer_caption
+from .incremental import image_partitions, perspective_image_caption
 from .jobs import (
     ASSETS as PERSPECTIVE_JOBS_ASSETS,
 )
@@ -8,6 +9,8 @@ from .jobs import (
 from .jobs import (
     RESOURCES as PERSPECTIVE_JOBS_RESOURCES,
 )
+from .sensors import perspective_image_sensor
+from .sharding import caption_shards, perspective_caption_shard, sharded_caption_output
 
 JOBS = [
     *PERSPECTIVE_JOBS,
@@ -23,13 +26,28 @@ ASSETS = [
     caption_output_files,
     caption_contexts,
     synthesizer_caption,
+    perspective_image_caption,
+    perspective_caption_shard,
+    sharded_caption_output,
 ]
+
+SENSORS = [
+    perspective_image_sensor,
+]
+
 __all__ = [
     "perspective_caption",
     "caption_output_files",
     "ASSETS",
     "caption_contexts",
     "synthesizer_caption",
+    "perspective_image_caption",
+    "perspective_image_sensor",
+    "image_partitions",
+    "perspective_caption_shard",
+    "sharded_caption_output",
+    "caption_shards",
     "JOBS",
     "RESOURCES",
+    "SENSORS",
 ]
@@ -2,28 +2,110 @@
 """Assets and ops for basic text captioning."""
 
 import asyncio
-import json
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Tuple
 
 import dagster as dg
 import pandas as pd
 from loguru import logger
-from tqdm.asyncio import tqdm_asyncio
-
-from graphcap.perspectives import get_perspective, get_synthesizer
+from tqdm import tqdm
+
+from graphcap.perspectives import (
+    BufferedJsonlCaptionSink,
+    PerspectiveNode,
+    PerspectiveScheduler,
+    get_perspective,
+    get_synthesizer,
+)
+from graphcap.providers import ImagePreprocessor
 
+from ..common.caption_results import caption_result_row, copy_caption_results, params_key
+from ..common.hashing import hash_image_file
+from ..common.job_info import JobInfo
 from ..common.logging import write_caption_results
+from ..common.resources import PostgresConfig
 from ..perspectives.jobs.config import PerspectivePipelineConfig
+from ..perspectives.resume import ResumeIndex, caption_key
 from ..providers.util import get_provider
 
 # File constants
-JOB_INFO_FILENAME = "job_info.json"
 CAPTIONS_FILENAME = "captions.jsonl"
 
-# Temporary batch processing function to replace BaseCaptionProcessor.process_batch
-# This will be replaced with Kafka-based processing in the future
+# Images hashed at the same time before captioning
+HASH_WORKERS = 8
+
+
+def _hash_images(image_paths: List[Path]) -> Dict[Path, str]:
+    """Hash the contents of images on a thread pool."""
+    with ThreadPoolExecutor(max_workers=HASH_WORKERS) as executor:
+        return dict(zip(image_paths, executor.map(hash_image_file, image_paths)))
+
+
+def _start_job(
+    output_dir, name, provider, model, processor, total_images, global_context=None, reused_results=()
+) -> JobInfo:
+    """Create the job directory of a perspective run with its job_info.json, counting reused results."""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    job_dir = output_dir / f"batch_{name or timestamp}"
+    job_dir.mkdir(parents=True, exist_ok=True)
+    logger.info(f"Writing results to {job_dir}")
+
+    reused_failed = sum(1 for r in reused_results if "error" in r["parsed"])
+    job_info = JobInfo(
+        job_dir,
+        started_at=timestamp,
+        provider=provider.name,
+        model=model,
+        config_name=getattr(processor, "config_name", name),
+        version=getattr(processor, "version", "1.0"),
+        total_images=total_images,
+        global_context=global_context,
+        reused_count=len(reused_results),
+        success_count=len(reused_results) - reused_failed,
+        failed_count=reused_failed,
+    )
+    job_info.count_offset = (len(reused_results) - reused_failed, reused_failed)
+    return job_info
+
+
+def _caption_sink(job_info: JobInfo, compression=None) -> BufferedJsonlCaptionSink:
+    """Create the captions.jsonl sink of a job, keeping the job_info.json counters current."""
+    filename = CAPTIONS_FILENAME + (".zst" if compression == "zstd" else "")
+    return BufferedJsonlCaptionSink(
+        job_info.job_dir / filename, compression=compression, on_checkpoint=job_info.record_counts
+    )
+
+
+def _finish_job(job_info: JobInfo, results, preprocessor=None) -> None:
+    """Record completion time and final result counts in a job's job_info.json."""
+    fields = {
+        "completed_at": datetime.now().strftime("%Y%m%d_%H%M%S"),
+        "success_count": sum(1 for r in results if "error" not in r["parsed"]),
+        "failed_count": sum(1 for r in results if "error" in r["parsed"]),
+    }
+    if preprocessor is not None:
+        fields["image_preprocessing"] = preprocessor.stats.as_dict()
+    job_info.update(**fields)
+
+
+def build_perspective_nodes(context: dg.AssetExecutionContext, perspective_config) -> List[PerspectiveNode]:
+    """Build a scheduler node for every enabled perspective, skipping perspectives that fail to load."""
+    nodes = []
+    for perspective, enabled in perspective_config.enabled_perspectives.items():
+        if not enabled:
+            continue
+        try:
+            processor = get_perspective(perspective)
+        except Exception as e:
+            context.log.error(f"Error loading perspective {perspective}: {e}")
+            continue
+        priority = perspective_config.priorities.get(perspective, getattr(processor, "priority", 0))
+        nodes.append(PerspectiveNode(name=perspective, processor=processor, priority=priority))
+    return nodes
+
+
 async def process_images_in_batch(
     processor,
     provider,
@@ -38,107 +120,207 @@ async def process_images_in_batch(
     global_context=None,
     contexts=None,
     name=None,
+    fields=None,
+    preprocessor=None,
+    compression=None,
 ):
     """
-    Temporary batch processing function to replace BaseCaptionProcessor.process_batch.
-    Will be replaced with Kafka-based processing in the future.
-    
-    Processes multiple images by calling process_single for each in parallel.
+    Caption a batch of images with the processor's bounded worker pool.
+
+    Results are streamed to captions.jsonl in the job directory as they complete,
+    zstd-compressed when ``compression`` is "zstd", and returned in the order of
+    image_paths. ``fields`` restricts generation to a
+    subset of the perspective's output fields. A ``preprocessor`` resizes and
+    re-encodes images for the provider's token model before they are sent.
     """
-    logger.info(f"[DEPRECATED] Processing {len(image_paths)} images with {provider.name}")
+    logger.info(f"Processing {len(image_paths)} images with {provider.name}")
     logger.info(f"Using max concurrency of {max_concurrent} requests")
+    if preprocessor is not None:
+        provider.image_preprocessor = preprocessor
     
     # Create job directory for output if requested
-    job_dir = None
+    job_info = None
+    sinks = []
     if output_dir:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        job_dir = output_dir / f"batch_{name or timestamp}"
-        job_dir.mkdir(parents=True, exist_ok=True)
-        logger.info(f"Writing results to {job_dir}")
-        
-        # Create captions.jsonl file and job_info.json with basic info
-        with open(job_dir / JOB_INFO_FILENAME, "w") as f:
-            job_info = {
-                "started_at": timestamp,
-                "provider": provider.name,
-                "model": model,
-                "config_name": getattr(processor, "config_name", name),
-                "version": getattr(processor, "version", "1.0"),
-                "total_images": len(image_paths),
-                "global_context": global_context,
-                "note": "This is a temporary implementation of batch processing until Kafka-based processing is implemented."
-            }
-            json.dump(job_info, f, indent=2)
-    
-    # Process images in parallel with limited concurrency
-    semaphore = asyncio.Semaphore(max_concurrent)
-    
-    async def process_image(path):
-        async with semaphore:
-            try:
-                result = await processor.process_single(
-                    provider=provider,
-                    image_path=path,
-                    model=model,
-                    max_tokens=max_tokens,
-                    temperature=temperature,
-                    top_p=top_p,
-                    repetition_penalty=repetition_penalty,
-                    context=contexts.get(path.name) if contexts else None,
-                    global_context=global_context,
-                )
-                
-                caption_data = {
-                    "filename": f"./{path.name}",
-                    "config_name": getattr(processor, "config_name", name),
-                    "version": getattr(processor, "version", "1.0"),
-                    "model": model,
-                    "provider": provider.name,
-                    "parsed": result,
-                }
-                
-                # Write to captions.jsonl if job_dir exists
-                if job_dir:
-                    with open(job_dir / CAPTIONS_FILENAME, "a") as f:
-                        f.write(json.dumps(caption_data) + "\n")
-                
-                return caption_data
-            except Exception as e:
-                logger.error(f"Error processing {path}: {e}")
-                error_data = {
-                    "filename": f"./{path.name}",
-                    "config_name": getattr(processor, "config_name", name),
-                    "version": getattr(processor, "version", "1.0"),
-                    "model": model,
-                    "provider": provider.name,
-                    "parsed": {"error": str(e)},
-                }
-                
-                # Write error to captions.jsonl if job_dir exists
-                if job_dir:
-                    with open(job_dir / CAPTIONS_FILENAME, "a") as f:
-                        f.write(json.dumps(error_data) + "\n")
-                
-                return error_data
-    
-    tasks = [process_image(path) for path in image_paths]
-    results = await tqdm_asyncio.gather(*tasks, desc=f"Processing images with {provider.name}")
+        job_info = _start_job(
+            output_dir, name, provider, model, processor, len(image_paths), global_context=global_context
+        )
+        sinks.append(_caption_sink(job_info, compression))
+
+    results_by_filename = {}
+    with tqdm(total=len(image_paths), desc=f"Processing images with {provider.name}") as progress_bar:
+        async for caption_data in processor.process_stream(
+            provider=provider,
+            images=image_paths,
+            model=model,
+            max_concurrent=max_concurrent,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            top_p=top_p,
+            repetition_penalty=repetition_penalty,
+            contexts=contexts,
+            global_context=global_context,
+            sinks=sinks,
+            on_progress=lambda _: progress_bar.update(1),
+            fields=fields,
+        ):
+            results_by_filename[caption_data["filename"]] = caption_data
+
+    results = [results_by_filename[f"./{path.name}"] for path in image_paths]
     
     # Update job_info.json with completion info
-    if job_dir:
-        with open(job_dir / JOB_INFO_FILENAME, "r") as f:
-            job_info = json.load(f)
-        
-        job_info["completed_at"] = datetime.now().strftime("%Y%m%d_%H%M%S")
-        job_info["success_count"] = sum(1 for r in results if "error" not in r["parsed"])
-        job_info["failed_count"] = sum(1 for r in results if "error" in r["parsed"])
-        
-        with open(job_dir / JOB_INFO_FILENAME, "w") as f:
-            json.dump(job_info, f, indent=2)
+    if job_info:
+        _finish_job(job_info, results, preprocessor)
+
+    if preprocessor is not None:
+        stats = preprocessor.stats
+        logger.info(
+            f"Image preprocessing saved {stats.bytes_saved} bytes and ~{stats.tokens_saved} image tokens "
+            f"over {stats.images} images"
+        )
     
     return results
 
 
+async def caption_images(
+    context: dg.AssetExecutionContext,
+    client,
+    model: str,
+    nodes: List[PerspectiveNode],
+    image_paths: List[Path],
+    run_dir: Path,
+    perspective_config,
+    compression=None,
+    preprocessor=None,
+) -> Tuple[List[Dict[str, Any]], List[Any], int]:
+    """
+    Caption images with every perspective node under one concurrency budget.
+
+    Each perspective writes a batch_<perspective> job directory in run_dir. Captions
+    already written there are reused, and failed ones are retried within the retry cap.
+
+    A provider error only fails its own (image, perspective) item, which is recorded
+    with an error payload. Anything else, such as a caption file that cannot be
+    written, fails the run.
+
+    Args:
+        context: Dagster execution context
+        client: Provider client
+        model: Model to caption with
+        nodes: Perspective nodes to caption with
+        image_paths: Images to caption
+        run_dir: Directory of the job directories
+        perspective_config: Perspective settings of the run
+        compression: Compression of the caption files, None or "zstd"
+        preprocessor: Image preprocessor of the client, recorded in job_info.json
+
+    Returns:
+        Results grouped per perspective in image order, caption_results rows for new
+        successful captions, and the number of reused captions
+    """
+    # Index captions already written to the run directory when resuming a run
+    # Hashing reads every image, so it runs off the event loop
+    image_hashes = await asyncio.to_thread(_hash_images, image_paths)
+    resume_index = await asyncio.to_thread(ResumeIndex.load, run_dir, perspective_config.max_retries)
+    prior_results: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for image_path in image_paths:
+        prior = {}
+        for node in nodes:
+            result = resume_index.prior_result(caption_key(image_hashes[image_path], node.processor, model))
+            if result is not None:
+                prior[node.name] = result
+        if prior:
+            prior_results[str(image_path)] = prior
+    pending_paths = [path for path in image_paths if len(prior_results.get(str(path), ())) < len(nodes)]
+    reused_count = sum(len(prior) for prior in prior_results.values())
+    if reused_count:
+        context.log.info(f"Reusing {reused_count} captions, captioning {len(pending_paths)} images")
+
+    jobs = {
+        node.name: _start_job(
+            run_dir,
+            node.name,
+            client,
+            model,
+            node.processor,
+            len(image_paths),
+            global_context=perspective_config.global_context,
+            reused_results=[prior[node.name] for prior in prior_results.values() if node.name in prior],
+        )
+        for node in nodes
+    }
+    sinks = {name: _caption_sink(job_info, compression) for name, job_info in jobs.items()}
+    results_by_perspective: Dict[str, Dict[str, Dict[str, Any]]] = {node.name: {} for node in nodes}
+    for image_path, prior in prior_results.items():
+        for name, caption_data in prior.items():
+            results_by_perspective[name][image_path] = caption_data
+
+    scheduler = PerspectiveScheduler(
+        client,
+        model,
+        nodes,
+        max_concurrent=perspective_config.max_concurrent,
+        global_context=perspective_config.global_context,
+    )
+    try:
+        with tqdm(total=len(pending_paths), desc=f"Captioning images with {client.name}") as progress_bar:
+            async for image_result in scheduler.run(pending_paths, prior_results=prior_results):
+                image_path = image_result["image_path"]
+                prior = prior_results.get(image_path, {})
+                for name, caption_data in image_result["perspectives"].items():
+                    if name in prior:
+                        continue
+                    # The image hash lets a resumed run recognize this caption
+                    caption_data["image_hash"] = image_hashes[Path(image_path)]
+                    await sinks[name].write(caption_data)
+                    results_by_perspective[name][image_path] = caption_data
+                progress_bar.update(1)
+    finally:
+        for sink in sinks.values():
+            await sink.close()
+
+    # The global context and generation options are part of the stored result key
+    params = params_key(perspective_config.global_context, **scheduler.generation_options)
+    result_rows = []
+
+    # Aggregate results per perspective, in image order
+    all_results = []
+    for node in nodes:
+        perspective_results = results_by_perspective[node.name]
+        caption_data_list = []
+        for image_path in image_paths:
+            caption_data = perspective_results.get(str(image_path))
+            if caption_data is None:
+                continue
+            caption_data_list.append(caption_data)
+            all_results.append(
+                {
+                    "perspective": node.name,
+                    # Use just the image filename in the key
+                    "image_filename": image_path.name,
+                    "caption_data": caption_data,
+                    "context": node.processor.to_context(caption_data),
+                }
+            )
+            reused = node.name in prior_results.get(str(image_path), {})
+            if not reused and "error" not in caption_data["parsed"]:
+                result_rows.append(
+                    caption_result_row(
+                        image_path,
+                        node.name,
+                        node.processor.version,
+                        model,
+                        client.name,
+                        caption_data["parsed"],
+                        image_hash=image_hashes[image_path],
+                        params=params,
+                    )
+                )
+        _finish_job(jobs[node.name], caption_data_list, preprocessor)
+
+    return all_results, result_rows, reused_count
+
+
 @dg.asset(
     group_name="perspectives",
     compute_kind="graphcap",
@@ -148,8 +330,23 @@ async def perspective_caption(
     context: dg.AssetExecutionContext,
     perspective_image_list: List[str],
     perspective_pipeline_run_config: PerspectivePipelineConfig,
+    postgres: PostgresConfig,
 ) -> List[Dict[str, Any]]:
-    """Generate captions for selected images."""
+    """
+    Generate captions for selected images.
+
+    Every (image, perspective) request of the run shares one concurrency budget,
+    so enabled perspectives caption in parallel rather than one after another.
+    When requests queue, perspectives with a lower priority value go first.
+    Results are still written and returned grouped per perspective.
+
+    When the run directory already holds captions from an interrupted run, they
+    are reused and only missing captions, and failed ones within the retry cap,
+    are generated.
+
+    Successful captions are also bulk loaded into the caption_results table, where
+    the inference bridge reuses them instead of captioning the same image again.
+    """
     context.log.info("Generating captions")
     context.log.info(f"Image selection: {perspective_image_list}")
 
@@ -164,45 +361,47 @@ async def perspective_caption(
 
     # Instantiate the client
     client = get_provider(provider_config.provider_config_file, provider_config.default)
+    preprocessor = ImagePreprocessor()
+    client.image_preprocessor = preprocessor
 
-    all_results = []
-    for perspective in enabled_perspectives:
-        processor = get_perspective(perspective)
+    model = getattr(provider_config, "model", "gemini-2.0-flash-exp")
+    image_paths = [Path(image) for image in perspective_image_list]
 
-        try:
-            # Process images using the temporary batch processing function
-            image_paths = [Path(image) for image in perspective_image_list]
-            caption_data_list = await process_images_in_batch(
-                processor,
-                client,
-                image_paths,
-                model=getattr(provider_config, "model", "gemini-2.0-flash-exp"),
-                output_dir=Path(io_config.run_dir),
-                global_context=perspective_config.global_context,
-                name=perspective,
-            )
+    nodes = build_perspective_nodes(context, perspective_config)
+    context.log.info(
+        f"Captioning {len(image_paths)} images with {len(nodes)} perspectives "
+        f"(max {perspective_config.max_concurrent} concurrent requests)"
+    )
 
-            # Aggregate results
-            for image, caption_data in zip(perspective_image_list, caption_data_list):
-                # Use just the image filename in the key
-                image_filename = Path(image).name
-                all_results.append(
-                    {
-                        "perspective": perspective,
-                        "image_filename": image_filename,
-                        "caption_data": caption_data,
-                        "context": processor.to_context(caption_data),
-                    }
-                )
-        except Exception as e:
-            context.log.error(f"Error generating captions for perspective {perspective}: {e}")
+    all_results, result_rows, reused_count = await caption_images(
+        context,
+        client,
+        model,
+        nodes,
+        image_paths,
+        Path(io_config.run_dir),
+        perspective_config,
+        compression=io_config.caption_compression,
+        preprocessor=preprocessor,
+    )
 
     write_caption_results(all_results)
+    stored_results = 0
+    try:
+        stored_results = copy_caption_results(postgres, result_rows)
+        context.log.info(f"Stored {stored_results} caption results in the database")
+    except Exception as e:
+        context.log.warning(f"Could not store caption results in the database: {e}")
     metadata = {
         "num_images": len(perspective_image_list),
         "perspectives": str(enabled_perspectives),
+        "max_concurrent": perspective_config.max_concurrent,
         "default_provider": provider_config.default,
         "caption_results_location": io_config.output_dir,
+        "image_bytes_saved": preprocessor.stats.bytes_saved,
+        "image_tokens_saved": preprocessor.stats.tokens_saved,
+        "stored_caption_results": stored_results,
+        "reused_captions": reused_count,
     }
     context.add_output_metadata(metadata)
     return all_results
@@ -244,11 +443,16 @@ async def synthesizer_caption(
     perspective_pipeline_run_config: PerspectivePipelineConfig,
     caption_contexts: Dict[str, List[str]],
 ) -> List:
-    """Synthesizes captions from the perspective caption data."""
+    """
+    Synthesizes captions from the perspective caption data.
+
+    Synthesis requests share the run's max_concurrent budget, like the perspectives.
+    """
     context.log.info("Synthesizing captions")
 
     provider_config = perspective_pipeline_run_config.provider
     io_config = perspective_pipeline_run_config.io
+    perspective_config = perspective_pipeline_run_config.perspective
 
     client = get_provider(provider_config.provider_config_file, provider_config.default)
     synthesizer = get_synthesizer()
@@ -256,14 +460,16 @@ async def synthesizer_caption(
     image_dir = Path(io_config.output_dir) / "images"
     paths = [image_dir / path for path in caption_contexts.keys()]
     
-    # Use the temporary batch processing function
     results = await process_images_in_batch(
         synthesizer,
         client,
         paths,
+        max_concurrent=perspective_config.max_concurrent,
         output_dir=Path(io_config.run_dir),
         contexts=caption_contexts,
-        name="synthesized_caption"
+        name="synthesized_caption",
+        preprocessor=ImagePreprocessor(),
+        compression=io_config.caption_compression,
     )
 
     # Format the results to match the perspective_caption output
@@ -282,33 +488,10 @@ async def synthesizer_caption(
     return formatted_results
 
 
-@dg.asset(
-    group_name="perspectives",
-    compute_kind="python",
-    deps=[perspective_caption, "perspective_pipeline_run_config", "synthesizer_caption"],
-)
-def caption_output_files(
-    context: dg.AssetExecutionContext,
-    perspective_caption: List[Dict[str, Any]],
-    synthesizer_caption: List[Dict[str, Any]],
-    perspective_pipeline_run_config: PerspectivePipelineConfig,
-) -> None:
-    """Writes the output data to an excel document and to a parquet file."""
-    io_config = perspective_pipeline_run_config.io
-    output_dir = Path(io_config.output_dir)
-    run_dir = Path(io_config.run_dir)
-    output_dir.mkdir(parents=True, exist_ok=True)
-    run_dir.mkdir(parents=True, exist_ok=True)
-    # Get enabled perspectives
-    enabled_perspectives = [
-        name for name, enabled in perspective_pipeline_run_config.perspective.enabled_perspectives.items() if enabled
-    ]
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    # Prepare data for DataFrame
-    excel_path = run_dir / f"caption_results_{timestamp}.xlsx"
-    parquet_path = run_dir / f"caption_results_{timestamp}.parquet"
-
-    # Create a dictionary to hold DataFrames for each perspective
+def perspective_tables(
+    context: dg.AssetExecutionContext, perspective_caption: List[Dict[str, Any]], enabled_perspectives: List[str]
+) -> Dict[str, pd.DataFrame]:
+    """Convert caption results to a table per perspective, skipping perspectives without results."""
     perspective_dataframes: Dict[str, pd.DataFrame] = {}
     total_items = len(perspective_caption)
     processed = 0
@@ -337,6 +520,37 @@ def caption_output_files(
             perspective_dataframes[perspective] = df
             context.log.info(f"Completed {perspective} perspective with {len(table_data)} entries")
 
+    return perspective_dataframes
+
+
+@dg.asset(
+    group_name="perspectives",
+    compute_kind="python",
+    deps=[perspective_caption, "perspective_pipeline_run_config", "synthesizer_caption"],
+)
+def caption_output_files(
+    context: dg.AssetExecutionContext,
+    perspective_caption: List[Dict[str, Any]],
+    synthesizer_caption: List[Dict[str, Any]],
+    perspective_pipeline_run_config: PerspectivePipelineConfig,
+) -> None:
+    """Writes the output data to an excel document and to a parquet file."""
+    io_config = perspective_pipeline_run_config.io
+    output_dir = Path(io_config.output_dir)
+    run_dir = Path(io_config.run_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    run_dir.mkdir(parents=True, exist_ok=True)
+    # Get enabled perspectives
+    enabled_perspectives = [
+        name for name, enabled in perspective_pipeline_run_config.perspective.enabled_perspectives.items() if enabled
+    ]
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    # Prepare data for DataFrame
+    excel_path = run_dir / f"caption_results_{timestamp}.xlsx"
+    parquet_path = run_dir / f"caption_results_{timestamp}.parquet"
+
+    perspective_dataframes = perspective_tables(context, perspective_caption, enabled_perspectives)
+
     # Write to Excel (each perspective to a separate sheet)
     with pd.ExcelWriter(excel_path) as writer:
         for perspective, df in perspective_dataframes.items():
@@ -0,0 +1,289 @@
+# SPDX-License-Identifier: Apache-2.0
+"""
+Incremental captioning of a growing image directory.
+
+Images are modeled as Dagster dynamic partitions keyed by file version: a digest
+of the path, size and modification time. The perspective_image_sensor keeps an
+index of the input directory from a directory scan alone, without reading any
+file. It adds a partition for every new or modified file, removes partitions
+whose file version is gone, and requests runs for the new partitions only. When
+the enabled perspective versions or the model change, it requests every
+partition again.
+
+The run hashes the content of its images. Captions are kept per SHA-256 of the
+content in a JSON file under the output directory, so a touched, renamed or
+duplicated image reuses them. A materialization reuses the captions whose
+perspective version and model still match and only sends the missing ones to
+the provider. The cost of a run therefore follows the change, not the size of
+the dataset.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import dagster as dg
+
+from graphcap.perspectives import PerspectiveScheduler
+from graphcap.providers import ImagePreprocessor
+
+from ..common.caption_results import caption_result_row, copy_caption_results, params_key
+from ..common.hashing import hash_image_file
+from ..common.resources import PostgresConfig
+from ..providers.util import get_provider
+from .assets import build_perspective_nodes
+from .jobs.config import PerspectivePipelineConfig, PerspectivePipelineRunConfig
+from .resume import caption_key, result_key
+
+IMAGE_INDEX_FILENAME = "image_index.json"
+PARTITIONS_DIRNAME = "partitions"
+
+image_partitions = dg.DynamicPartitionsDefinition(name="perspective_images")
+
+
+def _write_json(path: Path, data: Any) -> None:
+    """Atomically write a JSON document."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(f".{path.name}.tmp")
+    with open(temp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(temp_path, path)
+
+
+def file_version_key(path: str, size: int, mtime_ns: int) -> str:
+    """Partition key of a file version, derived from its path, size and modification time."""
+    return hashlib.sha256(f"{path}\0{size}\0{mtime_ns}".encode()).hexdigest()[:32]
+
+
+class ImageIndex:
+    """
+    File versions of the images in an input directory.
+
+    Attributes:
+        path (Path): Location of the index file
+        files (dict): Size, modification time and partition key by image path
+    """
+
+    def __init__(self, path: Union[str, Path], files: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.path = Path(path)
+        self.files = files or {}
+        self._paths_by_key: Optional[Dict[str, str]] = None
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "ImageIndex":
+        """Load an index, or start an empty one if the file does not exist."""
+        try:
+            with open(path) as f:
+                return cls(path, json.load(f)["files"])
+        except FileNotFoundError:
+            return cls(path)
+
+    def save(self) -> None:
+        """Write the index."""
+        _write_json(self.path, {"files": self.files})
+
+    def scan(self, input_dir: Union[str, Path], recursive: bool = False, sniff: bool = False) -> List[str]:
+        """
+        Refresh the index from a directory scan; only files whose extension is not
+        an image extension are read, and only their magic bytes when sniffing.
+
+        Args:
+            input_dir: Directory holding the images
+            recursive: Also index images in subdirectories
+            sniff: Identify files without an image extension by their magic bytes
+
+        Returns:
+            Partition keys of the images, in directory order
+        """
+        from ..io.image.discovery import iter_image_entries
+
+        self.files = {
+            entry.path: {
+                "size": entry.size,
+                "mtime_ns": entry.mtime_ns,
+                "key": file_version_key(entry.path, entry.size, entry.mtime_ns),
+            }
+            for entry in iter_image_entries(input_dir, recursive=recursive, sniff=sniff)
+        }
+        self._paths_by_key = None
+        return [entry["key"] for entry in self.files.values()]
+
+    def path_for(self, key: str) -> Optional[Path]:
+        """Get the path of the image with a partition key."""
+        if self._paths_by_key is None:
+            self._paths_by_key = {entry["key"]: path for path, entry in self.files.items() if "key" in entry}
+        path = self._paths_by_key.get(key)
+        return Path(path) if path else None
+
+
+def image_index_path(pipeline_config: PerspectivePipelineConfig) -> Path:
+    """Location of the image index of a pipeline configuration."""
+    return Path(pipeline_config.io.output_dir) / IMAGE_INDEX_FILENAME
+
+
+def partition_output_path(pipeline_config: PerspectivePipelineConfig, image_hash: str) -> Path:
+    """Location of the captions of an image partition."""
+    return Path(pipeline_config.io.output_dir) / PARTITIONS_DIRNAME / image_hash[:2] / f"{image_hash}.json"
+
+
+def caption_model(pipeline_config: PerspectivePipelineConfig) -> str:
+    """Model the pipeline captions with."""
+    return getattr(pipeline_config.provider, "model", "gemini-2.0-flash-exp")
+
+
+def perspective_fingerprint(pipeline_config: PerspectivePipelineConfig, nodes) -> str:
+    """Fingerprint of everything that invalidates stored captions: perspective versions, model and context."""
+    versions = sorted(
+        (node.processor.vision_config.config_name, str(node.processor.vision_config.version)) for node in nodes
+    )
+    payload = json.dumps([versions, caption_model(pipeline_config), pipeline_config.perspective.global_context])
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def _load_partition(path: Path) -> Dict[str, Any]:
+    """Load the stored captions of a partition."""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+@dg.asset(
+    group_name="perspectives",
+    compute_kind="graphcap",
+    partitions_def=image_partitions,
+    backfill_policy=dg.BackfillPolicy.single_run(),
+)
+async def perspective_image_caption(
+    context: dg.AssetExecutionContext,
+    perspective_run_config: PerspectivePipelineRunConfig,
+    postgres: PostgresConfig,
+) -> dg.MaterializeResult:
+    """
+    Caption the images of the requested partitions with every enabled perspective.
+
+    All partitions of a run share one concurrency budget. The images are hashed
+    here, and each distinct content is captioned once. Stored captions whose
+    perspective version, model and global context still match are reused, and
+    failed captions are retried.
+    """
+    pipeline_config = perspective_run_config.load_dataset(context)
+    perspective_config = pipeline_config.perspective
+    index = ImageIndex.load(image_index_path(pipeline_config))
+    nodes = build_perspective_nodes(context, perspective_config)
+    model = caption_model(pipeline_config)
+    client = get_provider(pipeline_config.provider.provider_config_file, pipeline_config.provider.default)
+    preprocessor = ImagePreprocessor()
+    client.image_preprocessor = preprocessor
+
+    image_paths: List[Path] = []
+    hashes: Dict[str, str] = {}
+    partitions: Dict[str, Dict[str, Any]] = {}
+    prior_results: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    seen_hashes: set[str] = set()
+    for key in context.partition_keys:
+        image_path = index.path_for(key)
+        if image_path is None:
+            context.log.warning(f"No image with partition key {key} in the image index, skipping")
+            continue
+        try:
+            image_hash = hash_image_file(image_path)
+        except OSError as e:
+            context.log.warning(f"Could not read {image_path}, skipping: {e}")
+            continue
+        if image_hash in seen_hashes:
+            context.log.info(f"{image_path} duplicates an image of this run, reusing its captions")
+            continue
+        seen_hashes.add(image_hash)
+        stored = _load_partition(partition_output_path(pipeline_config, image_hash))
+        stored_results = stored.get("results", {})
+        if stored.get("global_context") != perspective_config.global_context:
+            stored_results = {}
+
+        prior = {}
+        for node in nodes:
+            result = stored_results.get(node.name)
+            if result is None or "error" in result["parsed"]:
+                continue
+            if result_key(result) == caption_key(image_hash, node.processor, model):
+                prior[node.name] = result
+        partitions[str(image_path)] = stored_results
+        hashes[str(image_path)] = image_hash
+        if prior:
+            prior_results[str(image_path)] = prior
+        if len(prior) < len(nodes):
+            image_paths.append(image_path)
+
+    reused_count = sum(len(prior) for prior in prior_results.values())
+    context.log.info(
+        f"Captioning {len(image_paths)} of {len(hashes)} images with {len(nodes)} perspectives, "
+        f"reusing {reused_count} captions"
+    )
+
+    scheduler = PerspectiveScheduler(
+        client,
+        model,
+        nodes,
+        max_concurrent=perspective_config.max_concurrent,
+        global_context=perspective_config.global_context,
+    )
+    params = params_key(perspective_config.global_context, **scheduler.generation_options)
+    result_rows = []
+    captioned = failed = 0
+    async for image_result in scheduler.run(image_paths, prior_results=prior_results):
+        image_path = image_result["image_path"]
+        image_hash = hashes[image_path]
+        prior = prior_results.get(image_path, {})
+        results = {}
+        for node in nodes:
+            caption_data = image_result["perspectives"][node.name]
+            results[node.name] = caption_data
+            if node.name in prior:
+                continue
+            caption_data["image_hash"] = image_hash
+            if "error" in caption_data["parsed"]:
+                failed += 1
+                continue
+            captioned += 1
+            result_rows.append(
+                caption_result_row(
+                    Path(image_path),
+                    node.name,
+                    node.processor.version,
+                    model,
+                    client.name,
+                    caption_data["parsed"],
+                    image_hash=image_hash,
+                    params=params,
+                )
+            )
+        # Keep captions of perspectives that are currently disabled
+        _write_json(
+            partition_output_path(pipeline_config, image_hash),
+            {
+                "image_hash": image_hash,
+                "image_path": image_path,
+                "global_context": perspective_config.global_context,
+                "results": {**partitions[image_path], **results},
+            },
+        )
+
+    stored_results = 0
+    try:
+        stored_results = copy_caption_results(postgres, result_rows)
+    except Exception as e:
+        context.log.warning(f"Could not store caption results in the database: {e}")
+
+    return dg.MaterializeResult(
+        metadata={
+            "num_images": len(hashes),
+            "captioned": captioned,
+            "failed": failed,
+            "reused_captions": reused_count,
+            "stored_caption_results": stored_results,
+            "image_bytes_saved": preprocessor.stats.bytes_saved,
+        }
+    )
@@ -6,6 +6,8 @@ from .config import (
     ProviderConfig,
     perspective_pipeline_run_config,
 )
+from .incremental_perspective_pipeline import incremental_perspective_pipeline
+from .sharded_perspective_pipeline import sharded_perspective_merge, sharded_perspective_pipeline
 
 RESOURCES = [
     PerspectivePipelineRunConfig,
@@ -17,6 +19,9 @@ ASSETS = [
 
 JOBS = [
     basic_perspective_pipeline,
+    incremental_perspective_pipeline,
+    sharded_perspective_pipeline,
+    sharded_perspective_merge,
 ]
 
 __all__ = [
@@ -29,4 +34,7 @@ __all__ = [
     "ProviderConfig",
     "perspective_pipeline_run_config",
     "basic_perspective_pipeline",
+    "incremental_perspective_pipeline",
+    "sharded_perspective_pipeline",
+    "sharded_perspective_merge",
 ]
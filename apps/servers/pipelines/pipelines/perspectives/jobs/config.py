@@ -1,13 +1,18 @@
 # SPDX-License-Identifier: Apache-2.0
 """Shared resources for pipeline operations."""
 
+import re
 import tomllib
-from dataclasses import dataclass
-from typing import Dict
+from dataclasses import dataclass, field
 from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
 import dagster as dg
 from pydantic import BaseModel, Field
 
+from ..resume import DEFAULT_MAX_RETRIES
+
 
 @dataclass
 class FileSystemConfig:
@@ -29,7 +34,19 @@ class ProviderConfig:
 
 @dataclass
 class IOConfig:
-    """IO configuration settings."""
+    """
+    IO configuration settings.
+
+    ``caption_compression`` set to "zstd" writes captions.jsonl.zst instead of
+    plain captions.jsonl. ``recursive`` includes images in subdirectories of the
+    input directory and ``sniff_images`` includes files without an image extension
+    whose magic bytes match an image format. ``sampling_seed`` makes random and
+    stratified samples reproducible and salts hash samples; ``stratify_by`` picks
+    the strata of stratified sampling: directory, format or size.
+    ``image_store_dir`` is the content-addressed store images are copied into,
+    image_store next to the output directory by default, and
+    ``image_store_link_modes`` the ways new images are added to it, in order.
+    """
 
     dataset_name: str
     input_dir: str
@@ -39,14 +56,38 @@ class IOConfig:
     sampling_strategy: str
     num_samples: int
     sorting_strategy: str
+    caption_compression: Optional[str] = None
+    recursive: bool = False
+    sniff_images: bool = False
+    sampling_seed: Optional[int] = None
+    stratify_by: str = "directory"
+    image_store_dir: Optional[str] = None
+    image_store_link_modes: Tuple[str, ...] = ("reflink", "copy")
+
+
+# Default number of concurrent provider requests shared by all perspectives of a run
+DEFAULT_MAX_CONCURRENT = 8
+
+# Names of timestamped run directories
+RUN_DIR_PATTERN = re.compile(r"\d{8}_\d{6}")
 
 
 @dataclass
 class PerspectiveConfig:
-    """Perspective configuration settings."""
+    """
+    Perspective configuration settings.
+
+    ``max_concurrent`` caps provider requests across all perspectives of a run.
+    ``priorities`` overrides the priority of individual perspectives (lower runs
+    first); other perspectives use the priority from their own configuration.
+    ``max_retries`` is how many times a resumed run retries a failed caption.
+    """
 
     global_context: str
     enabled_perspectives: Dict[str, bool] = Field(default_factory=dict)
+    max_concurrent: int = DEFAULT_MAX_CONCURRENT
+    priorities: Dict[str, int] = field(default_factory=dict)
+    max_retries: int = DEFAULT_MAX_RETRIES
 
 
 class PerspectivePipelineConfig(BaseModel):
@@ -65,11 +106,60 @@ class PerspectivePipelineRunConfig(dg.ConfigurableResource):
         description="Path to the pipeline run configuration TOML file",
         default="/workspace/config/default_configs/pipeline_run_config.toml",
     )
+    resume_run_dir: Optional[str] = Field(
+        description=(
+            "Existing run directory to resume, or 'latest' for the most recent run in the output directory. "
+            "Captions already in the run directory are reused and only missing or failed ones are generated."
+        ),
+        default=None,
+    )
+    shard_run_id: Optional[str] = Field(
+        description=(
+            "Identifier grouping the shards of a sharded run, by default the id of the backfill that launched it. "
+            "Set it to resume the shards of an earlier run or to merge them outside their backfill."
+        ),
+        default=None,
+    )
+
+    def _run_dir(self, context: dg.AssetExecutionContext, output_dir: str) -> str:
+        """Pick the run directory: a new timestamped one, or an existing one to resume."""
+        new_run_dir = output_dir + "/" + datetime.now().strftime("%Y%m%d_%H%M%S")
+        if not self.resume_run_dir:
+            return new_run_dir
+
+        if self.resume_run_dir == "latest":
+            output_path = Path(output_dir)
+            runs = sorted(
+                path.name
+                for path in (output_path.iterdir() if output_path.is_dir() else ())
+                if path.is_dir() and RUN_DIR_PATTERN.fullmatch(path.name)
+            )
+            if not runs:
+                context.log.warning(f"No run to resume in {output_dir}, starting a new run")
+                return new_run_dir
+            run_dir = output_dir + "/" + runs[-1]
+        else:
+            run_dir = self.resume_run_dir
+            if not Path(run_dir).is_dir():
+                raise FileNotFoundError(f"Run directory to resume does not exist: {run_dir}")
+
+        context.log.info(f"Resuming run in {run_dir}")
+        return run_dir
 
     def load_dataset(self, context: dg.AssetExecutionContext) -> PerspectivePipelineConfig:
-        """Load the configuration from the TOML file during resource initialization."""
-        context.log.info(f"Self: {self}")
+        """Load the configuration from the TOML file for a run, picking its run directory."""
         context.log.info(f"Loading perspective pipeline run config from {self.config_path}")
+        pipeline_config = self.read_config()
+        pipeline_config.io.run_dir = self._run_dir(context, pipeline_config.io.output_dir)
+        return pipeline_config
+
+    def read_config(self) -> PerspectivePipelineConfig:
+        """
+        Parse the TOML file without picking a run directory.
+
+        Used where no run is being prepared, such as sensor evaluations; the run
+        directory of the returned configuration is the output directory.
+        """
         with open(self.config_path, "rb") as f:
             config = tomllib.load(f)
 
@@ -77,19 +167,27 @@ class PerspectivePipelineRunConfig(dg.ConfigurableResource):
         perspective = PerspectiveConfig(
             global_context=config["perspective"]["global_context"],
             enabled_perspectives=config["perspective"]["enabled"],
+            max_concurrent=config["perspective"].get("max_concurrent", DEFAULT_MAX_CONCURRENT),
+            priorities=config["perspective"].get("priority", {}),
+            max_retries=config["perspective"].get("max_retries", DEFAULT_MAX_RETRIES),
         )
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        run_dir = config["io"]["output_dir"] + "/" + timestamp
         # Create IO config
         io = IOConfig(
             dataset_name=config["io"]["dataset_name"],
             input_dir=config["io"]["input_dir"],
             output_dir=config["io"]["output_dir"],
-            run_dir=run_dir,
+            run_dir=config["io"]["output_dir"],
             copy_images=config["io"]["copy_images"],
             sampling_strategy=config["io"]["sampling_strategy"],
             num_samples=config["io"]["num_samples"],
             sorting_strategy=config["io"]["sorting_strategy"],
+            caption_compression=config["io"].get("caption_compression"),
+            recursive=config["io"].get("recursive", False),
+            sniff_images=config["io"].get("sniff_images", False),
+            sampling_seed=config["io"].get("sampling_seed"),
+            stratify_by=config["io"].get("stratify_by", "directory"),
+            image_store_dir=config["io"].get("image_store_dir"),
+            image_store_link_modes=tuple(config["io"].get("image_store_link_modes", ("reflink", "copy"))),
         )
 
         # Create provider config
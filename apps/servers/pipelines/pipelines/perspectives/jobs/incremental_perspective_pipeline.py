@@ -0,0 +1,12 @@
+"""
+# SPDX-License-Identifier: Apache-2.0
+Incremental Perspective Pipeline Job
+"""
+
+import dagster as dg
+
+incremental_perspective_pipeline = dg.define_asset_job(
+    name="incremental_perspective_pipeline",
+    selection=["perspective_image_caption"],
+    description="Captions new and changed images of the input directory, one partition per image content hash",
+)
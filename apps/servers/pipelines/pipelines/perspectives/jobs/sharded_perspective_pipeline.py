@@ -0,0 +1,18 @@
+"""
+# SPDX-License-Identifier: Apache-2.0
+Sharded Perspective Pipeline Jobs
+"""
+
+import dagster as dg
+
+sharded_perspective_pipeline = dg.define_asset_job(
+    name="sharded_perspective_pipeline",
+    selection=["perspective_caption_shard"],
+    description="Captions one shard of the image list per partition; backfill all partitions to caption in parallel",
+)
+
+sharded_perspective_merge = dg.define_asset_job(
+    name="sharded_perspective_merge",
+    selection=["sharded_caption_output"],
+    description="Concatenates the shard caption tables into the run's caption results Parquet",
+)
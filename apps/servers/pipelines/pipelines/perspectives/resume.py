@@ -0,0 +1,103 @@
+# SPDX-License-Identifier: Apache-2.0
+"""
+Resuming perspective caption runs.
+
+A run directory holds a batch_<perspective> job directory per perspective, each
+with the captions.jsonl written as results complete. Every row records the hash
+of the captioned image, so a rerun against the same directory can tell which
+(image hash, perspective, version, model) keys already have a result and only
+send the missing ones. Keys that failed are retried until they have failed more
+than max_retries times.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+from loguru import logger
+
+from graphcap.perspectives import read_caption_results
+
+# Times a failed caption is retried by later runs against the same run directory
+DEFAULT_MAX_RETRIES = 2
+
+CaptionKey = Tuple[str, str, str, str]
+
+
+def caption_key(image_hash: str, processor, model: str) -> CaptionKey:
+    """Build the key of the caption a processor produces for an image."""
+    return (image_hash, processor.vision_config.config_name, str(processor.vision_config.version), model)
+
+
+def result_key(result: Dict[str, Any]) -> Optional[CaptionKey]:
+    """Get the key of a written caption result, or None if it has no image hash."""
+    image_hash = result.get("image_hash")
+    if not image_hash:
+        return None
+    return (image_hash, result["config_name"], str(result["version"]), result["model"])
+
+
+class ResumeIndex:
+    """
+    Caption results already written to a run directory.
+
+    Attributes:
+        max_retries (int): Times a failed key is retried before its error is kept
+        completed (dict): Latest successful result by key
+        failures (dict): Failure count and latest error result by key
+    """
+
+    def __init__(self, max_retries: int = DEFAULT_MAX_RETRIES):
+        self.max_retries = max_retries
+        self.completed: Dict[CaptionKey, Dict[str, Any]] = {}
+        self.failures: Dict[CaptionKey, Tuple[int, Dict[str, Any]]] = {}
+
+    @classmethod
+    def load(cls, run_dir: Union[str, Path], max_retries: int = DEFAULT_MAX_RETRIES) -> "ResumeIndex":
+        """
+        Index the caption files of every job in a run directory.
+
+        Args:
+            run_dir: Run directory to resume
+            max_retries: Times a failed key is retried
+
+        Returns:
+            The index, empty for a new run directory
+        """
+        index = cls(max_retries)
+        for path in sorted(Path(run_dir).glob("batch_*/captions.jsonl*")):
+            for result in read_caption_results(path):
+                index.add(result)
+        if index.completed or index.failures:
+            logger.info(
+                f"Found {len(index.completed)} completed and {len(index.failures)} failed captions in {run_dir}"
+            )
+        return index
+
+    def add(self, result: Dict[str, Any]) -> None:
+        """Record a result read from a caption file; rows without an image hash are ignored."""
+        key = result_key(result)
+        if key is None:
+            return
+        if "error" in result["parsed"]:
+            count = self.failures.get(key, (0, None))[0]
+            self.failures[key] = (count + 1, result)
+        else:
+            self.completed[key] = result
+
+    def prior_result(self, key: CaptionKey) -> Optional[Dict[str, Any]]:
+        """
+        Get the result to reuse for a key.
+
+        Args:
+            key: Caption key
+
+        Returns:
+            The successful result, the last error once retries are exhausted, or
+            None if the caption should be (re)generated
+        """
+        if key in self.completed:
+            return self.completed[key]
+        count, result = self.failures.get(key, (0, None))
+        if count > self.max_retries:
+            return result
+        return None
@@ -0,0 +1,90 @@
+# SPDX-License-Identifier: Apache-2.0
+"""Sensors that start perspective captioning runs."""
+
+import os
+
+import dagster as dg
+
+from .assets import build_perspective_nodes
+from .incremental import ImageIndex, image_index_path, image_partitions, perspective_fingerprint
+from .jobs.config import PerspectivePipelineRunConfig
+from .jobs.incremental_perspective_pipeline import incremental_perspective_pipeline
+
+# Environment variable with the pipeline run configuration the sensor watches
+RUN_CONFIG_PATH_ENV = "GRAPHCAP_PIPELINE_RUN_CONFIG"
+
+# Run tags selecting a range of partitions for a single run
+PARTITION_RANGE_START_TAG = "dagster/asset_partition_range_start"
+PARTITION_RANGE_END_TAG = "dagster/asset_partition_range_end"
+
+
+@dg.sensor(
+    job=incremental_perspective_pipeline,
+    minimum_interval_seconds=300,
+    default_status=dg.DefaultSensorStatus.STOPPED,
+)
+def perspective_image_sensor(context: dg.SensorEvaluationContext) -> dg.SensorResult:
+    """
+    Add partitions for new images in the input directory and caption them.
+
+    Partitions are keyed by file version, so a tick only scans the directory and
+    never reads image content; the run hashes its images. New keys are requested
+    as one run over their partition range. When the perspective versions, model
+    or global context change, every partition is requested and stored captions
+    that still match are reused. The cursor holds the fingerprint of the last
+    request.
+    """
+    config_path = os.environ.get(RUN_CONFIG_PATH_ENV)
+    run_config_resource = (
+        PerspectivePipelineRunConfig(config_path=config_path) if config_path else PerspectivePipelineRunConfig()
+    )
+    pipeline_config = run_config_resource.read_config()
+
+    index = ImageIndex.load(image_index_path(pipeline_config))
+    io_config = pipeline_config.io
+    current_keys = index.scan(io_config.input_dir, recursive=io_config.recursive, sniff=io_config.sniff_images)
+    index.save()
+
+    existing_keys = context.instance.get_dynamic_partitions(image_partitions.name)
+    current = set(current_keys)
+    existing = set(existing_keys)
+    new_keys = [key for key in current_keys if key not in existing]
+    removed_keys = [key for key in existing_keys if key not in current]
+    # Partition keys keep their insertion order, so new keys form a range after the remaining ones
+    ordered_keys = [key for key in existing_keys if key in current] + new_keys
+
+    nodes = build_perspective_nodes(context, pipeline_config.perspective)
+    fingerprint = perspective_fingerprint(pipeline_config, nodes)
+    changed = context.cursor is not None and context.cursor != fingerprint
+    requested = ordered_keys if changed else new_keys
+
+    dynamic_partitions_requests = []
+    if new_keys:
+        dynamic_partitions_requests.append(image_partitions.build_add_request(new_keys))
+    if removed_keys:
+        dynamic_partitions_requests.append(image_partitions.build_delete_request(removed_keys))
+
+    run_requests = []
+    run_config = {"resources": {"perspective_run_config": {"config": {"config_path": run_config_resource.config_path}}}}
+    if requested:
+        context.log.info(
+            f"Requesting {len(requested)} image partitions ({len(new_keys)} new, "
+            f"{'perspectives changed' if changed else 'perspectives unchanged'})"
+        )
+        run_requests.append(
+            dg.RunRequest(
+                run_key=f"{fingerprint}:{requested[0]}:{requested[-1]}:{len(requested)}",
+                run_config=run_config,
+                tags={
+                    PARTITION_RANGE_START_TAG: requested[0],
+                    PARTITION_RANGE_END_TAG: requested[-1],
+                },
+            )
+        )
+
+    return dg.SensorResult(
+        run_requests=run_requests,
+        skip_reason=None if run_requests else "No new images or perspective changes",
+        cursor=fingerprint,
+        dynamic_partitions_requests=dynamic_partitions_requests,
+    )
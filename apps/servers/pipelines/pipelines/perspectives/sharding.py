@@ -0,0 +1,268 @@
+# SPDX-License-Identifier: Apache-2.0
+"""
+Sharded perspective captioning across processes and nodes.
+
+The image list of a run is split into shards by the SHA-256 of each image path,
+relative to the input directory, modulo the number of shards. Every worker
+derives the same assignment on its own, so shards need no coordination.
+
+Shards are the static partitions of perspective_caption_shard. A backfill over
+all partitions launches every shard as an independent run, which the run
+launcher places in its own process or on another node; all workers must share
+the output directory. Each shard has its own max_concurrent request budget, so
+throughput grows with the number of shards as long as the provider has capacity.
+
+The shards of a sharded run are grouped by a shard run id: the id of the
+backfill that launched them, or shard_run_id from the run configuration to
+resume or merge a run outside its backfill. A shard captions into
+output_dir/shards/<shard run id>/shard_<index>_of_<count>, reusing the captions
+already there like a resumed run, and writes its table to Parquet.
+sharded_caption_output concatenates the shard tables of the same shard run id
+into the run's caption_results Parquet, so tables left by earlier runs are never
+merged. Materializing both assets in one backfill runs the merge after every
+shard has completed.
+"""
+
+import hashlib
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import List, Union
+
+import dagster as dg
+import pandas as pd
+
+from graphcap.providers import ImagePreprocessor
+
+from ..common.caption_results import copy_caption_results
+from ..common.resources import PostgresConfig
+from ..providers.util import get_provider
+from .assets import build_perspective_nodes, caption_images, perspective_tables
+from .incremental import caption_model
+from .jobs.config import PerspectivePipelineConfig, PerspectivePipelineRunConfig
+
+# Environment variable with the number of shards; partitions are fixed when definitions load
+NUM_SHARDS_ENV = "GRAPHCAP_CAPTION_SHARDS"
+DEFAULT_NUM_SHARDS = 4
+
+SHARDS_DIRNAME = "shards"
+SHARD_TABLE_FILENAME = "captions.parquet"
+
+# Run tag with the id of the backfill that launched a run
+BACKFILL_ID_TAG = "dagster/backfill"
+
+caption_shards = dg.StaticPartitionsDefinition(
+    [str(shard) for shard in range(int(os.environ.get(NUM_SHARDS_ENV, DEFAULT_NUM_SHARDS)))]
+)
+
+
+def shard_of(image_path: Union[str, Path], input_dir: Union[str, Path], num_shards: int) -> int:
+    """
+    Get the shard of an image.
+
+    Args:
+        image_path: Path of the image
+        input_dir: Input directory the path is taken relative to, so workers mounting it elsewhere agree
+        num_shards: Number of shards
+
+    Returns:
+        Index of the shard
+    """
+    relative_path = os.path.relpath(image_path, input_dir)
+    digest = hashlib.sha256(relative_path.encode()).digest()
+    return int.from_bytes(digest[:8], "big") % num_shards
+
+
+def shard_run_id(context: dg.AssetExecutionContext, run_config: PerspectivePipelineRunConfig) -> str:
+    """
+    Get the id grouping the shards of a sharded run.
+
+    Args:
+        context: Dagster execution context
+        run_config: Run configuration resource, whose shard_run_id takes precedence
+
+    Returns:
+        The configured shard run id, or the id of the backfill that launched the run
+
+    Raises:
+        ValueError: If the run has neither, since its shards could not be told apart from other runs'
+    """
+    run_id = run_config.shard_run_id or context.run.tags.get(BACKFILL_ID_TAG)
+    if not run_id:
+        raise ValueError("Sharded captioning runs as a backfill, or needs shard_run_id in the run configuration")
+    return run_id
+
+
+def shard_dir(pipeline_config: PerspectivePipelineConfig, run_id: str, shard: int, num_shards: int) -> Path:
+    """Directory holding the job directories and table of a shard of a sharded run."""
+    return (
+        Path(pipeline_config.io.output_dir) / SHARDS_DIRNAME / run_id / f"shard_{shard:03d}_of_{num_shards:03d}"
+    )
+
+
+def shard_image_list(
+    context: dg.AssetExecutionContext, pipeline_config: PerspectivePipelineConfig, shard: int, num_shards: int
+) -> List[Path]:
+    """
+    List the images of a shard.
+
+    Args:
+        context: Dagster execution context
+        pipeline_config: Pipeline configuration
+        shard: Index of the shard
+        num_shards: Number of shards
+
+    Returns:
+        Paths of the shard's images, in image list order
+
+    Raises:
+        ValueError: If the image list is randomly sampled without a seed, since every shard would
+            draw a different sample
+    """
+    from ..io.image.load_images import get_image_list
+    from ..io.image.types import SamplingStrategy, SortingStrategy, StratificationKey
+
+    io_config = pipeline_config.io
+    sampling_strategy = SamplingStrategy(io_config.sampling_strategy)
+    randomized = sampling_strategy in (SamplingStrategy.RANDOM, SamplingStrategy.STRATIFIED)
+    if randomized and io_config.num_samples and io_config.sampling_seed is None:
+        raise ValueError("Sharded captioning needs a sampling_seed for random and stratified sampling")
+
+    image_files = get_image_list(
+        context=context,
+        image_dir=io_config.input_dir,
+        sorting_strategy=SortingStrategy(io_config.sorting_strategy),
+        sampling_strategy=sampling_strategy,
+        num_samples=io_config.num_samples,
+        recursive=io_config.recursive,
+        sniff=io_config.sniff_images,
+        sampling_seed=io_config.sampling_seed,
+        stratify_by=StratificationKey(io_config.stratify_by),
+    )
+    return [Path(path) for path in image_files if shard_of(path, io_config.input_dir, num_shards) == shard]
+
+
+def _write_parquet(data: pd.DataFrame, path: Path) -> None:
+    """Write a Parquet file through a temporary file, so the merge never reads a partial table."""
+    temp_path = path.with_name(f".{path.name}.tmp")
+    data.to_parquet(temp_path, index=False)
+    os.replace(temp_path, path)
+
+
+@dg.asset(
+    group_name="perspectives",
+    compute_kind="graphcap",
+    partitions_def=caption_shards,
+    backfill_policy=dg.BackfillPolicy.multi_run(1),
+)
+async def perspective_caption_shard(
+    context: dg.AssetExecutionContext,
+    perspective_run_config: PerspectivePipelineRunConfig,
+    postgres: PostgresConfig,
+) -> dg.MaterializeResult:
+    """
+    Caption the images of one shard with every enabled perspective.
+
+    Captions already in the shard directory are reused and failed ones are retried
+    within the retry cap. The shard's results replace its table.
+    """
+    pipeline_config = perspective_run_config.load_dataset(context)
+    perspective_config = pipeline_config.perspective
+    run_id = shard_run_id(context, perspective_run_config)
+    shard = int(context.partition_key)
+    num_shards = len(caption_shards.get_partition_keys())
+
+    image_paths = shard_image_list(context, pipeline_config, shard, num_shards)
+    nodes = build_perspective_nodes(context, perspective_config)
+    model = caption_model(pipeline_config)
+    client = get_provider(pipeline_config.provider.provider_config_file, pipeline_config.provider.default)
+    preprocessor = ImagePreprocessor()
+    client.image_preprocessor = preprocessor
+    context.log.info(
+        f"Captioning {len(image_paths)} images of shard {shard} of {num_shards} with {len(nodes)} perspectives "
+        f"(max {perspective_config.max_concurrent} concurrent requests)"
+    )
+
+    output_dir = shard_dir(pipeline_config, run_id, shard, num_shards)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    all_results, result_rows, reused_count = await caption_images(
+        context,
+        client,
+        model,
+        nodes,
+        image_paths,
+        output_dir,
+        perspective_config,
+        compression=pipeline_config.io.caption_compression,
+        preprocessor=preprocessor,
+    )
+
+    tables = perspective_tables(context, all_results, [node.name for node in nodes])
+    table_path = output_dir / SHARD_TABLE_FILENAME
+    _write_parquet(pd.concat(tables.values(), ignore_index=True) if tables else pd.DataFrame(), table_path)
+
+    stored_results = 0
+    try:
+        stored_results = copy_caption_results(postgres, result_rows)
+    except Exception as e:
+        context.log.warning(f"Could not store caption results in the database: {e}")
+
+    return dg.MaterializeResult(
+        metadata={
+            "shard": shard,
+            "num_shards": num_shards,
+            "shard_run_id": run_id,
+            "num_images": len(image_paths),
+            "num_results": len(all_results),
+            "reused_captions": reused_count,
+            "stored_caption_results": stored_results,
+            "image_bytes_saved": preprocessor.stats.bytes_saved,
+            "shard_table": str(table_path),
+        }
+    )
+
+
+@dg.asset(
+    group_name="perspectives",
+    compute_kind="python",
+    deps=[perspective_caption_shard],
+)
+def sharded_caption_output(
+    context: dg.AssetExecutionContext,
+    perspective_run_config: PerspectivePipelineRunConfig,
+) -> dg.MaterializeResult:
+    """
+    Concatenate the shard tables of a sharded run into its caption_results Parquet.
+
+    Raises:
+        FileNotFoundError: If a shard of the run has not written its table yet
+        ValueError: If the run has no shard run id
+    """
+    pipeline_config = perspective_run_config.load_dataset(context)
+    run_id = shard_run_id(context, perspective_run_config)
+    num_shards = len(caption_shards.get_partition_keys())
+    table_paths = [
+        shard_dir(pipeline_config, run_id, shard, num_shards) / SHARD_TABLE_FILENAME for shard in range(num_shards)
+    ]
+    missing = [str(path) for path in table_paths if not path.exists()]
+    if missing:
+        raise FileNotFoundError(f"Shards have not written their tables yet: {missing}")
+
+    shard_tables = [table for table in (pd.read_parquet(path) for path in table_paths) if not table.empty]
+    all_data = pd.concat(shard_tables, ignore_index=True) if shard_tables else pd.DataFrame()
+
+    run_dir = Path(pipeline_config.io.run_dir)
+    run_dir.mkdir(parents=True, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    parquet_path = run_dir / f"caption_results_{timestamp}.parquet"
+    all_data.to_parquet(parquet_path, index=False)
+    context.log.info(f"Merged {len(all_data)} rows from {num_shards} shards into {parquet_path}")
+
+    return dg.MaterializeResult(
+        metadata={
+            "num_shards": num_shards,
+            "shard_run_id": run_id,
+            "num_rows": len(all_data),
+            "parquet_path": str(parquet_path),
+        }
+    )
@@ -0,0 +1,101 @@
+# SPDX-License-Identifier: Apache-2.0
+"""Tests for image discovery."""
+
+import os
+
+from pipelines.io.image import discovery
+from pipelines.io.image.discovery import discover_images, iter_image_entries, sniff_image_format
+from pipelines.io.image.types import SortingStrategy
+
+PNG_HEADER = b"\x89PNG\r\n\x1a\n" + b"\x00" * 8
+
+
+def test_discovery_filters_and_recurses(tmp_path):
+    """Only images are listed, subdirectories only when recursive, and extensionless images only when sniffed."""
+    (tmp_path / "a.JPG").write_bytes(b"a")
+    (tmp_path / "notes.txt").write_bytes(b"notes")
+    (tmp_path / "scan").write_bytes(PNG_HEADER)
+    (tmp_path / "nested").mkdir()
+    (tmp_path / "nested" / "b.png").write_bytes(b"bb")
+
+    def names(**kwargs):
+        return sorted(os.path.relpath(entry.path, tmp_path) for entry in iter_image_entries(tmp_path, **kwargs))
+
+    assert names() == ["a.JPG"]
+    assert names(recursive=True) == ["a.JPG", os.path.join("nested", "b.png")]
+    assert names(sniff=True) == ["a.JPG", "scan"]
+    assert sniff_image_format(tmp_path / "scan") == "png"
+    assert sniff_image_format(tmp_path / "missing") is None
+
+
+def test_recursive_discovery_does_not_follow_directory_links(tmp_path):
+    """A link to a parent directory cannot make the walk loop."""
+    (tmp_path / "a.jpg").write_bytes(b"a")
+    (tmp_path / "nested").mkdir()
+    (tmp_path / "nested" / "loop").symlink_to(tmp_path, target_is_directory=True)
+
+    assert [entry.path for entry in iter_image_entries(tmp_path, recursive=True)] == [str(tmp_path / "a.jpg")]
+
+
+def test_listing_records_stat_and_sorts(tmp_path):
+    """Sizes and modification times come from discovery and drive sorting."""
+    for name, size, mtime in (("b.jpg", 3, 1), ("a.jpg", 1, 3), ("c.jpg", 2, 2)):
+        path = tmp_path / name
+        path.write_bytes(b"x" * size)
+        os.utime(path, ns=(mtime * 10**9, mtime * 10**9))
+
+    listing = discover_images(tmp_path)
+
+    assert len(listing) == 3
+    assert {entry.path: entry.size for entry in listing} == {
+        str(tmp_path / "a.jpg"): 1,
+        str(tmp_path / "b.jpg"): 3,
+        str(tmp_path / "c.jpg"): 2,
+    }
+
+    def names(sorting_strategy):
+        return [os.path.basename(entry.path) for entry in listing.sorted(sorting_strategy)]
+
+    assert names(SortingStrategy.NAME) == ["a.jpg", "b.jpg", "c.jpg"]
+    assert names(SortingStrategy.SIZE) == ["a.jpg", "c.jpg", "b.jpg"]
+    assert names(SortingStrategy.MODIFIED) == ["b.jpg", "c.jpg", "a.jpg"]
+
+
+def test_discovery_skips_unreadable_directories_and_vanished_files(tmp_path, monkeypatch):
+    """A directory that cannot be read or a file deleted during the walk does not abort the scan."""
+    for name in ("a.jpg", "gone.jpg", os.path.join("locked", "b.jpg"), os.path.join("open", "c.jpg")):
+        (tmp_path / name).parent.mkdir(exist_ok=True)
+        (tmp_path / name).write_bytes(b"x")
+    scandir = os.scandir
+
+    class VanishedEntry:
+        def __init__(self, entry):
+            self.name, self.path = entry.name, entry.path
+            self.is_dir, self.is_file = entry.is_dir, entry.is_file
+
+        def stat(self):
+            raise FileNotFoundError(self.path)
+
+    class Listing:
+        def __init__(self, path):
+            self._entries = scandir(path)
+
+        def __iter__(self):
+            return (VanishedEntry(entry) if entry.name == "gone.jpg" else entry for entry in self._entries)
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc_info):
+            self._entries.close()
+
+    def fake_scandir(path):
+        if os.path.basename(path) == "locked":
+            raise PermissionError(path)
+        return Listing(path)
+
+    monkeypatch.setattr(discovery.os, "scandir", fake_scandir)
+
+    names = sorted(os.path.relpath(entry.path, tmp_path) for entry in iter_image_entries(tmp_path, recursive=True))
+
+    assert names == ["a.jpg", os.path.join("open", "c.jpg")]
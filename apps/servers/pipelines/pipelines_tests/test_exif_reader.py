@@ -0,0 +1,78 @@
+# SPDX-License-Identifier: Apache-2.0
+"""Tests for the ExifTool process pool, run against a stand-in ExifTool script."""
+
+import sys
+import textwrap
+
+import pytest
+from pipelines.io.image.image_metadata.exif_reader import NO_METADATA_ERROR, ExifToolPool
+
+# Speaks the -stay_open protocol: reports the size of every existing file and exits on a path containing "crash"
+FAKE_EXIFTOOL = """
+import json
+import os
+import sys
+
+arguments = []
+for line in sys.stdin:
+    argument = line.rstrip("\\n")
+    if argument.startswith("-execute"):
+        records = []
+        for path in arguments:
+            if "crash" in path:
+                sys.exit(3)
+            if os.path.exists(path):
+                records.append({"SourceFile": path, "FileSize": os.path.getsize(path)})
+        print(json.dumps(records) if records else "", flush=True)
+        print("{ready" + argument[len("-execute"):] + "}", flush=True)
+        arguments = []
+    elif arguments[-1:] == ["-stay_open"] and argument == "False":
+        break
+    elif not argument.startswith("-") or argument == "-stay_open":
+        arguments.append(argument)
+"""
+
+
+@pytest.fixture
+def exiftool(tmp_path):
+    """Path of the stand-in ExifTool executable."""
+    path = tmp_path / "exiftool"
+    path.write_text(f"#!{sys.executable}\n" + textwrap.dedent(FAKE_EXIFTOOL))
+    path.chmod(0o755)
+    return str(path)
+
+
+@pytest.fixture
+def image_paths(tmp_path):
+    """Five files of different sizes, one of them named like an option."""
+    paths = []
+    for index, name in enumerate(("a.jpg", "b.jpg", "-c.jpg", "d.jpg", "e.jpg")):
+        (tmp_path / name).write_bytes(b"x" * (index + 1))
+        paths.append(name if name.startswith("-") else str(tmp_path / name))
+    return paths
+
+
+def test_pool_reads_batches_in_order(exiftool, image_paths, tmp_path, monkeypatch):
+    """Records follow the order of the paths across batches and processes, with errors for unread images."""
+    monkeypatch.chdir(tmp_path)
+    paths = [*image_paths, str(tmp_path / "missing.jpg")]
+
+    with ExifToolPool(workers=2, batch_size=2, executable=exiftool) as pool:
+        batches = list(pool.read_batches(paths))
+
+    records = [record for batch in batches for record in batch.to_pylist()]
+    assert len(batches) == 3
+    assert [record["SourceFile"] for record in records] == paths
+    assert [record["FileSize"] for record in records] == [1, 2, 3, 4, 5, None]
+    assert records[-1]["Error"] == NO_METADATA_ERROR
+
+
+def test_failed_process_is_replaced(exiftool, image_paths):
+    """A batch whose process exits gets error records, and the next batch runs on a new process."""
+    with ExifToolPool(workers=1, batch_size=2, executable=exiftool) as pool:
+        failed = pool.read_batch([image_paths[0], "/crash.jpg"])
+        records = pool.read_batch(image_paths[:2])
+
+    assert [record["SourceFile"] for record in failed] == [image_paths[0], "/crash.jpg"]
+    assert all("exited with code 3" in record["Error"] for record in failed)
+    assert [record["FileSize"] for record in records] == [1, 2]
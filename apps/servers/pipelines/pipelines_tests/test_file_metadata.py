@@ -0,0 +1,64 @@
+# SPDX-License-Identifier: Apache-2.0
+"""Tests for single-pass image file metadata."""
+
+import hashlib
+
+import pytest
+from PIL import Image
+from pipelines.io.image.image_metadata import file_metadata
+from pipelines.io.image.image_metadata.file_metadata import extract_file_metadata, read_file_metadata
+
+
+@pytest.fixture
+def image_path(tmp_path):
+    """A small transparent PNG."""
+    path = tmp_path / "image.png"
+    Image.new("RGBA", (40, 20), (255, 0, 0, 255)).save(path)
+    return path
+
+
+def test_read_file_metadata(image_path):
+    """The header and hashes come from a single read of the file."""
+    metadata = read_file_metadata(str(image_path), fast_hash="blake2b")
+    data = image_path.read_bytes()
+
+    assert metadata["file_name"] == "image.png"
+    assert metadata["file_size"] == len(data)
+    assert metadata["file_format"] == "PNG"
+    assert (metadata["width"], metadata["height"], metadata["aspect_ratio"]) == (40, 20, 2.0)
+    assert (metadata["color_mode"], metadata["bit_depth"]) == ("RGBA", 32)
+    assert metadata["file_hash"] == hashlib.sha256(data).hexdigest()
+    assert metadata["blake2b_hash"] == hashlib.blake2b(data).hexdigest()
+
+
+def test_memory_mapped_files_match_buffered_reads(image_path, monkeypatch):
+    """Files above the threshold are memory-mapped and give the same metadata."""
+    buffered = read_file_metadata(str(image_path))
+    monkeypatch.setattr(file_metadata, "MMAP_THRESHOLD", 1)
+    mapped = read_file_metadata(str(image_path))
+
+    # Reading the file may update its access time
+    assert {**mapped, "accessed_time": ""} == {**buffered, "accessed_time": ""}
+
+
+def test_unreadable_files_raise(tmp_path):
+    """Empty files and files Pillow cannot open raise OSError."""
+    (tmp_path / "empty.jpg").write_bytes(b"")
+    (tmp_path / "text.jpg").write_bytes(b"not an image")
+
+    for name in ("empty.jpg", "text.jpg", "missing.jpg"):
+        with pytest.raises(OSError):
+            read_file_metadata(str(tmp_path / name))
+
+
+def test_extract_file_metadata_reports_errors_in_order(image_path, tmp_path):
+    """Failed files yield empty metadata and their error, keeping the order of the paths."""
+    paths = [str(image_path), str(tmp_path / "missing.jpg"), str(image_path)]
+
+    results = list(extract_file_metadata(paths, max_workers=2))
+
+    assert [metadata["file_path"] for metadata, _ in results] == paths
+    assert [error is None for _, error in results] == [True, False, True]
+    assert results[1][0]["file_format"] == "Unknown"
+    with pytest.raises(ValueError):
+        list(extract_file_metadata(paths, fast_hash="md5"))
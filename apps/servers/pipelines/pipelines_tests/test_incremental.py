@@ -0,0 +1,31 @@
+# SPDX-License-Identifier: Apache-2.0
+"""Tests for the image index behind incremental captioning."""
+
+import os
+
+from pipelines.perspectives import incremental
+from pipelines.perspectives.incremental import ImageIndex
+
+
+def test_scan_keys_files_without_reading_them(tmp_path, monkeypatch):
+    """Partition keys come from the directory scan alone and follow file versions."""
+    monkeypatch.setattr(incremental, "hash_image_file", None)
+    input_dir = tmp_path / "images"
+    input_dir.mkdir()
+    for name in ("a.jpg", "b.png", "notes.txt"):
+        (input_dir / name).write_bytes(name.encode())
+    index = ImageIndex(tmp_path / "image_index.json")
+
+    keys = index.scan(input_dir)
+    assert len(keys) == 2
+    assert {index.path_for(key).name for key in keys} == {"a.jpg", "b.png"}
+
+    # Saving and loading keeps the keys; a modified file gets a new key
+    index.save()
+    index = ImageIndex.load(index.path)
+    stat = os.stat(input_dir / "a.jpg")
+    os.utime(input_dir / "a.jpg", ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    rescanned = index.scan(input_dir)
+
+    assert len(set(rescanned) & set(keys)) == 1
+    assert index.path_for(next(key for key in rescanned if key not in keys)).name == "a.jpg"
@@ -0,0 +1,30 @@
+# SPDX-License-Identifier: Apache-2.0
+"""Tests for copying selected images into a run's images directory."""
+
+from pathlib import Path
+
+import dagster as dg
+from pipelines.io.image.load_images import copy_images
+
+
+def test_copy_images_keeps_same_named_images_apart(tmp_path):
+    """Different images sharing a file name in different subdirectories get distinct links."""
+    input_dir = tmp_path / "input"
+    image_paths = []
+    for directory, data in (("a", b"first"), ("b", b"second"), ("c", b"first")):
+        (input_dir / directory).mkdir(parents=True)
+        path = input_dir / directory / "x.jpg"
+        path.write_bytes(data)
+        image_paths.append(str(path))
+    (input_dir / "unique.png").write_bytes(b"unique")
+    image_paths.append(str(input_dir / "unique.png"))
+
+    copied = copy_images(dg.build_asset_context(), image_paths, str(tmp_path / "output"))
+
+    assert len(copied) == 4
+    assert Path(copied[3]).name == "unique.png"
+    # The two copies of the same image share a link, the other image has its own
+    assert copied[0] == copied[2]
+    assert copied[0] != copied[1]
+    assert all(Path(path).name.startswith("x_") for path in copied[:3])
+    assert [Path(path).read_bytes() for path in copied] == [b"first", b"second", b"first", b"unique"]
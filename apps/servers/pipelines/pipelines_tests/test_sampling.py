@@ -0,0 +1,52 @@
+# SPDX-License-Identifier: Apache-2.0
+"""Tests for the streaming image samplers."""
+
+from collections import Counter
+
+import pytest
+from pipelines.io.image.sampling import hash_sample, reservoir_sample, stratified_sample
+
+
+def test_reservoir_sample_is_reproducible():
+    """A seeded sample is the same across runs, in stream order and without duplicates."""
+    sample = reservoir_sample(range(10_000), 50, seed=7)
+
+    assert sample == reservoir_sample(iter(range(10_000)), 50, seed=7)
+    assert len(set(sample)) == 50
+    assert sample == sorted(sample)
+    assert reservoir_sample(range(3), 5) == [0, 1, 2]
+
+
+def test_hash_sample_is_stable_when_items_are_added():
+    """Adding items only replaces members that hash higher than a new item."""
+    before = hash_sample(range(1000), 20, key=str)
+    after = hash_sample(range(1100), 20, key=str)
+
+    assert len(set(before) & set(after)) == len([item for item in after if item < 1000])
+
+
+def test_stratified_sample_is_proportional():
+    """Each stratum is represented in proportion to its size."""
+    items = [("big", i) for i in range(6000)] + [("mid", i) for i in range(3000)] + [("small", i) for i in range(1000)]
+
+    sample = stratified_sample(items, 100, stratum=lambda item: item[0], seed=3)
+
+    assert Counter(group for group, _ in sample) == {"big": 60, "mid": 30, "small": 10}
+    assert sample == [item for item in items if item in set(sample)]
+
+
+def test_stratified_sample_bounds_memory():
+    """Many strata do not grow memory beyond max_items, and the sample keeps its size."""
+    items = [(i % 500, i) for i in range(20_000)]
+
+    sample = stratified_sample(items, 50, stratum=lambda item: item[0], seed=1, max_items=50)
+
+    assert len(sample) == 50
+    assert len(set(sample)) == 50
+    with pytest.raises(ValueError):
+        stratified_sample(items, 50, stratum=lambda item: item[0], max_items=10)
+
+
+def test_stratified_sample_keeps_small_streams():
+    """A stream smaller than the sample is returned whole."""
+    assert stratified_sample(range(5), 10, stratum=lambda item: item % 2) == [0, 1, 2, 3, 4]
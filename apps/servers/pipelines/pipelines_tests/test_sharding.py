@@ -0,0 +1,41 @@
+# SPDX-License-Identifier: Apache-2.0
+"""Tests for the shard assignment and directories of sharded captioning."""
+
+from collections import Counter
+from types import SimpleNamespace
+
+import pytest
+from pipelines.perspectives.sharding import BACKFILL_ID_TAG, shard_dir, shard_of, shard_run_id
+
+
+def test_shard_of_is_relative_to_input_dir():
+    """Workers mounting the input directory elsewhere assign every image to the same shard."""
+    for name in ("a.jpg", "nested/b.png", "c d.webp"):
+        assert shard_of(f"/mnt/one/{name}", "/mnt/one", 8) == shard_of(f"/data/two/{name}", "/data/two", 8)
+
+
+def test_shard_of_spreads_images():
+    """Images are spread over every shard."""
+    counts = Counter(shard_of(f"/images/{i:05d}.jpg", "/images", 4) for i in range(4000))
+
+    assert sorted(counts) == [0, 1, 2, 3]
+    assert min(counts.values()) > 800
+
+
+def test_shard_dir_is_scoped_to_the_run(tmp_path):
+    """Shards of different runs never share a directory."""
+    pipeline_config = SimpleNamespace(io=SimpleNamespace(output_dir=str(tmp_path)))
+
+    assert shard_dir(pipeline_config, "backfill-a", 0, 2) != shard_dir(pipeline_config, "backfill-b", 0, 2)
+    assert shard_dir(pipeline_config, "backfill-a", 1, 2) == tmp_path / "shards" / "backfill-a" / "shard_001_of_002"
+
+
+def test_shard_run_id():
+    """The configured id takes precedence over the backfill id, and a run needs one of them."""
+    backfill_run = SimpleNamespace(run=SimpleNamespace(tags={BACKFILL_ID_TAG: "abcdef"}))
+    single_run = SimpleNamespace(run=SimpleNamespace(tags={}))
+
+    assert shard_run_id(backfill_run, SimpleNamespace(shard_run_id=None)) == "abcdef"
+    assert shard_run_id(backfill_run, SimpleNamespace(shard_run_id="resumed")) == "resumed"
+    with pytest.raises(ValueError):
+        shard_run_id(single_run, SimpleNamespace(shard_run_id=None))
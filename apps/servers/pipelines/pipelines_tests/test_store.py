@@ -0,0 +1,83 @@
+# SPDX-License-Identifier: Apache-2.0
+"""Tests for the content-addressed image store."""
+
+import os
+
+import pytest
+from pipelines.io.image.store import ImageStore, link_object
+
+
+@pytest.fixture
+def sources(tmp_path):
+    """Two source images with the same content and one with different content."""
+    source_dir = tmp_path / "sources"
+    source_dir.mkdir()
+    for name, data in (("a.jpg", b"same"), ("b.JPG", b"same"), ("c.png", b"other")):
+        (source_dir / name).write_bytes(data)
+    return [source_dir / name for name in ("a.jpg", "b.JPG", "c.png")]
+
+
+def test_identical_images_are_stored_once(tmp_path, sources):
+    """Objects are addressed by content, so identical images share one."""
+    store = ImageStore(tmp_path / "store")
+
+    object_paths = store.put_many(sources)
+
+    assert object_paths[0] == object_paths[1]
+    assert object_paths[0] != object_paths[2]
+    assert object_paths[0].suffix == ".jpg"
+    assert store.stats.reused == 1
+    assert store.stats.reused + store.stats.reflinked + store.stats.copied == 3
+
+
+def test_default_link_modes_never_share_the_source_inode(tmp_path, sources):
+    """Editing a source in place leaves the stored object unchanged."""
+    store = ImageStore(tmp_path / "store")
+    object_path = store.put(sources[2])
+
+    assert not os.path.samefile(object_path, sources[2])
+    sources[2].write_bytes(b"edited")
+    assert object_path.read_bytes() == b"other"
+
+
+def test_hash_cache_skips_unchanged_sources(tmp_path, sources, monkeypatch):
+    """A new store instance reuses the saved hashes of unchanged sources."""
+    ImageStore(tmp_path / "store").put_many(sources)
+
+    def fail(path):
+        raise AssertionError(f"{path} was read again")
+
+    monkeypatch.setattr("pipelines.io.image.store.hash_image_file", fail)
+    store = ImageStore(tmp_path / "store")
+    store.put_many(sources)
+
+    assert store.stats.reused == 3
+    assert store.stats.failed == 0
+
+
+def test_failed_images_are_reported_as_none(tmp_path, sources):
+    """Images that cannot be stored do not fail the others."""
+    store = ImageStore(tmp_path / "store")
+
+    object_paths = store.put_many([sources[0], tmp_path / "missing.jpg"])
+
+    assert object_paths[0] is not None
+    assert object_paths[1] is None
+    assert store.stats.failed == 1
+
+
+def test_unknown_link_modes_are_rejected(tmp_path):
+    """Link modes are checked when the store is created."""
+    with pytest.raises(ValueError):
+        ImageStore(tmp_path / "store", link_modes=("symlink",))
+
+
+def test_link_object_hard_links_into_run(tmp_path, sources):
+    """Runs reference stored objects without copying them."""
+    object_path = ImageStore(tmp_path / "store").put(sources[0])
+    destination = tmp_path / "run" / "images" / "a.jpg"
+
+    link_object(object_path, destination)
+    link_object(object_path, destination)
+
+    assert os.path.samefile(object_path, destination)
@@ -0,0 +1,3 @@
+ALTER TABLE "batch_jobs" ADD COLUMN "error" text;--> statement-breakpoint
+ALTER TABLE "batch_job_items" ADD COLUMN "result" jsonb;--> statement-breakpoint
+CREATE INDEX IF NOT EXISTS "batch_job_items_job_id_idx" ON "batch_job_items" USING btree ("job_id");
\ No newline at end of file
@@ -0,0 +1,15 @@
+CREATE TABLE IF NOT EXISTS "caption_results" (
+	"id" bigserial PRIMARY KEY NOT NULL,
+	"image_hash" text NOT NULL,
+	"perspective" text NOT NULL,
+	"version" text NOT NULL,
+	"model" text NOT NULL,
+	"fields" text DEFAULT '' NOT NULL,
+	"provider" text NOT NULL,
+	"image_path" text,
+	"result" jsonb NOT NULL,
+	"created_at" timestamp DEFAULT now() NOT NULL
+);
+--> statement-breakpoint
+CREATE UNIQUE INDEX IF NOT EXISTS "caption_results_key_idx" ON "caption_results" USING btree ("image_hash","perspective","version","model","fields");--> statement-breakpoint
+CREATE INDEX IF NOT EXISTS "caption_results_perspective_id_idx" ON "caption_results" USING btree ("perspective","id");
\ No newline at end of file
@@ -0,0 +1,2 @@
+ALTER TABLE "batch_jobs" ADD COLUMN "owner" text;--> statement-breakpoint
+ALTER TABLE "batch_jobs" ADD COLUMN "heartbeat_at" timestamp;
\ No newline at end of file
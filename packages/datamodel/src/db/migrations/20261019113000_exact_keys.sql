@@ -0,0 +1,3 @@
+ALTER TABLE "caption_results" ADD COLUMN "params" text DEFAULT '' NOT NULL;--> statement-breakpoint
+DROP INDEX IF EXISTS "caption_results_key_idx";--> statement-breakpoint
+CREATE UNIQUE INDEX IF NOT EXISTS "caption_results_key_idx" ON "caption_results" USING btree ("image_hash","perspective","version","model","fields","provider","params");
\ No newline at end of file
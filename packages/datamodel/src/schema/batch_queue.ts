@@ -1,6 +1,6 @@
 import { relations } from 'drizzle-orm';
 // SPDX-License-Identifier: Apache-2.0
-import { boolean, integer, jsonb, pgTable, serial, text, timestamp, uuid } from 'drizzle-orm/pg-core';
+import { boolean, index, integer, jsonb, pgTable, serial, text, timestamp, uuid } from 'drizzle-orm/pg-core';
 
 /**
  * Job Status Enum Values
@@ -57,6 +57,13 @@ export const batchJobs = pgTable('batch_jobs', {
   failedImages: integer('failed_images').notNull().default(0),
   progress: integer('progress').notNull().default(0), // 0-100 percentage
   
+  // Error message for failed, timed out or interrupted jobs
+  error: text('error'),
+  
+  // Server process running the job and when it last reported, to detect jobs orphaned by a crash
+  owner: text('owner'),
+  heartbeatAt: timestamp('heartbeat_at'),
+  
   // Timestamps
   createdAt: timestamp('created_at').defaultNow().notNull(),
   startedAt: timestamp('started_at'),
@@ -82,13 +89,18 @@ export const batchJobItems = pgTable('batch_job_items', {
   // Optional error information
   error: text('error'),
   
+  // Structured caption result
+  result: jsonb('result'),
+  
   // Timestamps
   startedAt: timestamp('started_at'),
   completedAt: timestamp('completed_at'),
   
   // Performance metrics
   processingTime: integer('processing_time'), // in milliseconds
-});
+}, (table) => [
+  index('batch_job_items_job_id_idx').on(table.jobId),
+]);
 
 /**
  * Job Dependencies table schema
@@ -0,0 +1,44 @@
+// SPDX-License-Identifier: Apache-2.0
+import { bigserial, index, jsonb, pgTable, text, timestamp, uniqueIndex } from 'drizzle-orm/pg-core';
+
+/**
+ * Caption Results table schema
+ * Stores structured captions so a perspective is not run twice on the same image.
+ *
+ * Results are keyed by the SHA-256 of the image file or upload named by the
+ * request (its resized copy when a resize was requested), the perspective name
+ * and version, the model, the requested field selection (an empty string for the
+ * full perspective schema), the provider and the generation parameters.
+ */
+export const captionResults = pgTable('caption_results', {
+  id: bigserial('id', { mode: 'number' }).primaryKey(),
+
+  // Result key
+  imageHash: text('image_hash').notNull(),
+  perspective: text('perspective').notNull(),
+  version: text('version').notNull(),
+  model: text('model').notNull(),
+  fields: text('fields').notNull().default(''),
+  provider: text('provider').notNull(),
+  // Canonical JSON of the global context and generation options
+  params: text('params').notNull().default(''),
+
+  // Where the result came from
+  imagePath: text('image_path'),
+
+  // Structured caption result
+  result: jsonb('result').notNull(),
+
+  createdAt: timestamp('created_at').defaultNow().notNull(),
+}, (table) => [
+  uniqueIndex('caption_results_key_idx').on(
+    table.imageHash,
+    table.perspective,
+    table.version,
+    table.model,
+    table.fields,
+    table.provider,
+    table.params,
+  ),
+  index('caption_results_perspective_id_idx').on(table.perspective, table.id),
+]);
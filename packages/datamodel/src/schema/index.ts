@@ -6,4 +6,5 @@
  */
 
 export * from './batch_queue';
+export * from './caption_results';
 export * from './db_providers';
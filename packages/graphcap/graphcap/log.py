@@ -0,0 +1,220 @@
+"""
+# SPDX-License-Identifier: Apache-2.0
+Logging Configuration
+
+Shared logging setup for graphcap, the inference bridge and the pipelines.
+
+Key features:
+- Log levels from the GRAPHCAP_LOG_LEVEL environment variable
+- Background sinks: loguru writes through a queue, standard library handlers
+  run behind a QueueHandler, so callers never block on I/O
+- Per-key sampling and rate limiting for per-item messages
+
+Messages on hot paths should use loguru's deferred formatting
+(``logger.debug("Loaded {}", path)``) rather than f-strings, so nothing is
+formatted unless the level is enabled.
+"""
+
+import atexit
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, List, Optional
+
+from loguru import logger
+
+LOG_LEVEL_ENV = "GRAPHCAP_LOG_LEVEL"
+LOG_ENQUEUE_ENV = "GRAPHCAP_LOG_ENQUEUE"
+DEFAULT_LOG_LEVEL = "INFO"
+
+LOG_FORMAT = (
+    "<green>{time:YYYY-MM-DD HH:mm:ss}</green> | "
+    "<level>{level: <8}</level> | "
+    "<cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - "
+    "<level>{message}</level>"
+)
+
+
+def get_log_level(default: str = DEFAULT_LOG_LEVEL) -> str:
+    """
+    Get the configured log level.
+
+    Args:
+        default: Level used when GRAPHCAP_LOG_LEVEL is not set
+
+    Returns:
+        Upper-case level name
+    """
+    return os.environ.get(LOG_LEVEL_ENV, default).strip().upper() or default
+
+
+class LogThrottle:
+    """
+    Sample and rate limit messages that share a key.
+
+    A message is let through when it is the every-th message for its key and the
+    key has not exceeded per_second messages per second. The number of messages
+    dropped since the last one let through is reported so it can be logged.
+    """
+
+    def __init__(self, every: int = 1, per_second: Optional[float] = None):
+        """
+        Args:
+            every: Let through one message out of every this many
+            per_second: Maximum sustained messages per second, or None for no limit
+        """
+        if every < 1:
+            raise ValueError("every must be at least 1")
+        if per_second is not None and per_second <= 0:
+            raise ValueError("per_second must be positive")
+        self.every = every
+        self.per_second = per_second
+        self._burst = max(1.0, per_second or 0.0)
+        self._lock = threading.Lock()
+        # key -> [messages seen, tokens, last refill time, suppressed since last message]
+        self._state: Dict[str, List[float]] = {}
+
+    def allow(self, key: str = "") -> Optional[int]:
+        """
+        Check whether a message for a key should be logged.
+
+        Args:
+            key: Key identifying the kind of message
+
+        Returns:
+            None if the message should be dropped, otherwise the number of
+            messages for the key dropped since the last one logged
+        """
+        now = time.monotonic()
+        with self._lock:
+            state = self._state.get(key)
+            if state is None:
+                state = self._state[key] = [0, self._burst, now, 0]
+            state[0] += 1
+            if (state[0] - 1) % self.every:
+                state[3] += 1
+                return None
+
+            if self.per_second is not None:
+                state[1] = min(self._burst, state[1] + (now - state[2]) * self.per_second)
+                state[2] = now
+                if state[1] < 1:
+                    state[3] += 1
+                    return None
+                state[1] -= 1
+
+            suppressed = int(state[3])
+            state[3] = 0
+            return suppressed
+
+
+_throttles: Dict[str, LogThrottle] = {}
+
+
+def throttled_logger(key: str, every: int = 1, per_second: Optional[float] = None):
+    """
+    Get a logger whose messages are sampled and rate limited together.
+
+    Sinks added by configure_logging drop throttled messages and note how many
+    were dropped on the next message logged.
+
+    Args:
+        key: Key shared by the messages to throttle
+        every: Log one message out of every this many
+        per_second: Maximum sustained messages per second, or None for no limit
+
+    Returns:
+        A loguru logger bound to the throttle
+    """
+    _throttles[key] = LogThrottle(every, per_second)
+    return logger.bind(throttle=key)
+
+
+def _throttle_filter(record: dict) -> bool:
+    """Drop throttled records and record how many were dropped before the ones kept."""
+    key = record["extra"].get("throttle")
+    if key is None:
+        return True
+    throttle = _throttles.get(key)
+    if throttle is None:
+        return True
+    suppressed = throttle.allow(key)
+    if suppressed is None:
+        return False
+    record["extra"]["suppressed"] = suppressed
+    return True
+
+
+def _format_record(record: dict) -> str:
+    """Format a record, noting messages dropped by throttling."""
+    if record["extra"].get("suppressed"):
+        return LOG_FORMAT + " <dim>({extra[suppressed]} similar messages suppressed)</dim>\n{exception}"
+    return LOG_FORMAT + "\n{exception}"
+
+
+def configure_logging(
+    level: Optional[str] = None,
+    enqueue: Optional[bool] = None,
+    colorize: Optional[bool] = None,
+) -> int:
+    """
+    Replace the loguru sinks with a single background stderr sink.
+
+    Args:
+        level: Minimum level, defaults to GRAPHCAP_LOG_LEVEL or INFO
+        enqueue: Write through a background queue, defaults to GRAPHCAP_LOG_ENQUEUE or True
+        colorize: Colorize output, defaults to whether stderr is a terminal
+
+    Returns:
+        The loguru handler id of the sink
+    """
+    if enqueue is None:
+        enqueue = os.environ.get(LOG_ENQUEUE_ENV, "true").strip().lower() not in ("0", "false", "no")
+
+    logger.remove()
+    return logger.add(
+        sys.stderr,
+        level=level or get_log_level(),
+        format=_format_record,
+        filter=_throttle_filter,
+        colorize=colorize,
+        enqueue=enqueue,
+        backtrace=False,
+    )
+
+
+def attach_queue_handlers(target: logging.Logger, handlers: List[logging.Handler]) -> QueueListener:
+    """
+    Attach standard library handlers to a logger behind a queue.
+
+    The logger only enqueues records; a listener thread formats them and runs the
+    handlers. The listener is stopped, flushing the queue, at interpreter exit.
+
+    Args:
+        target: Logger to attach the handlers to
+        handlers: Handlers to run on the listener thread
+
+    Returns:
+        The started queue listener
+    """
+    records: queue.SimpleQueue = queue.SimpleQueue()
+    listener = QueueListener(records, *handlers, respect_handler_level=True)
+    target.addHandler(QueueHandler(records))
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
+
+__all__ = [
+    "LOG_LEVEL_ENV",
+    "LOG_ENQUEUE_ENV",
+    "LogThrottle",
+    "get_log_level",
+    "throttled_logger",
+    "configure_logging",
+    "attach_queue_handlers",
+]
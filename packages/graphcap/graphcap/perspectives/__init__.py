@@ -23,10 +23,26 @@ from .perspective_loader import (
     load_perspective_config,
     load_perspective_from_json,
 )
+from .process_pool import ProcessPoolCaptioner
+from .projection import clear_projection_cache, project_config
+from .scheduler import PerspectiveNode, PerspectiveScheduler, build_perspective_dag
+from .schema import PerspectiveSchemaArtifacts, clear_schema_cache, get_schema_artifacts
+from .sinks import (
+    BufferedJsonlCaptionSink,
+    CallbackCaptionSink,
+    CaptionSink,
+    CaptionSinkStats,
+    JsonlCaptionSink,
+    ParquetCaptionSink,
+    read_caption_results,
+)
+from .types import CaptionProgress
 
 # Load JSON-based perspectives from workspace config
 _json_perspectives: Dict[str, JsonPerspectiveProcessor] = {}
 _modules: Dict[str, PerspectiveModule] = {}
+# Incremented whenever the set of loaded perspectives changes
+_registry_generation = 0
 
 # Get all perspective directories
 perspective_dirs = get_perspective_directories()
@@ -172,12 +188,26 @@ def toggle_module(module_name: str, enabled: bool) -> None:
     _modules[module_name].toggle(enabled)
 
     # Reload perspectives to reflect changes
-    global _json_perspectives
+    global _json_perspectives, _registry_generation
     _json_perspectives = {}
     for name, module in _modules.items():
         if module.enabled:
             for perspective_name, perspective in module.perspectives.items():
                 _json_perspectives[perspective_name] = perspective
+    _registry_generation += 1
+
+
+def get_registry_generation() -> int:
+    """
+    Get the generation of the perspective registry.
+
+    The generation changes whenever the set of loaded perspectives changes, so
+    anything derived from the registry can be cached until it does.
+
+    Returns:
+        The current registry generation
+    """
+    return _registry_generation
 
 
 def get_synthesizer() -> JsonPerspectiveProcessor:
@@ -243,6 +273,17 @@ __all__ = [
     # Classes
     "JsonPerspectiveProcessor",
     "PerspectiveModule",
+    "PerspectiveSchemaArtifacts",
+    "PerspectiveNode",
+    "PerspectiveScheduler",
+    "ProcessPoolCaptioner",
+    "CaptionProgress",
+    "CaptionSink",
+    "JsonlCaptionSink",
+    "BufferedJsonlCaptionSink",
+    "CaptionSinkStats",
+    "ParquetCaptionSink",
+    "CallbackCaptionSink",
     # Functions
     "get_perspective_directories",
     "load_perspective_config",
@@ -250,4 +291,11 @@ __all__ = [
     "get_all_modules",
     "load_all_perspectives",
     "load_module_settings",
+    "get_schema_artifacts",
+    "clear_schema_cache",
+    "project_config",
+    "clear_projection_cache",
+    "build_perspective_dag",
+    "read_caption_results",
+    "get_registry_generation",
 ]
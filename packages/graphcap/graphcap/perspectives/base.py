@@ -7,7 +7,7 @@ Provides base classes and utilities for implementing caption perspectives.
 
 from abc import abstractmethod
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 from pydantic import BaseModel
 from rich.table import Table
@@ -32,6 +32,7 @@ class BasePerspective(BaseCaptionProcessor):
         version (str): Version of the perspective
         prompt (str): Prompt template for the perspective
         schema (Type[PerspectiveData]): Data schema for the perspective
+        response_format (dict): Precomputed structured output payload for the schema
     """
 
     def __init__(
@@ -40,12 +41,14 @@ class BasePerspective(BaseCaptionProcessor):
         version: str,
         prompt: str,
         schema: type[PerspectiveData],
+        response_format: Optional[Dict[str, Any]] = None,
     ):
         super().__init__(
             config_name=config_name,
             version=version,
             prompt=prompt,
             schema=schema,
+            response_format=response_format,
         )
 
     @abstractmethod
@@ -5,22 +5,55 @@ Base Caption Module
 Provides base classes and shared functionality for different caption types.
 """
 
+import asyncio
 import json
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Any, Dict, Optional, cast
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    Mapping,
+    Optional,
+    Sequence,
+    Union,
+    cast,
+)
 
 from loguru import logger
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
 from rich.console import Console
 from rich.table import Table
 
 from ..providers.clients.base_client import BaseClient
-from .types import StructuredVisionConfig
+from .sinks import CaptionSink
+from .types import CaptionProgress, PerspectiveCaptionResult, StructuredVisionConfig
 
 # Initialize Rich console
 console = Console()
 
+ImagePaths = Union[Iterable[Union[str, Path]], AsyncIterable[Union[str, Path]]]
+
+
+async def iterate_images(images: ImagePaths) -> AsyncIterator[Union[str, Path]]:
+    """Iterate over a sync or async iterable of image paths."""
+    if isinstance(images, AsyncIterable):
+        async for image in images:
+            yield image
+    else:
+        for image in images:
+            yield image
+
+
+def describe_image(image: Union[str, Path, bytes]) -> str:
+    """Describe an image input for log and error messages without dumping raw bytes."""
+    if isinstance(image, bytes):
+        return f"<in-memory image, {len(image)} bytes>"
+    return str(image)
+
 
 def pretty_print_caption(caption_data: Dict[str, Any]) -> str:
     """Format caption data for pretty console output."""
@@ -54,6 +87,7 @@ class BaseCaptionProcessor(ABC):
         version (str): Version of the processor
         prompt (str): Instruction prompt for the vision model
         schema (BaseModel): Pydantic model for response validation
+        response_format (dict): Precomputed structured output payload for the schema
     """
 
     def __init__(
@@ -62,12 +96,14 @@ class BaseCaptionProcessor(ABC):
         version: str,
         prompt: str,
         schema: type[BaseModel],
+        response_format: Optional[Dict[str, Any]] = None,
     ):
         self.vision_config = StructuredVisionConfig(
             config_name=config_name,
             version=version,
             prompt=prompt,
             schema=schema,
+            response_format=response_format,
         )
 
     def _sanitize_json_string(self, text: str) -> str:
@@ -145,10 +181,17 @@ class BaseCaptionProcessor(ABC):
 
         Raises:
             json.JSONDecodeError: If JSON parsing fails
+            ValidationError: If the response does not match the schema
         """
         # Handle BaseModel responses through duck typing
         if hasattr(completion, 'choices') and hasattr(completion.choices[0], 'message'):
-            result = completion.choices[0].message.parsed
+            message = completion.choices[0].message
+            result = getattr(message, 'parsed', None)
+
+            # Responses requested with a precomputed response_format carry raw JSON content
+            if result is None and isinstance(getattr(message, 'content', None), str):
+                return self.vision_config.schema.model_validate_json(message.content).model_dump()
+
             if hasattr(result, 'model_dump'):
                 return result.model_dump()
             return cast(Dict[str, Any], result)
@@ -186,7 +229,7 @@ class BaseCaptionProcessor(ABC):
     async def process_single(
         self,
         provider: BaseClient,
-        image_path: Path,
+        image_path: Union[Path, bytes],
         model: str,
         max_tokens: Optional[int] = 4096,
         temperature: Optional[float] = 0.8,
@@ -194,13 +237,14 @@ class BaseCaptionProcessor(ABC):
         repetition_penalty: Optional[float] = 1.15,
         context: list[str] | None = None,
         global_context: str | None = None,
+        fields: Optional[Iterable[str]] = None,
     ) -> Dict[str, Any]:
         """
         Process a single image and return caption data.
 
         Args:
             provider: Vision AI provider client instance
-            image_path: Path to the image file
+            image_path: Path to the image file, or the encoded image bytes
             model: Model name to use for processing
             max_tokens: Maximum tokens for model response
             temperature: Sampling temperature
@@ -208,6 +252,7 @@ class BaseCaptionProcessor(ABC):
             repetition_penalty: Repetition penalty parameter
             context: List of context strings
             global_context: Global context string
+            fields: Output fields to generate, defaults to the full schema
 
         Returns:
             dict: Structured caption data according to schema
@@ -215,7 +260,21 @@ class BaseCaptionProcessor(ABC):
         Raises:
             CaptionParsingError: If parsing the JSON response fails
             CaptionProcessingError: If processing the image fails
+            ValueError: If the field selection is not valid for this processor
         """
+        if fields is not None:
+            return await self.project(fields).process_single(
+                provider=provider,
+                image_path=image_path,
+                model=model,
+                max_tokens=max_tokens,
+                temperature=temperature,
+                top_p=top_p,
+                repetition_penalty=repetition_penalty,
+                context=context,
+                global_context=global_context,
+            )
+
         try:
             # Build prompt with context if provided
             prompt = self._build_prompt_with_context(context, global_context)
@@ -231,6 +290,7 @@ class BaseCaptionProcessor(ABC):
                 prompt=prompt,
                 image=image_path,
                 schema=self.vision_config.schema,
+                response_format=self.vision_config.response_format,
                 model=model,
                 max_tokens=tokens,
                 temperature=temp,
@@ -241,14 +301,169 @@ class BaseCaptionProcessor(ABC):
             # Parse the completion result
             return self._parse_completion_result(completion)
             
-        except json.JSONDecodeError as e:
+        except (json.JSONDecodeError, ValidationError) as e:
             logger.error(f"Failed to parse JSON response: {e}")
-            raise CaptionParsingError(f"Error parsing response for {image_path}: {str(e)}")
+            raise CaptionParsingError(f"Error parsing response for {describe_image(image_path)}: {str(e)}")
         except Exception as e:
-            raise CaptionProcessingError(f"Error processing {image_path}: {str(e)}")
+            raise CaptionProcessingError(f"Error processing {describe_image(image_path)}: {str(e)}")
+
+    def project(self, fields: Optional[Iterable[str]]) -> "BaseCaptionProcessor":
+        """
+        Get a processor that generates only the selected output fields.
+
+        Args:
+            fields: Names of the output fields to generate, or None for all fields
+
+        Returns:
+            Processor restricted to the selected fields
+
+        Raises:
+            ValueError: If this processor does not support field selection
+        """
+        if fields is None:
+            return self
+        raise ValueError(f"{type(self).__name__} does not support field selection")
+
+    def build_caption_result(
+        self, provider: BaseClient, image_path: Path, model: str, parsed: Dict[str, Any]
+    ) -> PerspectiveCaptionResult:
+        """
+        Wrap parsed caption data with the metadata recorded for every caption.
+
+        Args:
+            provider: Provider client that produced the caption
+            image_path: Path to the captioned image
+            model: Model name used for processing
+            parsed: Parsed caption data, or an error payload
+
+        Returns:
+            Caption result record
+        """
+        return {
+            "filename": f"./{Path(image_path).name}",
+            "config_name": self.vision_config.config_name,
+            "version": self.vision_config.version,
+            "model": model,
+            "provider": provider.name,
+            "parsed": parsed,
+        }
+
+    async def process_stream(
+        self,
+        provider: BaseClient,
+        images: ImagePaths,
+        model: str,
+        max_concurrent: int = 3,
+        max_tokens: Optional[int] = 4096,
+        temperature: Optional[float] = 0.8,
+        top_p: Optional[float] = 0.9,
+        repetition_penalty: Optional[float] = 1.15,
+        contexts: Optional[Mapping[str, list[str]]] = None,
+        global_context: str | None = None,
+        sinks: Sequence[CaptionSink] = (),
+        on_progress: Optional[Callable[[CaptionProgress], Any]] = None,
+        fields: Optional[Iterable[str]] = None,
+    ) -> AsyncIterator[PerspectiveCaptionResult]:
+        """
+        Caption a stream of images with a bounded worker pool, yielding results as they complete.
+
+        Images are pulled from ``images`` only as workers free up, so memory stays constant
+        regardless of dataset size. Failed images are yielded with an error payload.
 
-    # Note: process_batch has been removed as batch processing is being migrated to Kafka.
-    # Batch processing functionality should now be implemented in Kafka-based pipeline components.
+        This streams a single perspective. Batches over a graph of perspectives, like the
+        bridge's batch endpoint and the pipeline's caption asset, run on PerspectiveScheduler,
+        which admits images the same bounded way but shares one request budget across nodes.
+
+        Args:
+            provider: Vision AI provider client instance
+            images: Sync or async iterable of image paths
+            model: Model name to use for processing
+            max_concurrent: Number of concurrent workers
+            max_tokens: Maximum tokens for model response
+            temperature: Sampling temperature
+            top_p: Nucleus sampling parameter
+            repetition_penalty: Repetition penalty parameter
+            contexts: Context strings keyed by image filename
+            global_context: Global context string
+            sinks: Destinations that receive every result; closed when the stream ends
+            on_progress: Callback invoked with running counters after each result
+            fields: Output fields to generate, defaults to the full schema
+
+        Yields:
+            Caption result for each image, in completion order
+        """
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent must be at least 1")
+        processor = self.project(fields)
+
+        pending: asyncio.Queue = asyncio.Queue(maxsize=max_concurrent)
+        results: asyncio.Queue = asyncio.Queue(maxsize=max_concurrent)
+        progress = CaptionProgress()
+        finished = object()
+        feed_error: Optional[Exception] = None
+
+        async def feed() -> None:
+            nonlocal feed_error
+            try:
+                async for image in iterate_images(images):
+                    progress.submitted += 1
+                    await pending.put(Path(image))
+            except Exception as e:
+                feed_error = e
+            for _ in range(max_concurrent):
+                await pending.put(finished)
+
+        async def work() -> None:
+            while True:
+                image_path = await pending.get()
+                if image_path is finished:
+                    await results.put(finished)
+                    return
+                try:
+                    parsed = await processor.process_single(
+                        provider=provider,
+                        image_path=image_path,
+                        model=model,
+                        max_tokens=max_tokens,
+                        temperature=temperature,
+                        top_p=top_p,
+                        repetition_penalty=repetition_penalty,
+                        context=contexts.get(image_path.name) if contexts else None,
+                        global_context=global_context,
+                    )
+                except Exception as e:
+                    logger.error(f"Error processing {image_path}: {e}")
+                    parsed = {"error": str(e)}
+                await results.put(self.build_caption_result(provider, image_path, model, parsed))
+
+        tasks = [asyncio.create_task(feed())]
+        tasks.extend(asyncio.create_task(work()) for _ in range(max_concurrent))
+        try:
+            remaining = max_concurrent
+            while remaining:
+                result = await results.get()
+                if result is finished:
+                    remaining -= 1
+                    continue
+
+                if "error" in result["parsed"]:
+                    progress.failed += 1
+                else:
+                    progress.completed += 1
+                for sink in sinks:
+                    await sink.write(result)
+                if on_progress:
+                    on_progress(progress)
+                yield result
+
+            if feed_error:
+                raise feed_error
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for sink in sinks:
+                await sink.close()
 
     @abstractmethod
     def to_table(self, caption_data: Dict[str, Any]) -> Dict[str, Any]:
@@ -0,0 +1,200 @@
+"""
+# SPDX-License-Identifier: Apache-2.0
+Process Pool Module
+
+Runs caption requests across several worker processes.
+
+Each worker process keeps one asyncio event loop and one provider client and
+captions chunks of images with ``BaseCaptionProcessor.process_stream``, so JSON
+parsing, validation and base64 encoding are spread over all cores instead of
+saturating the single core of one event loop. Processors travel to the workers
+as their configuration and are rebuilt once per worker.
+"""
+
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.context import BaseContext
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Set
+
+from loguru import logger
+
+from ..providers.clients.base_client import BaseClient
+from .base_caption import BaseCaptionProcessor, ImagePaths, iterate_images
+from .sinks import CaptionSink
+from .types import CaptionProgress, PerspectiveCaptionResult
+
+# Per-process worker state, created by the pool initializer
+_worker_loop: Optional[asyncio.AbstractEventLoop] = None
+_worker_provider: Optional[BaseClient] = None
+
+
+def _init_worker(provider_factory: Callable[[], BaseClient]) -> None:
+    """Create the event loop and provider client reused by every chunk in this process."""
+    global _worker_loop, _worker_provider
+    _worker_loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_worker_loop)
+    _worker_provider = provider_factory()
+
+
+def _caption_chunk(
+    processor: BaseCaptionProcessor,
+    image_paths: List[str],
+    model: str,
+    options: Dict[str, Any],
+) -> List[PerspectiveCaptionResult]:
+    """Caption one chunk of images on the worker's event loop."""
+    if _worker_loop is None or _worker_provider is None:
+        raise RuntimeError("Caption worker process was not initialized")
+
+    async def run() -> List[PerspectiveCaptionResult]:
+        return [
+            result
+            async for result in processor.process_stream(_worker_provider, image_paths, model, **options)
+        ]
+
+    return _worker_loop.run_until_complete(run())
+
+
+class ProcessPoolCaptioner:
+    """
+    Captions images with a pool of worker processes, each running its own asyncio loop.
+
+    Attributes:
+        processes (int): Number of worker processes
+        max_concurrent (int): Concurrent provider requests per worker process
+        chunk_size (int): Number of images sent to a worker at a time
+    """
+
+    def __init__(
+        self,
+        provider_factory: Callable[[], BaseClient],
+        processes: Optional[int] = None,
+        max_concurrent: int = 8,
+        chunk_size: int = 32,
+        mp_context: Optional[BaseContext] = None,
+    ):
+        """
+        Initialize the captioner.
+
+        Args:
+            provider_factory: Picklable callable that creates the provider client in each worker,
+                e.g. ``functools.partial(create_provider_client, name=..., kind=..., ...)``
+            processes: Number of worker processes, defaults to the CPU count
+            max_concurrent: Concurrent provider requests per worker process
+            chunk_size: Number of images sent to a worker at a time
+            mp_context: Multiprocessing context used to start the workers
+        """
+        if max_concurrent < 1 or chunk_size < 1:
+            raise ValueError("max_concurrent and chunk_size must be at least 1")
+
+        self.processes = processes or os.cpu_count() or 1
+        self.max_concurrent = max_concurrent
+        self.chunk_size = chunk_size
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=mp_context,
+            initializer=_init_worker,
+            initargs=(provider_factory,),
+        )
+
+    async def run(
+        self,
+        processor: BaseCaptionProcessor,
+        images: ImagePaths,
+        model: str,
+        max_tokens: Optional[int] = 4096,
+        temperature: Optional[float] = 0.8,
+        top_p: Optional[float] = 0.9,
+        repetition_penalty: Optional[float] = 1.15,
+        contexts: Optional[Mapping[str, list[str]]] = None,
+        global_context: str | None = None,
+        sinks: Sequence[CaptionSink] = (),
+        on_progress: Optional[Callable[[CaptionProgress], Any]] = None,
+        fields: Optional[Iterable[str]] = None,
+    ) -> AsyncIterator[PerspectiveCaptionResult]:
+        """
+        Caption a stream of images across the worker processes, yielding results as chunks complete.
+
+        Takes the same arguments as ``BaseCaptionProcessor.process_stream``. Sinks and progress
+        callbacks run in the calling process.
+
+        Yields:
+            Caption result for each image, in chunk completion order
+        """
+        loop = asyncio.get_running_loop()
+        options = {
+            "max_concurrent": self.max_concurrent,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "top_p": top_p,
+            "repetition_penalty": repetition_penalty,
+            "global_context": global_context,
+            "fields": sorted(fields) if fields is not None else None,
+        }
+        progress = CaptionProgress()
+        max_in_flight = self.processes * 2
+        in_flight: Set[asyncio.Future] = set()
+        images_iter = aiter(self._chunks(images))
+
+        def submit(chunk: List[str]) -> None:
+            chunk_options = dict(options)
+            if contexts:
+                chunk_options["contexts"] = {
+                    Path(path).name: contexts[Path(path).name] for path in chunk if Path(path).name in contexts
+                }
+            progress.submitted += len(chunk)
+            in_flight.add(loop.run_in_executor(self._executor, _caption_chunk, processor, chunk, model, chunk_options))
+
+        try:
+            exhausted = False
+            while True:
+                while not exhausted and len(in_flight) < max_in_flight:
+                    try:
+                        submit(await anext(images_iter))
+                    except StopAsyncIteration:
+                        exhausted = True
+                if not in_flight:
+                    break
+
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    in_flight.discard(future)
+                    for result in future.result():
+                        if "error" in result["parsed"]:
+                            progress.failed += 1
+                        else:
+                            progress.completed += 1
+                        for sink in sinks:
+                            await sink.write(result)
+                        if on_progress:
+                            on_progress(progress)
+                        yield result
+        finally:
+            for future in in_flight:
+                future.cancel()
+            for sink in sinks:
+                await sink.close()
+
+    async def _chunks(self, images: ImagePaths) -> AsyncIterator[List[str]]:
+        """Group image paths into chunks of ``chunk_size``."""
+        chunk: List[str] = []
+        async for image in iterate_images(images):
+            chunk.append(str(image))
+            if len(chunk) >= self.chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker processes."""
+        logger.debug(f"Shutting down {self.processes} caption worker processes")
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+
+    def __enter__(self) -> "ProcessPoolCaptioner":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.shutdown()
@@ -8,15 +8,66 @@ dynamically created schema models and implements conversion methods.
 
 import json
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional
 
 from loguru import logger
-from pydantic import Field, create_model
 from rich.table import Table
 from typing_extensions import override
 
-from .base import BasePerspective, PerspectiveData
+from .base import BasePerspective
 from .models import PerspectiveConfig
+from .projection import project_config
+from .schema import get_schema_artifacts
+
+
+def format_list_item(item: Any) -> str:
+    """
+    Render one item of a list field as text.
+
+    Items of complex list fields are objects; they render as their first value
+    followed by the others in parentheses, e.g. ``tree (object, 0.9)``.
+
+    Args:
+        item: A list item, either a scalar or a mapping of nested field values
+
+    Returns:
+        The item as text
+    """
+    if hasattr(item, "model_dump"):
+        item = item.model_dump()
+    if isinstance(item, dict):
+        values = [format_list_item(value) for value in item.values()]
+        if len(values) > 1:
+            return f"{values[0]} ({', '.join(values[1:])})"
+        return values[0] if values else ""
+    if isinstance(item, list):
+        return ", ".join(format_list_item(value) for value in item)
+    return str(item)
+
+
+# Processors rebuilt from pickled state, keyed by configuration content hash
+_processor_cache: Dict[str, "JsonPerspectiveProcessor"] = {}
+
+
+def restore_processor(config: PerspectiveConfig, config_hash: str) -> "JsonPerspectiveProcessor":
+    """
+    Rebuild a processor from its configuration, reusing an existing one with the same content.
+
+    Used when unpickling processors in worker processes, so each worker builds the
+    schema model for a configuration at most once.
+
+    Args:
+        config: The perspective configuration
+        config_hash: Content hash of the configuration
+
+    Returns:
+        Processor for the configuration
+    """
+    processor = _processor_cache.get(config_hash)
+    if processor is None:
+        processor = JsonPerspectiveProcessor(config)
+        _processor_cache[config_hash] = processor
+    return processor
 
 
 class JsonPerspectiveProcessor(BasePerspective):
@@ -24,7 +75,8 @@ class JsonPerspectiveProcessor(BasePerspective):
     Processor for perspectives defined in JSON configuration files.
 
     This class dynamically creates schema models and implements methods
-    based on the configuration provided in the JSON file.
+    based on the configuration provided in the JSON file. Instances pickle
+    as their configuration so they can be sent to worker processes.
     """
 
     def __init__(self, config: PerspectiveConfig):
@@ -32,35 +84,35 @@ class JsonPerspectiveProcessor(BasePerspective):
         self.config = config
         self.display_name = config.display_name
 
-        # Dynamically create schema model from JSON definition
-        schema_fields = {}
-        for field in config.schema_fields:
-            field_type = self._get_field_type(field.type, field.is_list)
-            schema_fields[field.name] = (field_type, Field(description=field.description))
-
-        # Create the schema model dynamically
-        schema_class = create_model(f"{config.name.capitalize()}Schema", __base__=PerspectiveData, **schema_fields)
+        # Schema model, JSON schema and response format are shared per config content
+        self.schema_artifacts = get_schema_artifacts(config)
+        self._projections: Dict[FrozenSet[str], "JsonPerspectiveProcessor"] = {}
 
         super().__init__(
             config_name=config.name,
             version=config.version,
             prompt=config.prompt,
-            schema=schema_class,
+            schema=self.schema_artifacts.model,
+            response_format=self.schema_artifacts.response_format,
         )
 
-    def _get_field_type(self, type_name: str, is_list: bool) -> Any:
-        """Convert string type name to actual Python type."""
-        type_map = {
-            "str": str,
-            "int": int,
-            "float": float,
-            "bool": bool,
-        }
+    def __reduce__(self):
+        """Pickle by configuration; the dynamic schema model is rebuilt on load."""
+        return restore_processor, (self.config, self.config_hash)
 
-        base_type = type_map.get(type_name, str)
-        if is_list:
-            return List[base_type]
-        return base_type
+    @override
+    def project(self, fields: Optional[Iterable[str]]) -> "JsonPerspectiveProcessor":
+        """Get a processor whose schema and prompt cover only the selected fields."""
+        if fields is None:
+            return self
+
+        selected = frozenset(fields)
+        processor = self._projections.get(selected)
+        if processor is None:
+            projected_config = project_config(self.config, selected)
+            processor = self if projected_config is self.config else JsonPerspectiveProcessor(projected_config)
+            self._projections[selected] = processor
+        return processor
 
     @override
     def create_rich_table(self, caption_data: Dict[str, Any]) -> Table:
@@ -81,12 +133,12 @@ class JsonPerspectiveProcessor(BasePerspective):
 
             # Format list values if needed
             if field.is_list and isinstance(field_value, list):
-                field_value = "\n".join(f"• {item}" for item in field_value)
+                field_value = "\n".join(f"• {format_list_item(item)}" for item in field_value)
 
             rows.append(field_value)
 
         table.add_row(*rows)
-        logger.info(f"Generated {self.display_name} for {caption_data['filename']}")
+        logger.debug("Generated {} for {}", self.display_name, caption_data["filename"])
         return table
 
     @override
@@ -130,7 +182,7 @@ class JsonPerspectiveProcessor(BasePerspective):
 
             # Format list values if needed
             if field.is_list and isinstance(field_value, list):
-                field_value = ", ".join(field_value)
+                field_value = ", ".join(format_list_item(item) for item in field_value)
 
             output[field_name] = field_value
 
@@ -149,7 +201,7 @@ class JsonPerspectiveProcessor(BasePerspective):
 
             # Format list values if needed
             if field.is_list and isinstance(field_value, list):
-                field_value = ", ".join(field_value)
+                field_value = ", ".join(format_list_item(item) for item in field_value)
 
             # Replace placeholder with value
             placeholder = f"{{{field_name}}}"
@@ -196,3 +248,8 @@ class JsonPerspectiveProcessor(BasePerspective):
     def priority(self) -> int:
         """Get the perspective priority."""
         return self.config.priority
+
+    @property
+    def config_hash(self) -> str:
+        """Get the content hash of the perspective configuration."""
+        return self.schema_artifacts.config_hash
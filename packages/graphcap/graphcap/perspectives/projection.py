@@ -0,0 +1,129 @@
+"""
+# SPDX-License-Identifier: Apache-2.0
+Perspective Projection Module
+
+Derives perspective configurations restricted to a subset of output fields.
+
+A projection keeps only the selected schema fields and removes the numbered
+prompt sections that ask for the dropped ones, so the model generates only what
+the caller needs. Projections are cached per (configuration, field set).
+"""
+
+import re
+from typing import Dict, FrozenSet, Iterable, List, Tuple
+
+from loguru import logger
+
+from .models import PerspectiveConfig
+from .schema import compute_config_hash
+
+# Numbered prompt sections such as "2. Short Caption: ..." or "3. **Lighting**: ..."
+_SECTION_PATTERN = re.compile(r"^([ \t]*)(\d+)\.\s+(?:\*\*)?([^:*\n]+?)(?:\*\*)?\s*:", re.MULTILINE)
+
+# Projected configurations keyed by (configuration content hash, selected fields)
+_projection_cache: Dict[Tuple[str, FrozenSet[str]], PerspectiveConfig] = {}
+
+
+def _normalize(text: str) -> str:
+    """Normalize a section title or field name for comparison."""
+    return re.sub(r"[^a-z0-9]+", "_", text.lower()).strip("_")
+
+
+def _words(name: str) -> FrozenSet[str]:
+    """Split a normalized name into its significant words."""
+    return frozenset(word for word in name.split("_") if word and word != "and")
+
+
+def _section_field(title: str, field_names: List[str]) -> str | None:
+    """Find the schema field a prompt section title refers to, if any."""
+    key = _normalize(title)
+    if key in field_names:
+        return key
+
+    # Fall back to word overlap, e.g. "Tags" -> tags_list, "Camera Type & Film Stock" -> camera_and_film
+    title_words = _words(key)
+    for name in field_names:
+        field_words = _words(name)
+        if title_words <= field_words or field_words <= title_words:
+            return name
+    return None
+
+
+def trim_prompt(prompt: str, field_names: List[str], selected: FrozenSet[str]) -> str:
+    """
+    Remove top-level numbered prompt sections that describe unselected fields.
+
+    Sections that cannot be matched to a field are kept, so instructions that are
+    not tied to a single field survive. Remaining sections are renumbered.
+
+    Args:
+        prompt: The perspective prompt
+        field_names: Names of all top-level schema fields
+        selected: Names of the fields to keep
+
+    Returns:
+        The trimmed prompt
+    """
+    matches = [match for match in _SECTION_PATTERN.finditer(prompt) if not match.group(1)]
+    if not matches:
+        return prompt
+
+    parts = [prompt[: matches[0].start()]]
+    number = 1
+    for index, match in enumerate(matches):
+        end = matches[index + 1].start() if index + 1 < len(matches) else len(prompt)
+        section = prompt[match.start() : end]
+        field_name = _section_field(match.group(3), field_names)
+        if field_name is not None and field_name not in selected:
+            # The final section also carries any closing instructions; keep those
+            if index + 1 == len(matches) and "\n\n" in section.strip("\n"):
+                parts.append(section.strip("\n").split("\n\n", 1)[1])
+            continue
+        parts.append(f"{number}" + section[match.end(2) - match.start() :])
+        number += 1
+    return "".join(parts)
+
+
+def project_config(config: PerspectiveConfig, fields: Iterable[str]) -> PerspectiveConfig:
+    """
+    Get the configuration of a perspective restricted to the selected output fields.
+
+    Args:
+        config: The perspective configuration
+        fields: Names of the top-level schema fields to keep
+
+    Returns:
+        Projected configuration, shared by every caller selecting the same fields
+
+    Raises:
+        ValueError: If no fields are selected or a field is not part of the perspective
+    """
+    selected = frozenset(fields)
+    field_names = [schema_field.name for schema_field in config.schema_fields]
+    if not selected:
+        raise ValueError(f"No fields selected for perspective '{config.name}'")
+    unknown = sorted(selected.difference(field_names))
+    if unknown:
+        raise ValueError(f"Unknown fields for perspective '{config.name}': {unknown}. Available fields: {field_names}")
+    if selected == frozenset(field_names):
+        return config
+
+    cache_key = (compute_config_hash(config), selected)
+    projected = _projection_cache.get(cache_key)
+    if projected is None:
+        logger.debug(f"Projecting perspective '{config.name}' onto fields {sorted(selected)}")
+        kept = [schema_field for schema_field in config.schema_fields if schema_field.name in selected]
+        projected = config.model_copy(
+            update={
+                "prompt": trim_prompt(config.prompt, field_names, selected),
+                "schema_fields": kept,
+            },
+            deep=True,
+        )
+        _projection_cache[cache_key] = projected
+    return projected
+
+
+def clear_projection_cache() -> None:
+    """Clear the projection cache."""
+    _projection_cache.clear()
@@ -0,0 +1,312 @@
+"""
+# SPDX-License-Identifier: Apache-2.0
+Perspective Scheduler Module
+
+Runs perspectives and the synthesizer as a dependency graph per image.
+
+Every image gets its own small DAG: perspectives have no dependencies and the
+synthesizer depends on all of them. All images share one global concurrency
+budget, so synthesis for an image starts as soon as its own perspectives finish
+instead of waiting for the whole dataset, and results stream out per image.
+"""
+
+import asyncio
+import heapq
+import itertools
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from loguru import logger
+
+from ..providers.clients.base_client import BaseClient
+from .base_caption import BaseCaptionProcessor, ImagePaths, iterate_images
+from .types import ImageCaptionResult, PerspectiveCaptionResult
+
+
+@dataclass(frozen=True)
+class PerspectiveNode:
+    """
+    A perspective in the per-image dependency graph.
+
+    Attributes:
+        name (str): Unique name of the node
+        processor (BaseCaptionProcessor): Processor that produces the caption
+        depends_on (Tuple[str, ...]): Names of nodes whose contexts feed this node
+        fields (Optional[Tuple[str, ...]]): Output fields to generate, defaults to the full schema
+        priority (int): Order among ready nodes of the same depth (lower runs first)
+    """
+
+    name: str
+    processor: BaseCaptionProcessor
+    depends_on: Tuple[str, ...] = ()
+    fields: Optional[Tuple[str, ...]] = None
+    priority: int = 0
+
+
+class _PriorityLimiter:
+    """Concurrency limiter that hands free slots to the waiter with the lowest priority key."""
+
+    def __init__(self, limit: int):
+        self._available = limit
+        self._waiters: List[Tuple[Tuple[int, ...], int, asyncio.Future]] = []
+        self._counter = itertools.count()
+
+    @asynccontextmanager
+    async def slot(self, priority: Tuple[int, ...]):
+        await self._acquire(priority)
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self, priority: Tuple[int, ...]) -> None:
+        if self._available > 0 and not self._waiters:
+            self._available -= 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), waiter))
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # A slot handed over just before cancellation must be passed on
+            if waiter.done() and not waiter.cancelled():
+                self._release()
+            raise
+
+    def _release(self) -> None:
+        while self._waiters:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._available += 1
+
+
+async def _completed(result: PerspectiveCaptionResult) -> PerspectiveCaptionResult:
+    """Wrap a reused result so it can stand in for a node task."""
+    return result
+
+
+def build_perspective_dag(
+    perspectives: Mapping[str, BaseCaptionProcessor],
+    synthesizer: Optional[BaseCaptionProcessor] = None,
+    synthesizer_name: str = "synthesized_caption",
+) -> List[PerspectiveNode]:
+    """
+    Build the per-image graph for a set of perspectives and an optional synthesizer.
+
+    Args:
+        perspectives: Perspective processors by name
+        synthesizer: Processor that synthesizes the perspective contexts
+        synthesizer_name: Node name for the synthesizer
+
+    Returns:
+        Graph nodes in dependency order
+    """
+    nodes = [PerspectiveNode(name=name, processor=processor) for name, processor in perspectives.items()]
+    if synthesizer is not None:
+        nodes.append(PerspectiveNode(name=synthesizer_name, processor=synthesizer, depends_on=tuple(perspectives)))
+    return nodes
+
+
+class PerspectiveScheduler:
+    """
+    Schedules perspective graphs for many images under one concurrency budget.
+
+    Free request slots go to the deepest ready node, then to the node with the lowest
+    priority, then to the earliest admitted image, so images complete roughly in
+    admission order and synthesis never queues behind perspectives of later images.
+
+    Attributes:
+        provider (BaseClient): Vision AI provider client
+        model (str): Model name to use for processing
+        max_concurrent (int): Maximum number of concurrent provider requests
+        max_images_in_flight (int): Maximum number of images admitted but not yet consumed
+    """
+
+    def __init__(
+        self,
+        provider: BaseClient,
+        model: str,
+        nodes: Sequence[PerspectiveNode],
+        max_concurrent: int = 8,
+        max_images_in_flight: Optional[int] = None,
+        global_context: Optional[str] = None,
+        synthesizer_name: str = "synthesized_caption",
+        max_tokens: Optional[int] = 4096,
+        temperature: Optional[float] = 0.8,
+        top_p: Optional[float] = 0.9,
+        repetition_penalty: Optional[float] = 1.15,
+    ):
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent must be at least 1")
+
+        self.provider = provider
+        self.model = model
+        self.max_concurrent = max_concurrent
+        self.max_images_in_flight = max_images_in_flight or max_concurrent * 2
+        self.global_context = global_context
+        self.synthesizer_name = synthesizer_name
+        self._generation_options: Dict[str, Any] = {
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "top_p": top_p,
+            "repetition_penalty": repetition_penalty,
+        }
+
+        self._nodes = self._order_nodes(nodes)
+        self._processors = {node.name: node.processor for node in self._nodes}
+        self._depths: Dict[str, int] = {}
+        for node in self._nodes:
+            self._depths[node.name] = 1 + max((self._depths[dep] for dep in node.depends_on), default=-1)
+
+    @property
+    def generation_options(self) -> Dict[str, Any]:
+        """Generation options sent with every request."""
+        return dict(self._generation_options)
+
+    @staticmethod
+    def _order_nodes(nodes: Sequence[PerspectiveNode]) -> List[PerspectiveNode]:
+        """Return nodes in topological order, validating the graph."""
+        by_name = {node.name: node for node in nodes}
+        if len(by_name) != len(nodes):
+            raise ValueError("Perspective node names must be unique")
+
+        ordered: List[PerspectiveNode] = []
+        visiting: set[str] = set()
+        visited: set[str] = set()
+
+        def visit(name: str) -> None:
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"Perspective graph has a cycle through '{name}'")
+            if name not in by_name:
+                raise ValueError(f"Unknown perspective dependency: {name}")
+            visiting.add(name)
+            for dep in by_name[name].depends_on:
+                visit(dep)
+            visiting.discard(name)
+            visited.add(name)
+            ordered.append(by_name[name])
+
+        for node in nodes:
+            visit(node.name)
+        return ordered
+
+    async def run(
+        self,
+        image_paths: ImagePaths,
+        prior_results: Optional[Mapping[str, Mapping[str, PerspectiveCaptionResult]]] = None,
+    ) -> AsyncIterator[ImageCaptionResult]:
+        """
+        Caption images through the perspective graph, yielding each image as it completes.
+
+        Args:
+            image_paths: Sync or async iterable of image paths
+            prior_results: Results to reuse instead of calling the provider, by image
+                path and node name; reused results also feed dependent nodes
+
+        Yields:
+            ImageCaptionResult for each image, in completion order
+        """
+        limiter = _PriorityLimiter(self.max_concurrent)
+        admission = asyncio.Semaphore(self.max_images_in_flight)
+        results: asyncio.Queue = asyncio.Queue()
+        finished = object()
+
+        async def run_admitted(image_path: Path, index: int) -> None:
+            prior = prior_results.get(str(image_path), {}) if prior_results else {}
+            await results.put(await self._run_image(image_path, index, limiter, prior))
+
+        async def feed() -> None:
+            try:
+                async with asyncio.TaskGroup() as group:
+                    index = 0
+                    async for image_path in iterate_images(image_paths):
+                        await admission.acquire()
+                        group.create_task(run_admitted(Path(image_path), index))
+                        index += 1
+            finally:
+                results.put_nowait(finished)
+
+        feeder = asyncio.create_task(feed())
+        try:
+            while True:
+                item = await results.get()
+                if item is finished:
+                    break
+                admission.release()
+                yield item
+            # Surface errors raised while iterating the image paths
+            await feeder
+        finally:
+            if not feeder.done():
+                feeder.cancel()
+                await asyncio.gather(feeder, return_exceptions=True)
+
+    async def _run_image(
+        self,
+        image_path: Path,
+        index: int,
+        limiter: _PriorityLimiter,
+        prior: Mapping[str, PerspectiveCaptionResult],
+    ) -> ImageCaptionResult:
+        """Run every node of the graph for a single image."""
+        tasks: Dict[str, asyncio.Task] = {}
+        for node in self._nodes:
+            if node.name in prior:
+                tasks[node.name] = asyncio.create_task(_completed(prior[node.name]))
+            else:
+                tasks[node.name] = asyncio.create_task(self._run_node(node, image_path, index, tasks, limiter))
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            raise
+
+        perspectives = {name: task.result() for name, task in tasks.items()}
+        synthesis = perspectives.pop(self.synthesizer_name, None)
+        logger.debug("Completed perspective graph for {}", image_path)
+        return {"image_path": str(image_path), "perspectives": perspectives, "synthesis": synthesis}
+
+    async def _run_node(
+        self,
+        node: PerspectiveNode,
+        image_path: Path,
+        index: int,
+        tasks: Mapping[str, asyncio.Task],
+        limiter: _PriorityLimiter,
+    ) -> PerspectiveCaptionResult:
+        """Wait for a node's dependencies, then caption the image with its processor."""
+        contexts = []
+        for dep in node.depends_on:
+            upstream: PerspectiveCaptionResult = await tasks[dep]
+            if "error" not in upstream["parsed"]:
+                contexts.append(self._processors[dep].to_context(upstream))
+
+        if node.depends_on and not contexts:
+            error = {"error": f"No successful inputs for {node.name}"}
+            return node.processor.build_caption_result(self.provider, image_path, self.model, error)
+
+        async with limiter.slot((-self._depths[node.name], node.priority, index)):
+            try:
+                parsed = await node.processor.process_single(
+                    provider=self.provider,
+                    image_path=image_path,
+                    model=self.model,
+                    context=contexts or None,
+                    global_context=self.global_context,
+                    fields=node.fields,
+                    **self._generation_options,
+                )
+            except Exception as e:
+                logger.error(f"Error processing {image_path} with {node.name}: {e}")
+                parsed = {"error": str(e)}
+
+        return node.processor.build_caption_result(self.provider, image_path, self.model, parsed)
@@ -0,0 +1,225 @@
+"""
+# SPDX-License-Identifier: Apache-2.0
+Perspective Schema Module
+
+Builds and caches the schema artifacts derived from a perspective configuration.
+
+Every artifact a caption request needs (pydantic model, JSON schema, strict
+response_format payload and validator) is computed once per configuration and
+shared by content hash, so no schema work remains on the request path.
+"""
+
+import hashlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from loguru import logger
+from pydantic import BaseModel, Field, create_model
+
+from .base import PerspectiveData
+from .models import PerspectiveConfig, SchemaField
+
+# Mapping of perspective config type names to Python types
+FIELD_TYPE_MAP: Dict[str, type] = {
+    "str": str,
+    "int": int,
+    "float": float,
+    "bool": bool,
+}
+
+
+@dataclass(frozen=True)
+class PerspectiveSchemaArtifacts:
+    """
+    Precomputed schema artifacts for a perspective configuration.
+
+    Attributes:
+        config_hash (str): Content hash of the configuration the artifacts were built from
+        model (type[PerspectiveData]): Pydantic model used to validate responses
+        json_schema (Dict[str, Any]): JSON schema of the model
+        response_format (Dict[str, Any]): Strict ``response_format`` payload for chat completions
+    """
+
+    config_hash: str
+    model: type[PerspectiveData]
+    json_schema: Dict[str, Any] = field(repr=False)
+    response_format: Dict[str, Any] = field(repr=False)
+
+    def validate_json(self, data: str | bytes) -> PerspectiveData:
+        """Validate a raw JSON response against the perspective model."""
+        return self.model.model_validate_json(data)
+
+
+# Artifacts keyed by configuration content hash
+_artifact_cache: Dict[str, PerspectiveSchemaArtifacts] = {}
+
+
+def compute_config_hash(config: PerspectiveConfig) -> str:
+    """
+    Compute a stable content hash for a perspective configuration.
+
+    Args:
+        config: The perspective configuration
+
+    Returns:
+        Hex digest identifying the configuration content
+    """
+    return hashlib.sha256(config.model_dump_json().encode("utf-8")).hexdigest()
+
+
+def _model_name(name: str) -> str:
+    """Convert a snake_case name into a CamelCase model name."""
+    return "".join(part.capitalize() for part in name.split("_") if part)
+
+
+def get_field_type(schema_field: SchemaField, parent_name: str) -> Any:
+    """
+    Convert a schema field definition into a Python type annotation.
+
+    Complex fields (``is_complex`` with nested ``fields``) become nested models.
+
+    Args:
+        schema_field: The field definition
+        parent_name: Name of the enclosing model, used to name nested models
+
+    Returns:
+        Type annotation for the field
+    """
+    base_type: Any
+    if schema_field.is_complex and schema_field.fields:
+        base_type = build_model(
+            f"{parent_name}{_model_name(schema_field.name)}",
+            schema_field.fields,
+            base=BaseModel,
+        )
+    elif isinstance(schema_field.type, str):
+        base_type = FIELD_TYPE_MAP.get(schema_field.type, str)
+    else:
+        base_type = str
+
+    if schema_field.is_list:
+        return List[base_type]
+    return base_type
+
+
+def build_model(model_name: str, fields: List[SchemaField], base: type[BaseModel] = PerspectiveData) -> type[BaseModel]:
+    """
+    Dynamically create a pydantic model from schema field definitions.
+
+    Args:
+        model_name: Name of the model to create
+        fields: Field definitions for the model
+        base: Base class for the model
+
+    Returns:
+        The created model class
+    """
+    model_fields = {
+        schema_field.name: (get_field_type(schema_field, model_name), Field(description=schema_field.description))
+        for schema_field in fields
+    }
+    return create_model(model_name, __base__=base, **model_fields)
+
+
+def _strict_schema(schema: Dict[str, Any], defs: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convert a JSON schema node to the strict subset accepted by structured outputs.
+
+    Objects forbid additional properties and require every property, nullable
+    ``None`` defaults are dropped, and references carrying sibling keywords, such as
+    a field description, are inlined since strict mode does not allow them.
+
+    Args:
+        schema: JSON schema node
+        defs: Definitions of the root schema, for resolving references
+
+    Returns:
+        The strict schema node
+    """
+    schema = dict(schema)
+    if "$ref" in schema and len(schema) > 1:
+        ref = schema.pop("$ref")
+        schema = {**defs[ref.rsplit("/", 1)[-1]], **schema}
+    if "default" in schema and schema["default"] is None:
+        del schema["default"]
+    if schema.get("type") == "object":
+        schema["additionalProperties"] = False
+        if "properties" in schema:
+            schema["properties"] = {name: _strict_schema(value, defs) for name, value in schema["properties"].items()}
+            schema["required"] = list(schema["properties"])
+    if isinstance(schema.get("items"), dict):
+        schema["items"] = _strict_schema(schema["items"], defs)
+    for keyword in ("anyOf", "allOf"):
+        if keyword in schema:
+            schema[keyword] = [_strict_schema(variant, defs) for variant in schema[keyword]]
+    if "$defs" in schema:
+        schema["$defs"] = {name: _strict_schema(value, defs) for name, value in schema["$defs"].items()}
+    return schema
+
+
+def build_response_format(model: type[BaseModel]) -> Dict[str, Any]:
+    """
+    Build the strict ``json_schema`` response format of a model.
+
+    This is the payload beta.chat.completions.parse would send for the model, built
+    from its JSON schema once instead of on every call.
+
+    Args:
+        model: Pydantic model of the response
+
+    Returns:
+        Response format for chat completions
+    """
+    json_schema = model.model_json_schema()
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "schema": _strict_schema(json_schema, json_schema.get("$defs", {})),
+            "name": model.__name__,
+            "strict": True,
+        },
+    }
+
+
+def build_schema_artifacts(config: PerspectiveConfig, config_hash: Optional[str] = None) -> PerspectiveSchemaArtifacts:
+    """
+    Build the schema artifacts for a perspective configuration without caching.
+
+    Args:
+        config: The perspective configuration
+        config_hash: Precomputed content hash of the configuration
+
+    Returns:
+        Freshly built schema artifacts
+    """
+    model = build_model(f"{config.name.capitalize()}Schema", config.schema_fields)
+    return PerspectiveSchemaArtifacts(
+        config_hash=config_hash or compute_config_hash(config),
+        model=model,
+        json_schema=model.model_json_schema(),
+        response_format=build_response_format(model),
+    )
+
+
+def get_schema_artifacts(config: PerspectiveConfig) -> PerspectiveSchemaArtifacts:
+    """
+    Get the schema artifacts for a perspective configuration, building them on first use.
+
+    Args:
+        config: The perspective configuration
+
+    Returns:
+        Cached schema artifacts for the configuration content
+    """
+    config_hash = compute_config_hash(config)
+    artifacts = _artifact_cache.get(config_hash)
+    if artifacts is None:
+        logger.debug(f"Building schema artifacts for perspective '{config.name}' ({config_hash[:12]})")
+        artifacts = build_schema_artifacts(config, config_hash)
+        _artifact_cache[config_hash] = artifacts
+    return artifacts
+
+
+def clear_schema_cache() -> None:
+    """Clear the schema artifact cache."""
+    _artifact_cache.clear()
@@ -0,0 +1,397 @@
+"""
+# SPDX-License-Identifier: Apache-2.0
+Caption Sinks Module
+
+Provides pluggable destinations for streamed caption results.
+
+Sinks receive every result produced by ``BaseCaptionProcessor.process_stream``
+as it completes, so output is persisted incrementally instead of being held
+in memory until a batch finishes.
+"""
+
+import asyncio
+import dataclasses
+import io
+import json
+import os
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Any, Awaitable, Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+from .types import PerspectiveCaptionResult
+
+
+class CaptionSink(ABC):
+    """Base class for caption result destinations."""
+
+    @abstractmethod
+    async def write(self, result: PerspectiveCaptionResult) -> None:
+        """Write a single caption result."""
+        pass
+
+    async def close(self) -> None:
+        """Flush pending results and release resources."""
+        pass
+
+    async def __aenter__(self) -> "CaptionSink":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+
+class JsonlCaptionSink(CaptionSink):
+    """
+    Appends caption results to a JSON Lines file.
+
+    The file is opened once and flushed every ``flush_every`` results.
+    """
+
+    def __init__(self, path: Union[str, Path], flush_every: int = 100):
+        self.path = Path(path)
+        self.flush_every = flush_every
+        self._file: Optional[IO[str]] = None
+        self._unflushed = 0
+
+    async def write(self, result: PerspectiveCaptionResult) -> None:
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = self.path.open("a", encoding="utf-8")
+
+        self._file.write(json.dumps(result) + "\n")
+        self._unflushed += 1
+        if self._unflushed >= self.flush_every:
+            self._file.flush()
+            self._unflushed = 0
+
+    async def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._unflushed = 0
+
+
+@dataclass
+class CaptionSinkStats:
+    """
+    Counts of results written by a sink.
+
+    Attributes:
+        written (int): Results written
+        failed (int): Written results that carry an error payload
+    """
+
+    written: int = 0
+    failed: int = 0
+
+    @property
+    def succeeded(self) -> int:
+        """Written results without an error payload."""
+        return self.written - self.failed
+
+
+# Queue marker that stops the writer task of BufferedJsonlCaptionSink
+_CLOSE = object()
+
+
+class BufferedJsonlCaptionSink(CaptionSink):
+    """
+    Appends caption results to a JSON Lines file from a single writer task.
+
+    ``write`` only enqueues a result. One writer task serializes the results and
+    writes them in batches from a worker thread, so concurrent producers never
+    interleave lines or block the event loop on file I/O. A batch is written once
+    it holds ``batch_size`` results or its oldest result is ``flush_interval``
+    seconds old.
+
+    Every ``checkpoint_every`` results, on ``checkpoint()`` and on ``close()`` the
+    file is fsynced and ``on_checkpoint`` is called, from a worker thread, with the
+    counts written so far.
+
+    With ``compression="zstd"`` the file is zstd-compressed JSON Lines. Each
+    checkpoint ends a zstd frame, so everything up to the last checkpoint can be
+    read back even if the process dies. Requires zstandard.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        batch_size: int = 256,
+        flush_interval: float = 1.0,
+        checkpoint_every: int = 1000,
+        compression: Optional[str] = None,
+        max_pending: int = 4096,
+        on_checkpoint: Optional[Callable[[CaptionSinkStats], Any]] = None,
+    ):
+        if compression not in (None, "zstd"):
+            raise ValueError(f"Unsupported compression: {compression}")
+        self._zstd = None
+        if compression == "zstd":
+            try:
+                import zstandard
+            except ImportError:
+                raise ImportError(
+                    "Compressed caption output requires zstandard. Install it with 'pip install zstandard'."
+                )
+            self._zstd = zstandard
+
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.checkpoint_every = checkpoint_every
+        self.max_pending = max_pending
+        self.on_checkpoint = on_checkpoint
+        self.stats = CaptionSinkStats()
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer: Optional[asyncio.Task] = None
+        self._error: Optional[BaseException] = None
+        self._file: Optional[IO[bytes]] = None
+        self._stream: Optional[IO[bytes]] = None
+        self._since_checkpoint = 0
+
+    async def write(self, result: PerspectiveCaptionResult) -> None:
+        if self._writer is None:
+            self._queue = asyncio.Queue(maxsize=self.max_pending)
+            self._writer = asyncio.create_task(self._run())
+        if self._error is not None:
+            raise self._error
+        await self._queue.put(result)
+
+    async def checkpoint(self) -> CaptionSinkStats:
+        """
+        Write and fsync every result enqueued so far.
+
+        Returns:
+            Counts written so far
+        """
+        if self._writer is not None:
+            done = asyncio.get_running_loop().create_future()
+            await self._queue.put(done)
+            await done
+        return dataclasses.replace(self.stats)
+
+    async def close(self) -> None:
+        if self._writer is None:
+            return
+        writer, self._writer = self._writer, None
+        await self._queue.put(_CLOSE)
+        await writer
+        if self._error is not None:
+            raise self._error
+
+    async def _run(self) -> None:
+        """Drain the queue, writing batches and checkpoints until the sink is closed."""
+        loop = asyncio.get_running_loop()
+        lines: List[str] = []
+        failed = 0
+        deadline: Optional[float] = None
+
+        while True:
+            timeout = None if deadline is None else max(0.0, deadline - loop.time())
+            try:
+                item = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                item = None
+
+            if self._error is not None:
+                # Keep draining after a failure so producers never block on a full queue
+                if isinstance(item, asyncio.Future) and not item.done():
+                    item.set_exception(self._error)
+                if item is _CLOSE:
+                    return
+                continue
+
+            try:
+                if isinstance(item, dict):
+                    lines.append(json.dumps(item) + "\n")
+                    failed += "error" in item["parsed"]
+                    deadline = deadline or loop.time() + self.flush_interval
+                    if len(lines) < self.batch_size:
+                        continue
+
+                if lines:
+                    batch, batch_failed = lines, failed
+                    lines, failed, deadline = [], 0, None
+                    await asyncio.to_thread(self._write_batch, batch, batch_failed)
+                checkpoint_due = self._since_checkpoint >= self.checkpoint_every
+                if item is _CLOSE or isinstance(item, asyncio.Future) or checkpoint_due:
+                    await asyncio.to_thread(self._sync, item is _CLOSE)
+            except Exception as e:
+                self._error = e
+                lines = []
+            if isinstance(item, asyncio.Future) and not item.done():
+                if self._error is not None:
+                    item.set_exception(self._error)
+                else:
+                    item.set_result(None)
+            if item is _CLOSE:
+                return
+
+    def _write_batch(self, lines: List[str], failed: int) -> None:
+        """Write serialized results to the file, opening it on first use."""
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = self.path.open("ab")
+            self._stream = self._file
+            if self._zstd is None and _ends_mid_line(self.path):
+                # Terminate a line torn by an earlier crash so appended lines stay parseable
+                self._file.write(b"\n")
+            if self._zstd is not None:
+                self._stream = self._zstd.ZstdCompressor().stream_writer(self._file, closefd=False)
+
+        self._stream.write("".join(lines).encode("utf-8"))
+        if self._zstd is not None:
+            self._stream.flush(self._zstd.FLUSH_BLOCK)
+        self._file.flush()
+        self.stats.written += len(lines)
+        self.stats.failed += failed
+        self._since_checkpoint += len(lines)
+
+    def _sync(self, close: bool = False) -> None:
+        """Make written results durable, report the checkpoint and optionally close the file."""
+        if self._file is not None:
+            if self._zstd is not None:
+                self._stream.flush(self._zstd.FLUSH_FRAME)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        self._since_checkpoint = 0
+        if self.on_checkpoint is not None:
+            self.on_checkpoint(dataclasses.replace(self.stats))
+        if close and self._file is not None:
+            if self._stream is not self._file:
+                self._stream.close()
+            self._file.close()
+            self._file = self._stream = None
+
+
+def _ends_mid_line(path: Path) -> bool:
+    """Check whether a file has content after its last newline."""
+    with path.open("rb") as f:
+        if f.seek(0, os.SEEK_END) == 0:
+            return False
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) != b"\n"
+
+
+def _parse_caption_lines(lines: Iterable[str]) -> Iterator[PerspectiveCaptionResult]:
+    """Parse caption results from JSON Lines one line at a time, skipping torn lines."""
+    for line in lines:
+        try:
+            result = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(result, dict) and "parsed" in result:
+            yield result
+
+
+def read_caption_results(path: Union[str, Path]) -> Iterator[PerspectiveCaptionResult]:
+    """
+    Read caption results written by a JSON Lines sink.
+
+    Files are read line by line, so a large run is never held in memory. Files
+    ending in ``.zst`` are decompressed as a stream, which requires zstandard.
+    Lines torn by a crash are skipped, as is compressed data after a torn frame.
+
+    Args:
+        path: Path to a captions.jsonl or captions.jsonl.zst file
+
+    Yields:
+        Caption results in file order
+    """
+    path = Path(path)
+    if path.suffix == ".zst":
+        try:
+            import zstandard
+        except ImportError:
+            raise ImportError(
+                "Reading compressed caption output requires zstandard. Install it with 'pip install zstandard'."
+            )
+
+        with path.open("rb") as f, zstandard.ZstdDecompressor().stream_reader(f, read_across_frames=True) as reader:
+            lines = io.TextIOWrapper(reader, encoding="utf-8", errors="replace")
+            try:
+                yield from _parse_caption_lines(lines)
+            except zstandard.ZstdError:
+                pass
+    else:
+        with path.open("r", encoding="utf-8", errors="replace") as f:
+            yield from _parse_caption_lines(f)
+
+
+class ParquetCaptionSink(CaptionSink):
+    """
+    Writes caption results to a Parquet file in row groups of ``batch_size``.
+
+    The ``parsed`` payload is stored as a JSON string so results from different
+    perspectives share one schema. Requires pyarrow.
+    """
+
+    COLUMNS = ("filename", "config_name", "version", "model", "provider", "parsed")
+
+    def __init__(self, path: Union[str, Path], batch_size: int = 1000):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("ParquetCaptionSink requires pyarrow. Install it with 'pip install pyarrow'.")
+
+        self._pa = pa
+        self._pq = pq
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self._schema = pa.schema([(column, pa.string()) for column in self.COLUMNS])
+        self._writer = None
+        self._buffer: List[Dict[str, str]] = []
+
+    async def write(self, result: PerspectiveCaptionResult) -> None:
+        row = {column: str(result[column]) for column in self.COLUMNS[:-1]}
+        row["parsed"] = json.dumps(result["parsed"])
+        self._buffer.append(row)
+        if len(self._buffer) >= self.batch_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._buffer:
+            return
+        if self._writer is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._writer = self._pq.ParquetWriter(str(self.path), self._schema)
+        self._writer.write_table(self._pa.Table.from_pylist(self._buffer, schema=self._schema))
+        self._buffer = []
+
+    async def close(self) -> None:
+        self._flush()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+class CallbackCaptionSink(CaptionSink):
+    """
+    Hands caption results to an async callback in batches of ``batch_size``.
+
+    Useful for destinations such as a bulk database insert.
+    """
+
+    def __init__(
+        self,
+        write_batch: Callable[[List[PerspectiveCaptionResult]], Awaitable[None]],
+        batch_size: int = 100,
+    ):
+        self.write_batch = write_batch
+        self.batch_size = batch_size
+        self._buffer: List[PerspectiveCaptionResult] = []
+
+    async def write(self, result: PerspectiveCaptionResult) -> None:
+        self._buffer.append(result)
+        if len(self._buffer) >= self.batch_size:
+            await self._flush()
+
+    async def _flush(self) -> None:
+        if self._buffer:
+            batch, self._buffer = self._buffer, []
+            await self.write_batch(batch)
+
+    async def close(self) -> None:
+        await self._flush()
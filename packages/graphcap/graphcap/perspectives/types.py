@@ -2,7 +2,7 @@
 """Type definitions for perspectives assets."""
 
 from dataclasses import dataclass
-from typing import Any, Dict, List, TypedDict
+from typing import Any, Dict, List, Optional, TypedDict
 
 from pydantic import BaseModel
 
@@ -21,9 +21,31 @@ class PerspectiveCaptionResult(TypedDict):
 PerspectiveCaptionOutput = List[PerspectiveCaptionResult]
 
 
+class ImageCaptionResult(TypedDict):
+    """Type definition for all captions produced for a single image."""
+
+    image_path: str
+    perspectives: Dict[str, PerspectiveCaptionResult]
+    synthesis: Optional[PerspectiveCaptionResult]
+
+
+@dataclass
+class CaptionProgress:
+    """Running counters for a streamed caption batch."""
+
+    submitted: int = 0
+    completed: int = 0
+    failed: int = 0
+
+    @property
+    def processed(self) -> int:
+        return self.completed + self.failed
+
+
 @dataclass
 class StructuredVisionConfig:
     config_name: str
     version: str
     prompt: str
     schema: type[BaseModel]
+    response_format: Optional[Dict[str, Any]] = None
@@ -15,6 +15,7 @@ Key features:
 Components:
     clients: Provider-specific client implementations
     factory: Provider client factory
+    image_preprocessing: Provider-aware image resizing and re-encoding
     types: Common type definitions
 """
 
@@ -24,6 +25,13 @@ from .factory import (
     create_provider_client,
     get_provider_factory,
 )
+from .image_preprocessing import (
+    ImagePreprocessor,
+    ImageTokenModel,
+    PreparedImage,
+    get_token_model,
+    sniff_mime_type,
+)
 from .types import ProviderConfig, RateLimits
 
 __all__ = [
@@ -33,4 +41,9 @@ __all__ = [
     "clear_provider_cache",
     "ProviderConfig",
     "RateLimits",
+    "ImagePreprocessor",
+    "ImageTokenModel",
+    "PreparedImage",
+    "get_token_model",
+    "sniff_mime_type",
 ]
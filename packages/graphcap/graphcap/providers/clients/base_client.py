@@ -9,6 +9,7 @@ Key features:
 - Vision API support
 - Structured output handling
 - Base64 image processing
+- Provider-aware image preprocessing
 - Environment variable management
 
 Classes:
@@ -23,8 +24,10 @@ Classes:
 
 import asyncio
 import base64
+import binascii
 import time
 from abc import ABC, abstractmethod
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
@@ -32,6 +35,20 @@ from loguru import logger
 from openai import AsyncOpenAI
 from pydantic import BaseModel
 
+from ..image_preprocessing import ImagePreprocessor, sniff_mime_type
+
+# Image inputs accepted by vision requests: a file path, a data URL, a raw base64 string, or raw bytes
+ImageInput = str | Path | bytes
+
+# Shortest raw base64 string taken as an image; the smallest encoded images are longer
+MIN_BASE64_IMAGE_LENGTH = 64
+
+
+@lru_cache(maxsize=None)
+def _model_json_schema(schema: type[BaseModel]) -> dict:
+    """Generate the JSON schema for a model class once and reuse it."""
+    return schema.model_json_schema()
+
 
 class BaseClient(AsyncOpenAI, ABC):
     """Abstract base class for all provider clients"""
@@ -53,26 +70,59 @@ class BaseClient(AsyncOpenAI, ABC):
         self.requests_per_minute: int | None = None
         self.tokens_per_minute: int | None = None
 
+        # Optional provider-aware resizing and re-encoding of vision images
+        self.image_preprocessor: ImagePreprocessor | None = None
+
     @abstractmethod
-    def _format_vision_content(self, text: str, image_data: str) -> list[dict]:
+    def _format_vision_content(self, text: str, image_data: str, mime_type: str = "image/jpeg") -> list[dict]:
         """Format the vision content according to provider specifications"""
         pass
 
+    @staticmethod
+    def _image_mime_type(image_data: str) -> str:
+        """Detect the MIME type of base64 encoded image data"""
+        return sniff_mime_type(base64.b64decode(image_data[:24]))
+
     def _get_schema_from_input(self, schema: dict | type[BaseModel] | BaseModel) -> dict:
         """Convert input schema to JSON Schema dict"""
         if isinstance(schema, dict):
             return schema
         elif isinstance(schema, type) and issubclass(schema, BaseModel):
-            return schema.model_json_schema()
+            return _model_json_schema(schema)
         elif isinstance(schema, BaseModel):
-            return schema.__class__.model_json_schema()
+            return _model_json_schema(schema.__class__)
         else:
             raise ValueError("Schema must be either a dict or a Pydantic model/instance")
 
     async def _get_base64_image(self, image_path: str | Path) -> str:
         """Helper method to convert image to base64"""
-        with open(image_path, "rb") as image_file:
-            return base64.b64encode(image_file.read()).decode("utf-8")
+        return base64.b64encode(await self._read_image(image_path)).decode("utf-8")
+
+    async def _read_image(self, image_path: str | Path) -> bytes:
+        """Helper method to read an image file without blocking the event loop"""
+        return await asyncio.to_thread(Path(image_path).read_bytes)
+
+    @staticmethod
+    def _decode_base64_image(image: str) -> bytes | None:
+        """Decode a raw base64 image string, or return None if the string may be a file path
+
+        Base64 may contain "/", so short strings, strings with a file extension, and strings
+        that do not decode to a known image format are all taken as paths. A mistyped path
+        then fails with FileNotFoundError instead of being sent as image bytes.
+        """
+        if len(image) < MIN_BASE64_IMAGE_LENGTH or Path(image).suffix:
+            return None
+        try:
+            if Path(image).is_file():
+                return None
+        except OSError:
+            # Base64 strings are usually longer than the maximum file name
+            pass
+        try:
+            data = base64.b64decode(image, validate=True)
+        except (binascii.Error, ValueError):
+            return None
+        return data if sniff_mime_type(data, default="") else None
 
     async def _enforce_rate_limits(self, token_count: int | None = None):
         """Enforce rate limits by waiting if necessary"""
@@ -109,49 +159,86 @@ class BaseClient(AsyncOpenAI, ABC):
     async def vision(
         self,
         prompt: str,
-        image: str | Path,
+        image: ImageInput,
         model: str,
         max_tokens: int = 4096,
         schema: BaseModel | None = None,
         repetition_penalty: float | None = 1.15,
         temperature: float | None = 0.8,
         top_p: float | None = 0.9,
+        response_format: dict | None = None,
         **kwargs,
     ):
-        """Create a vision completion with rate limiting"""
-        logger.info(f"Starting vision request for model: {model}")
-        logger.debug(f"Vision parameters - max_tokens: {max_tokens}, temperature: {temperature}, top_p: {top_p}")
+        """Create a vision completion with rate limiting
 
-        # Estimate token count - this is approximate
-        estimated_tokens = len(prompt.split()) + 1000  # Base tokens + image tokens
-        logger.debug(f"Estimated token count: {estimated_tokens}")
-
-        await self._enforce_rate_limits(estimated_tokens)
+        When a precomputed ``response_format`` is given alongside the schema, it is sent as-is
+        and the raw JSON content is left for the caller to validate, skipping per-call schema
+        generation. Raw image bytes are encoded in memory without touching disk. With an
+        ``image_preprocessor`` set, images are resized and re-encoded for the provider and model
+        before sending; the MIME type is always taken from the image content.
+        """
+        logger.debug("Starting vision request for model: {}", model)
+        logger.debug("Vision parameters - max_tokens: {}, temperature: {}, top_p: {}", max_tokens, temperature, top_p)
 
         # Handle image input
-        if isinstance(image, (str, Path)) and not str(image).startswith("data:"):
-            logger.debug(f"Loading image from path: {image}")
-            try:
-                image_data = await self._get_base64_image(image)
-                logger.debug("Successfully loaded and encoded image")
-            except Exception as e:
-                logger.error(f"Failed to load image from {image}: {str(e)}")
-                raise
-        else:
+        prepared = None
+        if isinstance(image, str) and image.startswith("data:"):
             logger.debug("Using provided base64 image data")
             image_data = image.split("base64,")[1] if "base64," in image else image
+            mime_type = image[5:].split(";", 1)[0] or self._image_mime_type(image_data)
+        else:
+            decoded = await asyncio.to_thread(self._decode_base64_image, image) if isinstance(image, str) else None
+            if isinstance(image, bytes):
+                logger.debug("Using {} bytes of in-memory image data", len(image))
+                raw_image = image
+            elif decoded is not None:
+                logger.debug("Using provided base64 image data")
+                raw_image = decoded
+            else:
+                logger.debug("Loading image from path: {}", image)
+                try:
+                    raw_image = await self._read_image(image)
+                except Exception as e:
+                    logger.error(f"Failed to load image from {image}: {str(e)}")
+                    raise
+
+            if self.image_preprocessor is not None:
+                prepared = await asyncio.to_thread(self.image_preprocessor.prepare, raw_image, self.kind, model)
+                raw_image = prepared.data
+            image_data = base64.b64encode(raw_image).decode("utf-8")
+            mime_type = prepared.mime_type if prepared else sniff_mime_type(raw_image)
+            logger.debug("Successfully loaded and encoded image")
+
+        # Estimate token count - this is approximate
+        image_tokens = prepared.tokens if prepared else 1000
+        estimated_tokens = len(prompt.split()) + image_tokens  # Base tokens + image tokens
+        logger.debug("Estimated token count: {}", estimated_tokens)
+
+        await self._enforce_rate_limits(estimated_tokens)
 
         # Get provider-specific message format
         try:
-            content = self._format_vision_content(prompt, image_data)
+            content = self._format_vision_content(prompt, image_data, mime_type)
             logger.debug("Successfully formatted vision content")
         except Exception as e:
             logger.error(f"Failed to format vision content: {str(e)}")
             raise
 
         try:
-            logger.debug(f"Making vision API call with schema: {'yes' if schema else 'no'}")
-            if schema:
+            logger.debug("Making vision API call with schema: {}", "yes" if schema else "no")
+            if schema and response_format:
+                completion = await self.chat.completions.create(
+                    model=model,
+                    messages=[{"role": "user", "content": content}],
+                    max_tokens=max_tokens,
+                    response_format=response_format,
+                    presence_penalty=repetition_penalty,
+                    temperature=temperature,
+                    top_p=top_p,
+                    timeout=180,
+                )
+                logger.debug("Successfully completed structured vision request")
+            elif schema:
                 completion = await self.beta.chat.completions.parse(
                     model=model,
                     messages=[{"role": "user", "content": content}],
@@ -162,7 +249,7 @@ class BaseClient(AsyncOpenAI, ABC):
                     top_p=top_p,
                     timeout=180,
                 )
-                logger.info("Successfully completed structured vision request")
+                logger.debug("Successfully completed structured vision request")
             else:
                 completion = await self.chat.completions.create(
                     model=model,
@@ -174,11 +261,11 @@ class BaseClient(AsyncOpenAI, ABC):
                     timeout=180,
                     **kwargs,
                 )
-                logger.info("Successfully completed unstructured vision request")
+                logger.debug("Successfully completed unstructured vision request")
             return completion
         except Exception as e:
             logger.error(f"Vision completion failed for provider {self.name}: {str(e)}")
-            logger.debug(f"Vision request details - model: {model}, base_url: {self.base_url}")
+            logger.debug("Vision request details - model: {}, base_url: {}", model, self.base_url)
             raise
 
     async def create_structured_completion(
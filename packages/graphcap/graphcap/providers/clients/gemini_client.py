@@ -36,12 +36,12 @@ class GeminiClient(BaseClient):
             api_key=api_key,
         )
 
-    def _format_vision_content(self, text: str, image_data: str) -> list[dict[str, Any]]:
+    def _format_vision_content(self, text: str, image_data: str, mime_type: str = "image/jpeg") -> list[dict[str, Any]]:
         """Format vision content for Gemini API"""
         # TODO: Add feature flag to handle gemini free tier rate limits instead of this hack
         return [
             {"type": "text", "text": text},
-            {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{image_data}"}},
+            {"type": "image_url", "image_url": {"url": f"data:{mime_type};base64,{image_data}"}},
         ]
 
     def create_structured_completion(
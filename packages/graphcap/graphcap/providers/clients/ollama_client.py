@@ -62,12 +62,12 @@ class OllamaClient(BaseClient):
         logger.debug(f"Using base URL {self._raw_base_url} for Ollama endpoints")
         logger.debug(f"Using base URL {self.base_url} for OpenAI-compatible endpoints")
 
-    def _format_vision_content(self, text: str, image_data: str) -> list[dict[str, Any]]:
+    def _format_vision_content(self, text: str, image_data: str, mime_type: str = "image/jpeg") -> list[dict[str, Any]]:
         """Format vision content for Ollama API"""
         logger.debug("Formatting vision content for Ollama API")
         return [
             {"type": "text", "text": text},
-            {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{image_data}"}},
+            {"type": "image_url", "image_url": {"url": f"data:{mime_type};base64,{image_data}"}},
         ]
 
     async def get_models(self):
@@ -39,11 +39,11 @@ class OpenAIClient(BaseClient):
             api_key=api_key,
         )
 
-    def _format_vision_content(self, text: str, image_data: str) -> list[dict[str, Any]]:
+    def _format_vision_content(self, text: str, image_data: str, mime_type: str = "image/jpeg") -> list[dict[str, Any]]:
         """Format vision content for OpenAI API"""
         return [
             {"type": "text", "text": text},
-            {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{image_data}"}},
+            {"type": "image_url", "image_url": {"url": f"data:{mime_type};base64,{image_data}"}},
         ]
 
     def create_structured_completion(
@@ -91,7 +91,7 @@ class OpenAIClient(BaseClient):
             image_data = image.split("base64,")[1] if "base64," in image else image
 
         # Get provider-specific message format
-        content = self._format_vision_content(prompt, image_data)
+        content = self._format_vision_content(prompt, image_data, self._image_mime_type(image_data))
 
         try:
             completion = self.chat.completions.create(
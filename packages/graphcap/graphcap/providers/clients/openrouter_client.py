@@ -43,11 +43,11 @@ class OpenRouterClient(BaseClient):
             api_key=api_key,
         )
 
-    def _format_vision_content(self, text: str, image_data: str) -> list[dict[str, Any]]:
+    def _format_vision_content(self, text: str, image_data: str, mime_type: str = "image/jpeg") -> list[dict[str, Any]]:
         """Format vision content for OpenRouter API"""
         return [
             {"type": "text", "text": text},
-            {"type": "image_url", "image_url": {"url": f"data:image/png;base64,{image_data}"}},
+            {"type": "image_url", "image_url": {"url": f"data:{mime_type};base64,{image_data}"}},
         ]
 
     async def _prepare_request(self, request, *args, **kwargs):
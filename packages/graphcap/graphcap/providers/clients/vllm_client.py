@@ -42,11 +42,11 @@ class VLLMClient(BaseClient):
             api_key=api_key,
         )
 
-    def _format_vision_content(self, text: str, image_data: str) -> list[dict[str, Any]]:
+    def _format_vision_content(self, text: str, image_data: str, mime_type: str = "image/jpeg") -> list[dict[str, Any]]:
         """Format vision content for VLLM API"""
         return [
             {"type": "text", "text": text},
-            {"type": "image_url", "image_url": {"url": f"data:image/jpeg;base64,{image_data}"}},
+            {"type": "image_url", "image_url": {"url": f"data:{mime_type};base64,{image_data}"}},
         ]
 
     async def create_structured_completion(
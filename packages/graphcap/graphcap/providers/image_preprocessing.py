@@ -0,0 +1,457 @@
+"""
+# SPDX-License-Identifier: Apache-2.0
+Image Preprocessing
+
+Prepares images for vision requests according to how each provider bills and
+processes them.
+
+Providers downscale images to their own limits and charge image tokens by tile
+or by pixel count, so sending pixels beyond those limits only costs upload bytes
+and prefill latency. The preprocessor resizes each image to the resolution the
+provider would actually use (or smaller, under an optional token budget),
+re-encodes it in the smallest format the provider accepts, and reports the MIME
+type and estimated image tokens.
+
+Key features:
+- Per-provider/model image token models
+- Resolution targeting under an optional token budget
+- Smallest-encoding selection among accepted formats, ranked on a thumbnail
+- Content-based MIME type detection
+- Running statistics of bytes and tokens saved
+
+Classes:
+    ImageTokenModel: How a provider sizes and bills images
+    PreparedImage: An image ready to send with its MIME type and token estimates
+    ImagePreprocessor: Prepares images for a provider and model
+"""
+
+import io
+import math
+import re
+import threading
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Optional, Tuple
+
+from loguru import logger
+
+try:
+    from PIL import Image, ImageOps, UnidentifiedImageError
+except ImportError:
+    Image = None
+
+# Leading byte signatures of the image formats accepted by the vision providers
+IMAGE_SIGNATURES: Tuple[Tuple[bytes, str], ...] = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"BM", "image/bmp"),
+    (b"II*\x00", "image/tiff"),
+    (b"MM\x00*", "image/tiff"),
+)
+
+MIME_TYPES = {"JPEG": "image/jpeg", "PNG": "image/png", "WEBP": "image/webp", "GIF": "image/gif"}
+
+# Formats considered when re-encoding, in order of preference on equal size
+ENCODE_FORMATS = ("WEBP", "JPEG", "PNG")
+
+# Format used when none of the candidates can hold the image; every provider accepts PNG
+FALLBACK_FORMAT = "PNG"
+
+# Longest side of the thumbnail the candidate formats are compared on
+PROBE_SIZE = 256
+
+# Size assumed for token estimates of images Pillow cannot decode
+UNDECODED_IMAGE_SIZE = (2048, 2048)
+
+EXIF_ORIENTATION = 0x0112
+# EXIF orientations that rotate the image by 90 or 270 degrees
+TRANSPOSED_ORIENTATIONS = (5, 6, 7, 8)
+
+
+def sniff_mime_type(data: bytes, default: str = "image/jpeg") -> str:
+    """
+    Detect the MIME type of encoded image data from its leading bytes.
+
+    Args:
+        data: Encoded image bytes (the first 12 bytes are enough)
+        default: MIME type returned when the format is not recognized
+
+    Returns:
+        The MIME type of the image
+    """
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    for signature, mime_type in IMAGE_SIGNATURES:
+        if data.startswith(signature):
+            return mime_type
+    return default
+
+
+@dataclass(frozen=True)
+class ImageTokenModel:
+    """
+    How a provider resizes and bills an image.
+
+    Images are first fitted within the size limits, as the provider would do itself.
+    Tokens are then counted per tile (``tile_size``) or per pixel (``pixels_per_token``).
+
+    Attributes:
+        name: Name of the token model
+        formats: Pillow format names the provider accepts
+        max_long_side: Longest side the provider keeps
+        max_short_side: Shortest side the provider keeps
+        max_pixels: Pixel count the provider keeps
+        tile_size: Edge length of a billing tile
+        tokens_per_tile: Tokens billed per tile
+        base_tokens: Tokens billed per image on top of the tiles
+        small_side: Images with both sides at most this size are billed small_tokens
+        small_tokens: Tokens billed for small images
+        pixels_per_token: Pixels per token for pixel-billed models
+    """
+
+    name: str
+    formats: Tuple[str, ...] = ("JPEG", "PNG")
+    max_long_side: Optional[int] = None
+    max_short_side: Optional[int] = None
+    max_pixels: Optional[int] = None
+    tile_size: Optional[int] = None
+    tokens_per_tile: int = 0
+    base_tokens: int = 0
+    small_side: Optional[int] = None
+    small_tokens: int = 0
+    pixels_per_token: Optional[int] = None
+
+    def fit(self, width: int, height: int) -> Tuple[int, int]:
+        """Get the size the provider downscales an image to."""
+        scale = 1.0
+        if self.max_long_side:
+            scale = min(scale, self.max_long_side / max(width, height))
+        if self.max_short_side:
+            scale = min(scale, self.max_short_side / min(width, height))
+        if self.max_pixels:
+            scale = min(scale, math.sqrt(self.max_pixels / (width * height)))
+        if scale >= 1.0:
+            return width, height
+        return max(1, int(width * scale)), max(1, int(height * scale))
+
+    def estimate_tokens(self, width: int, height: int) -> int:
+        """Estimate the image tokens billed for an image of the given size."""
+        width, height = self.fit(width, height)
+        if self.small_side and width <= self.small_side and height <= self.small_side:
+            return self.small_tokens
+        if self.tile_size:
+            tiles = math.ceil(width / self.tile_size) * math.ceil(height / self.tile_size)
+            return self.base_tokens + tiles * self.tokens_per_tile
+        if self.pixels_per_token:
+            return self.base_tokens + math.ceil(width * height / self.pixels_per_token)
+        return self.base_tokens
+
+    def target_size(self, width: int, height: int, max_tokens: Optional[int] = None) -> Tuple[int, int]:
+        """
+        Get the size to send an image at.
+
+        Args:
+            width: Width of the image
+            height: Height of the image
+            max_tokens: Optional budget of image tokens
+
+        Returns:
+            The fitted size, shrunk further until the estimate is within the budget
+        """
+        fitted = self.fit(width, height)
+        if max_tokens is None or self.estimate_tokens(*fitted) <= max_tokens:
+            return fitted
+
+        # Token counts grow with the scale, so bisect for the largest scale within the budget
+        low, high = 0.0, 1.0
+        for _ in range(20):
+            scale = (low + high) / 2
+            size = (max(1, int(fitted[0] * scale)), max(1, int(fitted[1] * scale)))
+            if self.estimate_tokens(*size) <= max_tokens:
+                low = scale
+            else:
+                high = scale
+        return max(1, int(fitted[0] * low)), max(1, int(fitted[1] * low))
+
+
+TOKEN_MODELS = {
+    # High detail: fit within 2048x2048, shortest side to 768, 170 tokens per 512px tile plus 85
+    "openai": ImageTokenModel(
+        name="openai",
+        formats=("JPEG", "PNG", "WEBP", "GIF"),
+        max_long_side=2048,
+        max_short_side=768,
+        tile_size=512,
+        tokens_per_tile=170,
+        base_tokens=85,
+    ),
+    # 258 tokens for images up to 384x384, otherwise 258 per 768x768 tile
+    "gemini": ImageTokenModel(
+        name="gemini",
+        formats=("JPEG", "PNG", "WEBP"),
+        max_long_side=3072,
+        tile_size=768,
+        tokens_per_tile=258,
+        small_side=384,
+        small_tokens=258,
+    ),
+    # About width * height / 750 tokens, long side up to 1568 and about 1.15 megapixels
+    "anthropic": ImageTokenModel(
+        name="anthropic",
+        formats=("JPEG", "PNG", "WEBP", "GIF"),
+        max_long_side=1568,
+        max_pixels=1_150_000,
+        pixels_per_token=750,
+    ),
+    # One token per 28x28 patch
+    "qwen-vl": ImageTokenModel(
+        name="qwen-vl",
+        formats=("JPEG", "PNG", "WEBP"),
+        max_pixels=12_845_056,
+        pixels_per_token=28 * 28,
+    ),
+    # Conservative model for unknown, usually local, vision models
+    "default": ImageTokenModel(
+        name="default",
+        formats=("JPEG", "PNG"),
+        max_long_side=2048,
+        pixels_per_token=28 * 28,
+    ),
+}
+
+# Model name patterns mapped to token models, checked before the provider kind
+MODEL_PATTERNS: Tuple[Tuple[re.Pattern, str], ...] = (
+    (re.compile(r"(^|/)(gpt-4o|gpt-4\.1|gpt-5|o1|o3|o4|chatgpt)", re.IGNORECASE), "openai"),
+    (re.compile(r"(^|/)(gemini|gemma)", re.IGNORECASE), "gemini"),
+    (re.compile(r"(^|/)claude", re.IGNORECASE), "anthropic"),
+    (re.compile(r"qwen.*vl", re.IGNORECASE), "qwen-vl"),
+)
+
+PROVIDER_TOKEN_MODELS = {"openai": "openai", "gemini": "gemini"}
+
+
+def get_token_model(provider_kind: str, model: str) -> ImageTokenModel:
+    """
+    Get the image token model for a provider and model.
+
+    Args:
+        provider_kind: Kind of the provider (openai, gemini, openrouter, ollama, vllm)
+        model: Name of the model
+
+    Returns:
+        The matching token model, or the default model
+    """
+    for pattern, name in MODEL_PATTERNS:
+        if pattern.search(model):
+            return TOKEN_MODELS[name]
+    return TOKEN_MODELS[PROVIDER_TOKEN_MODELS.get(provider_kind, "default")]
+
+
+@dataclass
+class PreparedImage:
+    """
+    An image ready to send to a provider.
+
+    Attributes:
+        data: Encoded image bytes
+        mime_type: MIME type of the data
+        size: Size of the encoded image
+        original_size: Size of the source image
+        original_bytes: Size in bytes of the source image
+        original_tokens: Estimated image tokens for the source image
+        tokens: Estimated image tokens for the prepared image
+    """
+
+    data: bytes
+    mime_type: str
+    size: Tuple[int, int]
+    original_size: Tuple[int, int]
+    original_bytes: int
+    original_tokens: int
+    tokens: int
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.original_bytes - len(self.data)
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.original_tokens - self.tokens
+
+
+@dataclass
+class PreprocessingStats:
+    """Running totals over the images prepared by a preprocessor."""
+
+    images: int = 0
+    original_bytes: int = 0
+    bytes: int = 0
+    original_tokens: int = 0
+    tokens: int = 0
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.original_bytes - self.bytes
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.original_tokens - self.tokens
+
+    def as_dict(self) -> dict:
+        return {**asdict(self), "bytes_saved": self.bytes_saved, "tokens_saved": self.tokens_saved}
+
+
+def _has_transparency(image: "Image.Image") -> bool:
+    """Check whether an image has any pixel that is not fully opaque."""
+    if image.mode in ("RGBA", "LA"):
+        return image.getchannel("A").getextrema()[0] < 255
+    return image.mode == "P" and "transparency" in image.info
+
+
+@dataclass
+class ImagePreprocessor:
+    """
+    Prepares images for vision requests of a provider and model.
+
+    Safe to share between threads; use one instance per configuration so the
+    statistics cover all of its requests.
+
+    Attributes:
+        quality: Encoding quality for lossy formats
+        max_image_tokens: Optional budget of image tokens per image
+        formats: Formats considered when re-encoding, narrowed to those the provider accepts
+    """
+
+    quality: int = 85
+    max_image_tokens: Optional[int] = None
+    formats: Tuple[str, ...] = ENCODE_FORMATS
+    stats: PreprocessingStats = field(default_factory=PreprocessingStats)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def _encode(self, image: "Image.Image", image_format: str, transparent: bool) -> bytes:
+        """Encode an image in one format, converting its mode as the format requires."""
+        if image_format == "JPEG":
+            image = image.convert("L" if image.mode in ("L", "LA") else "RGB")
+        elif image.mode not in ("L", "LA", "RGB", "RGBA"):
+            image = image.convert("RGBA" if transparent else "RGB")
+        output = io.BytesIO()
+        params = {"quality": self.quality} if image_format in ("JPEG", "WEBP") else {}
+        image.save(output, format=image_format, **params)
+        return output.getvalue()
+
+    def _encode_smallest(self, image: "Image.Image", formats: Tuple[str, ...]) -> Tuple[bytes, str]:
+        """
+        Encode an image in the candidate format that gives the smallest result.
+
+        Large images are ranked by encoding a thumbnail in every candidate format,
+        so only the winner is encoded at full size. JPEG is skipped for transparent
+        images; if no candidate is left, the image is encoded as FALLBACK_FORMAT.
+        """
+        transparent = _has_transparency(image)
+        candidates = [image_format for image_format in formats if not (image_format == "JPEG" and transparent)]
+        if not candidates:
+            return self._encode(image, FALLBACK_FORMAT, transparent), FALLBACK_FORMAT
+        if len(candidates) == 1:
+            return self._encode(image, candidates[0], transparent), candidates[0]
+
+        if max(image.size) > PROBE_SIZE:
+            probe = image.copy()
+            probe.thumbnail((PROBE_SIZE, PROBE_SIZE), Image.BILINEAR)
+            image_format = min(candidates, key=lambda candidate: len(self._encode(probe, candidate, transparent)))
+            return self._encode(image, image_format, transparent), image_format
+
+        encoded = {image_format: self._encode(image, image_format, transparent) for image_format in candidates}
+        image_format = min(candidates, key=lambda candidate: len(encoded[candidate]))
+        return encoded[image_format], image_format
+
+    def _record(self, prepared: PreparedImage) -> None:
+        """Add a prepared image to the running statistics."""
+        with self._lock:
+            self.stats.images += 1
+            self.stats.original_bytes += prepared.original_bytes
+            self.stats.bytes += len(prepared.data)
+            self.stats.original_tokens += prepared.original_tokens
+            self.stats.tokens += prepared.tokens
+
+    def prepare(self, image: bytes | str | Path, provider_kind: str, model: str) -> PreparedImage:
+        """
+        Resize and re-encode an image for a provider and model.
+
+        Args:
+            image: Encoded image bytes or path to an image file
+            provider_kind: Kind of the provider (openai, gemini, openrouter, ollama, vllm)
+            model: Name of the model
+
+        Returns:
+            The prepared image; data Pillow cannot decode is passed through unchanged
+
+        Raises:
+            ImportError: If Pillow is not installed
+        """
+        if Image is None:
+            raise ImportError("Image preprocessing requires Pillow. Install it with 'pip install Pillow'.")
+
+        data = image if isinstance(image, bytes) else Path(image).read_bytes()
+        token_model = get_token_model(provider_kind, model)
+        formats = tuple(image_format for image_format in self.formats if image_format in token_model.formats)
+
+        try:
+            source = Image.open(io.BytesIO(data))
+        except UnidentifiedImageError:
+            # Let the provider decide what to do with a format Pillow does not know
+            logger.warning(f"Sending {len(data)} bytes of undecodable image data unchanged")
+            tokens = token_model.estimate_tokens(*UNDECODED_IMAGE_SIZE)
+            prepared = PreparedImage(
+                data=data,
+                mime_type=sniff_mime_type(data),
+                size=(0, 0),
+                original_size=(0, 0),
+                original_bytes=len(data),
+                original_tokens=tokens,
+                tokens=tokens,
+            )
+            self._record(prepared)
+            return prepared
+
+        with source:
+            source_format = source.format
+            # Re-encoding drops EXIF, so apply its orientation to the pixels
+            orientation = source.getexif().get(EXIF_ORIENTATION, 1)
+            rotated = orientation != 1
+            transposed = orientation in TRANSPOSED_ORIENTATIONS
+            original_size = source.size[::-1] if transposed else source.size
+            size = token_model.target_size(*original_size, max_tokens=self.max_image_tokens)
+
+            if size == original_size and source_format in token_model.formats and not rotated:
+                # Nothing to gain from a resize; re-encode only if that is smaller
+                encoded, image_format = self._encode_smallest(source, formats)
+                if len(encoded) >= len(data):
+                    encoded, image_format = data, source_format
+            else:
+                if size != original_size:
+                    # Let the JPEG decoder downscale while decoding, before the pixels are loaded
+                    source.draft(source.mode, size[::-1] if transposed else size)
+                oriented = ImageOps.exif_transpose(source) if rotated else source
+                if oriented.size != size:
+                    oriented = oriented.resize(size, Image.LANCZOS)
+                encoded, image_format = self._encode_smallest(oriented, formats)
+
+        prepared = PreparedImage(
+            data=encoded,
+            mime_type=MIME_TYPES.get(image_format, sniff_mime_type(encoded)),
+            size=size,
+            original_size=original_size,
+            original_bytes=len(data),
+            original_tokens=token_model.estimate_tokens(*original_size),
+            tokens=token_model.estimate_tokens(*size),
+        )
+        self._record(prepared)
+
+        logger.debug(
+            f"Prepared image for {token_model.name}: {original_size[0]}x{original_size[1]} → {size[0]}x{size[1]} "
+            f"{image_format}, {prepared.original_bytes} → {len(encoded)} bytes, "
+            f"~{prepared.original_tokens} → ~{prepared.tokens} image tokens"
+        )
+        return prepared
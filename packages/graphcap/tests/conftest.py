@@ -0,0 +1,100 @@
+"""
+# SPDX-License-Identifier: Apache-2.0
+Shared fixtures for graphcap tests.
+"""
+
+import asyncio
+import json
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Optional
+
+import pytest
+
+from graphcap.perspectives.perspective_loader import JsonPerspectiveProcessor, PerspectiveConfig
+
+GRAPH_CAPTION_PATH = Path(__file__).parents[3] / "workspace/perspective_library/core/graph_caption.json"
+
+
+class FakeProvider:
+    """
+    Provider stub that records call order and concurrency.
+
+    By default every image is captioned as ``{"caption": <image name>}``.
+
+    Attributes:
+        calls: (image name, prompt) of every request, in completion order
+        kwargs: Keyword arguments of the last request
+        peak: Largest number of concurrent requests
+    """
+
+    name = "fake"
+
+    def __init__(
+        self,
+        fail_prompt: Optional[str] = None,
+        response: Optional[Callable[[Path], Dict[str, Any]]] = None,
+        delay: float = 0.01,
+    ):
+        self.calls: list[tuple[str, str]] = []
+        self.kwargs: Dict[str, Any] = {}
+        self.active = 0
+        self.peak = 0
+        self.fail_prompt = fail_prompt
+        self.response = response
+        self.delay = delay
+
+    async def vision(self, prompt: str, image: Path, **kwargs):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+            self.calls.append((Path(image).name, prompt))
+            self.kwargs = kwargs
+            if self.fail_prompt and prompt.endswith(self.fail_prompt):
+                raise RuntimeError("provider failure")
+            parsed = self.response(Path(image)) if self.response else {"caption": Path(image).name}
+            content = json.dumps(parsed)
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content, parsed=None))])
+        finally:
+            self.active -= 1
+
+
+def make_processor(name: str) -> JsonPerspectiveProcessor:
+    """Create a single-field perspective processor."""
+    return JsonPerspectiveProcessor(
+        PerspectiveConfig(
+            name=name,
+            display_name=name.title(),
+            version="1",
+            prompt=f"{name} prompt",
+            schema_fields=[{"name": "caption", "type": "str", "description": "A caption"}],
+            table_columns=[{"name": "Caption", "style": "green"}],
+            context_template=f"<{name}>{{caption}}</{name}>",
+        )
+    )
+
+
+@pytest.fixture
+def provider_factory() -> type[FakeProvider]:
+    """The provider stub class, for tests that configure it or pass it as a factory."""
+    return FakeProvider
+
+
+@pytest.fixture
+def fake_provider() -> FakeProvider:
+    """A provider stub with default responses."""
+    return FakeProvider()
+
+
+@pytest.fixture(name="make_processor")
+def make_processor_fixture() -> Callable[[str], JsonPerspectiveProcessor]:
+    """Factory of single-field perspective processors."""
+    return make_processor
+
+
+@pytest.fixture
+def graph_caption_config() -> PerspectiveConfig:
+    """Load the graph caption perspective, which uses complex nested fields."""
+    with open(GRAPH_CAPTION_PATH, "r") as f:
+        return PerspectiveConfig(**json.load(f))
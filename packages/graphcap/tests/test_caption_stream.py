@@ -0,0 +1,171 @@
+"""
+# SPDX-License-Identifier: Apache-2.0
+Tests for streamed batch captioning, caption sinks and process-pool execution.
+"""
+
+import asyncio
+import json
+import pickle
+from pathlib import Path
+
+import pytest
+
+from graphcap.perspectives.process_pool import ProcessPoolCaptioner
+from graphcap.perspectives.sinks import (
+    BufferedJsonlCaptionSink,
+    CallbackCaptionSink,
+    JsonlCaptionSink,
+    read_caption_results,
+)
+
+
+@pytest.mark.asyncio
+async def test_stream_writes_every_result_to_sinks(tmp_path, fake_provider, make_processor):
+    """Every streamed result reaches the sinks and progress reflects failures."""
+    provider = fake_provider
+    processor = make_processor("alpha")
+    batches = []
+
+    async def write_batch(batch):
+        batches.append(batch)
+
+    def images():
+        for i in range(5):
+            yield Path(f"image_{i}.jpg")
+
+    progress = []
+    sinks = [JsonlCaptionSink(tmp_path / "captions.jsonl"), CallbackCaptionSink(write_batch, batch_size=2)]
+    results = [
+        result
+        async for result in processor.process_stream(
+            provider, images(), "test-model", max_concurrent=2, sinks=sinks, on_progress=progress.append
+        )
+    ]
+
+    assert provider.peak <= 2
+    assert sorted(result["filename"] for result in results) == [f"./image_{i}.jpg" for i in range(5)]
+    assert progress[-1].completed == 5 and progress[-1].failed == 0
+
+    lines = (tmp_path / "captions.jsonl").read_text().splitlines()
+    assert len(lines) == 5
+    assert json.loads(lines[0])["config_name"] == "alpha"
+    assert [len(batch) for batch in batches] == [2, 2, 1]
+
+
+@pytest.mark.asyncio
+async def test_buffered_sink_batches_and_checkpoints(tmp_path, fake_provider, make_processor):
+    """Concurrent writes land as whole lines, and checkpoints report durable counts."""
+    checkpoints = []
+    sink = BufferedJsonlCaptionSink(
+        tmp_path / "captions.jsonl", batch_size=4, checkpoint_every=8, on_checkpoint=checkpoints.append
+    )
+    processor = make_processor("alpha")
+    provider = fake_provider
+
+    async def produce(start):
+        for i in range(start, start + 5):
+            parsed = {"error": "failed"} if i == 0 else {"caption": "x" * 1000}
+            await sink.write(processor.build_caption_result(provider, Path(f"image_{i}.jpg"), "test-model", parsed))
+
+    await asyncio.gather(produce(0), produce(5))
+    stats = await sink.checkpoint()
+    assert (stats.written, stats.failed, stats.succeeded) == (10, 1, 9)
+    await sink.write(processor.build_caption_result(provider, Path("late.jpg"), "test-model", {"caption": "y"}))
+    await sink.close()
+
+    lines = (tmp_path / "captions.jsonl").read_text().splitlines()
+    assert sorted(json.loads(line)["filename"] for line in lines)[-1] == "./late.jpg"
+    assert len(lines) == 11
+    assert [c.written for c in checkpoints] == [8, 10, 11]
+
+
+@pytest.mark.asyncio
+async def test_buffered_sink_flushes_on_interval(tmp_path, fake_provider, make_processor):
+    """A partial batch is written once it has waited flush_interval seconds."""
+    sink = BufferedJsonlCaptionSink(tmp_path / "captions.jsonl", batch_size=100, flush_interval=0.01)
+    processor = make_processor("alpha")
+
+    await sink.write(processor.build_caption_result(fake_provider, Path("image.jpg"), "test-model", {"caption": "x"}))
+    await asyncio.sleep(0.2)
+    assert len((tmp_path / "captions.jsonl").read_text().splitlines()) == 1
+    await sink.close()
+
+
+@pytest.mark.asyncio
+async def test_buffered_sink_appends_after_torn_line(tmp_path, fake_provider, make_processor):
+    """Appending after a crash mid-line keeps new results readable."""
+    path = tmp_path / "captions.jsonl"
+    processor = make_processor("alpha")
+    first = processor.build_caption_result(fake_provider, Path("first.jpg"), "test-model", {"caption": "x"})
+    path.write_text(json.dumps(first) + "\n" + '{"filename": "./torn')
+
+    sink = BufferedJsonlCaptionSink(path)
+    await sink.write(processor.build_caption_result(fake_provider, Path("second.jpg"), "test-model", {"caption": "y"}))
+    await sink.close()
+
+    assert [result["filename"] for result in read_caption_results(path)] == ["./first.jpg", "./second.jpg"]
+
+
+@pytest.mark.asyncio
+async def test_buffered_sink_compresses_with_zstd(tmp_path, fake_provider, make_processor):
+    """Compressed output decompresses to the same JSON Lines."""
+    zstandard = pytest.importorskip("zstandard")
+    path = tmp_path / "captions.jsonl.zst"
+    sink = BufferedJsonlCaptionSink(path, batch_size=2, compression="zstd")
+    processor = make_processor("alpha")
+    for i in range(3):
+        result = processor.build_caption_result(fake_provider, Path(f"{i}.jpg"), "test-model", {"caption": "x"})
+        await sink.write(result)
+        await sink.checkpoint()
+    await sink.close()
+
+    with zstandard.ZstdDecompressor().stream_reader(path.open("rb"), read_across_frames=True) as reader:
+        assert len(reader.read().decode().splitlines()) == 3
+    assert len(list(read_caption_results(path))) == 3
+
+
+def test_read_compressed_results_stops_at_torn_frame(tmp_path):
+    """Results in complete frames are read, and a frame torn by a crash ends the file."""
+    zstandard = pytest.importorskip("zstandard")
+    compressor = zstandard.ZstdCompressor()
+    frames = [
+        compressor.compress((json.dumps({"filename": f"./{i}.jpg", "parsed": {}}) + "\n").encode()) for i in range(3)
+    ]
+    path = tmp_path / "captions.jsonl.zst"
+    path.write_bytes(frames[0] + frames[1] + frames[2][: len(frames[2]) // 2])
+
+    assert [result["filename"] for result in read_caption_results(path)] == ["./0.jpg", "./1.jpg"]
+
+
+@pytest.mark.asyncio
+async def test_stream_records_errors(provider_factory, make_processor):
+    """Provider failures are yielded as error results instead of aborting the stream."""
+    provider = provider_factory(fail_prompt="alpha prompt")
+    processor = make_processor("alpha")
+
+    results = [result async for result in processor.process_stream(provider, [Path("image.jpg")], "test-model")]
+
+    assert "error" in results[0]["parsed"]
+
+
+def test_processor_pickles_by_config(make_processor):
+    """Processors survive a pickle round trip and are rebuilt from their configuration."""
+    processor = make_processor("alpha")
+
+    restored = pickle.loads(pickle.dumps(processor))
+
+    assert restored.config_hash == processor.config_hash
+    assert restored.vision_config.prompt == processor.vision_config.prompt
+    assert pickle.loads(pickle.dumps(processor)) is restored
+
+
+@pytest.mark.asyncio
+async def test_process_pool_captioner(provider_factory, make_processor):
+    """Worker processes caption every image and return results to the caller."""
+    images = [Path(f"image_{i}.jpg") for i in range(5)]
+
+    with ProcessPoolCaptioner(provider_factory, processes=2, max_concurrent=2, chunk_size=2) as captioner:
+        results = [result async for result in captioner.run(make_processor("alpha"), images, "test-model")]
+
+    assert sorted(result["filename"] for result in results) == [f"./image_{i}.jpg" for i in range(5)]
+    assert all(result["parsed"]["caption"] == result["filename"][2:] for result in results)
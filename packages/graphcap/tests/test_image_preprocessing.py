@@ -0,0 +1,153 @@
+"""
+# SPDX-License-Identifier: Apache-2.0
+Tests for provider-aware image preprocessing.
+"""
+
+import base64
+import io
+from types import SimpleNamespace
+
+import pytest
+from PIL import Image
+
+from graphcap.providers import ImagePreprocessor, get_token_model, sniff_mime_type
+from graphcap.providers.clients import OpenRouterClient
+
+
+def encode(image: Image.Image, image_format: str) -> bytes:
+    output = io.BytesIO()
+    image.save(output, format=image_format)
+    return output.getvalue()
+
+
+def test_token_models():
+    """Token estimates follow the documented provider formulas."""
+    openai = get_token_model("openai", "gpt-4o")
+    assert openai.estimate_tokens(1024, 1024) == 765
+    assert openai.estimate_tokens(2048, 4096) == 1105
+
+    gemini = get_token_model("gemini", "gemini-2.0-flash")
+    assert gemini.estimate_tokens(300, 200) == 258
+
+    # OpenRouter models are matched by name, unknown local models use the default
+    assert get_token_model("openrouter", "anthropic/claude-3.5-sonnet").name == "anthropic"
+    assert get_token_model("vllm", "Qwen/Qwen2.5-VL-7B-Instruct").name == "qwen-vl"
+    assert get_token_model("ollama", "llava").name == "default"
+
+
+def test_token_budget_shrinks_target_size():
+    """A token budget picks the largest size whose estimate fits."""
+    openai = get_token_model("openai", "gpt-4o")
+    width, height = openai.target_size(4000, 3000, max_tokens=255)
+
+    assert openai.estimate_tokens(width, height) <= 255
+    assert openai.estimate_tokens(width + 10, height + 10) > 255
+
+
+def test_prepare_resizes_to_provider_limits():
+    """Oversized images are downscaled to what the provider keeps and labelled correctly."""
+    preprocessor = ImagePreprocessor()
+    data = encode(Image.linear_gradient("L").resize((2048, 1536)).convert("RGB"), "PNG")
+
+    prepared = preprocessor.prepare(data, "openai", "gpt-4o")
+
+    assert prepared.size == (1024, 768)
+    assert prepared.mime_type == sniff_mime_type(prepared.data)
+    assert prepared.bytes_saved > 0
+    assert preprocessor.stats.images == 1
+    assert preprocessor.stats.bytes_saved == prepared.bytes_saved
+
+
+def test_prepare_keeps_transparency():
+    """Transparent images are never re-encoded as JPEG."""
+    preprocessor = ImagePreprocessor(formats=("JPEG", "PNG"))
+    data = encode(Image.new("RGBA", (64, 64), (255, 0, 0, 128)), "PNG")
+
+    prepared = preprocessor.prepare(data, "gemini", "gemini-2.0-flash")
+
+    assert prepared.mime_type == "image/png"
+
+
+def test_transparent_image_falls_back_to_png():
+    """A transparent image is encoded as PNG when JPEG is the only candidate format."""
+    preprocessor = ImagePreprocessor(formats=("JPEG",))
+    data = encode(Image.new("RGBA", (2048, 2048), (255, 0, 0, 128)), "PNG")
+
+    prepared = preprocessor.prepare(data, "openai", "gpt-4o")
+
+    assert prepared.mime_type == "image/png"
+    assert sniff_mime_type(prepared.data) == "image/png"
+
+
+def test_undecodable_image_passes_through():
+    """Data Pillow cannot decode is sent unchanged."""
+    preprocessor = ImagePreprocessor()
+    data = b"\x00\x00\x00\x18ftypheic\x00\x00\x00\x00mif1heic"
+
+    prepared = preprocessor.prepare(data, "gemini", "gemini-2.0-flash")
+
+    assert prepared.data == data
+    assert preprocessor.stats.images == 1
+
+
+def test_prepare_applies_orientation_after_draft():
+    """Rotated JPEGs are downscaled while decoding and sent upright at the target size."""
+    preprocessor = ImagePreprocessor()
+    image = Image.linear_gradient("L").resize((4096, 3072)).convert("RGB")
+    exif = Image.Exif()
+    exif[0x0112] = 6  # Rotated 90 degrees clockwise
+    output = io.BytesIO()
+    image.save(output, format="JPEG", exif=exif)
+
+    prepared = preprocessor.prepare(output.getvalue(), "openai", "gpt-4o")
+
+    assert prepared.original_size == (3072, 4096)
+    assert prepared.size == (768, 1024)
+    with Image.open(io.BytesIO(prepared.data)) as result:
+        assert result.size == prepared.size
+
+
+@pytest.fixture
+def recording_client():
+    """OpenRouter client whose completions record their arguments instead of calling the API."""
+    client = OpenRouterClient(
+        name="openrouter", kind="openrouter", environment="cloud", base_url="http://localhost", api_key="test"
+    )
+    client.sent = {}
+
+    async def create(**kwargs):
+        client.sent.update(kwargs)
+        return SimpleNamespace(choices=[])
+
+    client.chat = SimpleNamespace(completions=SimpleNamespace(create=create))
+    return client
+
+
+@pytest.mark.asyncio
+async def test_vision_sends_content_mime_type(recording_client):
+    """The data URL carries the MIME type of the image instead of a hardcoded one."""
+    client, sent = recording_client, recording_client.sent
+    data = encode(Image.new("RGB", (8, 8)), "JPEG")
+
+    await client.vision("Describe", data, model="google/gemini-2.0-flash-001")
+
+    url = sent["messages"][0]["content"][1]["image_url"]["url"]
+    assert url == f"data:image/jpeg;base64,{base64.b64encode(data).decode()}"
+
+
+@pytest.mark.asyncio
+async def test_vision_accepts_paths_and_raw_base64(recording_client, tmp_path):
+    """Image paths are read from disk, and strings that are not files are taken as raw base64."""
+    data = encode(Image.new("RGB", (8, 8)), "PNG")
+    path = tmp_path / "image.png"
+    path.write_bytes(data)
+    expected = f"data:image/png;base64,{base64.b64encode(data).decode()}"
+
+    for image in (path, str(path), base64.b64encode(data).decode()):
+        await recording_client.vision("Describe", image, model="google/gemini-2.0-flash-001")
+        assert recording_client.sent["messages"][0]["content"][1]["image_url"]["url"] == expected
+
+    # Missing paths are never mistaken for base64, even when they happen to be valid base64
+    for missing in (str(tmp_path / "missing.png"), "image", "data/abcd", "a" * 64):
+        with pytest.raises(FileNotFoundError):
+            await recording_client.vision("Describe", missing, model="google/gemini-2.0-flash-001")
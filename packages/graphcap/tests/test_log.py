@@ -0,0 +1,57 @@
+"""
+# SPDX-License-Identifier: Apache-2.0
+Tests for log sampling and rate limiting.
+"""
+
+import sys
+
+import pytest
+from loguru import logger
+
+from graphcap.log import LogThrottle, configure_logging, throttled_logger
+
+
+def test_throttle_samples_every_nth_message():
+    """One message out of every N is let through, reporting how many were dropped."""
+    throttle = LogThrottle(every=3)
+
+    results = [throttle.allow("copy") for _ in range(7)]
+
+    assert results == [0, None, None, 2, None, None, 2]
+    # Keys are sampled independently
+    assert throttle.allow("other") == 0
+
+
+def test_throttle_rate_limits_per_key(monkeypatch):
+    """Messages beyond the per-second budget are dropped until tokens refill."""
+    now = [100.0]
+    monkeypatch.setattr("graphcap.log.time.monotonic", lambda: now[0])
+    throttle = LogThrottle(per_second=2)
+
+    assert [throttle.allow("k") for _ in range(4)] == [0, 0, None, None]
+    now[0] += 0.5
+    assert throttle.allow("k") == 2
+
+
+def test_throttled_logger_notes_suppressed_messages(capsys):
+    """Sinks from configure_logging drop throttled records and count them on the next one."""
+    configure_logging(level="DEBUG", enqueue=False, colorize=False)
+    try:
+        sampled = throttled_logger("test-sampled", every=2)
+        for index in range(3):
+            sampled.info("item {}", index)
+    finally:
+        logger.remove()
+        logger.add(sys.stderr)
+
+    lines = capsys.readouterr().err.splitlines()
+    assert len(lines) == 2
+    assert lines[0].endswith("item 0")
+    assert lines[1].endswith("item 2 (1 similar messages suppressed)")
+
+
+def test_throttle_validates_arguments():
+    with pytest.raises(ValueError):
+        LogThrottle(every=0)
+    with pytest.raises(ValueError):
+        LogThrottle(per_second=0)
@@ -8,6 +8,7 @@ import tempfile
 from pathlib import Path
 
 import pytest
+
 from graphcap.perspectives.perspective_loader import (
     ModuleConfig,
     PerspectiveSettings,
@@ -185,3 +186,17 @@ def test_perspective_metadata(temp_perspective_dir, settings):
     assert perspectives["test_root"].module_name == "default"
     assert "default" in perspectives["test_root"].tags
     assert perspectives["test_root"].priority == 30
+
+
+def test_toggle_module_advances_registry_generation(temp_perspective_dir, settings, monkeypatch):
+    """Toggling a module reloads the registry and advances its generation."""
+    import graphcap.perspectives as perspectives
+
+    monkeypatch.setattr(perspectives, "_modules", get_all_modules([Path(temp_perspective_dir)], settings))
+    monkeypatch.setattr(perspectives, "_json_perspectives", {})
+    generation = perspectives.get_registry_generation()
+
+    perspectives.toggle_module("experimental", True)
+
+    assert perspectives.get_registry_generation() == generation + 1
+    assert set(perspectives.get_perspective_list()) == {"test_core", "test_experimental", "test_root"}
@@ -0,0 +1,50 @@
+"""
+# SPDX-License-Identifier: Apache-2.0
+Tests for output field projection.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from graphcap.perspectives.perspective_loader import JsonPerspectiveProcessor
+from graphcap.perspectives.projection import clear_projection_cache, project_config
+
+
+@pytest.fixture(autouse=True)
+def empty_projection_cache():
+    """Start every test with an empty projection cache."""
+    clear_projection_cache()
+
+
+def test_projection_trims_schema_and_prompt(graph_caption_config):
+    """Only the selected fields remain in the schema and numbered prompt sections."""
+    projected = project_config(graph_caption_config, ["short_caption"])
+
+    assert [field.name for field in projected.schema_fields] == ["short_caption"]
+    assert projected.prompt.count("1. Short Caption:") == 1
+    assert "Dense Caption" not in projected.prompt
+    assert "Tags:" not in projected.prompt
+    # Closing instructions after the last section are kept
+    assert projected.prompt.endswith("based solely on what is visible in the image.")
+    assert project_config(graph_caption_config, {"short_caption"}) is projected
+
+
+def test_projection_rejects_unknown_fields(graph_caption_config):
+    """Selecting a field the perspective does not define is an error."""
+    with pytest.raises(ValueError):
+        project_config(graph_caption_config, ["short_caption", "missing"])
+
+
+@pytest.mark.asyncio
+async def test_process_single_with_fields(graph_caption_config, provider_factory):
+    """A field selection sends the projected prompt and schema."""
+    processor = JsonPerspectiveProcessor(graph_caption_config)
+    provider = provider_factory(response=lambda image: {"short_caption": "An owl"})
+
+    parsed = await processor.process_single(provider, Path("image.jpg"), "test-model", fields=["short_caption"])
+
+    assert parsed == {"short_caption": "An owl"}
+    assert "Dense Caption" not in provider.calls[0][1]
+    assert provider.kwargs["response_format"]["json_schema"]["schema"]["required"] == ["short_caption"]
+    assert processor.project(["short_caption"]) is processor.project({"short_caption"})
@@ -0,0 +1,96 @@
+"""
+# SPDX-License-Identifier: Apache-2.0
+Tests for the per-image perspective scheduler.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from graphcap.perspectives.scheduler import PerspectiveNode, PerspectiveScheduler, build_perspective_dag
+
+
+@pytest.mark.asyncio
+async def test_synthesis_streams_per_image(fake_provider, make_processor):
+    """Synthesis for early images runs before perspectives of later images finish."""
+    provider = fake_provider
+    nodes = build_perspective_dag(
+        {"alpha": make_processor("alpha"), "beta": make_processor("beta")}, make_processor("synth")
+    )
+    scheduler = PerspectiveScheduler(provider, "test-model", nodes, max_concurrent=2)
+
+    images = [Path(f"image_{i}.jpg") for i in range(6)]
+    results = [result async for result in scheduler.run(images)]
+
+    assert len(results) == 6
+    assert provider.peak <= 2
+    first = results[0]
+    assert set(first["perspectives"]) == {"alpha", "beta"}
+    assert first["synthesis"]["config_name"] == "synth"
+
+    synth_calls = [i for i, (_, prompt) in enumerate(provider.calls) if prompt.endswith("synth prompt")]
+    last_image_calls = [i for i, (image, _) in enumerate(provider.calls) if image == "image_5.jpg"]
+    assert synth_calls[0] < last_image_calls[-1]
+
+    # Synthesizer received the upstream contexts
+    assert "<alpha>" in next(prompt for _, prompt in provider.calls if prompt.endswith("synth prompt"))
+
+
+@pytest.mark.asyncio
+async def test_failed_perspectives_are_recorded(provider_factory, make_processor):
+    """Perspective errors are captured per node without failing the image."""
+    provider = provider_factory(fail_prompt="alpha prompt")
+    nodes = build_perspective_dag({"alpha": make_processor("alpha")}, make_processor("synth"))
+    scheduler = PerspectiveScheduler(provider, "test-model", nodes, max_concurrent=1)
+
+    results = [result async for result in scheduler.run([Path("image.jpg")])]
+
+    assert "error" in results[0]["perspectives"]["alpha"]["parsed"]
+    assert "error" in results[0]["synthesis"]["parsed"]
+
+
+def test_cycles_are_rejected(fake_provider, make_processor):
+    """Graphs with cycles cannot be scheduled."""
+    processor = make_processor("alpha")
+    nodes = [
+        PerspectiveNode(name="a", processor=processor, depends_on=("b",)),
+        PerspectiveNode(name="b", processor=processor, depends_on=("a",)),
+    ]
+    with pytest.raises(ValueError):
+        PerspectiveScheduler(fake_provider, "test-model", nodes)
+
+
+@pytest.mark.asyncio
+async def test_node_priority_orders_waiting_requests(fake_provider, make_processor):
+    """Waiting requests of lower-priority-value nodes are served first."""
+    provider = fake_provider
+    nodes = [
+        PerspectiveNode(name="alpha", processor=make_processor("alpha"), priority=1),
+        PerspectiveNode(name="beta", processor=make_processor("beta"), priority=0),
+    ]
+    scheduler = PerspectiveScheduler(provider, "test-model", nodes, max_concurrent=1, max_images_in_flight=2)
+
+    results = [result async for result in scheduler.run([Path("image_0.jpg"), Path("image_1.jpg")])]
+
+    assert len(results) == 2
+    # The first request takes the free slot; queued requests then go to beta first
+    prompts = [prompt.rsplit(" ", 2)[-2] for _, prompt in provider.calls[1:]]
+    assert prompts == ["beta", "beta", "alpha"]
+
+
+@pytest.mark.asyncio
+async def test_prior_results_are_reused(fake_provider, make_processor):
+    """Nodes with a prior result skip the provider, and the prior result feeds dependents."""
+    provider = fake_provider
+    alpha = make_processor("alpha")
+    nodes = build_perspective_dag({"alpha": alpha, "beta": make_processor("beta")}, make_processor("synth"))
+    scheduler = PerspectiveScheduler(provider, "test-model", nodes, max_concurrent=2)
+    prior = alpha.build_caption_result(provider, Path("image.jpg"), "test-model", {"caption": "remembered"})
+
+    prior_results = {"image.jpg": {"alpha": prior}}
+    results = [result async for result in scheduler.run([Path("image.jpg")], prior_results=prior_results)]
+
+    assert results[0]["perspectives"]["alpha"] is prior
+    prompts = [prompt for _, prompt in provider.calls]
+    assert not any(prompt.endswith("alpha prompt") for prompt in prompts)
+    assert "remembered" in next(prompt for prompt in prompts if prompt.endswith("synth prompt"))
@@ -0,0 +1,110 @@
+"""
+# SPDX-License-Identifier: Apache-2.0
+Tests for precomputed perspective schema artifacts.
+"""
+
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from graphcap.perspectives.perspective_loader import JsonPerspectiveProcessor
+from graphcap.perspectives.schema import clear_schema_cache, compute_config_hash, get_schema_artifacts
+
+
+@pytest.fixture(autouse=True)
+def empty_schema_cache():
+    """Start every test with an empty artifact cache."""
+    clear_schema_cache()
+    yield
+    clear_schema_cache()
+
+
+def test_artifacts_are_shared_by_content_hash(graph_caption_config):
+    """Processors built from identical configs reuse the same artifacts."""
+    first = JsonPerspectiveProcessor(graph_caption_config)
+    second = JsonPerspectiveProcessor(graph_caption_config.model_copy(deep=True))
+
+    assert first.config_hash == compute_config_hash(graph_caption_config)
+    assert first.schema_artifacts is second.schema_artifacts
+    assert first.vision_config.schema is second.vision_config.schema
+
+    changed = graph_caption_config.model_copy(update={"version": "2"})
+    assert get_schema_artifacts(changed).config_hash != first.config_hash
+
+
+def test_complex_fields_become_nested_models(graph_caption_config):
+    """Complex list fields are validated as lists of nested objects."""
+    artifacts = get_schema_artifacts(graph_caption_config)
+
+    tags_schema = artifacts.json_schema["properties"]["tags_list"]
+    item_ref = tags_schema["items"]["$ref"].split("/")[-1]
+    assert set(artifacts.json_schema["$defs"][item_ref]["properties"]) == {"tag", "category", "confidence"}
+
+    parsed = artifacts.validate_json(
+        json.dumps(
+            {
+                "tags_list": [{"tag": "owl", "category": "animal", "confidence": 0.9}],
+                "short_caption": "An owl",
+                "verification": "ok",
+                "dense_caption": "An owl on a branch",
+            }
+        )
+    )
+    assert parsed.model_dump()["tags_list"][0]["confidence"] == 0.9
+
+
+def test_response_format_is_strict(graph_caption_config):
+    """The precomputed response format is a strict JSON schema payload."""
+    response_format = get_schema_artifacts(graph_caption_config).response_format
+
+    assert response_format["type"] == "json_schema"
+    assert response_format["json_schema"]["strict"] is True
+    schema = response_format["json_schema"]["schema"]
+    assert schema["additionalProperties"] is False
+    assert set(schema["required"]) == {"tags_list", "short_caption", "verification", "dense_caption"}
+
+    def check(node):
+        """Every nested object is closed and requires all its properties; references stand alone."""
+        if isinstance(node, dict):
+            assert "$ref" not in node or len(node) == 1
+            if node.get("type") == "object" and "properties" in node:
+                assert node["additionalProperties"] is False
+                assert node["required"] == list(node["properties"])
+            for value in node.values():
+                check(value)
+        elif isinstance(node, list):
+            for value in node:
+                check(value)
+
+    check(schema)
+
+
+def test_parse_raw_completion_content(graph_caption_config):
+    """Raw JSON content returned for a precomputed response format is validated locally."""
+    processor = JsonPerspectiveProcessor(graph_caption_config)
+    content = json.dumps({"tags_list": [], "short_caption": "A", "verification": "B", "dense_caption": "C"})
+    completion = SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content, parsed=None))])
+
+    assert processor._parse_completion_result(completion)["short_caption"] == "A"
+
+
+def test_complex_list_fields_render_as_text(graph_caption_config):
+    """Lists of nested objects render as text in tables, contexts and rich tables."""
+    processor = JsonPerspectiveProcessor(graph_caption_config)
+    caption_data = {
+        "filename": "owl.jpg",
+        "parsed": {
+            "tags_list": [
+                {"tag": "owl", "category": "animal", "confidence": 0.9},
+                {"tag": "branch", "category": "object", "confidence": 0.7},
+            ],
+            "short_caption": "An owl",
+            "verification": "ok",
+            "dense_caption": "An owl on a branch",
+        },
+    }
+
+    assert processor.to_table(caption_data)["tags_list"] == "owl (animal, 0.9), branch (object, 0.7)"
+    assert "Tags: owl (animal, 0.9), branch (object, 0.7)" in processor.to_context(caption_data)
+    assert processor.create_rich_table(caption_data).row_count == 1